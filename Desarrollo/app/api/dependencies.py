@@ -0,0 +1,17 @@
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services.prediccion import PrediccionService
+from app.services.model_registry import ModelRegistry, get_model_registry
+
+def get_prediccion_service(
+    db: Session = Depends(get_db),
+    registry: ModelRegistry = Depends(get_model_registry)
+) -> PrediccionService:
+    """
+    Dependencia que construye un PrediccionService por request.
+
+    El servicio es liviano: el modelo y el preprocesador se toman del
+    registro compartido del proceso en lugar de cargarse en cada request.
+    """
+    return PrediccionService(db, registry=registry)
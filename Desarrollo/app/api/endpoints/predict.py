@@ -1,31 +1,58 @@
-from fastapi import APIRouter, HTTPException, status
-from app.api.models import PredictionRequest, PredictionResponse
+import numpy as np
+from fastapi import APIRouter, HTTPException, Response, status
+from app.api.models import (
+    PredictionRequest,
+    PredictionResponse,
+    ColumnarPredictionRequest,
+    ColumnarPredictionResponse
+)
 # Importaremos el servicio de predicción más adelante
-from app.services.prediction import make_prediction
-import pandas as pd
+from app.services.prediction import valid_columns
+from app.services.ml_model_service import ml_model_service
+from app.services.attribution import AttributionUnavailableError
+from app.services.columnar import FIELD_NAMES, validate_columns
+from app.core.executors import inference_executor
 
 router = APIRouter()
 
 @router.post("/predict", response_model=PredictionResponse, status_code=status.HTTP_200_OK)
-async def predict_stress(request: PredictionRequest):
+async def predict_stress(request: PredictionRequest, response: Response, explain: bool = False):
     """
     Recibe datos de estudiantes, realiza el preprocesamiento y la predicción,
     y devuelve la probabilidad de estrés académico para cada estudiante.
 
+    La variante del modelo que atendió la solicitud se indica en la cabecera X-Model-Variant.
+    Con `explain=true` se incluye, por estudiante, la contribución de cada
+    característica a la probabilidad (integrated gradients).
+
     - **request**: Cuerpo de la solicitud con la lista de estudiantes (PredictionRequest).
     - **returns**: Respuesta con la lista de probabilidades (PredictionResponse).
     """
     try:
-        # Convertir los datos de entrada Pydantic a un DataFrame de Pandas
-        # que es el formato esperado por muchos pipelines de scikit-learn.
-        input_data = pd.DataFrame([student.model_dump() for student in request.students])
+        # Convertir los datos de entrada Pydantic a columnas; el preprocesador
+        # compilado las usa directamente y el pipeline joblib como DataFrame.
+        input_data = {
+            campo: [getattr(student, campo) for student in request.students]
+            for campo in FIELD_NAMES
+        }
 
         # Llamar al servicio de predicción (RF05, RF06)
         # Esta función contendrá la lógica de preprocesamiento y predicción.
-        probabilities = make_prediction(input_data)
+        # La inferencia se ejecuta en el pool de inferencia, no en el event loop
+        explicaciones = None
+        if explain:
+            probabilities, variante, explicaciones = await inference_executor.run(
+                ml_model_service.predict_batch_explained, input_data
+            )
+        else:
+            probabilities, variante = await inference_executor.run(ml_model_service.predict_batch, input_data)
+        response.headers["X-Model-Variant"] = variante
 
         # Formatear la respuesta (RF07)
-        return PredictionResponse(probabilities=probabilities)
+        return PredictionResponse(probabilities=probabilities.tolist(), explanations=explicaciones)
+
+    except AttributionUnavailableError as ae:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(ae))
 
     except ValueError as ve:
         # Captura errores específicos que podrían surgir en la conversión o preprocesamiento
@@ -35,6 +62,8 @@ async def predict_stress(request: PredictionRequest):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error en los datos de entrada: {ve}"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         # Manejo genérico de errores de inferencia (RF08)
         # Aquí deberías loggear el error completo para depuración
@@ -44,4 +73,62 @@ async def predict_stress(request: PredictionRequest):
             detail="Ocurrió un error interno al procesar la solicitud."
         )
 
-# Nota: Necesitaremos implementar la función make_prediction en app/services/prediction.py 
\ No newline at end of file
+@router.post("/predict/columnar", response_model=ColumnarPredictionResponse, status_code=status.HTTP_200_OK)
+def predict_stress_columnar(request: ColumnarPredictionRequest, response: Response, explain: bool = False):
+    """
+    Variante masiva de /predict: recibe un arreglo por campo (todos de la misma
+    longitud) en lugar de una lista de objetos estudiante.
+
+    La validación y la construcción de la entrada del modelo son vectorizadas.
+    Las filas inválidas se informan en `errors` y su probabilidad es null; el
+    resto del lote se predice normalmente. Con `explain=true` se explica cada fila válida.
+
+    - **request**: Columnas de datos de estudiantes (ColumnarPredictionRequest).
+    - **returns**: Probabilidades por fila y errores por fila (ColumnarPredictionResponse).
+    """
+    try:
+        columnas, validas, errores = validate_columns(dict(request))
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error en los datos de entrada: {ve}"
+        )
+
+    explicaciones_validas = []
+    try:
+        if validas.any() and explain:
+            probabilidades_validas, variante, explicaciones_validas = ml_model_service.predict_batch_explained(
+                valid_columns(columnas, validas)
+            )
+            response.headers["X-Model-Variant"] = variante
+        elif validas.any():
+            probabilidades_validas, variante = ml_model_service.predict_batch(valid_columns(columnas, validas))
+            response.headers["X-Model-Variant"] = variante
+        else:
+            probabilidades_validas = np.empty(0, dtype=np.float64)
+    except AttributionUnavailableError as ae:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(ae))
+    except Exception as e:
+        print(f"Error inesperado durante la predicción columnar: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ocurrió un error interno al procesar la solicitud."
+        )
+
+    probabilidades = [None] * len(validas)
+    for fila, probabilidad in zip(validas.nonzero()[0].tolist(), probabilidades_validas.tolist()):
+        probabilidades[fila] = probabilidad
+    explicaciones = None
+    if explain:
+        explicaciones = [None] * len(validas)
+        for fila, explicacion in zip(validas.nonzero()[0].tolist(), explicaciones_validas):
+            explicaciones[fila] = explicacion
+
+    n_validas = int(validas.sum())
+    return ColumnarPredictionResponse(
+        probabilities=probabilidades,
+        errors=errores,
+        n_valid=n_validas,
+        n_invalid=len(validas) - n_validas,
+        explanations=explicaciones
+    ) 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, conlist, EmailStr
-from typing import List, Union, Literal, Optional
+from typing import Any, Dict, List, Union, Literal, Optional
 from datetime import date
 
 # Modelo para los datos de entrada de un estudiante (RF02)
@@ -42,8 +42,46 @@ class PredictionRequest(BaseModel):
     students: conlist(StudentDataInput, min_length=1)
 
 # Modelo para la respuesta de predicción (RF07)
+class Explanation(BaseModel):
+    base: float = Field(..., description="Probabilidad de la línea base (estudiante promedio)")
+    contributions: Dict[str, float] = Field(
+        ..., description="Contribución de cada característica a la probabilidad, de mayor a menor en valor absoluto"
+    )
+
 class PredictionResponse(BaseModel):
     probabilities: List[float] = Field(..., description="Lista de probabilidades de estrés académico (clase '1')")
+    explanations: Optional[List[Explanation]] = Field(None, description="Explicación por estudiante (con explain=true)")
+
+# Variante columnar de la solicitud: un arreglo por campo de StudentDataInput.
+# Los elementos no se validan con pydantic; se validan de forma vectorizada y
+# los errores se informan por fila sin rechazar el lote completo.
+class ColumnarPredictionRequest(BaseModel):
+    gender: List[Any]
+    year_of_study: List[Any]
+    program_major: List[Any]
+    credit_load: List[Any]
+    gpa_previous_semester: List[Any]
+    gpa_current_semester: List[Any]
+    number_of_failed_courses_current_semester: List[Any]
+    number_of_course_withdrawals_current_semester: List[Any]
+    entrance_exam_score_percentile: List[Any]
+    lms_activity_weekly_hours_avg_last_month: List[Any]
+    support_service_use_last_month: List[Any]
+    edad: List[Any]
+
+class RowError(BaseModel):
+    row: int = Field(..., description="Índice de la fila (estudiante) con error")
+    field: str = Field(..., description="Campo inválido")
+    error: str = Field(..., description="Descripción del error")
+
+class ColumnarPredictionResponse(BaseModel):
+    probabilities: List[Optional[float]] = Field(..., description="Probabilidad por fila; null si la fila es inválida")
+    errors: List[RowError] = Field(default_factory=list, description="Errores de validación por fila")
+    n_valid: int
+    n_invalid: int
+    explanations: Optional[List[Optional[Explanation]]] = Field(
+        None, description="Explicación por fila (con explain=true); null si la fila es inválida"
+    )
 
 class ContactInfo(BaseModel):
     email: EmailStr
@@ -79,14 +117,4 @@ class StressPrediction(BaseModel):
     riesgo_estres: float = Field(..., ge=0, le=100)
     riesgo_desercion: float = Field(..., ge=0, le=100)
     factores_estres: List[str]
-
-class PredictionRequest(BaseModel):
-    estudiante_id: int
-    datos_academicos: dict
-    datos_personales: dict
-    historial_academico: List[AcademicHistory]
-
-class PredictionResponse(BaseModel):
-    prediccion: StressPrediction
-    mensaje: str
-    recomendaciones: List[str] 
\ No newline at end of file
+ 
\ No newline at end of file
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.services.academic_data_service import AcademicDataService
+from app.services.academic_event_stream import FORMATOS, formato_desde_content_type, validar_arreglo
+from app.services.bulk_ingestion import BulkAcademicEventLoader, BulkStudentDataSync, BulkLoader
 from app.models import AcademicHistory
 from pydantic import BaseModel
 from datetime import datetime
@@ -30,6 +32,7 @@ def registrar_evento_academico(
 ):
     """
     Registra un evento académico para un estudiante.
+    La predicción de estrés se actualiza en segundo plano.
     """
     try:
         service = AcademicDataService(db)
@@ -55,6 +58,7 @@ def actualizar_datos_lms(
 ):
     """
     Actualiza los datos de actividad en el LMS para un estudiante.
+    La predicción de estrés se actualiza en segundo plano.
     """
     try:
         service = AcademicDataService(db)
@@ -78,6 +82,7 @@ def actualizar_servicios_apoyo(
 ):
     """
     Actualiza los datos de uso de servicios de apoyo para un estudiante.
+    La predicción de estrés se actualiza en segundo plano.
     """
     try:
         service = AcademicDataService(db)
@@ -94,6 +99,82 @@ def actualizar_servicios_apoyo(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/eventos-academicos/carga-masiva", response_model=dict)
+async def cargar_eventos_academicos(
+    request: Request,
+    formato: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Registra eventos académicos en bloque desde un archivo NDJSON o CSV
+    enviado como cuerpo de la petición.
+
+    Cada línea (o fila CSV, con encabezado) tiene los campos estudiante_id,
+    evento, detalles, promedio y, opcionalmente, fecha. El archivo se procesa
+    a medida que llega; las filas inválidas se reportan por número de línea
+    sin detener la carga. Al terminar se encola una sola actualización de la
+    predicción de estrés por estudiante afectado.
+
+    El formato se toma del parámetro `formato` o del encabezado Content-Type
+    (application/x-ndjson o text/csv); también se acepta un arreglo JSON.
+    """
+    return await _cargar_lote(request, formato, BulkAcademicEventLoader(db))
+
+@router.post("/datos-lms/lote", response_model=dict)
+async def sincronizar_datos_lms(
+    request: Request,
+    formato: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Actualiza la actividad en el LMS de muchos estudiantes a la vez.
+
+    Acepta un arreglo JSON o un archivo NDJSON/CSV de
+    {estudiante_id, horas_actividad_semanal}. Responde con los errores por
+    fila y encola una actualización de la predicción por estudiante.
+    """
+    return await _cargar_lote(request, formato, BulkStudentDataSync.lms(db))
+
+@router.post("/servicios-apoyo/lote", response_model=dict)
+async def sincronizar_servicios_apoyo(
+    request: Request,
+    formato: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Actualiza el uso de servicios de apoyo de muchos estudiantes a la vez.
+
+    Acepta un arreglo JSON o un archivo NDJSON/CSV de
+    {estudiante_id, servicios_utilizados} (en CSV, los servicios separados
+    por ";"). Responde con los errores por fila y encola una actualización
+    de la predicción por estudiante.
+    """
+    return await _cargar_lote(request, formato, BulkStudentDataSync.servicios_apoyo(db))
+
+async def _cargar_lote(request: Request, formato: Optional[str], loader: BulkLoader) -> dict:
+    """Carga el cuerpo como arreglo JSON (application/json) o como archivo NDJSON/CSV por partes."""
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    try:
+        if formato is None and content_type == "application/json":
+            try:
+                filas = validar_arreglo(await request.json(), loader.modelo)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return await loader.cargar_filas(filas)
+
+        formato = (formato or formato_desde_content_type(content_type) or "").lower()
+        if formato not in FORMATOS:
+            raise HTTPException(
+                status_code=415,
+                detail="Formato no soportado; use Content-Type application/json, application/x-ndjson "
+                       f"o text/csv, o formato={'|'.join(FORMATOS)}"
+            )
+        return await loader.cargar_stream(request.stream(), formato)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/historial/{estudiante_id}", response_model=List[dict])
 def obtener_historial_academico(
     estudiante_id: int,
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.session import get_db
+from app.database import get_db
 from app.services.admin_service import AdminService
-from app.schemas import AdminCreate, AdminResponse
+from app.models import AdminCreate, AdminResponse
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from app.database import get_db
 from app.services.auth_service import AuthService
+from app.core.executors import db_executor, hashing_executor
 from app.models import User, UserRole
 from pydantic import BaseModel
 from datetime import timedelta
@@ -34,7 +35,8 @@ async def login_for_access_token(
     Endpoint para obtener un token de acceso.
     """
     auth_service = AuthService(db)
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    # bcrypt es deliberadamente lento: se verifica fuera del event loop
+    user = await hashing_executor.run(auth_service.authenticate_user, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -57,7 +59,8 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     Endpoint para iniciar sesión.
     """
     auth_service = AuthService(db)
-    user = auth_service.authenticate_user(user_data.email, user_data.password)
+    # bcrypt es deliberadamente lento: se verifica fuera del event loop
+    user = await hashing_executor.run(auth_service.authenticate_user, user_data.email, user_data.password)
     
     if not user:
         raise HTTPException(
@@ -82,7 +85,7 @@ async def get_current_user(
     Dependencia para obtener el usuario actual.
     """
     auth_service = AuthService(db)
-    user = auth_service.get_current_user(token)
+    user = await db_executor.run(auth_service.get_current_user, token)
     
     if not user:
         raise HTTPException(
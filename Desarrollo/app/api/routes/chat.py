@@ -28,6 +28,8 @@ async def iniciar_conversacion(
             contexto=conversacion.contexto
         )
         return nueva_conversacion
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -48,6 +50,8 @@ async def enviar_mensaje(
             mensaje_metadata=mensaje.mensaje_metadata
         )
         return respuesta
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -68,6 +72,8 @@ async def actualizar_conversacion(
             # TODO: Implementar actualización de otros campos
             raise HTTPException(status_code=501, detail="Funcionalidad no implementada")
         return conversacion
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -87,5 +93,7 @@ async def obtener_historial(
             limit=limit
         )
         return historial
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
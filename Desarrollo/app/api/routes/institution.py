@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.session import get_db
+from app.database import get_db
 from app.services.institution_service import InstitutionService
 from app.models import InstitutionCreate, InstitutionResponse
 
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from pydantic import BaseModel
+from app.api.routes.auth import check_admin_permissions
+from app.models import User
+from app.core.executors import inference_executor
+from app.services.ml_model_service import ml_model_service
+from app.services.model_registry import model_registry, reload_unpinned
+
+router = APIRouter(prefix="/modelos", tags=["modelos"])
+
+class RecargaModelo(BaseModel):
+    version: Optional[str] = None  # Por defecto, la indicada en CURRENT
+    activar: bool = True  # Escribir CURRENT para que el resto de workers también la adopte
+
+@router.get("", response_model=dict)
+async def listar_versiones(current_user: User = Depends(check_admin_permissions)):
+    """
+    Lista la versión de modelo activa en este worker, la indicada en CURRENT y las publicadas.
+    """
+    return {
+        "activa": model_registry.version,
+        "current": model_registry.current_pointer(),
+        "disponibles": model_registry.available_versions(),
+        "recargando": model_registry.reloading,
+        "error_recarga": model_registry.reload_error,
+    }
+
+@router.get("/importancia", response_model=dict)
+async def importancia_caracteristicas(current_user: User = Depends(check_admin_permissions)):
+    """
+    Importancia global de cada característica para la versión activa del modelo.
+
+    Se calcula la primera vez que se consulta cada versión y queda en caché.
+    """
+    if not model_registry.is_loaded:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="El modelo no está cargado")
+    return {
+        "version": model_registry.version,
+        "importancia": await inference_executor.run(ml_model_service.get_feature_importance),
+    }
+
+@router.post("/recargar", status_code=status.HTTP_202_ACCEPTED, response_model=dict)
+async def recargar_modelo(
+    recarga: RecargaModelo,
+    current_user: User = Depends(check_admin_permissions)
+):
+    """
+    Carga y calienta una versión del modelo en segundo plano y la activa sin interrumpir el servicio.
+
+    Las peticiones en curso terminan con la versión anterior. Se recargan
+    también los registros sin versión fijada. El progreso puede consultarse
+    en GET /modelos o en /health.
+    """
+    try:
+        model_registry.resolve_directory(recarga.version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    # La comprobación y el inicio de la recarga son atómicos: de dos peticiones
+    # simultáneas sólo una la inicia. También se recargan los registros que
+    # siguen a la versión activa (otros motores, variantes "@int8")
+    if reload_unpinned(recarga.version) is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Ya hay una recarga del modelo en curso")
+
+    # La recarga ya lleva la versión explícita, así que CURRENT puede escribirse después
+    if recarga.version and recarga.activar:
+        model_registry.activate(recarga.version)
+    return {
+        "message": "Recarga del modelo iniciada",
+        "version_actual": model_registry.version,
+        "version_solicitada": recarga.version or model_registry.current_pointer(),
+    }
@@ -1,15 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from typing import List
-from ..models import (
-    Student,
-    StressPrediction,
+from ...models import (
+    AcademicHistoryResponse,
     PredictionRequest,
     PredictionResponse,
-    StudentPersonalInfo,
-    AcademicHistory
+    StudentResponse
 )
-from ..services.prediccion import PrediccionService
+from ...services.prediccion import PrediccionService
+from ...services.batching import prediction_batcher
+from ...services.prediction_cache import prediction_cache
 from ..dependencies import get_prediccion_service
 
 router = APIRouter(prefix="/prediccion", tags=["prediccion"])
@@ -28,13 +28,16 @@ async def predecir_estres_estudiante(
             estudiante_id=estudiante_id,
             datos_academicos=request.datos_academicos,
             datos_personales=request.datos_personales,
-            historial_academico=request.historial_academico
+            historial_academico=request.historial_academico,
+            institucion_id=request.institucion_id
         )
         return prediccion
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/estudiantes", response_model=List[Student])
+@router.get("/estudiantes", response_model=List[StudentResponse])
 async def obtener_estudiantes_con_prediccion(
     prediccion_service: PrediccionService = Depends(get_prediccion_service)
 ):
@@ -44,10 +47,12 @@ async def obtener_estudiantes_con_prediccion(
     try:
         estudiantes = await prediccion_service.obtener_estudiantes_con_prediccion()
         return estudiantes
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/estudiante/{estudiante_id}/historial", response_model=List[AcademicHistory])
+@router.get("/estudiante/{estudiante_id}/historial", response_model=List[AcademicHistoryResponse])
 async def obtener_historial_academico(
     estudiante_id: int,
     prediccion_service: PrediccionService = Depends(get_prediccion_service)
@@ -58,5 +63,21 @@ async def obtener_historial_academico(
     try:
         historial = await prediccion_service.obtener_historial_academico(estudiante_id)
         return historial
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@router.get("/metricas/batching", response_model=dict)
+async def obtener_metricas_batching():
+    """
+    Expone los histogramas de tamaño de lote y espera en cola del micro-batching.
+    """
+    return prediction_batcher.stats()
+
+@router.get("/metricas/cache", response_model=dict)
+async def obtener_metricas_cache():
+    """
+    Expone la tasa de aciertos, expulsiones e invalidaciones de la caché de predicciones.
+    """
+    return prediction_cache.stats()
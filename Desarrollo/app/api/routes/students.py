@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from ...database import get_db
 from ...services.student_service import StudentService
-from ..models import Student, StudentResponse
+from ...models import StudentResponse, StudentSchema
 
 router = APIRouter(
     prefix="/students",
@@ -11,7 +11,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
-def create_student(student: Student, db: Session = Depends(get_db)):
+def create_student(student: StudentSchema, db: Session = Depends(get_db)):
     """
     Crea un nuevo estudiante.
     """
@@ -43,7 +43,7 @@ def get_students(
 @router.put("/{student_id}", response_model=StudentResponse)
 def update_student(
     student_id: int,
-    student: Student,
+    student: StudentSchema,
     db: Session = Depends(get_db)
 ):
     """
@@ -2,12 +2,108 @@
 
 # Aquí podrías cargar configuraciones desde variables de entorno,
 # archivos .env, etc. usando Pydantic Settings o similar.
+import os
 
 # Ejemplo básico (podría expandirse)
 ARTIFACTS_PATH = "./artifacts" # Ruta relativa a la raíz del proyecto
 MODEL_NAME = "model_final_pred.keras"
 PREPROCESSOR_NAME = "preprocessor_final.joblib"
+NUMPY_MODEL_NAME = "model_final_pred.npz"
+COMPILED_PREPROCESSOR_NAME = "preprocessor_final.compiled.npz"
+
+# Artefactos versionados: ARTIFACTS_PATH/versions/<versión>/ y el archivo
+# ARTIFACTS_PATH/CURRENT con la versión activa. Cada worker revisa CURRENT
+# cada MODEL_WATCH_INTERVAL_SECONDS segundos (0 desactiva la vigilancia).
+MODEL_VERSIONS_DIR = "versions"
+MODEL_CURRENT_POINTER = "CURRENT"
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "30"))
+
+# Motor de inferencia: "keras" (TensorFlow) o "numpy" (pesos exportados a .npz)
+ML_BACKEND = os.getenv("ML_BACKEND", "keras").lower()
+
+# Con el motor NumPy, mapear los pesos en memoria en lugar de copiarlos: los
+# workers de un mismo nodo comparten las páginas del archivo
+MODEL_MMAP = os.getenv("MODEL_MMAP", "true").lower() in ("1", "true", "yes")
+
+# Precisión de los pesos con el motor NumPy: "float32", "float16" o "int8".
+# Las variantes reducidas se guardan junto al .npz original como
+# model_final_pred.<precisión>.npz y se generan al vuelo si no existen.
+MODEL_PRECISION = os.getenv("MODEL_PRECISION", "float32").lower()
+
+# Preprocesador en tiempo de request: "compiled" (NumPy) o "sklearn" (joblib original)
+PREPROCESSOR_BACKEND = os.getenv("PREPROCESSOR_BACKEND", "compiled").lower()
+
+# Tamaños de lote fijos con los que se compila y calienta el modelo Keras;
+# cada lote se rellena hasta el tamaño inmediatamente superior.
+INFERENCE_BATCH_BUCKETS = tuple(
+    int(tam) for tam in os.getenv("INFERENCE_BATCH_BUCKETS", "1,8,32,64,256,1024").split(",")
+)
+
+# Micro-batching de inferencia: máximo de filas por lote y espera máxima
+# antes de despachar un lote incompleto.
+PREDICTION_BATCH_MAX_SIZE = int(os.getenv("PREDICTION_BATCH_MAX_SIZE", "64"))
+PREDICTION_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICTION_BATCH_MAX_WAIT_MS", "5"))
+
+# Pools de hilos para trabajo bloqueante fuera del event loop: hilos y tareas
+# en espera de cada pool. El de base de datos coincide con el pool de
+# conexiones por defecto de SQLAlchemy (5 + 10 de desborde).
+INFERENCE_POOL_WORKERS = int(os.getenv("INFERENCE_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+INFERENCE_POOL_QUEUE = int(os.getenv("INFERENCE_POOL_QUEUE", "256"))
+HASHING_POOL_WORKERS = int(os.getenv("HASHING_POOL_WORKERS", "2"))
+HASHING_POOL_QUEUE = int(os.getenv("HASHING_POOL_QUEUE", "64"))
+DB_POOL_WORKERS = int(os.getenv("DB_POOL_WORKERS", "15"))
+DB_POOL_QUEUE = int(os.getenv("DB_POOL_QUEUE", "256"))
+# El pool de la variante sombra descarta trabajo en lugar de encolarlo sin límite
+SHADOW_POOL_WORKERS = int(os.getenv("SHADOW_POOL_WORKERS", "1"))
+SHADOW_POOL_QUEUE = int(os.getenv("SHADOW_POOL_QUEUE", "32"))
+
+# Variantes del modelo para pruebas A/B: "nombre=versión:fracción" separadas por
+# comas (por ejemplo "candidata=2025-06:0.1"). La variante "principal" (versión
+# activa en CURRENT) recibe el tráfico restante. MODEL_SHADOW_VARIANT nombra una
+# variante que evalúa en segundo plano los mismos lotes sin afectar la respuesta.
+MODEL_VARIANTS = os.getenv("MODEL_VARIANTS", "")
+MODEL_SHADOW_VARIANT = os.getenv("MODEL_SHADOW_VARIANT", "")
+
+# Caché de predicciones por estudiante: máximo de entradas (LRU) y vigencia
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+
+# Canal de PostgreSQL (NOTIFY/LISTEN) por el que los workers se avisan de
+# cambios en la configuración de una institución
+INSTITUTION_CONFIG_CHANNEL = os.getenv("INSTITUTION_CONFIG_CHANNEL", "institution_config")
+
+# Re-evaluación masiva de estudiantes: filas por bloque leído con cursor de
+# servidor, procesos de inferencia y eventos académicos recientes por estudiante.
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", "5000"))
+RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", str(os.cpu_count() or 1)))
+RESCORE_HISTORY_EVENTS = int(os.getenv("RESCORE_HISTORY_EVENTS", "10"))
+
+# Cola de re-predicción tras la ingesta de datos académicos: los cambios de un
+# mismo estudiante dentro de la ventana se combinan en una sola predicción, y
+# los hilos en segundo plano evalúan hasta MAX_BATCH estudiantes por lote.
+RESCORE_QUEUE_WORKERS = int(os.getenv("RESCORE_QUEUE_WORKERS", "1"))
+RESCORE_QUEUE_WINDOW_MS = float(os.getenv("RESCORE_QUEUE_WINDOW_MS", "500"))
+RESCORE_QUEUE_MAX_BATCH = int(os.getenv("RESCORE_QUEUE_MAX_BATCH", "256"))
+
+# Carga masiva de eventos académicos: filas validadas y guardadas por bloque
+# (una transacción por bloque) y máximo de errores detallados en la respuesta.
+BULK_INGEST_CHUNK_SIZE = int(os.getenv("BULK_INGEST_CHUNK_SIZE", "5000"))
+BULK_INGEST_MAX_ERRORS = int(os.getenv("BULK_INGEST_MAX_ERRORS", "1000"))
+
+# Atribución de la predicción (integrated gradients): pasos de la integral,
+# filas interpoladas como máximo por pasada y filas de referencia con las que
+# se calcula la importancia global de cada versión del modelo.
+ATTRIBUTION_STEPS = int(os.getenv("ATTRIBUTION_STEPS", "32"))
+ATTRIBUTION_MAX_ROWS = int(os.getenv("ATTRIBUTION_MAX_ROWS", "65536"))
+ATTRIBUTION_REFERENCE_ROWS = int(os.getenv("ATTRIBUTION_REFERENCE_ROWS", "256"))
+
+# Consultas SQL por request: con DEBUG (o DB_QUERY_HEADERS) las respuestas
+# incluyen las cabeceras X-DB-*; una misma sentencia repetida N_PLUS_ONE_THRESHOLD
+# veces en un request se registra como posible N+1.
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+DB_QUERY_HEADERS = os.getenv("DB_QUERY_HEADERS", str(DEBUG)).lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
 
 # Configuraciones de seguridad (ejemplo)
 # API_KEY = "tu_api_key_secreta" # ¡Mejor cargarla desde el entorno!
-# JWT_SECRET = "tu_jwt_secret" # ¡Mejor cargarla desde el entorno! 
\ No newline at end of file
+# JWT_SECRET = "tu_jwt_secret" # ¡Mejor cargarla desde el entorno!
@@ -0,0 +1,209 @@
+"""
+Pools de hilos acotados para sacar trabajo bloqueante del event loop.
+
+Cada tipo de trabajo tiene su propio pool para que, por ejemplo, una ráfaga
+de logins (bcrypt) no deje sin hilos a la inferencia ni a la base de datos.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import (
+    DB_POOL_QUEUE,
+    DB_POOL_WORKERS,
+    HASHING_POOL_QUEUE,
+    HASHING_POOL_WORKERS,
+    INFERENCE_POOL_QUEUE,
+    INFERENCE_POOL_WORKERS,
+    SHADOW_POOL_QUEUE,
+    SHADOW_POOL_WORKERS,
+)
+from app.utils.metrics import LATENCY_BUCKETS_MS, Histogram
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorSaturatedError(HTTPException):
+    """El pool tiene su cola llena; se responde 503 para que el cliente reintente."""
+    def __init__(self, nombre: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"El servicio está saturado ({nombre}); intente nuevamente",
+            headers={"Retry-After": "1"},
+        )
+
+
+class BoundedExecutor:
+    """
+    Pool de hilos con cola acotada y métricas de ocupación.
+
+    Como máximo `max_workers` tareas se ejecutan a la vez y `max_queue`
+    esperan turno; por encima de eso se rechaza con ExecutorSaturatedError.
+    """
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        """
+        Inicializa el pool.
+
+        Args:
+            name: Nombre del pool (para métricas y nombres de hilo)
+            max_workers: Hilos del pool
+            max_queue: Tareas que pueden esperar turno además de las que se ejecutan
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers debe ser al menos 1")
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max(max_queue, 0)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"pool-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self.queue_wait_histogram = Histogram(f"{name}_queue_wait_ms", LATENCY_BUCKETS_MS)
+        self.run_time_histogram = Histogram(f"{name}_run_time_ms", LATENCY_BUCKETS_MS)
+
+    def _reservar(self) -> bool:
+        """Reserva un lugar en la cola; False si el pool está saturado."""
+        with self._lock:
+            if self._queued + self._active >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                return False
+            self._queued += 1
+            return True
+
+    def _envolver(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Callable[[], T]:
+        """Prepara la tarea con el contexto del llamador y las métricas del pool."""
+        encolado = time.perf_counter()
+        contexto = contextvars.copy_context()
+        llamada = functools.partial(func, *args, **kwargs)
+
+        def ejecutar() -> T:
+            inicio = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+            self.queue_wait_histogram.observe((inicio - encolado) * 1000.0)
+            try:
+                return contexto.run(llamada)
+            finally:
+                self.run_time_histogram.observe((time.perf_counter() - inicio) * 1000.0)
+                with self._lock:
+                    self._active -= 1
+
+        return ejecutar
+
+    def _al_terminar(self, future: Future) -> None:
+        with self._lock:
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Ejecuta una función bloqueante en el pool y espera su resultado.
+
+        El contexto (contextvars) del llamador se propaga al hilo.
+
+        Args:
+            func: Función síncrona
+            *args: Argumentos posicionales
+            **kwargs: Argumentos con nombre
+
+        Returns:
+            El resultado de `func`
+
+        Raises:
+            ExecutorSaturatedError: Si la cola del pool está llena
+        """
+        if not self._reservar():
+            raise ExecutorSaturatedError(self.name)
+
+        ejecutar = self._envolver(func, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        try:
+            resultado = await loop.run_in_executor(self._executor, ejecutar)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        with self._lock:
+            self._completed += 1
+        return resultado
+
+    def submit_nowait(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Optional[Future]:
+        """
+        Encola una tarea sin esperar su resultado, desde código síncrono o asíncrono.
+
+        Pensado para trabajo opcional (por ejemplo, la variante sombra): si el
+        pool está saturado la tarea se descarta en lugar de frenar al llamador.
+
+        Returns:
+            Optional[Future]: Futuro de la tarea, o None si se descartó
+        """
+        if not self._reservar():
+            return None
+        future = self._executor.submit(self._envolver(func, *args, **kwargs))
+        future.add_done_callback(self._al_terminar)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Expone la profundidad de cola y la saturación del pool.
+
+        Returns:
+            Dict[str, Any]: Hilos activos, tareas en cola, saturación y contadores
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._queued,
+                "saturation": round(self._active / self.max_workers, 4),
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "queue_wait_ms": self.queue_wait_histogram.snapshot(),
+                "run_time_ms": self.run_time_histogram.snapshot(),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Detiene el pool."""
+        self._executor.shutdown(wait=wait)
+
+
+# Pools compartidos por el proceso
+inference_executor = BoundedExecutor("inference", INFERENCE_POOL_WORKERS, INFERENCE_POOL_QUEUE)
+hashing_executor = BoundedExecutor("hashing", HASHING_POOL_WORKERS, HASHING_POOL_QUEUE)
+db_executor = BoundedExecutor("db", DB_POOL_WORKERS, DB_POOL_QUEUE)
+shadow_executor = BoundedExecutor("shadow", SHADOW_POOL_WORKERS, SHADOW_POOL_QUEUE)
+
+EXECUTORS: Dict[str, BoundedExecutor] = {
+    executor.name: executor for executor in (inference_executor, hashing_executor, db_executor, shadow_executor)
+}
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Métricas de todos los pools, para /health."""
+    return {nombre: executor.stats() for nombre, executor in EXECUTORS.items()}
+
+
+def shutdown_executors() -> None:
+    """Detiene todos los pools al cerrar la aplicación."""
+    for executor in EXECUTORS.values():
+        executor.shutdown(wait=False)
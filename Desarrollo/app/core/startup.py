@@ -0,0 +1,61 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """
+    Registra la duración de cada fase del arranque de un worker
+    (importaciones, verificación del esquema, carga del modelo, calentamiento).
+    """
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    def record(self, nombre: str, segundos: float) -> None:
+        """Registra la duración de una fase medida externamente."""
+        self.phases[nombre] = segundos
+
+    @contextmanager
+    def phase(self, nombre: str) -> Iterator[None]:
+        """
+        Mide la duración de una fase del arranque.
+
+        Args:
+            nombre: Nombre de la fase
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.errors[nombre] = str(e)
+            raise
+        finally:
+            self.record(nombre, time.perf_counter() - inicio)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Resume el arranque para el endpoint /health.
+
+        Returns:
+            Dict[str, Any]: Duración por fase, total y errores
+        """
+        return {
+            "phases_seconds": {nombre: round(segundos, 4) for nombre, segundos in self.phases.items()},
+            "total_seconds": round(sum(self.phases.values()), 4),
+            "errors": dict(self.errors),
+        }
+
+    def log(self) -> None:
+        """Escribe el informe de arranque en el log."""
+        fases = ", ".join(f"{nombre}={segundos:.3f}s" for nombre, segundos in self.phases.items())
+        logger.info(f"Arranque completado en {sum(self.phases.values()):.3f}s ({fases})")
+
+
+# Informe del arranque del proceso actual
+startup_report = StartupReport()
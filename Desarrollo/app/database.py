@@ -4,6 +4,9 @@ from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
+from app.utils.prometheus import InstrumentedQueuePool, instrument_engine
+from app.utils.query_counter import track_queries
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -16,8 +19,11 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "omega_lab")
 
 SQLALCHEMY_DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-# Crear el motor de la base de datos
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Crear el motor de la base de datos; el pool mide la espera por conexión
+# y cada consulta se cuenta en /metrics y en el request que la ejecuta
+engine = track_queries(
+    instrument_engine(create_engine(SQLALCHEMY_DATABASE_URL, poolclass=InstrumentedQueuePool))
+)
 
 # Crear la sesión de la base de datos
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
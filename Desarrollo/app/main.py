@@ -1,15 +1,37 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import time
+
+_inicio_importaciones = time.perf_counter()
+
+from fastapi import FastAPI, Depends, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import os
 from pathlib import Path
 
-from app.database import get_db, engine, Base
-from app.api.routes import admin, students, prediccion, chat, institution, academic_data, auth
+from app.database import get_db, engine, Base, SessionLocal
+from app.api.routes import admin, students, prediccion, chat, institution, academic_data, auth, modelos
+from app.api.endpoints import predict
 from app.utils.logger import RequestLogger, setup_logger
-from app.services.ml_model_service import MLModelService
+from app.utils.prometheus import PrometheusMiddleware, RuntimeCollector, render_metrics
+from app.utils.query_counter import QueryCounterMiddleware
+from app.services.ml_model_service import ml_model_service
+from app.services.model_registry import model_registry, watch_current_version
+from app.services.batching import prediction_batcher
+from app.services.institution_config import ConfigChangeListener, institution_config_cache
+from app.services.institution_service import InstitutionService
+from app.services.rescore_queue import rescore_queue
+from app.core.startup import startup_report
+from app.core.executors import db_executor, executor_stats, shutdown_executors
+from app.core.config import MODEL_WATCH_INTERVAL_SECONDS
+
+# Las dependencias pesadas (TensorFlow, scikit-learn, pandas) se importan
+# al cargar el modelo en el lifespan o en el primer uso, no aquí.
+startup_report.record("imports", time.perf_counter() - _inicio_importaciones)
 
 # Crear directorio de logs si no existe
 Path("logs").mkdir(exist_ok=True)
@@ -17,11 +39,66 @@ Path("logs").mkdir(exist_ok=True)
 # Configurar logger principal
 logger = setup_logger("main", "main.log")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Verifica el esquema y carga los artefactos de ML una única vez al iniciar el proceso.
+    """
+    with startup_report.phase("db_schema"):
+        # Crear tablas en la base de datos
+        Base.metadata.create_all(bind=engine)
+
+    # Escuchar primero para no perder cambios ocurridos durante la carga inicial
+    escucha_configuracion = ConfigChangeListener(engine, institution_config_cache)
+    escucha_configuracion.start()
+    with startup_report.phase("institution_config"):
+        try:
+            with SessionLocal() as db:
+                instituciones = InstitutionService(db).cargar_configuraciones()
+            logger.info(f"Configuración de {instituciones} instituciones cargada en caché")
+        except Exception as e:
+            # Sin carga inicial la caché se llena bajo demanda
+            logger.error(f"No se pudo precargar la configuración de instituciones: {str(e)}")
+
+    with startup_report.phase("model_load"):
+        cargado = model_registry.load()
+    if not cargado:
+        logger.error("No se pudieron cargar los modelos de ML")
+        # En producción, podrías querer detener la aplicación aquí
+        # raise Exception("No se pudieron cargar los modelos de ML")
+    else:
+        with startup_report.phase("warmup"):
+            model_registry.warmup()
+
+    if len(ml_model_service.variants) > 1:
+        # Variantes A/B y sombra: su fallo no impide servir con la principal
+        with startup_report.phase("variants_load"):
+            ml_model_service.load_models()
+
+    # Adoptar sin reiniciar las versiones del modelo activadas en CURRENT
+    vigilancia = None
+    if MODEL_WATCH_INTERVAL_SECONDS > 0:
+        vigilancia = asyncio.create_task(watch_current_version(model_registry, MODEL_WATCH_INTERVAL_SECONDS))
+
+    # Re-predicción en segundo plano tras la ingesta de datos académicos
+    rescore_queue.start()
+
+    startup_report.log()
+    yield
+    # Terminar los trabajos encolados antes de cerrar los pools
+    rescore_queue.stop(drain=True, timeout=30)
+    if vigilancia is not None:
+        vigilancia.cancel()
+    escucha_configuracion.stop()
+    await prediction_batcher.stop()
+    shutdown_executors()
+
 # Crear aplicación FastAPI
 app = FastAPI(
     title="OmegaLab API",
     description="API para el sistema de predicción de estrés académico",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -36,15 +113,17 @@ app.add_middleware(
 # Agregar middleware de logging
 app.add_middleware(RequestLogger)
 
-# Crear tablas en la base de datos
-Base.metadata.create_all(bind=engine)
+# Consultas SQL por request y avisos de N+1 (cabeceras X-DB-* con DEBUG)
+app.add_middleware(QueryCounterMiddleware)
+
+# Métricas por ruta (el último middleware agregado es el más externo)
+app.add_middleware(PrometheusMiddleware)
+
+# Colas y pools del proceso, leídos en cada scrape de /metrics
+runtime_collector = RuntimeCollector(rescore_queue.stats, executor_stats, engine)
 
-# Inicializar servicio de modelos ML
-ml_service = MLModelService()
-if not ml_service.load_models():
-    logger.error("No se pudieron cargar los modelos de ML")
-    # En producción, podrías querer detener la aplicación aquí
-    # raise Exception("No se pudieron cargar los modelos de ML")
+# Servicio de modelos ML (lee del registro compartido cargado en el lifespan)
+ml_service = ml_model_service
 
 # Incluir routers
 app.include_router(auth.router)
@@ -54,6 +133,8 @@ app.include_router(prediccion.router)
 app.include_router(chat.router)
 app.include_router(institution.router)
 app.include_router(academic_data.router)
+app.include_router(modelos.router)
+app.include_router(predict.router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
@@ -62,20 +143,62 @@ async def root():
     """
     return {"message": "OmegaLab API está funcionando correctamente"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Métricas en formato Prometheus: latencia y peticiones en curso por ruta,
+    inferencia, base de datos, LLM y profundidad de las colas.
+    """
+    cuerpo, content_type = render_metrics(runtime_collector)
+    return Response(content=cuerpo, media_type=content_type)
+
+def _verificar_base_de_datos() -> dict:
+    """Ejecuta SELECT 1 y devuelve el estado de la conexión y del pool (bloqueante)."""
+    inicio = time.perf_counter()
+    try:
+        with engine.connect() as conexion:
+            conexion.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+    return {
+        "status": "connected",
+        "latency_ms": round((time.perf_counter() - inicio) * 1000, 3),
+        "pool": engine.pool.status(),
+    }
+
 @app.get("/health")
 async def health_check():
     """
     Endpoint para verificar la salud del sistema.
     """
+    try:
+        database = await db_executor.run(_verificar_base_de_datos)
+    except HTTPException as e:
+        # Pool de base de datos saturado
+        database = {"status": "error", "error": e.detail}
+
     health_status = {
         "status": "healthy",
+        "ready": model_registry.is_ready,
         "ml_models_loaded": ml_service.is_loaded,
-        "database": "connected"  # Podrías agregar más verificaciones aquí
+        "ml_models": model_registry.stats(),
+        "ml_variants": ml_service.variant_stats(),
+        "startup": startup_report.as_dict(),
+        "executors": executor_stats(),
+        "institution_config_cache": institution_config_cache.stats(),
+        "rescore_queue": rescore_queue.stats(),
+        "database": database
     }
     
-    if not ml_service.is_loaded:
+    if database["status"] != "connected":
+        health_status["status"] = "degraded"
+        health_status["message"] = "No hay conexión con la base de datos"
+    elif not ml_service.is_loaded:
         health_status["status"] = "degraded"
         health_status["message"] = "Los modelos de ML no están cargados"
+    elif not model_registry.is_ready:
+        health_status["status"] = "starting"
+        health_status["message"] = "Los modelos de ML se están calentando"
         
     return health_status
 
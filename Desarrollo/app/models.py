@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text, Enum, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import enum
@@ -27,6 +27,7 @@ class Institution(Base):
     nombre = Column(String(100), nullable=False)
     codigo = Column(String(20), unique=True, nullable=False)
     configuracion = Column(JSON, nullable=True)  # Para configuraciones específicas
+    config_version = Column(Integer, nullable=False, default=1, server_default="1")  # Aumenta con cada cambio
     activa = Column(Boolean, default=True)
     fecha_creacion = Column(DateTime, default=datetime.now)
     
@@ -116,6 +117,7 @@ class StressPrediction(Base):
     nivel_estres = Column(Float, nullable=False)
     probabilidad_abandono = Column(Float, nullable=False)
     factores_riesgo = Column(JSON)
+    version_modelo = Column(String(50), nullable=True)
     
     estudiante = relationship("Student", back_populates="predicciones")
 
@@ -131,6 +133,28 @@ class AcademicHistory(Base):
     
     estudiante = relationship("Student", back_populates="historial_academico")
 
+class StudentFeatures(Base):
+    """Agregados y entrada del modelo de cada estudiante, actualizados con cada evento."""
+    __tablename__ = "student_features"
+
+    estudiante_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    programa = Column(String(100))
+    semestre = Column(Integer)
+    eventos = Column(Integer, nullable=False, default=0)
+    eventos_recientes = Column(JSON)  # [evento, promedio] de los últimos eventos, del más antiguo al más reciente
+    materias_reprobadas = Column(Integer, nullable=False, default=0)  # En los eventos recientes
+    materias_retiradas = Column(Integer, nullable=False, default=0)  # En los eventos recientes
+    suma_promedios = Column(Float, nullable=False, default=0.0)
+    promedios_registrados = Column(Integer, nullable=False, default=0)
+    gpa_actual = Column(Float, nullable=True)
+    gpa_anterior = Column(Float, nullable=True)
+    lms_horas_semanales = Column(Float, nullable=True)
+    servicios_apoyo_mes = Column(Integer, nullable=True)
+    datos_academicos = Column(JSON, nullable=True)  # Últimos datos académicos reportados (créditos, asistencia...)
+    datos_personales = Column(JSON, nullable=True)  # Últimos datos personales reportados, sin el contacto
+    entrada = Column(JSON)  # Un valor por campo de StudentDataInput
+    fecha_actualizacion = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
 # Modelos Pydantic para la API
 class InstitutionBase(BaseModel):
     nombre: str
@@ -145,8 +169,7 @@ class InstitutionResponse(InstitutionBase):
     activa: bool
     fecha_creacion: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -162,8 +185,7 @@ class UserResponse(UserBase):
     activo: bool
     fecha_creacion: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class AdminBase(BaseModel):
     departamento: Optional[str] = None
@@ -177,8 +199,12 @@ class AdminResponse(AdminBase):
     usuario_id: int
     usuario: UserResponse
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class ContactInfo(BaseModel):
+    email: EmailStr
+    telefono: Optional[str] = None
+    direccion: Optional[str] = None
 
 class StudentPersonalInfo(BaseModel):
     nombre: str
@@ -205,10 +231,10 @@ class AcademicHistoryResponse(BaseModel):
     detalles: str
     promedio: Optional[float] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
-class Student(BaseModel):
+# Esquema de la API; no se llama `Student` para no ocultar el modelo de base de datos
+class StudentSchema(BaseModel):
     id: int
     nombre: str
     programa: str
@@ -228,13 +254,7 @@ class StudentResponse(BaseModel):
     riesgo_desercion: float
     factores_estres: Optional[List[str]] = None
 
-    class Config:
-        orm_mode = True
-
-class ContactInfo(BaseModel):
-    email: EmailStr
-    telefono: Optional[str] = None
-    direccion: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
 
 class StressPredictionResponse(BaseModel):
     id: int
@@ -243,9 +263,9 @@ class StressPredictionResponse(BaseModel):
     nivel_estres: float
     probabilidad_abandono: float
     factores_riesgo: List[str]
+    version_modelo: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class MessageResponse(BaseModel):
     id: int
@@ -255,8 +275,18 @@ class MessageResponse(BaseModel):
     fecha: datetime
     mensaje_metadata: Optional[Dict[str, Any]] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class MessageCreate(BaseModel):
+    contenido: str
+    mensaje_metadata: Optional[Dict[str, Any]] = None
+
+class ConversationCreate(BaseModel):
+    estudiante_id: int
+    contexto: Optional[str] = None
+
+class ConversationUpdate(BaseModel):
+    estado: str
 
 class ConversationResponse(BaseModel):
     id: int
@@ -267,15 +297,14 @@ class ConversationResponse(BaseModel):
     estado: str
     mensajes: List[MessageResponse] = []
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PredictionRequest(BaseModel):
     estudiante_id: int
     institucion_id: int
     datos_academicos: dict
     datos_personales: StudentPersonalInfo
-    historial_academico: List[AcademicHistory]
+    historial_academico: List[AcademicHistoryCreate]
 
 class PredictionResponse(BaseModel):
     prediccion: StressPredictionResponse
@@ -2,8 +2,11 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from app.models import Student, AcademicHistory, StressPrediction
+from app.models import Student, AcademicHistory, StudentFeatures
 from app.services.prediccion import PrediccionService
+from app.services.feature_store import StudentFeatureStore
+from app.services.prediction_cache import prediction_cache
+from app.services.rescore_queue import RescoreQueue, rescore_queue
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -13,15 +16,19 @@ class AcademicDataService:
     """
     Servicio para manejar la ingesta y actualización de datos académicos.
     """
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, rescore: Optional[RescoreQueue] = None):
         """
         Inicializa el servicio de datos académicos.
         
         Args:
             db: Sesión de base de datos
+            rescore: Cola de re-predicción (por defecto, la del proceso)
         """
         self.db = db
         self.prediccion_service = PrediccionService(db)
+        self.features = StudentFeatureStore(db)
+        # La predicción de estrés se recalcula en segundo plano, no en la petición de ingesta
+        self.rescore = rescore or rescore_queue
         
     def registrar_evento_academico(
         self,
@@ -49,6 +56,9 @@ class AcademicDataService:
                 logger.error(f"No se encontró el estudiante con ID {estudiante_id}")
                 return False
                 
+            # Actualizar los agregados antes de agregar el evento a la sesión
+            self.features.registrar_evento(estudiante, evento, promedio)
+
             # Crear nuevo registro de historial académico
             historial = AcademicHistory(
                 estudiante_id=estudiante_id,
@@ -61,8 +71,11 @@ class AcademicDataService:
             self.db.add(historial)
             self.db.commit()
             
-            # Actualizar predicción de estrés
-            self._actualizar_prediccion_estres(estudiante_id)
+            # Las predicciones en caché ya no reflejan los datos del estudiante
+            prediction_cache.invalidate_student(estudiante_id)
+            
+            # Encolar la actualización de la predicción de estrés
+            self.rescore.enqueue(estudiante_id)
             
             logger.info(f"Evento académico registrado para estudiante {estudiante_id}")
             return True
@@ -97,11 +110,15 @@ class AcademicDataService:
             # Actualizar datos en la tabla Student o en una tabla específica para datos LMS
             # Aquí asumimos que hay un campo en Student para esto
             estudiante.lms_activity_weekly_hours_avg_last_month = horas_actividad_semanal
+            self.features.actualizar_lms(estudiante, horas_actividad_semanal)
             
             self.db.commit()
             
-            # Actualizar predicción de estrés
-            self._actualizar_prediccion_estres(estudiante_id)
+            # Las predicciones en caché ya no reflejan los datos del estudiante
+            prediction_cache.invalidate_student(estudiante_id)
+            
+            # Encolar la actualización de la predicción de estrés
+            self.rescore.enqueue(estudiante_id)
             
             logger.info(f"Datos LMS actualizados para estudiante {estudiante_id}")
             return True
@@ -136,11 +153,15 @@ class AcademicDataService:
             # Actualizar datos en la tabla Student o en una tabla específica para servicios
             # Aquí asumimos que hay un campo en Student para esto
             estudiante.support_service_use_last_month = servicios_utilizados
+            self.features.actualizar_servicios_apoyo(estudiante, servicios_utilizados)
             
             self.db.commit()
             
-            # Actualizar predicción de estrés
-            self._actualizar_prediccion_estres(estudiante_id)
+            # Las predicciones en caché ya no reflejan los datos del estudiante
+            prediction_cache.invalidate_student(estudiante_id)
+            
+            # Encolar la actualización de la predicción de estrés
+            self.rescore.enqueue(estudiante_id)
             
             logger.info(f"Datos de servicios de apoyo actualizados para estudiante {estudiante_id}")
             return True
@@ -150,70 +171,47 @@ class AcademicDataService:
             self.db.rollback()
             return False
             
-    def _actualizar_prediccion_estres(self, estudiante_id: int) -> None:
+    def recalcular_predicciones(self, estudiante_ids: List[int]) -> int:
         """
-        Actualiza la predicción de estrés para un estudiante.
+        Actualiza la predicción de estrés de varios estudiantes con una sola
+        inferencia y una sola confirmación.
+
+        La entrada del modelo ya está en student_features: no se consulta el
+        historial salvo para estudiantes que todavía no tienen esa fila.
         
         Args:
-            estudiante_id: ID del estudiante
+            estudiante_ids: IDs de los estudiantes
+            
+        Returns:
+            int: Número de predicciones guardadas
         """
         try:
-            # Obtener datos actualizados del estudiante
-            estudiante = self.db.query(Student).filter(Student.id == estudiante_id).first()
-            if not estudiante:
-                return
-                
-            # Obtener historial académico reciente
-            historial = self.db.query(AcademicHistory).filter(
-                AcademicHistory.estudiante_id == estudiante_id
-            ).order_by(AcademicHistory.fecha.desc()).limit(10).all()
-            
-            # Preparar datos para la predicción
-            datos_prediccion = {
-                "estudiante_id": estudiante_id,
-                "institucion_id": estudiante.institucion_id,
-                "datos_academicos": {
-                    "programa": estudiante.programa,
-                    "semestre": estudiante.semestre,
-                    "promedio_actual": estudiante.promedio if hasattr(estudiante, 'promedio') else None,
-                    "lms_activity": estudiante.lms_activity_weekly_hours_avg_last_month if hasattr(estudiante, 'lms_activity_weekly_hours_avg_last_month') else None,
-                    "support_services": estudiante.support_service_use_last_month if hasattr(estudiante, 'support_service_use_last_month') else []
-                },
-                "historial_academico": [
-                    {
-                        "fecha": h.fecha.isoformat(),
-                        "evento": h.evento,
-                        "detalles": h.detalles,
-                        "promedio": h.promedio
-                    }
-                    for h in historial
-                ]
-            }
-            
-            # Realizar predicción
-            prediccion = self.prediccion_service.predict_stress(datos_prediccion)
-            
-            if prediccion:
-                # Actualizar predicción en la base de datos
-                nueva_prediccion = StressPrediction(
-                    estudiante_id=estudiante_id,
-                    fecha_prediccion=datetime.now(),
-                    nivel_estres=prediccion.nivel_estres,
-                    probabilidad_abandono=prediccion.probabilidad_abandono,
-                    factores_riesgo=prediccion.factores_riesgo
+            estudiantes = self.db.query(Student).filter(Student.id.in_(estudiante_ids)).all()
+            if not estudiantes:
+                return 0
+            filas = {
+                fila.estudiante_id: fila
+                for fila in self.db.query(StudentFeatures).filter(
+                    StudentFeatures.estudiante_id.in_([e.id for e in estudiantes])
                 )
-                
-                self.db.add(nueva_prediccion)
-                
+            }
+            pares = [(e, filas.get(e.id) or self.features.obtener(e)) for e in estudiantes]
+
+            predicciones = self.prediccion_service.predecir_lote_desde_features(pares)
+            for (estudiante, _), prediccion in zip(pares, predicciones):
+                self.db.add(prediccion)
                 # Actualizar riesgo en el estudiante
                 estudiante.riesgo_estres = prediccion.nivel_estres
-                estudiante.riesgo_desercion = prediccion.probabilidad_abandono
                 estudiante.factores_estres = prediccion.factores_riesgo
-                
-                self.db.commit()
-                
-                logger.info(f"Predicción de estrés actualizada para estudiante {estudiante_id}")
+
+            self.db.commit()
+            for estudiante in estudiantes:
+                prediction_cache.invalidate_student(estudiante.id)
+
+            logger.info(f"Predicción de estrés actualizada para {len(predicciones)} estudiantes")
+            return len(predicciones)
                 
         except Exception as e:
-            logger.error(f"Error al actualizar predicción de estrés: {str(e)}")
-            self.db.rollback() 
\ No newline at end of file
+            logger.error(f"Error al actualizar predicciones de estrés: {str(e)}")
+            self.db.rollback()
+            raise
@@ -0,0 +1,232 @@
+"""
+Lectura incremental de cargas masivas de datos académicos (NDJSON o CSV):
+eventos académicos, actividad en el LMS y uso de servicios de apoyo.
+
+El archivo llega por partes; cada parte se divide en líneas completas y cada
+línea se valida por separado, de modo que una fila inválida sólo produce un
+error en el reporte y no interrumpe la carga.
+"""
+import csv
+import json
+import typing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+FORMATOS = ("ndjson", "csv")
+
+_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+    "text/csv": "csv",
+    "application/csv": "csv",
+}
+
+
+class EventoAcademicoFila(BaseModel):
+    """Una fila de la carga masiva; los mismos campos que el registro individual."""
+    estudiante_id: int
+    evento: str = Field(..., min_length=1, max_length=100)
+    detalles: str = ""
+    promedio: Optional[float] = None
+    # Sin fecha, el evento se registra con la hora de la carga
+    fecha: Optional[datetime] = None
+
+
+class DatosLMSFila(BaseModel):
+    """Horas semanales de actividad en el LMS de un estudiante."""
+    estudiante_id: int
+    horas_actividad_semanal: float = Field(..., ge=0)
+
+
+class ServiciosApoyoFila(BaseModel):
+    """Servicios de apoyo usados por un estudiante en el último mes."""
+    estudiante_id: int
+    # En CSV, los servicios van en una sola celda separados por ";"
+    servicios_utilizados: List[str]
+
+
+@dataclass(frozen=True)
+class ParsedRow:
+    """Resultado de leer una línea: la fila validada o el motivo del rechazo."""
+    linea: int
+    fila: Optional[BaseModel] = None
+    error: Optional[str] = None
+
+
+def formato_desde_content_type(content_type: Optional[str]) -> Optional[str]:
+    """
+    Deduce el formato de la carga a partir del encabezado Content-Type.
+
+    Returns:
+        Optional[str]: "ndjson", "csv" o None si no se reconoce
+    """
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+def _describir_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(parte) for parte in e['loc']) or 'fila'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def validar_registro(linea: int, datos: Any, modelo: Type[BaseModel] = EventoAcademicoFila) -> ParsedRow:
+    """
+    Valida un registro ya decodificado.
+
+    Args:
+        linea: Número de línea en el archivo (desde 1), o posición en un arreglo JSON
+        datos: Objeto JSON o fila CSV como diccionario
+        modelo: Modelo con el que se valida la fila
+
+    Returns:
+        ParsedRow: Fila válida o error
+    """
+    if not isinstance(datos, dict):
+        return ParsedRow(linea, error="Se esperaba un objeto JSON por línea")
+    try:
+        return ParsedRow(linea, fila=modelo.model_validate(datos))
+    except ValidationError as e:
+        return ParsedRow(linea, error=_describir_error(e))
+
+
+def validar_arreglo(registros: Any, modelo: Type[BaseModel]) -> List[ParsedRow]:
+    """
+    Valida un arreglo JSON de registros; el número de "línea" es la posición (desde 1).
+
+    Raises:
+        ValueError: Si el cuerpo no es un arreglo
+    """
+    if not isinstance(registros, list):
+        raise ValueError("Se esperaba un arreglo JSON de registros")
+    return [validar_registro(i, datos, modelo) for i, datos in enumerate(registros, start=1)]
+
+
+def _campos_lista(modelo: Type[BaseModel]) -> FrozenSet[str]:
+    """Campos del modelo que son listas (en CSV se separan con ";")."""
+    return frozenset(
+        nombre for nombre, campo in modelo.model_fields.items()
+        if typing.get_origin(campo.annotation) is list
+    )
+
+
+class AcademicEventStreamParser:
+    """
+    Convierte las partes de un archivo NDJSON o CSV en filas validadas.
+
+    En CSV la primera línea no vacía es el encabezado y cada registro ocupa
+    una sola línea (no se admiten saltos de línea dentro de un campo).
+    """
+    def __init__(self, formato: str, modelo: Type[BaseModel] = EventoAcademicoFila):
+        """
+        Inicializa el lector.
+
+        Args:
+            formato: "ndjson" o "csv"
+            modelo: Modelo con el que se valida cada fila
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato} (use {', '.join(FORMATOS)})")
+        self.formato = formato
+        self.modelo = modelo
+        self._listas = _campos_lista(modelo)
+        self._resto = b""
+        self._linea = 0
+        self._columnas: Optional[List[str]] = None
+        self.filas = 0
+
+    def feed(self, datos: bytes) -> List[ParsedRow]:
+        """
+        Procesa una parte del archivo.
+
+        Args:
+            datos: Bytes recibidos (pueden cortar una línea a la mitad)
+
+        Returns:
+            List[ParsedRow]: Filas de las líneas completas recibidas hasta ahora
+        """
+        lineas = (self._resto + datos).split(b"\n")
+        self._resto = lineas.pop()
+        return self._procesar(lineas)
+
+    def close(self) -> List[ParsedRow]:
+        """
+        Procesa la última línea (sin salto de línea final).
+
+        Returns:
+            List[ParsedRow]: Filas pendientes
+        """
+        resto, self._resto = self._resto, b""
+        return self._procesar([resto]) if resto else []
+
+    def _procesar(self, lineas: List[bytes]) -> List[ParsedRow]:
+        resultado = []
+        for crudo in lineas:
+            self._linea += 1
+            try:
+                texto = crudo.decode("utf-8-sig" if self._linea == 1 else "utf-8").strip()
+            except UnicodeDecodeError:
+                resultado.append(ParsedRow(self._linea, error="La línea no es UTF-8 válido"))
+                self.filas += 1
+                continue
+            if not texto:
+                continue
+
+            if self.formato == "csv":
+                fila = self._leer_csv(texto)
+                if fila is None:
+                    continue
+            else:
+                fila = self._leer_json(texto)
+            self.filas += 1
+            resultado.append(fila)
+        return resultado
+
+    def _leer_json(self, texto: str) -> ParsedRow:
+        try:
+            datos = json.loads(texto)
+        except ValueError as e:
+            return ParsedRow(self._linea, error=f"JSON inválido: {str(e)}")
+        return validar_registro(self._linea, datos, self.modelo)
+
+    def _leer_csv(self, texto: str) -> Optional[ParsedRow]:
+        valores = next(csv.reader([texto]))
+        if self._columnas is None:
+            self._columnas = [columna.strip().lower() for columna in valores]
+            return None
+        if len(valores) != len(self._columnas):
+            return ParsedRow(
+                self._linea,
+                error=f"Se esperaban {len(self._columnas)} columnas, se recibieron {len(valores)}"
+            )
+        # Las celdas vacías equivalen a un campo ausente (promedio o fecha opcionales)
+        datos: Dict[str, Any] = {
+            columna: valor.strip() for columna, valor in zip(self._columnas, valores) if valor.strip()
+        }
+        for columna in self._listas:
+            if columna in datos:
+                datos[columna] = [parte.strip() for parte in datos[columna].split(";") if parte.strip()]
+            elif columna in self._columnas:
+                datos[columna] = []
+        return validar_registro(self._linea, datos, self.modelo)
+
+
+def resumen_errores(filas: List[ParsedRow], limite: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Arma el reporte de errores por fila.
+
+    Args:
+        filas: Filas rechazadas
+        limite: Máximo de errores detallados en la respuesta
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: Errores detallados y número de errores omitidos
+    """
+    detalle = [{"linea": f.linea, "error": f.error} for f in filas[:limite]]
+    return detalle, max(len(filas) - limite, 0)
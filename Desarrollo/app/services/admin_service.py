@@ -1,6 +1,5 @@
-from sqlalchemy.orm import Session
-from app.models import Admin, User, UserRole
-from app.schemas import AdminCreate, AdminResponse
+from sqlalchemy.orm import Session, joinedload
+from app.models import Admin, AdminCreate, AdminResponse, User, UserRole
 from typing import List, Optional
 from fastapi import HTTPException
 from passlib.context import CryptContext
@@ -70,7 +69,8 @@ class AdminService:
         )
 
     def listar_admins(self) -> List[AdminResponse]:
-        admins = self.db.query(Admin).all()
+        # Cargar el usuario en la misma consulta (antes, una consulta por admin)
+        admins = self.db.query(Admin).options(joinedload(Admin.usuario)).all()
         return [
             AdminResponse(
                 id=admin.id,
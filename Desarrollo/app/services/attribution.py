@@ -0,0 +1,353 @@
+"""
+Atribución de la predicción de estrés a las características de entrada.
+
+Usa integrated gradients sobre la red densa: se evalúan `steps + 1` puntos entre
+una línea base y la entrada de cada estudiante, y los gradientes se calculan
+analíticamente capa por capa. Todo el lote (estudiantes x pasos) se evalúa en
+una sola pasada vectorizada, y el último punto es la propia entrada, así que
+la probabilidad sale de la misma pasada que la explicación.
+
+La línea base es el vector cero en el espacio preprocesado: las numéricas en
+su media de entrenamiento (estandarizadas) y ninguna categoría activa. Las
+contribuciones de cada estudiante suman, salvo error de integración,
+`probabilidad - base`.
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import ATTRIBUTION_MAX_ROWS, ATTRIBUTION_REFERENCE_ROWS, ATTRIBUTION_STEPS
+from app.services.compiled_preprocessor import CompiledPreprocessor
+from app.services.numpy_inference import ACTIVACIONES, NumpyDenseModel
+from app.services.prediction import preprocess_columns
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Capas de Keras que no cambian la salida en inferencia
+_CAPAS_IGNORADAS = {"InputLayer", "Dropout"}
+# Versiones del modelo cuyas atribuciones se conservan en caché
+_MAX_VERSIONES = 8
+
+Layer = Tuple[np.ndarray, np.ndarray, str]
+
+
+class AttributionUnavailableError(RuntimeError):
+    """El modelo cargado no es una red densa que el motor de atribución sepa derivar."""
+
+
+def _derivada(activacion: str, salida: np.ndarray) -> np.ndarray:
+    """Derivada de la activación expresada en función de su salida."""
+    if activacion == "relu":
+        return (salida > 0).astype(salida.dtype)
+    if activacion == "sigmoid":
+        return salida * (1.0 - salida)
+    if activacion == "tanh":
+        return 1.0 - salida * salida
+    return np.ones_like(salida)
+
+
+def dense_layers(model: Any) -> Optional[List[Layer]]:
+    """
+    Obtiene (pesos, sesgo, activación) de cada capa de un modelo denso.
+
+    Acepta el modelo NumPy, un modelo Keras secuencial de capas Dense o el
+    predictor compilado que envuelve a este último.
+
+    Returns:
+        Optional[List[Layer]]: Capas en orden de evaluación, o None si el modelo no es soportado
+    """
+    if isinstance(model, NumpyDenseModel):
+        # Con pesos float16/int8 se deriva la aproximación en float32 que evalúa predict
+        return model.dequantized_layers()
+
+    model = getattr(model, "model", None) or model  # BucketedPredictor
+    capas = getattr(model, "layers", None)
+    if capas is None:
+        return None
+
+    resultado = []
+    for capa in capas:
+        nombre_clase = capa.__class__.__name__
+        if nombre_clase in _CAPAS_IGNORADAS:
+            continue
+        if nombre_clase != "Dense":
+            return None
+        activacion = getattr(capa.activation, "__name__", "linear")
+        if activacion not in ACTIVACIONES:
+            return None
+        pesos, sesgo = capa.get_weights()
+        resultado.append((np.asarray(pesos, dtype=np.float32), np.asarray(sesgo, dtype=np.float32), activacion))
+    return resultado or None
+
+
+class IntegratedGradients:
+    """
+    Integrated gradients de la probabilidad de la clase positiva de una red densa.
+    """
+    def __init__(
+        self,
+        layers: Sequence[Layer],
+        steps: int = ATTRIBUTION_STEPS,
+        max_rows: int = ATTRIBUTION_MAX_ROWS,
+        baseline: Optional[np.ndarray] = None
+    ):
+        """
+        Inicializa el explicador.
+
+        Args:
+            layers: (pesos, sesgo, activación) por capa
+            steps: Puntos de la integral entre la línea base y la entrada
+            max_rows: Filas interpoladas como máximo por pasada (acota la memoria)
+            baseline: Línea base en el espacio preprocesado (por defecto, ceros)
+        """
+        if steps < 1:
+            raise ValueError("steps debe ser al menos 1")
+        for _, _, activacion in layers[:-1]:
+            if activacion == "softmax":
+                raise AttributionUnavailableError("softmax sólo se admite en la capa de salida")
+
+        self.layers = list(layers)
+        self.steps = steps
+        self.input_dim = self.layers[0][0].shape[0]
+        self.rows_per_pass = max(1, max_rows // (steps + 1))
+        self.baseline = (
+            np.zeros(self.input_dim, dtype=np.float32) if baseline is None
+            else np.asarray(baseline, dtype=np.float32)
+        )
+        # Regla del trapecio sobre steps + 1 puntos, de la línea base (alpha = 0) a la entrada (alpha = 1)
+        self.alphas = np.linspace(0.0, 1.0, steps + 1, dtype=np.float32)[:, None, None]
+        pesos = np.full(steps + 1, 1.0 / steps, dtype=np.float32)
+        pesos[[0, -1]] *= 0.5
+        self.weights = pesos[:, None, None]
+        self.base_probability = float(self._gradientes(self.baseline[None, :])[0][0])
+
+    def _gradientes(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pasada hacia adelante y hacia atrás.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Probabilidad (filas,) y su gradiente respecto de la entrada (filas, input_dim)
+        """
+        salidas = [x]
+        for pesos, sesgo, activacion in self.layers:
+            z = salidas[-1] @ pesos
+            z += sesgo
+            salidas.append(ACTIVACIONES[activacion](z))
+
+        final = salidas[-1]
+        activacion_final = self.layers[-1][2]
+        if activacion_final == "softmax" and final.shape[1] > 1:
+            probabilidad = final[:, -1]
+            gradiente = -probabilidad[:, None] * final
+            gradiente[:, -1] += probabilidad
+        else:
+            probabilidad = final[:, 0]
+            gradiente = np.zeros_like(final)
+            gradiente[:, 0] = _derivada(activacion_final, probabilidad)
+
+        for i in range(len(self.layers) - 1, -1, -1):
+            gradiente = gradiente @ self.layers[i][0].T
+            if i > 0:
+                gradiente *= _derivada(self.layers[i - 1][2], salidas[i])
+        return probabilidad, gradiente
+
+    def attribute(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calcula la probabilidad y la atribución de cada característica.
+
+        Args:
+            x: Entrada preprocesada (n_filas, input_dim)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Probabilidades (n_filas,) y atribuciones (n_filas, input_dim)
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if x.shape[1] != self.input_dim:
+            raise ValueError(f"Se esperaban {self.input_dim} características, se recibieron {x.shape[1]}")
+
+        n = len(x)
+        probabilidades = np.empty(n, dtype=np.float32)
+        atribuciones = np.empty((n, self.input_dim), dtype=np.float32)
+        for inicio in range(0, n, self.rows_per_pass):
+            parte = x[inicio:inicio + self.rows_per_pass]
+            delta = parte - self.baseline
+            # (pasos, filas, características) -> una sola matriz para la pasada
+            puntos = (self.baseline + self.alphas * delta).reshape(-1, self.input_dim)
+            probabilidad, gradiente = self._gradientes(puntos)
+            gradiente = gradiente.reshape(self.steps + 1, len(parte), self.input_dim)
+            # El último punto (alpha = 1) es la entrada original
+            probabilidades[inicio:inicio + len(parte)] = probabilidad.reshape(self.steps + 1, len(parte))[-1]
+            atribuciones[inicio:inicio + len(parte)] = delta * (self.weights * gradiente).sum(axis=0)
+        return probabilidades, atribuciones
+
+
+def feature_groups(preprocessor: Any, n_features: int) -> List[Tuple[str, np.ndarray]]:
+    """
+    Agrupa las columnas preprocesadas por característica de origen.
+
+    Con el preprocesador compilado, las columnas one-hot de una categórica se
+    suman en un solo grupo; con otros preprocesadores cada columna es un grupo.
+
+    Returns:
+        List[Tuple[str, np.ndarray]]: (nombre, índices de columna) por grupo
+    """
+    if isinstance(preprocessor, CompiledPreprocessor):
+        grupos = [(nombre, np.array([i])) for i, nombre in enumerate(preprocessor.num_columns)]
+        inicio = len(preprocessor.num_columns)
+        for nombre, categorias in zip(preprocessor.cat_columns, preprocessor.categories):
+            grupos.append((nombre, np.arange(inicio, inicio + len(categorias))))
+            inicio += len(categorias)
+        return grupos
+
+    try:
+        nombres = [str(nombre) for nombre in preprocessor.get_feature_names_out()]
+    except Exception:
+        nombres = []
+    if len(nombres) != n_features:
+        nombres = [f"feature_{i}" for i in range(n_features)]
+    return [(nombre, np.array([i])) for i, nombre in enumerate(nombres)]
+
+
+def reference_inputs(preprocessor: Any, n_features: int, n: int, seed: int = 0) -> np.ndarray:
+    """
+    Filas de referencia en el espacio preprocesado para la importancia global:
+    numéricas estandarizadas ~ N(0, 1) y una categoría al azar por categórica.
+    """
+    rng = np.random.default_rng(seed)
+    if not isinstance(preprocessor, CompiledPreprocessor):
+        return rng.normal(size=(n, n_features)).astype(np.float32)
+
+    filas = np.zeros((n, n_features), dtype=np.float32)
+    num = len(preprocessor.num_columns)
+    filas[:, :num] = rng.normal(size=(n, num))
+    inicio = num
+    for categorias in preprocessor.categories:
+        filas[np.arange(n), inicio + rng.integers(0, len(categorias), n)] = 1.0
+        inicio += len(categorias)
+    return filas
+
+
+def _clave(artefactos: Any) -> str:
+    """Clave de caché: la versión y, si los pesos están cuantizados, su precisión."""
+    precision = getattr(artefactos, "precision", "float32")
+    return artefactos.version if precision == "float32" else f"{artefactos.version}@{precision}"
+
+
+class _Explicador:
+    """Explicador y agrupación de columnas de una versión del modelo."""
+    def __init__(self, ig: IntegratedGradients, grupos: List[Tuple[str, np.ndarray]]):
+        self.ig = ig
+        self.nombres = [nombre for nombre, _ in grupos]
+        self.matriz = np.zeros((ig.input_dim, len(grupos)), dtype=np.float32)
+        for j, (_, indices) in enumerate(grupos):
+            self.matriz[indices, j] = 1.0
+
+    def attribute(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        probabilidades, atribuciones = self.ig.attribute(x)
+        return probabilidades, atribuciones @ self.matriz
+
+
+class AttributionEngine:
+    """
+    Explicaciones por estudiante e importancia global, en caché por versión del modelo.
+    """
+    def __init__(
+        self,
+        steps: int = ATTRIBUTION_STEPS,
+        max_rows: int = ATTRIBUTION_MAX_ROWS,
+        reference_rows: int = ATTRIBUTION_REFERENCE_ROWS
+    ):
+        self.steps = steps
+        self.max_rows = max_rows
+        self.reference_rows = reference_rows
+        self._explicadores: Dict[str, _Explicador] = {}
+        self._globales: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _explicador(self, artefactos: Any) -> _Explicador:
+        """Construye (una vez por versión) el explicador de los artefactos dados."""
+        with self._lock:
+            explicador = self._explicadores.get(_clave(artefactos))
+        if explicador is not None:
+            return explicador
+
+        capas = dense_layers(artefactos.model)
+        if capas is None:
+            raise AttributionUnavailableError(
+                f"El modelo de la versión {artefactos.version} no es una red densa soportada"
+            )
+        ig = IntegratedGradients(capas, self.steps, self.max_rows)
+        explicador = _Explicador(ig, feature_groups(artefactos.preprocessor, ig.input_dim))
+
+        with self._lock:
+            if len(self._explicadores) >= _MAX_VERSIONES:
+                self._explicadores.clear()
+                self._globales.clear()
+            return self._explicadores.setdefault(_clave(artefactos), explicador)
+
+    def explain(self, artefactos: Any, columns: Dict[str, Any]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """
+        Predice y explica un lote en la misma pasada.
+
+        Args:
+            artefactos: Instantánea del registro (modelo, preprocesador y versión)
+            columns: Una columna por campo de StudentDataInput
+
+        Returns:
+            Tuple[np.ndarray, List[Dict[str, Any]]]: Probabilidades y, por
+            estudiante, la probabilidad base y la contribución de cada
+            característica (de mayor a menor en valor absoluto)
+        """
+        explicador = self._explicador(artefactos)
+        probabilidades, contribuciones = explicador.attribute(preprocess_columns(artefactos.preprocessor, columns))
+
+        orden = np.argsort(-np.abs(contribuciones), axis=1, kind="stable")
+        base = round(explicador.ig.base_probability, 6)
+        explicaciones = [
+            {
+                "base": base,
+                "contributions": {
+                    explicador.nombres[j]: round(float(fila[j]), 6) for j in indices
+                },
+            }
+            for fila, indices in zip(contribuciones, orden)
+        ]
+        return probabilidades.astype(np.float64), explicaciones
+
+    def global_importance(self, artefactos: Any) -> Dict[str, float]:
+        """
+        Importancia global de cada característica para una versión del modelo:
+        media del valor absoluto de las atribuciones sobre las filas de
+        referencia, normalizada para sumar 1. Se calcula una vez por versión.
+
+        Returns:
+            Dict[str, float]: Importancia por característica, de mayor a menor
+        """
+        with self._lock:
+            importancia = self._globales.get(_clave(artefactos))
+        if importancia is not None:
+            return importancia
+
+        explicador = self._explicador(artefactos)
+        referencia = reference_inputs(artefactos.preprocessor, explicador.ig.input_dim, self.reference_rows)
+        _, contribuciones = explicador.attribute(referencia)
+        media = np.abs(contribuciones).mean(axis=0)
+        total = float(media.sum()) or 1.0
+        importancia = {
+            explicador.nombres[j]: round(float(media[j]) / total, 6) for j in np.argsort(-media, kind="stable")
+        }
+
+        with self._lock:
+            self._globales[_clave(artefactos)] = importancia
+        logger.info(f"Importancia global calculada para la versión {_clave(artefactos)}")
+        return importancia
+
+
+# Motor compartido por el proceso
+attribution_engine = AttributionEngine()
@@ -0,0 +1,269 @@
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import RESCORE_CHUNK_SIZE, RESCORE_HISTORY_EVENTS, RESCORE_WORKERS
+from app.database import SessionLocal
+from app.models import AcademicHistory, Student, StressPrediction
+from app.services.model_registry import ModelRegistry, model_registry
+from app.services.prediction import predict_columns
+from app.services.student_features import build_feature_columns
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Registro propio de cada proceso del pool, cargado una vez en el inicializador
+_worker_registry: Optional[ModelRegistry] = None
+
+
+def _init_worker(models_dir: str, backend: str, preprocessor_backend: str, version: Optional[str] = None) -> None:
+    """Carga los artefactos de ML una sola vez por proceso del pool, fijando la versión del proceso principal."""
+    global _worker_registry
+    _worker_registry = ModelRegistry(models_dir, backend=backend, preprocessor_backend=preprocessor_backend)
+    if not _worker_registry.load(version=version):
+        raise RuntimeError(f"No se pudieron cargar los artefactos de ML: {_worker_registry.error}")
+
+
+def score_columns(
+    columns: Dict[str, np.ndarray],
+    registry: Optional[ModelRegistry] = None
+) -> Tuple[np.ndarray, str]:
+    """
+    Calcula la probabilidad de estrés de un bloque completo de estudiantes.
+
+    Args:
+        columns: Una columna por campo de StudentDataInput
+        registry: Registro a usar; por defecto el del proceso del pool
+
+    Returns:
+        Tuple[np.ndarray, str]: Probabilidad por estudiante, en el mismo orden,
+            y versión del modelo que la calculó
+    """
+    registry = registry or _worker_registry or model_registry
+    artefactos = registry.get_artifacts()
+    return predict_columns(artefactos.model, artefactos.preprocessor, columns), artefactos.version
+
+
+class _InlineExecutor:
+    """Ejecuta los bloques en el proceso actual (workers=0) con el registro del servicio."""
+    def __init__(self, registry: ModelRegistry):
+        self.registry = registry
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, registry=self.registry))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+class BatchScoringService:
+    """
+    Re-evalúa el riesgo de estrés de todos los estudiantes de la base de datos.
+
+    Lee los estudiantes por bloques con un cursor de servidor, junta su
+    historial académico reciente con una sola consulta por bloque, calcula
+    las predicciones en lotes vectorizados repartidos en un pool de procesos
+    y escribe en bloque las filas de StressPrediction y el riesgo de cada
+    estudiante. Sólo hay en memoria unos pocos bloques a la vez, sin importar
+    el tamaño de la tabla.
+    """
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        chunk_size: int = RESCORE_CHUNK_SIZE,
+        workers: int = RESCORE_WORKERS,
+        history_events: int = RESCORE_HISTORY_EVENTS,
+        registry: Optional[ModelRegistry] = None
+    ):
+        """
+        Inicializa el servicio.
+
+        Args:
+            session_factory: Fábrica de sesiones de base de datos
+            chunk_size: Estudiantes por bloque
+            workers: Procesos de inferencia; 0 para evaluar en el proceso actual
+            history_events: Eventos académicos recientes considerados por estudiante
+            registry: Registro de modelos cuya configuración replican los procesos
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size debe ser al menos 1")
+
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.workers = max(workers, 0)
+        self.history_events = history_events
+        self.registry = registry or model_registry
+        # Bloques evaluándose a la vez: mantiene ocupados a los procesos sin
+        # acumular resultados pendientes de escribir
+        self.max_in_flight = max(self.workers, 1) * 2
+
+    def _crear_executor(self):
+        if self.workers == 0:
+            return _InlineExecutor(self.registry)
+        # Todos los procesos usan la versión activa al empezar, aunque CURRENT cambie durante la corrida
+        version = self.registry.get_artifacts().version
+        # spawn: TensorFlow no es seguro tras un fork
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                str(self.registry.models_dir),
+                self.registry.backend,
+                self.registry.preprocessor_backend,
+                version if self.registry.current_pointer() else None,
+            ),
+        )
+
+    def _stream_students(self, session: Session) -> Iterator[Sequence[Any]]:
+        """Recorre la tabla de estudiantes en bloques usando un cursor de servidor."""
+        stmt = (
+            select(
+                Student.id,
+                Student.programa,
+                Student.semestre,
+                Student.riesgo_desercion,
+                Student.factores_estres,
+            )
+            .order_by(Student.id)
+            .execution_options(stream_results=True, yield_per=self.chunk_size)
+        )
+        yield from session.execute(stmt).partitions()
+
+    def _historial_reciente(self, session: Session, primer_id: int, ultimo_id: int) -> List[Any]:
+        """
+        Obtiene los eventos académicos más recientes de un rango de estudiantes.
+
+        El bloque está ordenado por ID y es contiguo, así que basta un rango
+        en lugar de una lista IN con miles de parámetros.
+        """
+        rank = func.row_number().over(
+            partition_by=AcademicHistory.estudiante_id,
+            order_by=AcademicHistory.fecha.desc(),
+        ).label("rank")
+        recientes = (
+            select(AcademicHistory.estudiante_id, AcademicHistory.promedio, AcademicHistory.evento, rank)
+            .where(AcademicHistory.estudiante_id.between(primer_id, ultimo_id))
+            .subquery()
+        )
+        stmt = select(recientes).where(recientes.c.rank <= self.history_events)
+        return session.execute(stmt).all()
+
+    def _preparar_bloque(self, session: Session, filas: Sequence[Any]) -> Dict[str, np.ndarray]:
+        """Convierte un bloque de estudiantes en columnas de entrada del modelo."""
+        historial = self._historial_reciente(session, filas[0].id, filas[-1].id)
+        return build_feature_columns(
+            student_ids=[f.id for f in filas],
+            programas=[f.programa for f in filas],
+            semestres=[f.semestre for f in filas],
+            history_student_ids=[h.estudiante_id for h in historial],
+            history_rank=[h.rank for h in historial],
+            history_promedio=[h.promedio for h in historial],
+            history_evento=[h.evento for h in historial],
+        )
+
+    def _guardar_bloque(
+        self,
+        session: Session,
+        filas: Sequence[Any],
+        probabilidades: np.ndarray,
+        version_modelo: Optional[str] = None
+    ) -> None:
+        """
+        Inserta las predicciones y actualiza el riesgo de los estudiantes en bloque.
+
+        El modelo sólo estima el riesgo de estrés; el riesgo de deserción y los
+        factores vigentes del estudiante se conservan.
+        """
+        ahora = datetime.now()
+        probabilidades = probabilidades.tolist()
+        session.execute(
+            insert(StressPrediction),
+            [
+                {
+                    "estudiante_id": fila.id,
+                    "fecha_prediccion": ahora,
+                    "nivel_estres": probabilidad,
+                    "probabilidad_abandono": fila.riesgo_desercion or 0.0,
+                    "factores_riesgo": fila.factores_estres,
+                    "version_modelo": version_modelo,
+                }
+                for fila, probabilidad in zip(filas, probabilidades)
+            ],
+        )
+        # UPDATE masivo por clave primaria (executemany)
+        session.execute(
+            update(Student),
+            [{"id": fila.id, "riesgo_estres": probabilidad} for fila, probabilidad in zip(filas, probabilidades)],
+        )
+        session.commit()
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Re-evalúa a todos los estudiantes.
+
+        Args:
+            dry_run: Calcular las predicciones sin escribir en la base de datos
+
+        Returns:
+            Dict[str, Any]: Estudiantes y bloques procesados, duración y throughput
+        """
+        inicio = time.perf_counter()
+        procesados = 0
+        bloques = 0
+        pendientes: Deque[Tuple[Sequence[Any], Future]] = deque()
+
+        executor = self._crear_executor()
+        # Sesiones separadas: el commit de cada escritura cerraría el cursor de lectura
+        lectura = self.session_factory()
+        escritura = self.session_factory()
+
+        def drenar(hasta: int) -> None:
+            nonlocal procesados, bloques
+            while len(pendientes) > hasta:
+                filas, future = pendientes.popleft()
+                probabilidades, version_modelo = future.result()
+                if not dry_run:
+                    self._guardar_bloque(escritura, filas, probabilidades, version_modelo)
+                procesados += len(filas)
+                bloques += 1
+                logger.info(f"Bloque {bloques} re-evaluado ({procesados} estudiantes)")
+
+        try:
+            for filas in self._stream_students(lectura):
+                columnas = self._preparar_bloque(escritura, filas)
+                pendientes.append((filas, executor.submit(score_columns, columnas)))
+                drenar(self.max_in_flight - 1)
+            drenar(0)
+        except Exception:
+            escritura.rollback()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            lectura.close()
+            escritura.close()
+
+        duracion = time.perf_counter() - inicio
+        resumen = {
+            "students": procesados,
+            "chunks": bloques,
+            "seconds": round(duracion, 3),
+            "students_per_second": round(procesados / duracion, 1) if duracion > 0 else None,
+            "dry_run": dry_run,
+        }
+        logger.info(f"Re-evaluación completada: {resumen}")
+        return resumen
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import PREDICTION_BATCH_MAX_SIZE, PREDICTION_BATCH_MAX_WAIT_MS
+from app.core.executors import BoundedExecutor, inference_executor
+from app.services.model_registry import model_registry
+from app.utils.metrics import BATCH_SIZE_BUCKETS, LATENCY_BUCKETS_MS, Histogram
+from app.utils.prometheus import observe_inference
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (filas, futuro del llamador, instante de encolado, función de predicción)
+_Pendiente = Tuple[np.ndarray, asyncio.Future, float, Callable[[np.ndarray], np.ndarray]]
+
+
+class MicroBatcher:
+    """
+    Agrupa peticiones de predicción concurrentes en un único lote.
+
+    Cada llamador envía sus filas con `submit`; un bucle en segundo plano
+    junta peticiones hasta `max_batch_size` filas o `max_wait_ms`
+    milisegundos, ejecuta una sola predicción vectorizada y reparte el
+    resultado entre los llamadores.
+    """
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = PREDICTION_BATCH_MAX_SIZE,
+        max_wait_ms: float = PREDICTION_BATCH_MAX_WAIT_MS,
+        executor: Optional[BoundedExecutor] = None
+    ):
+        """
+        Inicializa el agrupador.
+
+        Args:
+            predict_fn: Función síncrona que recibe un lote 2D y devuelve una fila de salida por fila de entrada
+            max_batch_size: Máximo de filas por lote
+            max_wait_ms: Espera máxima, en milisegundos, antes de despachar un lote incompleto
+            executor: Pool donde se ejecuta la inferencia (por defecto, el de inferencia)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size debe ser al menos 1")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor or inference_executor
+        self.batch_size_histogram = Histogram("prediction_batch_size", BATCH_SIZE_BUCKETS)
+        self.queue_wait_histogram = Histogram("prediction_queue_wait_ms", LATENCY_BUCKETS_MS)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> None:
+        """Arranca el bucle de despacho en el event loop actual si no está corriendo."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
+
+    async def submit(
+        self,
+        rows: np.ndarray,
+        predict_fn: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Encola filas para predicción y espera su resultado.
+
+        Args:
+            rows: Matriz 2D (o vector de una fila) ya preprocesada
+            predict_fn: Función de predicción a usar para estas filas (por ejemplo, la
+                de la versión de modelo que tomó el llamador); por defecto la del agrupador
+
+        Returns:
+            np.ndarray: Salidas del modelo para las filas enviadas, en el mismo orden
+        """
+        rows = np.asarray(rows)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((rows, future, time.perf_counter(), predict_fn or self.predict_fn))
+        return await future
+
+    async def stop(self) -> None:
+        """Detiene el bucle de despacho."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
+
+    async def _collect(self) -> List[_Pendiente]:
+        """Reúne peticiones hasta llenar el lote o agotar la espera máxima."""
+        primero = await self._queue.get()
+        lote = [primero]
+        filas = len(primero[0])
+        limite = time.perf_counter() + self.max_wait_ms / 1000.0
+
+        while filas < self.max_batch_size:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                pendiente = await asyncio.wait_for(self._queue.get(), timeout=restante)
+            except asyncio.TimeoutError:
+                break
+            lote.append(pendiente)
+            filas += len(pendiente[0])
+
+        return lote
+
+    async def _run(self) -> None:
+        """Bucle principal: agrupa, predice y reparte resultados."""
+        while True:
+            lote = await self._collect()
+            try:
+                despacho = time.perf_counter()
+                self.queue_wait_histogram.observe_many([(despacho - encolado) * 1000.0 for _, _, encolado, _ in lote])
+
+                # Durante una recarga del modelo conviven peticiones de dos versiones:
+                # cada grupo se evalúa con la función con la que se encoló. Las filas
+                # de otro ancho van aparte para no hacer fallar al resto del lote
+                grupos: Dict[Tuple[Callable, Tuple[int, ...]], List[_Pendiente]] = {}
+                for pendiente in lote:
+                    grupos.setdefault((pendiente[3], pendiente[0].shape[1:]), []).append(pendiente)
+
+                for (predict_fn, _), grupo in grupos.items():
+                    await self._despachar(predict_fn, grupo)
+            except Exception as e:
+                # Un lote defectuoso no debe detener el despacho de los siguientes
+                logger.error(f"Error al despachar un lote de predicciones: {str(e)}")
+                self._fallar(lote, e)
+
+    @staticmethod
+    def _fallar(lote: List[_Pendiente], error: BaseException) -> None:
+        """Propaga el error a los llamadores del lote que aún esperan."""
+        for _, future, _, _ in lote:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _despachar(self, predict_fn: Callable[[np.ndarray], np.ndarray], lote: List[_Pendiente]) -> None:
+        """Ejecuta una predicción vectorizada y reparte el resultado entre los llamadores."""
+        def evaluar(x: np.ndarray) -> np.ndarray:
+            # Sólo el cómputo, sin la espera en el pool de inferencia
+            inicio = time.perf_counter()
+            salida = predict_fn(x)
+            observe_inference("predict", time.perf_counter() - inicio, len(x), "micro_batch")
+            return salida
+
+        try:
+            entradas = np.concatenate([filas for filas, _, _, _ in lote], axis=0)
+            self.batch_size_histogram.observe(len(entradas))
+            salidas = await self.executor.run(evaluar, entradas)
+        except Exception as e:
+            logger.error(f"Error en la predicción por lotes: {str(e)}")
+            self._fallar(lote, e)
+            return
+
+        inicio = 0
+        for filas, future, _, _ in lote:
+            fin = inicio + len(filas)
+            if not future.done():
+                future.set_result(salidas[inicio:fin])
+            inicio = fin
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Expone la configuración y los histogramas del agrupador.
+
+        Returns:
+            Dict[str, Any]: Tamaños de lote y tiempos de espera en cola
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_ms": self.queue_wait_histogram.snapshot(),
+        }
+
+
+def _predict_with_registry(batch: np.ndarray) -> np.ndarray:
+    """Ejecuta el modelo del registro compartido sobre un lote completo."""
+    model, _ = model_registry.get()
+    return model.predict(batch, verbose=0)
+
+
+# Agrupador compartido para las predicciones individuales de estudiantes
+prediction_batcher = MicroBatcher(_predict_with_registry)
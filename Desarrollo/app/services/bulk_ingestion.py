@@ -0,0 +1,404 @@
+import csv
+import io
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Type
+
+from pydantic import BaseModel
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import BULK_INGEST_CHUNK_SIZE, BULK_INGEST_MAX_ERRORS
+from app.core.executors import db_executor
+from app.models import AcademicHistory, Student
+from app.services.academic_event_stream import (
+    AcademicEventStreamParser,
+    DatosLMSFila,
+    EventoAcademicoFila,
+    ParsedRow,
+    ServiciosApoyoFila,
+    resumen_errores,
+)
+from app.services.feature_store import StudentFeatureStore
+from app.services.prediction_cache import prediction_cache
+from app.services.rescore_queue import RescoreQueue, rescore_queue
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_COLUMNAS_COPY = ("estudiante_id", "fecha", "evento", "detalles", "promedio")
+
+
+class BulkLoader(ABC):
+    """
+    Base de las cargas masivas: lee el archivo por bloques, guarda cada
+    bloque en su propia transacción y, al terminar, encola una única
+    re-predicción por estudiante afectado y arma el reporte de errores.
+
+    Si la carga se interrumpe (pool saturado, cliente desconectado), los
+    estudiantes de los bloques ya confirmados se invalidan y encolan igual.
+    """
+    # Modelo con el que se valida cada fila y nombre del total en el reporte
+    modelo: Type[BaseModel] = EventoAcademicoFila
+    etiqueta = "insertadas"
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = BULK_INGEST_CHUNK_SIZE,
+        max_errors: int = BULK_INGEST_MAX_ERRORS,
+        rescore: Optional[RescoreQueue] = None
+    ):
+        """
+        Inicializa el cargador.
+
+        Args:
+            db: Sesión de base de datos
+            chunk_size: Filas por bloque (y por transacción)
+            max_errors: Máximo de errores detallados en el reporte (y guardados en memoria)
+            rescore: Cola de re-predicción (por defecto, la del proceso)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size debe ser al menos 1")
+
+        self.db = db
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.rescore = rescore or rescore_queue
+        self.features = StudentFeatureStore(db)
+        self.aplicadas = 0
+        self.rechazadas = 0
+        # Sólo los `max_errors` errores de menor línea; del resto se cuenta el total
+        self.errores: List[ParsedRow] = []
+        self.estudiantes_afectados: Set[int] = set()
+        self.encolados = 0
+        self._encolados: Set[int] = set()
+        self._encolar_lock = threading.Lock()
+        self._interrumpida = False
+
+    @abstractmethod
+    def cargar_bloque(self, filas: List[ParsedRow]) -> int:
+        """Valida y guarda un bloque de filas; devuelve las filas aplicadas."""
+
+    def _rechazar(self, filas: Iterable[ParsedRow]) -> None:
+        """Registra filas rechazadas; el detalle se recorta a `max_errors` al terminar cada bloque."""
+        for fila in filas:
+            self.rechazadas += 1
+            self.errores.append(fila)
+
+    def _separar_validas(self, filas: List[ParsedRow]) -> List[ParsedRow]:
+        """Registra como error las filas que no pasaron la validación y devuelve el resto."""
+        validas = []
+        for fila in filas:
+            if fila.fila is None:
+                self._rechazar([fila])
+            else:
+                validas.append(fila)
+        return validas
+
+    def _cargar(self, filas: List[ParsedRow]) -> int:
+        """
+        Carga un bloque (en el pool de base de datos) y recorta los errores guardados.
+
+        Si la carga ya se interrumpió (la espera se canceló mientras el bloque
+        se guardaba), los estudiantes del bloque se encolan aquí mismo.
+        """
+        try:
+            return self.cargar_bloque(filas)
+        finally:
+            self.errores.sort(key=lambda f: f.linea)
+            del self.errores[self.max_errors:]
+            if self._interrumpida:
+                self._encolar_afectados()
+
+    def _guardar(self, filas: List[ParsedRow], guardar: Callable[[], Set[int]]) -> int:
+        """
+        Ejecuta `guardar` y confirma; si falla, revierte y reporta las filas del bloque.
+
+        Args:
+            filas: Filas válidas del bloque
+            guardar: Función que escribe el bloque y devuelve los IDs de los
+                estudiantes existentes; las filas de otros estudiantes se rechazan
+
+        Returns:
+            int: Filas aplicadas
+        """
+        try:
+            existentes = guardar()
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error al guardar un bloque de {len(filas)} filas: {str(e)}")
+            self._rechazar(ParsedRow(fila.linea, error=f"Error al guardar el bloque: {str(e)}") for fila in filas)
+            return 0
+
+        aplicadas = 0
+        for fila in filas:
+            if fila.fila.estudiante_id in existentes:
+                aplicadas += 1
+            else:
+                self._rechazar([
+                    ParsedRow(fila.linea, error=f"No se encontró el estudiante con ID {fila.fila.estudiante_id}")
+                ])
+        self.aplicadas += aplicadas
+        self.estudiantes_afectados.update(existentes)
+        return aplicadas
+
+    def _encolar_afectados(self) -> int:
+        """
+        Invalida las predicciones en caché y encola la re-predicción de los
+        estudiantes afectados que aún no se encolaron (una vez por estudiante).
+
+        Returns:
+            int: Re-predicciones nuevas en cola
+        """
+        with self._encolar_lock:
+            pendientes = sorted(self.estudiantes_afectados - self._encolados)
+            if not pendientes:
+                return 0
+            for estudiante_id in pendientes:
+                prediction_cache.invalidate_student(estudiante_id)
+            nuevos = self.rescore.enqueue_many(pendientes)
+            self._encolados.update(pendientes)
+            self.encolados += nuevos
+            return nuevos
+
+    def finalizar(self) -> Dict[str, Any]:
+        """
+        Encola la re-predicción de los estudiantes afectados y arma el reporte.
+
+        Returns:
+            Dict[str, Any]: Totales y errores por fila
+        """
+        self._encolar_afectados()
+
+        errores, _ = resumen_errores(self.errores, self.max_errors)
+        logger.info(
+            f"Carga masiva ({self.__class__.__name__}): {self.aplicadas} filas {self.etiqueta}, "
+            f"{self.rechazadas} rechazadas, {len(self.estudiantes_afectados)} estudiantes "
+            f"({self.encolados} re-predicciones nuevas en cola)"
+        )
+        return {
+            "filas": self.aplicadas + self.rechazadas,
+            self.etiqueta: self.aplicadas,
+            "rechazadas": self.rechazadas,
+            "estudiantes_afectados": len(self.estudiantes_afectados),
+            "errores": errores,
+            "errores_omitidos": self.rechazadas - len(errores),
+        }
+
+    async def _cargar_por_bloques(self, bloques: AsyncIterator[List[ParsedRow]]) -> Dict[str, Any]:
+        """
+        Guarda cada bloque en el pool de base de datos y arma el reporte.
+
+        Si la carga se interrumpe, los estudiantes de los bloques ya
+        confirmados se encolan igualmente antes de propagar el error.
+        """
+        try:
+            async for bloque in bloques:
+                await db_executor.run(self._cargar, bloque)
+        except BaseException as e:
+            self._interrumpida = True
+            nuevos = self._encolar_afectados()
+            logger.warning(
+                f"Carga masiva ({self.__class__.__name__}) interrumpida tras {self.aplicadas} filas "
+                f"{self.etiqueta}: {e!r}; {nuevos} re-predicciones en cola de los bloques ya guardados"
+            )
+            raise
+        return self.finalizar()
+
+    async def cargar_stream(self, partes: AsyncIterator[bytes], formato: str) -> Dict[str, Any]:
+        """
+        Lee el archivo a medida que llega y guarda cada bloque completo en el pool de base de datos.
+
+        Args:
+            partes: Bytes del cuerpo de la petición, por partes
+            formato: "ndjson" o "csv"
+
+        Returns:
+            Dict[str, Any]: Reporte de la carga
+        """
+        async def bloques() -> AsyncIterator[List[ParsedRow]]:
+            lector = AcademicEventStreamParser(formato, self.modelo)
+            pendientes: List[ParsedRow] = []
+            async for datos in partes:
+                pendientes.extend(lector.feed(datos))
+                while len(pendientes) >= self.chunk_size:
+                    bloque, pendientes = pendientes[:self.chunk_size], pendientes[self.chunk_size:]
+                    yield bloque
+
+            pendientes.extend(lector.close())
+            for inicio in range(0, len(pendientes), self.chunk_size):
+                yield pendientes[inicio:inicio + self.chunk_size]
+
+        return await self._cargar_por_bloques(bloques())
+
+    async def cargar_filas(self, filas: List[ParsedRow]) -> Dict[str, Any]:
+        """
+        Guarda filas ya validadas (por ejemplo, de un arreglo JSON) por bloques.
+
+        Returns:
+            Dict[str, Any]: Reporte de la carga
+        """
+        async def bloques() -> AsyncIterator[List[ParsedRow]]:
+            for inicio in range(0, len(filas), self.chunk_size):
+                yield filas[inicio:inicio + self.chunk_size]
+
+        return await self._cargar_por_bloques(bloques())
+
+
+class BulkAcademicEventLoader(BulkLoader):
+    """
+    Carga masiva de eventos académicos por bloques.
+
+    Cada bloque se valida contra la base de datos con una sola consulta,
+    actualiza student_features y se inserta en academic_history con COPY
+    (PostgreSQL) o con un INSERT de varias filas, en una transacción.
+    """
+    modelo = EventoAcademicoFila
+    etiqueta = "insertadas"
+
+    def __init__(self, db: Session, **kwargs: Any):
+        super().__init__(db, **kwargs)
+        # Los eventos sin fecha se registran todos con la hora de inicio de la carga
+        self.fecha_carga = datetime.now()
+
+    def cargar_bloque(self, filas: List[ParsedRow]) -> int:
+        """
+        Valida y guarda un bloque de filas (bloqueante; se ejecuta en el pool de base de datos).
+
+        Args:
+            filas: Filas leídas del archivo, válidas o no
+
+        Returns:
+            int: Filas insertadas del bloque
+        """
+        validas = self._separar_validas(filas)
+        if not validas:
+            return 0
+
+        ids = {fila.fila.estudiante_id for fila in validas}
+        estudiantes: Dict[int, Student] = {
+            estudiante.id: estudiante
+            for estudiante in self.db.scalars(select(Student).where(Student.id.in_(ids)))
+        }
+        aceptadas = [fila for fila in validas if fila.fila.estudiante_id in estudiantes]
+        if not aceptadas:
+            # Se reportan como estudiantes inexistentes
+            return self._guardar(validas, set)
+
+        registros = [
+            {
+                "estudiante_id": fila.fila.estudiante_id,
+                "fecha": fila.fila.fecha or self.fecha_carga,
+                "evento": fila.fila.evento,
+                "detalles": fila.fila.detalles,
+                "promedio": fila.fila.promedio,
+            }
+            for fila in aceptadas
+        ]
+
+        def guardar() -> Set[int]:
+            # Los agregados se actualizan antes de insertar, como en el registro individual
+            self.features.registrar_eventos(
+                estudiantes,
+                [(r["estudiante_id"], r["evento"], r["promedio"]) for r in registros]
+            )
+            self._insertar(registros)
+            return {r["estudiante_id"] for r in registros}
+
+        return self._guardar(validas, guardar)
+
+    def _insertar(self, registros: List[Dict[str, Any]]) -> None:
+        """Inserta las filas con COPY en PostgreSQL y con un INSERT de varias filas en otros motores."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            self._copiar(registros)
+        else:
+            self.db.execute(insert(AcademicHistory), registros)
+
+    def _copiar(self, registros: List[Dict[str, Any]]) -> None:
+        """COPY ... FROM STDIN sobre la conexión de la sesión (misma transacción)."""
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for r in registros:
+            escritor.writerow([
+                r["estudiante_id"],
+                r["fecha"].isoformat(),
+                r["evento"],
+                r["detalles"],
+                "" if r["promedio"] is None else repr(r["promedio"]),
+            ])
+        buffer.seek(0)
+
+        # Las filas de student_features deben llegar antes que el COPY
+        self.db.flush()
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {AcademicHistory.__tablename__} ({', '.join(_COLUMNAS_COPY)}) "
+                "FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (detalles))",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+
+class BulkStudentDataSync(BulkLoader):
+    """
+    Sincronización masiva de actividad en el LMS o de uso de servicios de apoyo.
+
+    Por bloque: los IDs se validan con una consulta y la columna de
+    student_features se actualiza con un único UPDATE ... FROM (VALUES ...).
+    Si un estudiante aparece varias veces, vale su última fila.
+    """
+    etiqueta = "actualizadas"
+
+    def __init__(
+        self,
+        db: Session,
+        modelo: Type[BaseModel],
+        campo: str,
+        valor: Callable[[BaseModel], Any],
+        **kwargs: Any
+    ):
+        """
+        Args:
+            db: Sesión de base de datos
+            modelo: Modelo de cada fila (DatosLMSFila o ServiciosApoyoFila)
+            campo: Columna de student_features que se actualiza
+            valor: Obtiene el valor de la columna a partir de una fila validada
+        """
+        super().__init__(db, **kwargs)
+        self.modelo = modelo
+        self.campo = campo
+        self.valor = valor
+
+    @classmethod
+    def lms(cls, db: Session, **kwargs: Any) -> "BulkStudentDataSync":
+        """Sincroniza las horas semanales de actividad en el LMS."""
+        return cls(db, DatosLMSFila, "lms_horas_semanales", lambda f: f.horas_actividad_semanal, **kwargs)
+
+    @classmethod
+    def servicios_apoyo(cls, db: Session, **kwargs: Any) -> "BulkStudentDataSync":
+        """Sincroniza el uso de servicios de apoyo del último mes (número de servicios)."""
+        return cls(db, ServiciosApoyoFila, "servicios_apoyo_mes", lambda f: len(f.servicios_utilizados), **kwargs)
+
+    def cargar_bloque(self, filas: List[ParsedRow]) -> int:
+        """
+        Valida y aplica un bloque de filas (bloqueante; se ejecuta en el pool de base de datos).
+
+        Args:
+            filas: Filas leídas del archivo o del arreglo, válidas o no
+
+        Returns:
+            int: Filas aplicadas del bloque
+        """
+        validas = self._separar_validas(filas)
+        if not validas:
+            return 0
+
+        valores = {fila.fila.estudiante_id: self.valor(fila.fila) for fila in validas}
+        return self._guardar(validas, lambda: self.features.actualizar_en_bloque(self.campo, valores))
@@ -9,6 +9,8 @@ from ..models import (
     MessageCreate,
     Student
 )
+from ..core.executors import db_executor
+from ..utils.prometheus import LLMTimer
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os
@@ -34,6 +36,10 @@ class ChatAgent:
         """
         Inicia una nueva conversación con un estudiante.
         """
+        return await db_executor.run(self._iniciar_conversacion, estudiante_id, contexto)
+
+    def _iniciar_conversacion(self, estudiante_id: int, contexto: Optional[str]) -> Conversation:
+        """Crea la conversación y el mensaje del sistema (bloqueante)."""
         # Verificar que el estudiante existe
         estudiante = self.db.query(Student).filter(Student.id == estudiante_id).first()
         if not estudiante:
@@ -60,6 +66,7 @@ class ChatAgent:
         )
         self.db.add(mensaje_sistema)
         self.db.commit()
+        self.db.refresh(conversacion)
 
         return conversacion
 
@@ -72,6 +79,50 @@ class ChatAgent:
         """
         Envía un mensaje del usuario y obtiene la respuesta del agente usando Gemini.
         """
+        # Las consultas se hacen en el pool de base de datos; sólo la llamada a
+        # Gemini, que ya es asíncrona, se espera en el event loop
+        mensajes_previos = await db_executor.run(
+            self._registrar_mensaje_usuario, conversacion_id, contenido, mensaje_metadata
+        )
+
+        try:
+            # Preparar el prompt con el historial
+            prompt = self._preparar_prompt(mensajes_previos, contenido)
+            
+            # Obtener respuesta de Gemini (latencia y errores en /metrics)
+            with LLMTimer("chat"):
+                respuesta = await self.model.generate_content_async(prompt)
+            
+            # Guardar respuesta del asistente
+            return await db_executor.run(
+                self._guardar_mensaje,
+                conversacion_id,
+                MessageRole.ASSISTANT,
+                respuesta.text,
+                {
+                    "modelo": "gemini-2.5-flash-preview-04-17",
+                    "candidates": len(respuesta.candidates) if hasattr(respuesta, 'candidates') else 1
+                }
+            )
+
+        except Exception as e:
+            # En caso de error, guardar un mensaje de error
+            await db_executor.run(
+                self._guardar_mensaje,
+                conversacion_id,
+                MessageRole.ASSISTANT,
+                "Lo siento, ha ocurrido un error al procesar tu mensaje. Por favor, intenta nuevamente.",
+                {"error": str(e)}
+            )
+            raise
+
+    def _registrar_mensaje_usuario(
+        self,
+        conversacion_id: int,
+        contenido: str,
+        mensaje_metadata: Optional[Dict[str, Any]]
+    ) -> List[Message]:
+        """Guarda el mensaje del usuario y devuelve el historial de la conversación (bloqueante)."""
         # Verificar que la conversación existe y está activa
         conversacion = self.db.query(Conversation).filter(
             Conversation.id == conversacion_id,
@@ -91,43 +142,28 @@ class ChatAgent:
         self.db.commit()
 
         # Obtener historial de mensajes para el contexto
-        mensajes_previos = self.db.query(Message).filter(
+        return self.db.query(Message).filter(
             Message.conversacion_id == conversacion_id
         ).order_by(Message.fecha.asc()).all()
 
-        try:
-            # Preparar el prompt con el historial
-            prompt = self._preparar_prompt(mensajes_previos, contenido)
-            
-            # Obtener respuesta de Gemini
-            respuesta = await self.model.generate_content_async(prompt)
-            
-            # Guardar respuesta del asistente
-            mensaje_asistente = Message(
-                conversacion_id=conversacion_id,
-                rol=MessageRole.ASSISTANT,
-                contenido=respuesta.text,
-                mensaje_metadata={
-                    "modelo": "gemini-2.5-flash-preview-04-17",
-                    "candidates": len(respuesta.candidates) if hasattr(respuesta, 'candidates') else 1
-                }
-            )
-            self.db.add(mensaje_asistente)
-            self.db.commit()
-
-            return mensaje_asistente
-
-        except Exception as e:
-            # En caso de error, guardar un mensaje de error
-            mensaje_error = Message(
-                conversacion_id=conversacion_id,
-                rol=MessageRole.ASSISTANT,
-                contenido="Lo siento, ha ocurrido un error al procesar tu mensaje. Por favor, intenta nuevamente.",
-                mensaje_metadata={"error": str(e)}
-            )
-            self.db.add(mensaje_error)
-            self.db.commit()
-            raise
+    def _guardar_mensaje(
+        self,
+        conversacion_id: int,
+        rol: MessageRole,
+        contenido: str,
+        mensaje_metadata: Optional[Dict[str, Any]]
+    ) -> Message:
+        """Guarda un mensaje de la conversación (bloqueante)."""
+        mensaje = Message(
+            conversacion_id=conversacion_id,
+            rol=rol,
+            contenido=contenido,
+            mensaje_metadata=mensaje_metadata
+        )
+        self.db.add(mensaje)
+        self.db.commit()
+        self.db.refresh(mensaje)
+        return mensaje
 
     def _preparar_prompt(self, mensajes_previos: List[Message], mensaje_actual: str) -> str:
         """
@@ -153,6 +189,10 @@ class ChatAgent:
         """
         Finaliza una conversación activa.
         """
+        return await db_executor.run(self._finalizar_conversacion, conversacion_id)
+
+    def _finalizar_conversacion(self, conversacion_id: int) -> Conversation:
+        """Marca la conversación como finalizada (bloqueante)."""
         conversacion = self.db.query(Conversation).filter(
             Conversation.id == conversacion_id,
             Conversation.estado == "activa"
@@ -175,6 +215,10 @@ class ChatAgent:
         """
         Obtiene el historial de mensajes de una conversación.
         """
+        return await db_executor.run(self._obtener_historial, conversacion_id, limit)
+
+    def _obtener_historial(self, conversacion_id: int, limit: Optional[int]) -> List[Message]:
+        """Consulta los mensajes de la conversación (bloqueante)."""
         query = self.db.query(Message).filter(
             Message.conversacion_id == conversacion_id
         ).order_by(Message.fecha.asc())
@@ -196,7 +240,8 @@ class ChatAgent:
             {{"positivo": X, "negativo": Y, "neutro": Z}}
             donde X, Y, Z son números entre 0 y 1 que suman 1."""
             
-            respuesta = await self.model.generate_content_async(prompt)
+            with LLMTimer("sentiment"):
+                respuesta = await self.model.generate_content_async(prompt)
             
             # Procesar la respuesta para extraer las probabilidades
             # Nota: Esto es un ejemplo simplificado, deberías adaptarlo según el formato real de la respuesta
@@ -0,0 +1,138 @@
+"""
+Validación vectorizada de solicitudes de predicción en formato columnar.
+
+Las reglas de cada campo se derivan de `StudentDataInput`, de modo que el
+camino columnar y el camino por filas aceptan exactamente los mismos valores.
+"""
+import typing
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from annotated_types import Ge, Le
+
+from app.api.models import StudentDataInput
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Regla de validación de una columna."""
+    name: str
+    kind: str  # "int", "float", "str" o "choice"
+    ge: Optional[float] = None
+    le: Optional[float] = None
+    choices: Tuple[str, ...] = ()
+
+
+def _build_specs() -> Dict[str, FieldSpec]:
+    """Traduce los campos de StudentDataInput a reglas vectorizables."""
+    specs = {}
+    for nombre, campo in StudentDataInput.model_fields.items():
+        ge = next((m.ge for m in campo.metadata if isinstance(m, Ge)), None)
+        le = next((m.le for m in campo.metadata if isinstance(m, Le)), None)
+        anotacion = campo.annotation
+
+        if typing.get_origin(anotacion) is typing.Literal:
+            specs[nombre] = FieldSpec(nombre, "choice", choices=tuple(typing.get_args(anotacion)))
+        elif anotacion is int:
+            specs[nombre] = FieldSpec(nombre, "int", ge=ge, le=le)
+        elif anotacion is float:
+            specs[nombre] = FieldSpec(nombre, "float", ge=ge, le=le)
+        else:
+            specs[nombre] = FieldSpec(nombre, "str")
+    return specs
+
+
+FIELD_SPECS: Dict[str, FieldSpec] = _build_specs()
+FIELD_NAMES: Tuple[str, ...] = tuple(FIELD_SPECS)
+
+
+def _to_float_array(values: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte una columna a float64.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (valores, máscara de valores no numéricos)
+    """
+    try:
+        arr = np.asarray(values, dtype=np.float64)
+        # bool es subclase de int y numpy lo acepta; pydantic también, se respeta
+        return arr, np.isnan(arr)
+    except (TypeError, ValueError):
+        pass
+
+    # Camino lento sólo si la columna trae valores no convertibles (None, texto...)
+    arr = np.empty(len(values), dtype=np.float64)
+    invalidos = np.zeros(len(values), dtype=bool)
+    for i, valor in enumerate(values):
+        try:
+            if isinstance(valor, str) or valor is None:
+                raise TypeError
+            arr[i] = float(valor)
+        except (TypeError, ValueError):
+            arr[i] = np.nan
+            invalidos[i] = True
+    return arr, invalidos | np.isnan(arr)
+
+
+def validate_columns(
+    columns: Dict[str, Sequence[Any]]
+) -> Tuple[Dict[str, np.ndarray], np.ndarray, List[Dict[str, Any]]]:
+    """
+    Valida y normaliza una solicitud columnar.
+
+    Args:
+        columns: Un arreglo por campo de StudentDataInput, todos de la misma longitud
+
+    Returns:
+        Tuple: (columnas como arreglos NumPy, máscara de filas válidas, errores por fila)
+
+    Raises:
+        ValueError: Si faltan columnas o las longitudes no coinciden
+    """
+    faltantes = [nombre for nombre in FIELD_NAMES if nombre not in columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+
+    longitudes = {len(columns[nombre]) for nombre in FIELD_NAMES}
+    if len(longitudes) != 1:
+        raise ValueError("Todas las columnas deben tener la misma longitud")
+    n_filas = longitudes.pop()
+
+    salida: Dict[str, np.ndarray] = {}
+    validas = np.ones(n_filas, dtype=bool)
+    errores: List[Dict[str, Any]] = []
+
+    def registrar(mascara: np.ndarray, campo: str, mensaje: str) -> None:
+        for fila in np.flatnonzero(mascara):
+            errores.append({"row": int(fila), "field": campo, "error": mensaje})
+        validas[mascara] = False
+
+    for nombre, spec in FIELD_SPECS.items():
+        valores = columns[nombre]
+
+        if spec.kind in ("choice", "str"):
+            arr = np.asarray(valores, dtype=object)
+            no_texto = np.fromiter((not isinstance(v, str) for v in arr), dtype=bool, count=n_filas)
+            registrar(no_texto, nombre, "Se esperaba un texto")
+            if spec.kind == "choice":
+                fuera = ~no_texto & ~np.isin(arr, spec.choices)
+                registrar(fuera, nombre, f"Valor no permitido; opciones: {', '.join(spec.choices)}")
+            salida[nombre] = arr
+            continue
+
+        arr, invalidos = _to_float_array(valores)
+        registrar(invalidos, nombre, "Se esperaba un número")
+        revisar = ~invalidos
+
+        if spec.kind == "int":
+            registrar(revisar & (arr != np.floor(arr)), nombre, "Se esperaba un entero")
+        if spec.ge is not None:
+            registrar(revisar & (arr < spec.ge), nombre, f"Debe ser mayor o igual a {spec.ge}")
+        if spec.le is not None:
+            registrar(revisar & (arr > spec.le), nombre, f"Debe ser menor o igual a {spec.le}")
+
+        salida[nombre] = arr
+
+    errores.sort(key=lambda e: e["row"])
+    return salida, validas, errores
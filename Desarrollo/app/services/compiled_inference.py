@@ -0,0 +1,133 @@
+import bisect
+import logging
+import time
+from typing import Any, Callable, Dict, Sequence
+
+import numpy as np
+
+from app.core.config import INFERENCE_BATCH_BUCKETS
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BucketedPredictor:
+    """
+    Envuelve una función de inferencia para que sólo vea tamaños de lote fijos.
+
+    Cada lote se rellena con ceros hasta el bucket inmediatamente superior y
+    los lotes mayores que el último bucket se dividen; así el motor sólo
+    compila y calienta un conjunto pequeño y conocido de formas.
+    """
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Any],
+        input_dim: int,
+        output_dim: int,
+        buckets: Sequence[int] = INFERENCE_BATCH_BUCKETS,
+        model: Any = None
+    ):
+        """
+        Inicializa el predictor.
+
+        Args:
+            predict_fn: Función que recibe un lote float32 (n, input_dim) y devuelve (n, output_dim)
+                como arreglo NumPy o tensor convertible
+            input_dim: Número de características de entrada
+            output_dim: Número de salidas del modelo
+            buckets: Tamaños de lote permitidos
+            model: Modelo original, para inspección
+        """
+        if not buckets or min(buckets) < 1:
+            raise ValueError("Se requiere al menos un tamaño de lote positivo")
+
+        self.predict_fn = predict_fn
+        self.input_dim = input_dim
+        self.output_dim = output_dim
+        self.buckets = tuple(sorted(set(buckets)))
+        self.model = model
+
+    def bucket_for(self, n: int) -> int:
+        """Devuelve el tamaño de lote fijo con el que se evalúan `n` filas."""
+        indice = bisect.bisect_left(self.buckets, n)
+        return self.buckets[min(indice, len(self.buckets) - 1)]
+
+    def predict(self, x: np.ndarray, verbose: int = 0, **kwargs) -> np.ndarray:
+        """
+        Ejecuta la inferencia con relleno hasta el bucket correspondiente.
+
+        Args:
+            x: Matriz (n_filas, input_dim)
+            verbose: Ignorado; se acepta por compatibilidad con Keras
+
+        Returns:
+            np.ndarray: Salidas con forma (n_filas, output_dim)
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        if x.shape[1] != self.input_dim:
+            raise ValueError(f"Se esperaban {self.input_dim} características, se recibieron {x.shape[1]}")
+
+        n = len(x)
+        if n == 0:
+            return np.empty((0, self.output_dim), dtype=np.float32)
+
+        maximo = self.buckets[-1]
+        salidas = []
+        for inicio in range(0, n, maximo):
+            parte = x[inicio:inicio + maximo]
+            tam = self.bucket_for(len(parte))
+            if tam > len(parte):
+                relleno = np.zeros((tam, self.input_dim), dtype=np.float32)
+                relleno[:len(parte)] = parte
+                parte_salida = np.asarray(self.predict_fn(relleno))[:len(parte)]
+            else:
+                parte_salida = np.asarray(self.predict_fn(parte))
+            salidas.append(parte_salida)
+
+        return salidas[0] if len(salidas) == 1 else np.concatenate(salidas, axis=0)
+
+    __call__ = predict
+
+    def warmup(self) -> Dict[int, float]:
+        """
+        Evalúa una vez cada bucket para compilar y calentar todas las formas.
+
+        Returns:
+            Dict[int, float]: Segundos empleados por tamaño de lote
+        """
+        tiempos = {}
+        for tam in self.buckets:
+            inicio = time.perf_counter()
+            self.predict_fn(np.zeros((tam, self.input_dim), dtype=np.float32))
+            tiempos[tam] = time.perf_counter() - inicio
+        return tiempos
+
+
+def compile_keras_model(model: Any, buckets: Sequence[int] = INFERENCE_BATCH_BUCKETS) -> BucketedPredictor:
+    """
+    Compila un modelo Keras en una tf.function con firma de entrada fija.
+
+    La firma (None, input_dim) float32 evita que TensorFlow vuelva a trazar
+    el grafo por cada nueva forma o tipo de entrada, y se evita la
+    sobrecarga de `model.predict` (que crea un iterador de datos por llamada).
+
+    Args:
+        model: Modelo Keras cargado
+        buckets: Tamaños de lote permitidos
+
+    Returns:
+        BucketedPredictor: Predictor con la misma interfaz `predict`
+    """
+    import tensorflow as tf
+
+    input_dim = int(model.input_shape[-1])
+    output_dim = int(model.output_shape[-1])
+
+    @tf.function(input_signature=[tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32)])
+    def inferir(x):
+        return model(x, training=False)
+
+    return BucketedPredictor(inferir, input_dim, output_dim, buckets, model=model)
@@ -0,0 +1,291 @@
+"""
+Preprocesador compilado: reproduce `preprocessor_final.joblib` con NumPy puro.
+
+El pipeline de scikit-learn consta de:
+1. `feature_engineering`: FunctionTransformer con `create_engineered_features`
+   (parámetros `lms_mean` y `lms_std`).
+2. `preprocessing`: ColumnTransformer con
+   - `num`: SimpleImputer(mean) + StandardScaler sobre 20 columnas numéricas.
+   - `cat`: SimpleImputer(most_frequent) + OneHotEncoder(handle_unknown="ignore")
+     sobre 3 columnas categóricas.
+
+`compile_preprocessor` extrae los parámetros ajustados a arreglos planos y
+tablas de categorías; `CompiledPreprocessor.transform` aplica todo en una sola
+función vectorizada, sin pandas ni scikit-learn en tiempo de request.
+"""
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columnas creadas por create_engineered_features, en el orden en que se añaden
+ENGINEERED_FEATURES = (
+    "is_first_year",
+    "is_health_sciences",
+    "has_failed_courses",
+    "has_withdrawal",
+    "used_any_support",
+    "low_entrance_score",
+    "is_female",
+    "gpa_change",
+    "high_load_low_gpa_current",
+    "struggle_no_support",
+    "unusual_lms_activity",
+)
+
+
+@dataclass
+class CompiledPreprocessor:
+    """
+    Parámetros ajustados del preprocesador, en forma de arreglos planos.
+    """
+    lms_mean: float
+    lms_std: float
+    num_columns: Tuple[str, ...]
+    num_fill: np.ndarray      # SimpleImputer(mean).statistics_
+    num_mean: np.ndarray      # StandardScaler.mean_
+    num_scale: np.ndarray     # StandardScaler.scale_
+    cat_columns: Tuple[str, ...]
+    cat_fill: Tuple[str, ...]  # SimpleImputer(most_frequent).statistics_
+    categories: Tuple[Tuple[str, ...], ...]  # OneHotEncoder.categories_
+
+    @property
+    def n_features_out(self) -> int:
+        return len(self.num_columns) + sum(len(c) for c in self.categories)
+
+    # ------------------------------------------------------------------ #
+    # Entrada
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _as_columns(X: Any) -> Tuple[Mapping[str, Any], int]:
+        """Normaliza la entrada a un mapeo columna -> arreglo."""
+        if hasattr(X, "columns") and hasattr(X, "__getitem__") and not isinstance(X, Mapping):
+            # DataFrame de pandas
+            return {col: X[col].to_numpy() for col in X.columns}, len(X)
+        if isinstance(X, Mapping):
+            n = len(next(iter(X.values()))) if X else 0
+            return X, n
+        if isinstance(X, Sequence):
+            # Lista de diccionarios (un estudiante por elemento)
+            filas = list(X)
+            columnas = {k: [fila.get(k) for fila in filas] for k in (filas[0] if filas else {})}
+            return columnas, len(filas)
+        raise TypeError(f"Entrada no soportada por el preprocesador compilado: {type(X)!r}")
+
+    @staticmethod
+    def _float_column(values: Any) -> np.ndarray:
+        """Convierte una columna a float64 (None pasa a NaN)."""
+        return np.asarray(values, dtype=np.float64)
+
+    @staticmethod
+    def _object_column(values: Any) -> np.ndarray:
+        return np.asarray(values, dtype=object)
+
+    # ------------------------------------------------------------------ #
+    # Transformación
+    # ------------------------------------------------------------------ #
+    def _engineered(self, cols: Mapping[str, Any], n: int) -> Dict[str, np.ndarray]:
+        """Equivalente vectorizado de create_engineered_features."""
+        f = self._float_column
+        datos: Dict[str, np.ndarray] = {}
+
+        # El original calcula la media sobre la columna cruda (skipna), así que
+        # texto en `edad` lo hace fallar igual que aquí. Si todo es NaN, la media
+        # es NaN y la imputación numérica posterior usa la media del entrenamiento.
+        edad = f(cols["edad"])
+        validos = edad[~np.isnan(edad)]
+        relleno = validos.mean() if len(validos) else np.nan
+        datos["edad"] = np.where(np.isnan(edad), relleno, edad)
+
+        year = f(cols["year_of_study"])
+        credit = f(cols["credit_load"])
+        gpa_prev = f(cols["gpa_previous_semester"])
+        gpa_cur = f(cols["gpa_current_semester"])
+        failed = f(cols["number_of_failed_courses_current_semester"])
+        withdrawals = f(cols["number_of_course_withdrawals_current_semester"])
+        entrance = f(cols["entrance_exam_score_percentile"])
+        lms = f(cols["lms_activity_weekly_hours_avg_last_month"])
+
+        program = self._object_column(cols["program_major"])
+        support = self._object_column(cols["support_service_use_last_month"])
+        gender = self._object_column(cols["gender"])
+
+        datos.update({
+            "year_of_study": year,
+            "credit_load": credit,
+            "gpa_previous_semester": gpa_prev,
+            "gpa_current_semester": gpa_cur,
+            "number_of_failed_courses_current_semester": failed,
+            "number_of_course_withdrawals_current_semester": withdrawals,
+            "entrance_exam_score_percentile": entrance,
+            "lms_activity_weekly_hours_avg_last_month": lms,
+        })
+
+        has_failed = (failed > 0).astype(np.float64)
+        used_any = (support != "None").astype(np.float64)
+        datos["is_first_year"] = (year == 1).astype(np.float64)
+        datos["is_health_sciences"] = (program == "Health Sciences").astype(np.float64)
+        datos["has_failed_courses"] = has_failed
+        datos["has_withdrawal"] = (withdrawals > 0).astype(np.float64)
+        datos["used_any_support"] = used_any
+        datos["low_entrance_score"] = (entrance < 30).astype(np.float64)
+        datos["is_female"] = (gender == "Female").astype(np.float64)
+        datos["gpa_change"] = gpa_cur - gpa_prev
+        datos["high_load_low_gpa_current"] = (credit > 18).astype(np.float64) * (gpa_cur < 2.5).astype(np.float64)
+        datos["struggle_no_support"] = has_failed * (1 - used_any)
+        umbral = 1.5 * self.lms_std
+        datos["unusual_lms_activity"] = (
+            (lms < self.lms_mean - umbral) | (lms > self.lms_mean + umbral)
+        ).astype(np.float64)
+
+        datos["program_major"] = program
+        datos["support_service_use_last_month"] = support
+        datos["gender"] = gender
+        return datos
+
+    def transform(self, X: Any) -> np.ndarray:
+        """
+        Aplica el preprocesamiento completo.
+
+        Args:
+            X: DataFrame, mapeo columna -> arreglo, o lista de diccionarios con
+               las 12 columnas de entrada de StudentDataInput
+
+        Returns:
+            np.ndarray: Matriz float64 (n_filas, n_features_out), idéntica a
+            `preprocessor_final.joblib.transform`
+        """
+        cols, n = self._as_columns(X)
+        salida = np.zeros((n, self.n_features_out), dtype=np.float64)
+        if n == 0:
+            return salida
+        datos = self._engineered(cols, n)
+
+        # Numéricas: imputación por media + estandarización
+        num = np.column_stack([datos[c] for c in self.num_columns])
+        num = np.where(np.isnan(num), self.num_fill, num)
+        num -= self.num_mean
+        num /= self.num_scale
+        salida[:, :len(self.num_columns)] = num
+
+        # Categóricas: imputación por moda + one-hot con tabla de categorías
+        inicio = len(self.num_columns)
+        for columna, relleno, categorias in zip(self.cat_columns, self.cat_fill, self.categories):
+            valores = datos[columna]
+            faltantes = np.equal(valores, None) | (valores != valores)
+            if faltantes.any():
+                valores = np.where(faltantes, relleno, valores)
+            for j, categoria in enumerate(categorias):
+                salida[:, inicio + j] = valores == categoria
+            inicio += len(categorias)
+
+        return salida
+
+    __call__ = transform
+
+    # ------------------------------------------------------------------ #
+    # Persistencia
+    # ------------------------------------------------------------------ #
+    def save(self, path: Union[str, Path]) -> Path:
+        """Guarda los parámetros compilados en un .npz sin objetos pickle."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "lms": np.array([self.lms_mean, self.lms_std], dtype=np.float64),
+            "num_columns": np.array(self.num_columns),
+            "num_fill": self.num_fill,
+            "num_mean": self.num_mean,
+            "num_scale": self.num_scale,
+            "cat_columns": np.array(self.cat_columns),
+            "cat_fill": np.array(self.cat_fill),
+        }
+        for i, categorias in enumerate(self.categories):
+            arrays[f"categories_{i}"] = np.array(categorias)
+        np.savez(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CompiledPreprocessor":
+        """Carga parámetros guardados con `save`."""
+        with np.load(path, allow_pickle=False) as datos:
+            cat_columns = tuple(str(c) for c in datos["cat_columns"])
+            return cls(
+                lms_mean=float(datos["lms"][0]),
+                lms_std=float(datos["lms"][1]),
+                num_columns=tuple(str(c) for c in datos["num_columns"]),
+                num_fill=datos["num_fill"].astype(np.float64),
+                num_mean=datos["num_mean"].astype(np.float64),
+                num_scale=datos["num_scale"].astype(np.float64),
+                cat_columns=cat_columns,
+                cat_fill=tuple(str(c) for c in datos["cat_fill"]),
+                categories=tuple(
+                    tuple(str(c) for c in datos[f"categories_{i}"]) for i in range(len(cat_columns))
+                ),
+            )
+
+
+def compile_preprocessor(pipeline: Any) -> CompiledPreprocessor:
+    """
+    Extrae los parámetros ajustados del pipeline joblib.
+
+    Args:
+        pipeline: Pipeline de scikit-learn cargado desde preprocessor_final.joblib
+
+    Returns:
+        CompiledPreprocessor: Preprocesador equivalente en NumPy
+
+    Raises:
+        ValueError: Si el pipeline no tiene la estructura esperada
+    """
+    pasos = dict(getattr(pipeline, "steps", []))
+    if set(pasos) != {"feature_engineering", "preprocessing"}:
+        raise ValueError(f"Pasos del pipeline no soportados: {list(pasos)}")
+
+    fe = pasos["feature_engineering"]
+    if getattr(fe.func, "__name__", None) != "create_engineered_features":
+        raise ValueError(f"Función de ingeniería de características desconocida: {fe.func!r}")
+
+    ct = pasos["preprocessing"]
+    transformadores = {nombre: (t, cols) for nombre, t, cols in ct.transformers_ if nombre != "remainder"}
+    if set(transformadores) != {"num", "cat"}:
+        raise ValueError(f"Transformadores no soportados: {list(transformadores)}")
+    if ct.output_indices_["remainder"].stop != ct.output_indices_["remainder"].start:
+        raise ValueError("El preprocesador compilado no soporta columnas 'remainder'")
+
+    num, num_cols = transformadores["num"]
+    imputer_num, scaler = num.named_steps["imputer"], num.named_steps["scaler"]
+    if imputer_num.strategy != "mean" or imputer_num.add_indicator:
+        raise ValueError("Se esperaba SimpleImputer(strategy='mean') en las columnas numéricas")
+    faltantes = set(num_cols) - set(ENGINEERED_FEATURES) - {
+        "year_of_study", "credit_load", "gpa_previous_semester", "gpa_current_semester",
+        "number_of_failed_courses_current_semester", "number_of_course_withdrawals_current_semester",
+        "entrance_exam_score_percentile", "lms_activity_weekly_hours_avg_last_month", "edad",
+    }
+    if faltantes:
+        raise ValueError(f"Columnas numéricas desconocidas: {sorted(faltantes)}")
+
+    cat, cat_cols = transformadores["cat"]
+    imputer_cat, onehot = cat.named_steps["imputer"], cat.named_steps["onehot"]
+    if imputer_cat.strategy != "most_frequent" or onehot.handle_unknown != "ignore" or onehot.drop is not None:
+        raise ValueError("Se esperaba SimpleImputer(most_frequent) + OneHotEncoder(handle_unknown='ignore')")
+
+    escala = scaler.scale_ if scaler.scale_ is not None else np.ones(len(num_cols))
+    media = scaler.mean_ if scaler.mean_ is not None else np.zeros(len(num_cols))
+
+    return CompiledPreprocessor(
+        lms_mean=float(fe.kw_args["lms_mean"]),
+        lms_std=float(fe.kw_args["lms_std"]),
+        num_columns=tuple(num_cols),
+        num_fill=np.asarray(imputer_num.statistics_, dtype=np.float64),
+        num_mean=np.asarray(media, dtype=np.float64),
+        num_scale=np.asarray(escala, dtype=np.float64),
+        cat_columns=tuple(cat_cols),
+        cat_fill=tuple(str(v) for v in imputer_cat.statistics_),
+        categories=tuple(tuple(str(v) for v in cats) for cats in onehot.categories_),
+    )
@@ -0,0 +1,204 @@
+import logging
+import numbers
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TIPOS = ("academico", "personal")
+OPERADORES: Dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    ">": np.greater,
+    "<": np.less,
+    "==": np.equal,
+}
+
+
+class RuleCompileError(ValueError):
+    """Una regla de `factores_adicionales` no es válida."""
+
+
+def _es_numero(valor: Any) -> bool:
+    return isinstance(valor, numbers.Number)
+
+
+def _columna_numerica(valores: Sequence[Any]) -> np.ndarray:
+    """Convierte una columna a float64; los valores no numéricos o ausentes quedan como NaN."""
+    try:
+        return np.asarray(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array(
+            [float(v) if _es_numero(v) else np.nan for v in valores],
+            dtype=np.float64
+        )
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """Regla validada: compara una columna con un valor fijo."""
+    nombre: str
+    tipo: str
+    campo: str
+    operador: str
+    valor: Any
+
+    @property
+    def numerica(self) -> bool:
+        return _es_numero(self.valor)
+
+    def evaluate(self, columna: Sequence[Any]) -> np.ndarray:
+        """
+        Evalúa la regla sobre una columna completa.
+
+        Args:
+            columna: Valores del campo, uno por estudiante
+
+        Returns:
+            np.ndarray: Máscara booleana, True donde se cumple la regla
+        """
+        if self.numerica:
+            # NaN (dato ausente o no numérico) nunca cumple la regla
+            return OPERADORES[self.operador](_columna_numerica(columna), self.valor)
+        return np.asarray(columna, dtype=object) == self.valor
+
+
+class CompiledRuleSet:
+    """
+    Conjunto de reglas de una institución, evaluable sobre un lote de estudiantes.
+
+    Se compila una vez por versión de la configuración; cada evaluación
+    recorre las reglas (pocas) y no los estudiantes (muchos).
+    """
+    def __init__(self, reglas: Sequence[CompiledRule]):
+        self.reglas: Tuple[CompiledRule, ...] = tuple(reglas)
+        self.nombres = np.array([r.nombre for r in self.reglas], dtype=object)
+        self.campos_academicos = tuple(sorted({r.campo for r in self.reglas if r.tipo == "academico"}))
+        self.campos_personales = tuple(sorted({r.campo for r in self.reglas if r.tipo == "personal"}))
+
+    def __len__(self) -> int:
+        return len(self.reglas)
+
+    def evaluate(
+        self,
+        academicos: Mapping[str, Sequence[Any]],
+        personales: Mapping[str, Sequence[Any]],
+        n: int
+    ) -> np.ndarray:
+        """
+        Evalúa todas las reglas sobre un lote.
+
+        Los campos académicos ausentes valen 0 y los personales ausentes None,
+        igual que en la evaluación por estudiante.
+
+        Args:
+            academicos: Columnas de datos académicos por campo
+            personales: Columnas de datos personales por campo
+            n: Número de estudiantes del lote
+
+        Returns:
+            np.ndarray: Matriz booleana (n, n_reglas)
+        """
+        mascaras = np.zeros((n, len(self.reglas)), dtype=bool)
+        for j, regla in enumerate(self.reglas):
+            if regla.tipo == "academico":
+                columna = academicos.get(regla.campo)
+                if columna is None:
+                    columna = np.zeros(n)
+            else:
+                columna = personales.get(regla.campo)
+                if columna is None:
+                    columna = [None] * n
+            mascaras[:, j] = regla.evaluate(columna)
+        return mascaras
+
+    def factores(
+        self,
+        academicos: Mapping[str, Sequence[Any]],
+        personales: Mapping[str, Sequence[Any]],
+        n: int
+    ) -> List[List[str]]:
+        """
+        Nombres de los factores que cumple cada estudiante del lote, en el orden de la configuración.
+
+        Returns:
+            List[List[str]]: Una lista de nombres por estudiante
+        """
+        if not self.reglas:
+            return [[] for _ in range(n)]
+        mascaras = self.evaluate(academicos, personales, n)
+        return [self.nombres[fila].tolist() for fila in mascaras]
+
+
+def _compilar_regla(factor: Any, campos_personales: Optional[Iterable[str]]) -> CompiledRule:
+    if not isinstance(factor, dict):
+        raise RuleCompileError(f"Cada factor adicional debe ser un objeto, se recibió {factor!r}")
+
+    faltantes = [clave for clave in ("nombre", "tipo", "campo", "operador", "valor") if clave not in factor]
+    if faltantes:
+        raise RuleCompileError(f"Al factor {factor.get('nombre', factor)!r} le faltan: {', '.join(faltantes)}")
+
+    nombre, tipo, campo, operador, valor = (
+        factor["nombre"], factor["tipo"], factor["campo"], factor["operador"], factor["valor"]
+    )
+    if not isinstance(nombre, str) or not nombre:
+        raise RuleCompileError(f"El nombre del factor debe ser un texto no vacío: {nombre!r}")
+    if tipo not in TIPOS:
+        raise RuleCompileError(f"Tipo de factor no soportado en '{nombre}': {tipo!r} (use {', '.join(TIPOS)})")
+    if not isinstance(campo, str) or not campo:
+        raise RuleCompileError(f"El campo del factor '{nombre}' debe ser un texto no vacío")
+    if tipo == "personal" and campos_personales is not None and campo not in set(campos_personales):
+        raise RuleCompileError(f"Campo personal desconocido en '{nombre}': {campo}")
+    if operador not in OPERADORES:
+        raise RuleCompileError(
+            f"Operador no soportado en '{nombre}': {operador!r} (use {', '.join(OPERADORES)})"
+        )
+    if operador != "==" and not _es_numero(valor):
+        raise RuleCompileError(f"El operador {operador} del factor '{nombre}' requiere un valor numérico")
+    if valor is not None and not _es_numero(valor) and not isinstance(valor, str):
+        raise RuleCompileError(f"Valor no soportado en '{nombre}': {valor!r}")
+
+    return CompiledRule(nombre, tipo, campo, operador, valor)
+
+
+def compile_rules(
+    factores: Any,
+    campos_personales: Optional[Iterable[str]] = None,
+    strict: bool = True
+) -> CompiledRuleSet:
+    """
+    Compila la lista `factores_adicionales` de una configuración de institución.
+
+    Args:
+        factores: Lista de reglas {"nombre", "tipo", "campo", "operador", "valor"}
+        campos_personales: Campos personales válidos (si se indica, se verifican)
+        strict: Lanzar RuleCompileError ante la primera regla inválida; si es
+            False, las reglas inválidas se omiten con una advertencia (para
+            configuraciones guardadas antes de existir la validación)
+
+    Returns:
+        CompiledRuleSet: Reglas listas para evaluarse por lotes
+
+    Raises:
+        RuleCompileError: Si strict y alguna regla no es válida
+    """
+    if factores is None:
+        factores = []
+    if not isinstance(factores, list):
+        error = RuleCompileError("factores_adicionales debe ser una lista")
+        if strict:
+            raise error
+        logger.warning(str(error))
+        return CompiledRuleSet([])
+
+    reglas = []
+    for factor in factores:
+        try:
+            reglas.append(_compilar_regla(factor, campos_personales))
+        except RuleCompileError as e:
+            if strict:
+                raise
+            logger.warning(f"Se omite un factor adicional inválido: {str(e)}")
+    return CompiledRuleSet(reglas)
@@ -0,0 +1,304 @@
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import JSON, Float, Integer, cast, column, select, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import AcademicHistory, Student, StudentFeatures, StudentPersonalInfo
+from app.services.student_features import apply_academic_event, feature_record
+
+# Columnas de student_features que se sincronizan en bloque desde sistemas externos
+CAMPOS_SINCRONIZABLES = {
+    "lms_horas_semanales": Float,
+    "servicios_apoyo_mes": Integer,
+}
+
+# INSERT ... ON CONFLICT DO NOTHING por motor
+INSERT_SIN_CONFLICTO = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StudentFeatureStore:
+    """
+    Almacén de características por estudiante (tabla student_features).
+
+    Cada evento académico, actualización de LMS o de servicios de apoyo
+    actualiza los agregados del estudiante en la misma transacción que el
+    dato original, de modo que predecir sólo requiere leer una fila.
+    """
+    def __init__(self, db: Session):
+        """
+        Inicializa el almacén.
+
+        Args:
+            db: Sesión de base de datos (la misma del cambio que se registra)
+        """
+        self.db = db
+
+    def obtener(self, estudiante: Student) -> StudentFeatures:
+        """
+        Obtiene la fila de características del estudiante bloqueada hasta el
+        fin de la transacción, creándola a partir de su historial completo si
+        todavía no existe.
+
+        Args:
+            estudiante: Estudiante
+
+        Returns:
+            StudentFeatures: Fila en la sesión (sin confirmar)
+        """
+        return self._obtener_varios({estudiante.id: estudiante})[estudiante.id]
+
+    def _obtener_varios(self, estudiantes: Dict[int, Student]) -> Dict[int, StudentFeatures]:
+        """
+        Como `obtener`, para varios estudiantes.
+
+        El bloqueo (SELECT ... FOR UPDATE) serializa las actualizaciones
+        concurrentes de un mismo estudiante: sin él, dos eventos simultáneos
+        leerían los mismos agregados y uno de los incrementos se perdería.
+        """
+        filas = self._bloquear(estudiantes)
+        faltantes = [estudiantes[i] for i in sorted(estudiantes.keys() - filas.keys())]
+        if faltantes:
+            filas.update(self._reconstruir_varios(faltantes))
+        return filas
+
+    def _bloquear(self, ids: Iterable[int]) -> Dict[int, StudentFeatures]:
+        """Lee y bloquea las filas existentes, en orden de ID para no provocar interbloqueos."""
+        consulta = (
+            select(StudentFeatures)
+            .where(StudentFeatures.estudiante_id.in_(list(ids)))
+            .order_by(StudentFeatures.estudiante_id)
+            .with_for_update()
+            # Una fila ya cargada en la sesión podría estar desactualizada
+            .execution_options(populate_existing=True)
+        )
+        return {fila.estudiante_id: fila for fila in self.db.scalars(consulta)}
+
+    def _reconstruir(self, estudiante: Student) -> StudentFeatures:
+        """Calcula los agregados desde cero recorriendo el historial en orden cronológico."""
+        return self._reconstruir_varios([estudiante])[estudiante.id]
+
+    def _reconstruir_varios(self, estudiantes: Sequence[Student]) -> Dict[int, StudentFeatures]:
+        """
+        Como `_reconstruir`, para varios estudiantes con una sola consulta del historial.
+
+        Las filas se insertan con INSERT ... ON CONFLICT DO NOTHING: si otra
+        transacción creó la fila de un estudiante al mismo tiempo, se descarta
+        la reconstrucción propia y se usa (bloqueada) la que ya existe, que
+        incluye el evento de esa transacción.
+        """
+        historial = self.db.execute(
+            select(AcademicHistory.estudiante_id, AcademicHistory.evento, AcademicHistory.promedio)
+            .where(AcademicHistory.estudiante_id.in_([estudiante.id for estudiante in estudiantes]))
+            .order_by(AcademicHistory.estudiante_id, AcademicHistory.fecha, AcademicHistory.id)
+        ).all()
+
+        estados = {
+            estudiante.id: SimpleNamespace(
+                estudiante_id=estudiante.id, eventos=0, eventos_recientes=[], materias_reprobadas=0,
+                materias_retiradas=0, suma_promedios=0.0, promedios_registrados=0, gpa_actual=None,
+                gpa_anterior=None, lms_horas_semanales=None, servicios_apoyo_mes=None,
+                datos_academicos=None, datos_personales=None,
+            )
+            for estudiante in estudiantes
+        }
+        for evento in historial:
+            apply_academic_event(estados[evento.estudiante_id], evento.evento, evento.promedio)
+        for estudiante in estudiantes:
+            self._refrescar(estados[estudiante.id], estudiante)
+
+        filas = self._insertar_nuevas([vars(estado) for estado in estados.values()])
+        concurrentes = estados.keys() - filas.keys()
+        if concurrentes:
+            logger.info(f"Características de {len(concurrentes)} estudiantes creadas por otra transacción")
+            filas.update(self._bloquear(concurrentes))
+        logger.info(f"Características de {len(filas)} estudiantes reconstruidas ({len(historial)} eventos)")
+        return filas
+
+    def _insertar_nuevas(self, registros: List[Dict[str, Any]]) -> Dict[int, StudentFeatures]:
+        """
+        Inserta filas nuevas omitiendo las que ya existen.
+
+        Returns:
+            Dict[int, StudentFeatures]: Filas insertadas, por ID de estudiante
+        """
+        dialecto = self.db.get_bind().dialect.name
+        if dialecto not in INSERT_SIN_CONFLICTO:
+            filas = [StudentFeatures(**registro) for registro in registros]
+            self.db.add_all(filas)
+            self.db.flush()
+            return {fila.estudiante_id: fila for fila in filas}
+
+        consulta = (
+            INSERT_SIN_CONFLICTO[dialecto](StudentFeatures)
+            .on_conflict_do_nothing(index_elements=[StudentFeatures.estudiante_id])
+            .returning(StudentFeatures)
+        )
+        return {fila.estudiante_id: fila for fila in self.db.scalars(consulta, registros)}
+
+    def _refrescar(self, fila: StudentFeatures, estudiante: Student) -> StudentFeatures:
+        """Sincroniza los datos de perfil y recalcula la entrada del modelo."""
+        fila.programa = estudiante.programa
+        fila.semestre = estudiante.semestre
+        fila.entrada = feature_record(fila)
+        fila.fecha_actualizacion = datetime.now()
+        return fila
+
+    def registrar_evento(self, estudiante: Student, evento: str, promedio: Optional[float]) -> StudentFeatures:
+        """
+        Incorpora un evento académico.
+
+        Debe llamarse antes de agregar el evento a la sesión: si la fila no
+        existe se reconstruye con el historial previo y luego se aplica el evento.
+        """
+        fila = self.obtener(estudiante)
+        apply_academic_event(fila, evento, promedio)
+        return self._refrescar(fila, estudiante)
+
+    def actualizar_lms(self, estudiante: Student, horas_actividad_semanal: float) -> StudentFeatures:
+        """Registra las horas semanales de actividad en el LMS."""
+        fila = self.obtener(estudiante)
+        fila.lms_horas_semanales = horas_actividad_semanal
+        return self._refrescar(fila, estudiante)
+
+    def actualizar_servicios_apoyo(self, estudiante: Student, servicios_utilizados: List[str]) -> StudentFeatures:
+        """Registra el uso de servicios de apoyo del último mes (número de servicios)."""
+        fila = self.obtener(estudiante)
+        fila.servicios_apoyo_mes = len(servicios_utilizados)
+        return self._refrescar(fila, estudiante)
+
+    def registrar_datos_reportados(
+        self,
+        estudiante: Student,
+        datos_academicos: Optional[dict],
+        datos_personales: Optional[StudentPersonalInfo]
+    ) -> StudentFeatures:
+        """
+        Guarda los últimos datos académicos y personales recibidos al predecir,
+        para evaluar los mismos factores de riesgo al re-predecir desde los agregados.
+
+        El contacto no se guarda: ningún factor lo usa.
+        """
+        fila = self.obtener(estudiante)
+        fila.datos_academicos = dict(datos_academicos or {})
+        if datos_personales is not None:
+            fila.datos_personales = datos_personales.model_dump(mode="json", exclude={"contacto"})
+        return self._refrescar(fila, estudiante)
+
+    def registrar_eventos(
+        self,
+        estudiantes: Dict[int, Student],
+        eventos: Sequence[Tuple[int, str, Optional[float]]]
+    ) -> Dict[int, StudentFeatures]:
+        """
+        Incorpora varios eventos académicos con una sola consulta (y bloqueo) de filas.
+
+        Como `registrar_evento`, debe llamarse antes de insertar los eventos.
+        Los eventos se aplican en el orden recibido.
+
+        Args:
+            estudiantes: Estudiantes involucrados, por ID
+            eventos: (estudiante_id, evento, promedio) por evento
+
+        Returns:
+            Dict[int, StudentFeatures]: Filas actualizadas, por ID de estudiante
+        """
+        ids = {estudiante_id for estudiante_id, _, _ in eventos}
+        filas = self._obtener_varios({i: estudiantes[i] for i in ids})
+
+        for estudiante_id, evento, promedio in eventos:
+            apply_academic_event(filas[estudiante_id], evento, promedio)
+        for estudiante_id, fila in filas.items():
+            self._refrescar(fila, estudiantes[estudiante_id])
+        return filas
+
+    def actualizar_en_bloque(self, campo: str, valores: Dict[int, Any]) -> Set[int]:
+        """
+        Actualiza una columna (LMS o servicios de apoyo) de muchos estudiantes
+        con un único UPDATE ... FROM (VALUES ...) en PostgreSQL.
+
+        Los IDs se validan con una sola consulta y las filas se bloquean como
+        en `_obtener_varios` antes de recalcular la entrada del modelo: si no,
+        un evento académico confirmado entretanto se perdería al reescribir la
+        entrada con los agregados leídos antes. Las filas que faltan (poco
+        frecuente) se reconstruyen antes, en un solo bloque.
+        No confirma la transacción.
+
+        Args:
+            campo: Columna de CAMPOS_SINCRONIZABLES
+            valores: Nuevo valor por ID de estudiante
+
+        Returns:
+            Set[int]: IDs actualizados (los demás no existen)
+        """
+        if campo not in CAMPOS_SINCRONIZABLES:
+            raise ValueError(f"Campo no sincronizable: {campo}")
+        if not valores:
+            return set()
+
+        ids = set(self.db.scalars(select(Student.id).where(Student.id.in_(list(valores)))))
+        if not ids:
+            return set()
+
+        filas = self._bloquear(ids)
+        sin_fila = ids - filas.keys()
+        if sin_fila:
+            # Se crean antes, en un solo bloque, para actualizarlas junto con las demás
+            filas.update(self._reconstruir_varios(list(
+                self.db.scalars(select(Student).where(Student.id.in_(sin_fila)).order_by(Student.id))
+            )))
+
+        tabla = StudentFeatures.__table__
+        datos = []
+        for estudiante_id, fila in sorted(filas.items()):
+            estado = SimpleNamespace(**{c.key: getattr(fila, c.key) for c in tabla.c})
+            setattr(estado, campo, valores[estudiante_id])
+            datos.append((estudiante_id, valores[estudiante_id], feature_record(estado)))
+
+        self._actualizar_filas(campo, datos)
+        # El UPDATE no pasa por la sesión: las filas se releen si se usan
+        for fila in filas.values():
+            self.db.expire(fila)
+
+        return ids
+
+    def _actualizar_filas(self, campo: str, datos: List[Tuple[int, Any, Dict[str, Any]]]) -> None:
+        """UPDATE ... FROM (VALUES ...) en PostgreSQL; UPDATE por clave primaria (executemany) en otros motores."""
+        ahora = datetime.now()
+        if self.db.get_bind().dialect.name != "postgresql":
+            self.db.execute(
+                update(StudentFeatures),
+                [
+                    {"estudiante_id": estudiante_id, campo: valor, "entrada": entrada, "fecha_actualizacion": ahora}
+                    for estudiante_id, valor, entrada in datos
+                ],
+            )
+            return
+
+        nuevos = values(
+            column("estudiante_id", Integer),
+            column("valor", CAMPOS_SINCRONIZABLES[campo]),
+            column("entrada", JSON),
+            name="nuevos"
+        ).data(datos)
+        self.db.execute(
+            update(StudentFeatures)
+            .where(StudentFeatures.estudiante_id == nuevos.c.estudiante_id)
+            .values({
+                campo: nuevos.c.valor,
+                # En VALUES el JSON llega como texto
+                "entrada": cast(nuevos.c.entrada, JSON),
+                "fecha_actualizacion": ahora,
+            })
+            .execution_options(synchronize_session=False)
+        )
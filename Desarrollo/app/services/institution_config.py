@@ -0,0 +1,269 @@
+import logging
+import select
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import INSTITUTION_CONFIG_CHANNEL
+from app.services.factor_rules import CompiledRuleSet, compile_rules
+from app.services.prediction_cache import prediction_cache
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class InstitutionConfig:
+    """
+    Configuración de una institución y la versión con la que se leyó.
+
+    Las reglas de `factores_adicionales` se compilan al crear la entrada, es
+    decir, una vez por versión de la configuración.
+    """
+    configuracion: Dict[str, Any]
+    version: int
+    reglas: CompiledRuleSet = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        reglas = compile_rules(self.configuracion.get("factores_adicionales"), strict=False)
+        object.__setattr__(self, "reglas", reglas)
+
+
+class InstitutionConfigCache:
+    """
+    Caché de configuraciones de institución compartida por el proceso.
+
+    Cada entrada guarda la versión (`Institution.config_version`) leída de la
+    base de datos; una invalidación con una versión ya conocida se ignora y
+    una escritura vieja nunca pisa a una más nueva. Cada invalidación deja
+    además la versión invalidada (una lápida por institución): una lectura
+    hecha antes del cambio que llegue después de la invalidación no se guarda.
+    """
+    def __init__(self):
+        self._entries: Dict[int, InstitutionConfig] = {}
+        # Versión más alta invalidada por institución
+        self._invalidated: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self.listening = False
+
+    def get(self, institucion_id: int) -> Optional[InstitutionConfig]:
+        """
+        Obtiene la configuración en caché de una institución.
+
+        Returns:
+            Optional[InstitutionConfig]: Configuración y versión, o None si no está en caché
+        """
+        with self._lock:
+            entrada = self._entries.get(institucion_id)
+            if entrada is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return entrada
+
+    def set(self, institucion_id: int, configuracion: Optional[dict], version: int) -> InstitutionConfig:
+        """
+        Guarda la configuración leída de la base de datos.
+
+        Args:
+            institucion_id: ID de la institución
+            configuracion: Configuración JSON (None se guarda como {})
+            version: Valor de config_version leído junto con la configuración
+
+        Returns:
+            InstitutionConfig: La entrada vigente (la existente si era más nueva);
+                si la versión ya fue invalidada, la leída, sin guardarla
+        """
+        entrada = InstitutionConfig(configuracion or {}, version)
+        with self._lock:
+            if version < self._invalidated.get(institucion_id, 0):
+                logger.info(
+                    f"Se descarta la configuración {version} de la institución {institucion_id}: "
+                    f"ya se invalidó la versión {self._invalidated[institucion_id]}"
+                )
+                return entrada
+            actual = self._entries.get(institucion_id)
+            if actual is not None and actual.version > version:
+                return actual
+            self._entries[institucion_id] = entrada
+            return entrada
+
+    def replace_all(self, configuraciones: Dict[int, InstitutionConfig]) -> None:
+        """Sustituye el contenido completo de la caché (carga inicial), salvo las versiones ya invalidadas."""
+        with self._lock:
+            self._entries = {
+                institucion_id: entrada
+                for institucion_id, entrada in configuraciones.items()
+                if entrada.version >= self._invalidated.get(institucion_id, 0)
+            }
+
+    def invalidate(self, institucion_id: int, version: Optional[int] = None) -> bool:
+        """
+        Invalida la configuración de una institución y sus predicciones en caché.
+
+        Args:
+            institucion_id: ID de la institución
+            version: Nueva versión escrita; si la caché ya la tiene, no se invalida.
+                Las lecturas de versiones anteriores dejan de guardarse
+
+        Returns:
+            bool: True si se eliminó la entrada
+        """
+        with self._lock:
+            if version is not None:
+                self._invalidated[institucion_id] = max(self._invalidated.get(institucion_id, 0), version)
+            actual = self._entries.get(institucion_id)
+            if actual is not None and version is not None and actual.version >= version:
+                return False
+            eliminada = self._entries.pop(institucion_id, None) is not None
+            self._invalidations += 1
+
+        prediction_cache.invalidate_institution(institucion_id)
+        return eliminada
+
+    def handle_notification(self, payload: str) -> None:
+        """
+        Procesa una notificación "<institucion_id>:<versión>" de otro worker.
+        """
+        try:
+            institucion_id, _, version = payload.partition(":")
+            self.invalidate(int(institucion_id), int(version) if version else None)
+        except ValueError:
+            logger.warning(f"Notificación de configuración inválida: {payload!r}")
+
+    def clear(self) -> None:
+        """Vacía la caché (por ejemplo, si pudieron perderse notificaciones)."""
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+        prediction_cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Expone el tamaño y la tasa de aciertos de la caché.
+
+        Returns:
+            Dict[str, Any]: Métricas de la caché
+        """
+        with self._lock:
+            consultas = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / consultas, 4) if consultas else None,
+                "invalidations": self._invalidations,
+                "listening": self.listening,
+            }
+
+
+def notify_config_change(db: Session, institucion_id: int, version: int) -> None:
+    """
+    Publica el cambio de configuración para los demás workers.
+
+    Con PostgreSQL se usa NOTIFY, que se entrega sólo si la transacción
+    confirma; debe llamarse antes del commit. Con otros motores (SQLite en
+    desarrollo, un solo proceso) no hace nada.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(
+        text("SELECT pg_notify(:canal, :mensaje)"),
+        {"canal": INSTITUTION_CONFIG_CHANNEL, "mensaje": f"{institucion_id}:{version}"},
+    )
+
+
+class ConfigChangeListener:
+    """
+    Escucha con LISTEN las notificaciones de cambio de configuración e
+    invalida la caché local.
+
+    Usa una conexión dedicada (fuera del pool) en un hilo en segundo plano.
+    Al conectarse (o reconectarse) vacía la caché, porque pudo perder
+    notificaciones mientras no escuchaba.
+    """
+    def __init__(
+        self,
+        engine: Engine,
+        cache: InstitutionConfigCache,
+        channel: str = INSTITUTION_CONFIG_CHANNEL,
+        poll_seconds: float = 5.0,
+        retry_seconds: float = 5.0
+    ):
+        self.engine = engine
+        self.cache = cache
+        self.channel = channel
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """
+        Arranca el hilo de escucha si el motor es PostgreSQL.
+
+        Returns:
+            bool: True si se arrancó
+        """
+        if self.engine.dialect.name != "postgresql":
+            return False
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._escuchar, name="institution-config-listener", daemon=True)
+        self._hilo.start()
+        return True
+
+    def stop(self) -> None:
+        """Detiene el hilo de escucha."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.poll_seconds + 1)
+            self._hilo = None
+
+    def _conectar(self):
+        dialecto = self.engine.dialect
+        args, kwargs = dialecto.create_connect_args(self.engine.url)
+        conexion = dialecto.connect(*args, **kwargs)
+        conexion.autocommit = True
+        with conexion.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return conexion
+
+    def _escuchar(self) -> None:
+        while not self._detener.is_set():
+            conexion = None
+            try:
+                conexion = self._conectar()
+                self.cache.clear()
+                self.cache.listening = True
+                logger.info(f"Escuchando cambios de configuración de instituciones en '{self.channel}'")
+
+                while not self._detener.is_set():
+                    listos, _, _ = select.select([conexion], [], [], self.poll_seconds)
+                    if not listos:
+                        continue
+                    conexion.poll()
+                    while conexion.notifies:
+                        self.cache.handle_notification(conexion.notifies.pop(0).payload)
+
+            except Exception as e:
+                logger.warning(f"Se perdió la escucha de cambios de configuración: {str(e)}")
+                self._detener.wait(self.retry_seconds)
+            finally:
+                self.cache.listening = False
+                if conexion is not None:
+                    try:
+                        conexion.close()
+                    except Exception:
+                        pass
+
+
+# Caché compartida por el proceso
+institution_config_cache = InstitutionConfigCache()
@@ -1,13 +1,37 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.models import Institution, InstitutionCreate, InstitutionResponse
+from app.models import Institution, InstitutionCreate, InstitutionResponse, StudentPersonalInfo
 from typing import List, Optional
 from fastapi import HTTPException
+from app.services.factor_rules import RuleCompileError, compile_rules
+from app.services.institution_config import (
+    InstitutionConfig,
+    institution_config_cache,
+    notify_config_change
+)
 
 class InstitutionService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _validar_configuracion(self, configuracion: Optional[dict]) -> None:
+        """
+        Verifica que las reglas de `factores_adicionales` compilen antes de guardarlas,
+        para que un error se informe al guardar y no al predecir.
+        """
+        if not configuracion:
+            return
+        try:
+            compile_rules(
+                configuracion.get("factores_adicionales"),
+                campos_personales=StudentPersonalInfo.model_fields
+            )
+        except RuleCompileError as e:
+            raise HTTPException(status_code=400, detail=f"Configuración inválida: {str(e)}")
+
     def crear_institucion(self, institucion_data: InstitutionCreate) -> InstitutionResponse:
+        self._validar_configuracion(institucion_data.configuracion)
+
         # Verificar si el código ya existe
         if self.db.query(Institution).filter(Institution.codigo == institucion_data.codigo).first():
             raise HTTPException(status_code=400, detail="El código de institución ya está registrado")
@@ -38,6 +62,8 @@ class InstitutionService:
         if not institucion:
             return None
 
+        self._validar_configuracion(institucion_data.configuracion)
+
         # Verificar si el nuevo código ya existe en otra institución
         if institucion_data.codigo != institucion.codigo:
             if self.db.query(Institution).filter(Institution.codigo == institucion_data.codigo).first():
@@ -46,9 +72,11 @@ class InstitutionService:
         institucion.nombre = institucion_data.nombre
         institucion.codigo = institucion_data.codigo
         institucion.configuracion = institucion_data.configuracion
+        self._publicar_cambio(institucion)
 
         self.db.commit()
         self.db.refresh(institucion)
+        institution_config_cache.invalidate(institucion_id, institucion.config_version)
 
         return institucion
 
@@ -57,15 +85,22 @@ class InstitutionService:
         if not institucion:
             return False
 
-        # Verificar si hay estudiantes o administradores asociados
-        if institucion.estudiantes or institucion.admins:
+        # Verificar si hay estudiantes o administradores asociados, sin cargar las colecciones
+        asociados = self.db.scalar(
+            select(Institution.estudiantes.any() | Institution.admins.any())
+            .where(Institution.id == institucion_id)
+        )
+        if asociados:
             raise HTTPException(
                 status_code=400,
                 detail="No se puede eliminar la institución porque tiene estudiantes o administradores asociados"
             )
 
+        version = (institucion.config_version or 0) + 1
         self.db.delete(institucion)
+        notify_config_change(self.db, institucion_id, version)
         self.db.commit()
+        institution_config_cache.invalidate(institucion_id, version)
 
         return True
 
@@ -80,8 +115,60 @@ class InstitutionService:
         if not institucion:
             return None
 
+        self._validar_configuracion(configuracion)
         institucion.configuracion = configuracion
+        self._publicar_cambio(institucion)
         self.db.commit()
         self.db.refresh(institucion)
+        institution_config_cache.invalidate(institucion_id, institucion.config_version)
+
+        return institucion
 
-        return institucion 
\ No newline at end of file
+    def _publicar_cambio(self, institucion: Institution) -> None:
+        """
+        Incrementa la versión de la configuración y avisa a los demás workers.
+
+        El aviso se entrega al confirmar la transacción, junto con el cambio.
+        El incremento se hace en SQL: el UPDATE bloquea la fila, así que dos
+        cambios simultáneos obtienen versiones distintas (si no, el aviso del
+        segundo se descartaría en los demás workers por tener la misma versión).
+        """
+        institucion.config_version = Institution.config_version + 1
+        self.db.flush()
+        self.db.refresh(institucion, ["config_version"])
+        notify_config_change(self.db, institucion.id, institucion.config_version)
+
+    def obtener_configuracion_vigente(self, institucion_id: int) -> InstitutionConfig:
+        """
+        Obtiene la configuración de una institución desde la caché del proceso,
+        consultando la base de datos sólo si no está en caché.
+
+        Returns:
+            InstitutionConfig: Configuración ({} si la institución no existe o no tiene) y su versión
+        """
+        entrada = institution_config_cache.get(institucion_id)
+        if entrada is not None:
+            return entrada
+
+        fila = self.db.execute(
+            select(Institution.configuracion, Institution.config_version).where(Institution.id == institucion_id)
+        ).first()
+        if fila is None:
+            # No se guarda: la institución podría crearse más adelante
+            return InstitutionConfig({}, 0)
+        return institution_config_cache.set(institucion_id, fila.configuracion, fila.config_version)
+
+    def cargar_configuraciones(self) -> int:
+        """
+        Carga en la caché la configuración de todas las instituciones (al iniciar el proceso).
+
+        Returns:
+            int: Instituciones cargadas
+        """
+        filas = self.db.execute(
+            select(Institution.id, Institution.configuracion, Institution.config_version)
+        ).all()
+        institution_config_cache.replace_all({
+            fila.id: InstitutionConfig(fila.configuracion or {}, fila.config_version) for fila in filas
+        })
+        return len(filas) 
\ No newline at end of file
@@ -1,74 +1,384 @@
 import os
+import time
+import random
+import hashlib
 import logging
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-import joblib
-import tensorflow as tf
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import MODEL_SHADOW_VARIANT, MODEL_VARIANTS
+from app.core.executors import BoundedExecutor, shadow_executor
+from app.services.attribution import AttributionEngine, attribution_engine
+from app.services.model_registry import (
+    ModelRegistry,
+    follow_current_version,
+    get_registry_for_backend,
+    model_registry,
+)
+from app.services.prediction import predict_columns
+from app.utils.metrics import LATENCY_BUCKETS_MS, PROBABILITY_BUCKETS, Histogram
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Nombre de la variante que sirve la versión activa del registro principal
+PRIMARY_VARIANT = "principal"
+
+
+class VariantStats:
+    """Latencia, throughput y distribución de probabilidades de una variante."""
+    def __init__(self, name: str):
+        self.latency_histogram = Histogram(f"{name}_latency_ms", LATENCY_BUCKETS_MS)
+        self.score_histogram = Histogram(f"{name}_score", PROBABILITY_BUCKETS)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._rows = 0
+        self._errors = 0
+        self._seconds = 0.0
+        self._comparadas = 0
+        self._diferencia_total = 0.0
+
+    def observe(self, segundos: float, probabilidades: np.ndarray) -> None:
+        """Registra una evaluación correcta."""
+        self.latency_histogram.observe(segundos * 1000.0)
+        self.score_histogram.observe_many(probabilidades)
+        with self._lock:
+            self._requests += 1
+            self._rows += len(probabilidades)
+            self._seconds += segundos
+
+    def observe_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def observe_difference(self, probabilidades: np.ndarray, referencia: np.ndarray) -> None:
+        """Acumula la diferencia absoluta frente a las probabilidades servidas."""
+        with self._lock:
+            self._comparadas += len(probabilidades)
+            self._diferencia_total += float(np.abs(probabilidades - referencia).sum())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            resumen = {
+                "requests": self._requests,
+                "rows": self._rows,
+                "errors": self._errors,
+                # Filas por segundo de cómputo (no de reloj): compara el costo de cada modelo
+                "rows_per_second": round(self._rows / self._seconds, 1) if self._seconds > 0 else None,
+                "mean_abs_diff_vs_served": (
+                    round(self._diferencia_total / self._comparadas, 6) if self._comparadas else None
+                ),
+            }
+        resumen["latency_ms"] = self.latency_histogram.snapshot()
+        resumen["score"] = self.score_histogram.snapshot()
+        return resumen
+
+
+@dataclass
+class ModelVariant:
+    """Versión del modelo que recibe una fracción del tráfico o lo evalúa en sombra."""
+    name: str
+    registry: ModelRegistry
+    weight: float = 0.0
+    shadow: bool = False
+    stats: Optional[VariantStats] = None
+
+    def __post_init__(self):
+        if self.stats is None:
+            self.stats = VariantStats(self.name)
+
+
+def parse_variants(spec: str) -> List[Tuple[str, str, float]]:
+    """
+    Interpreta MODEL_VARIANTS.
+
+    Args:
+        spec: "nombre=versión:fracción" separados por comas; la fracción es opcional (0)
+
+    Returns:
+        List[Tuple[str, str, float]]: (nombre, versión, fracción) por variante
+
+    Raises:
+        ValueError: Si la especificación está mal formada
+    """
+    variantes = []
+    for parte in filter(None, (p.strip() for p in spec.split(","))):
+        nombre, separador, resto = parte.partition("=")
+        if not separador or not nombre.strip() or not resto.strip():
+            raise ValueError(f"Variante de modelo inválida: {parte!r} (se espera nombre=versión:fracción)")
+        version, _, fraccion = resto.partition(":")
+        peso = float(fraccion) if fraccion.strip() else 0.0
+        if not 0.0 <= peso <= 1.0:
+            raise ValueError(f"La fracción de tráfico de {nombre} debe estar entre 0 y 1")
+        variantes.append((nombre.strip(), version.strip(), peso))
+    return variantes
+
+
+def _fraccion_estable(routing_key: Any) -> float:
+    """Convierte una clave de enrutamiento en un número estable en [0, 1)."""
+    digest = hashlib.sha256(str(routing_key).encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
 class MLModelService:
     """
     Servicio para cargar y gestionar modelos de ML.
+
+    Puede alojar varias variantes del modelo: cada una recibe una fracción
+    configurable del tráfico y, opcionalmente, una variante sombra evalúa los
+    mismos lotes en segundo plano. Se registran latencia, throughput y
+    distribución de probabilidades por variante para compararlas antes de
+    promover un modelo.
     """
-    def __init__(self, models_dir: str = "artifacts"):
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        backend: Optional[str] = None,
+        variants: Optional[List[ModelVariant]] = None,
+        shadow_pool: Optional[BoundedExecutor] = None,
+        rng: Optional[random.Random] = None,
+        attribution: Optional[AttributionEngine] = None,
+        precision: Optional[str] = None
+    ):
         """
         Inicializa el servicio de modelos ML.
         
         Args:
-            models_dir: Directorio donde se almacenan los artefactos de ML
+            registry: Registro de modelos compartido (por defecto, el del proceso)
+            backend: Motor de inferencia ("keras" o "numpy"); si se indica, se usa
+                el registro compartido de ese motor
+            variants: Variantes adicionales a la principal
+            shadow_pool: Pool donde se evalúa la variante sombra
+            rng: Generador aleatorio para el reparto sin clave (inyectable para pruebas)
+            attribution: Motor de explicaciones (por defecto, el del proceso)
+            precision: Precisión de los pesos con el motor NumPy ("float32",
+                "float16" o "int8"); si se indica, se usa el registro compartido
+                de esa precisión
+        """
+        if registry is None and (backend is not None or precision is not None):
+            registry = get_registry_for_backend(backend or model_registry.backend, precision)
+        self.registry = registry or model_registry
+        self.shadow_pool = shadow_pool or shadow_executor
+        self._rng = rng or random.Random()
+        self.attribution = attribution or attribution_engine
+
+        variants = list(variants or [])
+        nombres = [v.name for v in variants]
+        if PRIMARY_VARIANT in nombres or len(set(nombres)) != len(nombres):
+            raise ValueError("Los nombres de las variantes deben ser únicos y distintos de 'principal'")
+        sombras = [v for v in variants if v.shadow]
+        if len(sombras) > 1:
+            raise ValueError("Sólo puede haber una variante sombra")
+        for sombra in sombras:
+            sombra.weight = 0.0
+        restante = 1.0 - sum(v.weight for v in variants)
+        if restante < 0:
+            raise ValueError("Las fracciones de tráfico de las variantes suman más de 1")
+
+        self.primary = ModelVariant(PRIMARY_VARIANT, self.registry, weight=restante)
+        self.variants: Dict[str, ModelVariant] = {PRIMARY_VARIANT: self.primary}
+        self.variants.update((v.name, v) for v in variants)
+        self.shadow = sombras[0] if sombras else None
+
+    @classmethod
+    def from_config(
+        cls,
+        registry: Optional[ModelRegistry] = None,
+        spec: str = MODEL_VARIANTS,
+        shadow: str = MODEL_SHADOW_VARIANT
+    ) -> "MLModelService":
         """
-        self.models_dir = Path(models_dir)
-        self.preprocessor = None
-        self.model = None
-        self.is_loaded = False
+        Construye el servicio a partir de MODEL_VARIANTS y MODEL_SHADOW_VARIANT.
+
+        Cada variante usa su propio registro fijado a su versión, con el mismo
+        directorio y motores que el registro principal. La versión puede llevar
+        una precisión de pesos ("v2@int8"; "@float16" sirve la versión activa
+        en float16) para comparar un modelo cuantizado con el original.
+        """
+        registry = registry or model_registry
+        variantes = []
+        for nombre, version, peso in parse_variants(spec):
+            version, _, precision = version.partition("@")
+            variantes.append(ModelVariant(
+                name=nombre,
+                # Sin versión ("@int8") la variante sigue a la versión activa
+                registry=follow_current_version(ModelRegistry(
+                    str(registry.models_dir),
+                    backend=registry.backend,
+                    preprocessor_backend=registry.preprocessor_backend,
+                    version=version or None,
+                    precision=precision or registry.precision
+                )),
+                weight=peso,
+                shadow=(nombre == shadow)
+            ))
+        if shadow and shadow not in {v.name for v in variantes}:
+            raise ValueError(f"La variante sombra {shadow} no está definida en MODEL_VARIANTS")
+        return cls(registry, variants=variantes)
+
+    @property
+    def backend(self) -> str:
+        return self.registry.backend
+
+    @property
+    def precision(self) -> str:
+        return self.registry.precision
+
+    @property
+    def models_dir(self) -> Path:
+        return self.registry.models_dir
+
+    @property
+    def preprocessor(self):
+        return self.registry.preprocessor
+
+    @property
+    def model(self):
+        return self.registry.model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.registry.is_loaded
         
     def load_models(self) -> bool:
         """
-        Carga los modelos de ML desde el almacenamiento.
+        Carga los modelos de ML en el registro compartido, si aún no lo están.
+
+        Las variantes adicionales se cargan y calientan también; si alguna
+        falla se deja de enrutar tráfico hacia ella, sin afectar a la principal.
         
         Returns:
             bool: True si los modelos se cargaron correctamente, False en caso contrario
         """
+        cargado = self.registry.load()
+        for variante in self.variants.values():
+            if variante is self.primary:
+                continue
+            if not (variante.registry.load() and variante.registry.warmup()):
+                logger.error(
+                    f"No se pudo cargar la variante {variante.name}; su tráfico pasa a la principal: "
+                    f"{variante.registry.error}"
+                )
+        return cargado
+
+    def choose_variant(self, routing_key: Any = None) -> ModelVariant:
+        """
+        Elige la variante que atiende una petición.
+
+        Args:
+            routing_key: Clave estable (por ejemplo, el ID del estudiante) para que
+                la misma entidad reciba siempre la misma variante; sin clave el
+                reparto es aleatorio
+
+        Returns:
+            ModelVariant: Variante elegida (nunca la sombra)
+        """
+        punto = self._rng.random() if routing_key is None else _fraccion_estable(routing_key)
+        acumulado = 0.0
+        for variante in self.variants.values():
+            if variante.shadow or variante is self.primary:
+                continue
+            acumulado += variante.weight
+            if punto < acumulado:
+                return variante if variante.registry.is_loaded else self.primary
+        return self.primary
+
+    def _evaluar(self, variante: ModelVariant, columns: Dict[str, Any]) -> np.ndarray:
+        """Evalúa un lote con una variante y registra sus métricas."""
+        inicio = time.perf_counter()
         try:
-            # Verificar que el directorio existe
-            if not self.models_dir.exists():
-                logger.error(f"El directorio de modelos {self.models_dir} no existe")
-                return False
-                
-            # Cargar el preprocesador
-            preprocessor_path = self.models_dir / "preprocessor_final.joblib"
-            if not preprocessor_path.exists():
-                logger.error(f"No se encontró el preprocesador en {preprocessor_path}")
-                return False
-                
-            self.preprocessor = joblib.load(preprocessor_path)
-            logger.info("Preprocesador cargado correctamente")
-            
-            # Cargar el modelo Keras
-            model_path = self.models_dir / "model_final_pred.keras"
-            if not model_path.exists():
-                logger.error(f"No se encontró el modelo en {model_path}")
-                return False
-                
-            self.model = tf.keras.models.load_model(str(model_path))
-            logger.info("Modelo Keras cargado correctamente")
-            
-            self.is_loaded = True
-            return True
-            
+            model, preprocessor = variante.registry.get()
+            probabilidades = predict_columns(model, preprocessor, columns)
+        except Exception:
+            variante.stats.observe_error()
+            raise
+        variante.stats.observe(time.perf_counter() - inicio, probabilidades)
+        return probabilidades
+
+    def _evaluar_sombra(self, columns: Dict[str, Any], servidas: np.ndarray) -> None:
+        try:
+            probabilidades = self._evaluar(self.shadow, columns)
         except Exception as e:
-            logger.error(f"Error al cargar los modelos: {str(e)}")
-            return False
+            logger.warning(f"Error en la variante sombra {self.shadow.name}: {str(e)}")
+            return
+        self.shadow.stats.observe_difference(probabilidades, servidas)
+
+    def predict_batch(self, columns: Dict[str, Any], routing_key: Any = None) -> Tuple[np.ndarray, str]:
+        """
+        Predice un lote con la variante que corresponda y, si hay variante
+        sombra, lo encola para evaluarlo fuera del camino crítico.
+
+        Args:
+            columns: Una columna por campo de StudentDataInput
+            routing_key: Clave estable de enrutamiento (opcional)
+
+        Returns:
+            Tuple[np.ndarray, str]: Probabilidades por fila y nombre de la variante que las calculó
+        """
+        variante = self.choose_variant(routing_key)
+        probabilidades = self._evaluar(variante, columns)
+        if self.shadow is not None and self.shadow.registry.is_loaded and len(probabilidades):
+            # Si el pool de la sombra está saturado el lote simplemente no se compara
+            self.shadow_pool.submit_nowait(self._evaluar_sombra, columns, probabilidades)
+        return probabilidades, variante.name
+
+    def predict_batch_explained(
+        self,
+        columns: Dict[str, Any],
+        routing_key: Any = None
+    ) -> Tuple[np.ndarray, str, List[Dict[str, Any]]]:
+        """
+        Predice un lote y explica cada predicción en la misma pasada vectorizada.
+
+        No se envía a la variante sombra ni se registra en las métricas de
+        latencia de la variante, que no serían comparables con las del resto.
+
+        Args:
+            columns: Una columna por campo de StudentDataInput
+            routing_key: Clave estable de enrutamiento (opcional)
+
+        Returns:
+            Tuple[np.ndarray, str, List[Dict[str, Any]]]: Probabilidades, variante
+            y explicación por fila (probabilidad base y contribución por característica)
+
+        Raises:
+            AttributionUnavailableError: Si el modelo de la variante no admite atribución
+        """
+        variante = self.choose_variant(routing_key)
+        probabilidades, explicaciones = self.attribution.explain(variante.registry.get_artifacts(), columns)
+        return probabilidades, variante.name, explicaciones
+
+    def variant_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Métricas por variante, para /health y para comparar modelos antes de promoverlos.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Versión, fracción de tráfico y métricas de cada variante
+        """
+        return {
+            nombre: {
+                "version": variante.registry.version,
+                "precision": variante.registry.precision,
+                "weight": round(variante.weight, 4),
+                "shadow": variante.shadow,
+                "loaded": variante.registry.is_loaded,
+                **variante.stats.snapshot(),
+            }
+            for nombre, variante in self.variants.items()
+        }
             
-    def predict(self, features: Dict[str, Any]) -> Optional[float]:
+    def predict(self, features: Dict[str, Any], routing_key: Any = None) -> Optional[float]:
         """
         Realiza una predicción usando los modelos cargados.
         
         Args:
             features: Diccionario con las características para la predicción
+            routing_key: Clave estable para elegir la variante (opcional)
             
         Returns:
             float: Probabilidad de estrés predicha, o None si hay error
@@ -78,13 +388,11 @@ class MLModelService:
             return None
             
         try:
-            # Preprocesar las características
-            processed_features = self.preprocessor.transform([features])
-            
-            # Realizar la predicción
-            prediction = self.model.predict(processed_features)[0][0]
-            
-            return float(prediction)
+            probabilidades, _ = self.predict_batch(
+                {campo: [valor] for campo, valor in features.items()},
+                routing_key
+            )
+            return float(probabilidades[0])
             
         except Exception as e:
             logger.error(f"Error al realizar la predicción: {str(e)}")
@@ -92,7 +400,11 @@ class MLModelService:
             
     def get_feature_importance(self) -> Dict[str, float]:
         """
-        Obtiene la importancia de las características del modelo.
+        Obtiene la importancia global de las características del modelo activo.
+
+        Con modelos que exponen `feature_importances_` se usa ese valor; con la
+        red densa se usa la media de integrated gradients sobre filas de
+        referencia, calculada una vez por versión del modelo.
         
         Returns:
             Dict[str, float]: Diccionario con la importancia de cada característica
@@ -102,25 +414,21 @@ class MLModelService:
             return {}
             
         try:
-            # Obtener nombres de características del preprocesador
-            feature_names = self.preprocessor.get_feature_names_out()
-            
-            # Obtener importancia de características del modelo
-            if hasattr(self.model, 'feature_importances_'):
-                importances = self.model.feature_importances_
-            else:
-                # Para modelos que no tienen feature_importances_ directamente
-                # Podríamos implementar SHAP o LIME aquí
-                return {}
-                
-            # Crear diccionario de importancia
-            importance_dict = {
-                name: float(importance)
-                for name, importance in zip(feature_names, importances)
-            }
-            
-            return importance_dict
+            artefactos = self.registry.get_artifacts()
+
+            if hasattr(artefactos.model, 'feature_importances_'):
+                feature_names = artefactos.preprocessor.get_feature_names_out()
+                return {
+                    name: float(importance)
+                    for name, importance in zip(feature_names, artefactos.model.feature_importances_)
+                }
+
+            return self.attribution.global_importance(artefactos)
             
         except Exception as e:
             logger.error(f"Error al obtener importancia de características: {str(e)}")
-            return {} 
\ No newline at end of file
+            return {} 
+
+
+# Servicio compartido por el proceso (variantes según MODEL_VARIANTS)
+ml_model_service = MLModelService.from_config()
@@ -0,0 +1,715 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import (
+    ARTIFACTS_PATH,
+    COMPILED_PREPROCESSOR_NAME,
+    ML_BACKEND,
+    MODEL_CURRENT_POINTER,
+    MODEL_MMAP,
+    MODEL_NAME,
+    MODEL_PRECISION,
+    MODEL_VERSIONS_DIR,
+    NUMPY_MODEL_NAME,
+    PREPROCESSOR_BACKEND,
+    PREPROCESSOR_NAME,
+)
+from app.services.numpy_inference import PRECISIONS, quantized_model_name
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("keras", "numpy")
+PREPROCESSOR_BACKENDS = ("compiled", "sklearn")
+
+
+def _rss_bytes() -> Optional[int]:
+    """
+    Obtiene la memoria residente (RSS) actual del proceso.
+
+    Returns:
+        Optional[int]: RSS en bytes, o None si no se puede determinar
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        # En Linux ru_maxrss está en KB; es el pico, no el valor actual
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return None
+
+
+def load_sklearn_preprocessor(path: Path) -> Any:
+    """
+    Carga el preprocesador joblib.
+
+    La función de ingeniería de características se serializó con dill desde un
+    notebook y busca `pd`/`np` en los globales de `__main__`, que bajo uvicorn
+    no los tiene; se inyectan aquí para que `transform` funcione en cualquier
+    proceso.
+    """
+    import joblib
+    import numpy as np
+    import pandas as pd
+
+    preprocessor = joblib.load(path)
+    for _, step in getattr(preprocessor, "steps", []):
+        func = getattr(step, "func", None)
+        if func is not None and hasattr(func, "__globals__"):
+            func.__globals__.setdefault("pd", pd)
+            func.__globals__.setdefault("np", np)
+    return preprocessor
+
+
+def _artifact_version(*paths: Path) -> str:
+    """
+    Calcula una versión corta a partir del contenido de los artefactos.
+
+    Returns:
+        str: Primeros 12 caracteres del SHA-256 de los archivos existentes
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if path.exists():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class LoadedArtifacts:
+    """
+    Modelo y preprocesador de una misma versión.
+
+    Es inmutable: una recarga crea un objeto nuevo y lo sustituye de forma
+    atómica, así que quien ya tomó una referencia termina con la versión
+    anterior.
+    """
+    model: Any
+    preprocessor: Any
+    version: str
+    directory: Path
+    loaded_at: float
+    load_time_seconds: float
+    memory_bytes: Optional[int]
+    # Tipo de los pesos del modelo NumPy ("float32", "float16" o "int8")
+    precision: str = "float32"
+
+
+def _warmup_model(model: Any) -> float:
+    """
+    Ejecuta predicciones de prueba sobre un modelo recién cargado.
+
+    Con el motor Keras se evalúa cada tamaño de lote fijo; con el motor
+    NumPy basta una fila.
+
+    Returns:
+        float: Segundos empleados
+    """
+    import numpy as np
+
+    inicio = time.perf_counter()
+    if hasattr(model, "warmup"):
+        model.warmup()
+    else:
+        model.predict(np.zeros((1, model.input_dim), dtype=np.float32), verbose=0)
+    return time.perf_counter() - inicio
+
+
+class ModelRegistry:
+    """
+    Registro de modelos compartido por todo el proceso.
+
+    Carga una única vez el modelo (Keras o NumPy) y el preprocesador, y los expone a
+    PrediccionService, MLModelService y app/services/prediction.py.
+
+    Si el directorio de artefactos contiene `versions/<versión>/` y un archivo
+    `CURRENT` con el nombre de la versión activa, se carga esa versión; si no,
+    se usan los archivos que están directamente en el directorio. Una nueva
+    versión puede cargarse y calentarse en segundo plano con `reload` y se
+    activa con un intercambio atómico.
+    """
+    def __init__(
+        self,
+        models_dir: str = ARTIFACTS_PATH,
+        backend: str = ML_BACKEND,
+        preprocessor_backend: str = PREPROCESSOR_BACKEND,
+        version: Optional[str] = None,
+        precision: Optional[str] = None
+    ):
+        """
+        Inicializa el registro de modelos.
+
+        Args:
+            models_dir: Directorio donde se almacenan los artefactos de ML
+            backend: Motor de inferencia, "keras" o "numpy"
+            preprocessor_backend: "compiled" (NumPy) o "sklearn" (joblib original)
+            version: Versión fija a servir (por ejemplo, un modelo candidato); por
+                defecto la indicada en CURRENT
+            precision: Precisión de los pesos con el motor NumPy; por defecto
+                MODEL_PRECISION (el motor Keras siempre usa float32)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend de inferencia no soportado: {backend}")
+        if preprocessor_backend not in PREPROCESSOR_BACKENDS:
+            raise ValueError(f"Backend de preprocesamiento no soportado: {preprocessor_backend}")
+        if precision is None:
+            precision = MODEL_PRECISION if backend == "numpy" else "float32"
+        if precision not in PRECISIONS:
+            raise ValueError(f"Precisión de pesos no soportada: {precision}")
+        if precision != "float32" and backend != "numpy":
+            raise ValueError("Los pesos de precisión reducida sólo se sirven con el motor numpy")
+
+        self.models_dir = Path(models_dir)
+        self.backend = backend
+        self.preprocessor_backend = preprocessor_backend
+        self.precision = precision
+        self.pinned_version = version
+        self.is_ready = False
+        self.warmup_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.reloading = False
+        self.reload_error: Optional[str] = None
+        self._artifacts: Optional[LoadedArtifacts] = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    # --- Estado de la versión activa ---
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._artifacts is not None
+
+    @property
+    def model(self):
+        return self._artifacts.model if self._artifacts is not None else None
+
+    @property
+    def preprocessor(self):
+        return self._artifacts.preprocessor if self._artifacts is not None else None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._artifacts.version if self._artifacts is not None else None
+
+    @property
+    def loaded_at(self) -> Optional[float]:
+        return self._artifacts.loaded_at if self._artifacts is not None else None
+
+    @property
+    def load_time_seconds(self) -> Optional[float]:
+        return self._artifacts.load_time_seconds if self._artifacts is not None else None
+
+    @property
+    def memory_bytes(self) -> Optional[int]:
+        return self._artifacts.memory_bytes if self._artifacts is not None else None
+
+    # --- Directorios y versiones ---
+
+    @property
+    def versions_dir(self) -> Path:
+        return self.models_dir / MODEL_VERSIONS_DIR
+
+    def current_pointer(self) -> Optional[str]:
+        """Versión indicada en el archivo CURRENT, o None si no hay artefactos versionados."""
+        puntero = self.models_dir / MODEL_CURRENT_POINTER
+        if not puntero.exists():
+            return None
+        return puntero.read_text().strip() or None
+
+    def available_versions(self) -> List[str]:
+        """Versiones publicadas en el directorio de versiones."""
+        if not self.versions_dir.is_dir():
+            return []
+        return sorted(d.name for d in self.versions_dir.iterdir() if d.is_dir())
+
+    def resolve_directory(self, version: Optional[str] = None) -> Tuple[Path, Optional[str]]:
+        """
+        Resuelve el directorio de una versión.
+
+        Args:
+            version: Versión solicitada; por defecto la fijada al crear el registro
+                o, si no hay ninguna, la indicada en CURRENT
+
+        Returns:
+            Tuple[Path, Optional[str]]: (directorio, nombre de la versión o None si no hay versiones)
+
+        Raises:
+            FileNotFoundError: Si la versión no existe
+        """
+        version = version or self.pinned_version or self.current_pointer()
+        if version is None:
+            return self.models_dir, None
+
+        directorio = self.versions_dir / version
+        if Path(version).name != version or not directorio.is_dir():
+            raise FileNotFoundError(f"No existe la versión de modelo {version} en {self.versions_dir}")
+        return directorio, version
+
+    def activate(self, version: str) -> None:
+        """
+        Marca una versión como activa escribiendo CURRENT de forma atómica.
+
+        Los demás workers la detectan con `watch_current_version`.
+        """
+        self.resolve_directory(version)
+        puntero = self.models_dir / MODEL_CURRENT_POINTER
+        temporal = puntero.with_name(f".{puntero.name}.{os.getpid()}")
+        temporal.write_text(version + "\n")
+        os.replace(temporal, puntero)
+
+    @property
+    def artifact_dir(self) -> Path:
+        """Directorio de la versión cargada (o de la que se cargaría)."""
+        if self._artifacts is not None:
+            return self._artifacts.directory
+        try:
+            return self.resolve_directory()[0]
+        except FileNotFoundError:
+            return self.models_dir
+
+    @property
+    def model_path(self) -> Path:
+        return self.artifact_dir / MODEL_NAME
+
+    @property
+    def numpy_model_path(self) -> Path:
+        return self.artifact_dir / quantized_model_name(NUMPY_MODEL_NAME, self.precision)
+
+    @property
+    def preprocessor_path(self) -> Path:
+        return self.artifact_dir / PREPROCESSOR_NAME
+
+    @property
+    def compiled_preprocessor_path(self) -> Path:
+        return self.artifact_dir / COMPILED_PREPROCESSOR_NAME
+
+    # --- Carga ---
+
+    def _load_preprocessor(self, directory: Optional[Path] = None):
+        """Carga el preprocesador compilado o, si no es posible, el pipeline joblib."""
+        directory = directory or self.artifact_dir
+        preprocessor_path = directory / PREPROCESSOR_NAME
+
+        if self.preprocessor_backend == "compiled":
+            from app.services.compiled_preprocessor import CompiledPreprocessor, compile_preprocessor
+
+            compilado = directory / COMPILED_PREPROCESSOR_NAME
+            if compilado.exists() and (
+                not preprocessor_path.exists()
+                or compilado.stat().st_mtime >= preprocessor_path.stat().st_mtime
+            ):
+                # No requiere scikit-learn ni pandas
+                return CompiledPreprocessor.load(compilado)
+
+            pipeline = load_sklearn_preprocessor(preprocessor_path)
+            try:
+                return compile_preprocessor(pipeline)
+            except ValueError as e:
+                logger.warning(f"No se pudo compilar el preprocesador, se usará el pipeline joblib: {str(e)}")
+                return pipeline
+
+        return load_sklearn_preprocessor(preprocessor_path)
+
+    def _load_model(self, directory: Optional[Path] = None):
+        """Carga el modelo con el motor configurado."""
+        directory = directory or self.artifact_dir
+        model_path = directory / MODEL_NAME
+
+        if self.backend == "numpy":
+            from app.services.numpy_inference import NumpyDenseModel, export_keras_weights, quantize_weights
+
+            numpy_model_path = directory / NUMPY_MODEL_NAME
+            quantized_path = directory / quantized_model_name(NUMPY_MODEL_NAME, self.precision)
+            if not quantized_path.exists():
+                if not numpy_model_path.exists():
+                    # Exportar al vuelo; sólo requiere h5py, no TensorFlow
+                    logger.info(f"No existe {numpy_model_path}; exportando pesos desde {model_path}")
+                    export_keras_weights(model_path, numpy_model_path)
+                if quantized_path != numpy_model_path:
+                    logger.info(f"No existe {quantized_path}; cuantizando pesos desde {numpy_model_path}")
+                    quantize_weights(numpy_model_path, quantized_path, self.precision)
+            return NumpyDenseModel.load(quantized_path, mmap=MODEL_MMAP)
+
+        # TensorFlow sólo se importa cuando realmente se usa el motor Keras
+        import tensorflow as tf
+        from app.services.compiled_inference import compile_keras_model
+
+        return compile_keras_model(tf.keras.models.load_model(str(model_path)))
+
+    def _load_artifacts(self, version: Optional[str] = None) -> LoadedArtifacts:
+        """
+        Carga una versión completa sin tocar la versión activa.
+
+        Raises:
+            FileNotFoundError: Si faltan artefactos
+        """
+        directorio, nombre = self.resolve_directory(version)
+        model_path = directorio / MODEL_NAME
+        preprocessor_path = directorio / PREPROCESSOR_NAME
+
+        if not preprocessor_path.exists() and not (
+            self.preprocessor_backend == "compiled" and (directorio / COMPILED_PREPROCESSOR_NAME).exists()
+        ):
+            raise FileNotFoundError(f"No se encontró el preprocesador en {preprocessor_path}")
+        if not model_path.exists() and not (
+            self.backend == "numpy" and (
+                (directorio / NUMPY_MODEL_NAME).exists()
+                or (directorio / quantized_model_name(NUMPY_MODEL_NAME, self.precision)).exists()
+            )
+        ):
+            raise FileNotFoundError(f"No se encontró el modelo en {model_path}")
+
+        rss_antes = _rss_bytes()
+        inicio = time.perf_counter()
+
+        preprocessor = self._load_preprocessor(directorio)
+        model = self._load_model(directorio)
+
+        load_time_seconds = time.perf_counter() - inicio
+        rss_despues = _rss_bytes()
+        memory_bytes = None
+        if rss_antes is not None and rss_despues is not None:
+            memory_bytes = max(rss_despues - rss_antes, 0)
+
+        return LoadedArtifacts(
+            model=model,
+            preprocessor=preprocessor,
+            # Sin directorio de versiones, la versión es la huella del contenido
+            version=nombre or _artifact_version(model_path, preprocessor_path),
+            directory=directorio,
+            loaded_at=time.time(),
+            load_time_seconds=load_time_seconds,
+            memory_bytes=memory_bytes,
+            precision=self.precision,
+        )
+
+    def load(self, force: bool = False, version: Optional[str] = None) -> bool:
+        """
+        Carga los artefactos si aún no están cargados.
+
+        Es seguro llamarlo desde varios hilos: sólo uno realiza la carga y
+        el resto espera y reutiliza el resultado.
+
+        Args:
+            force: Recargar aunque los artefactos ya estén en memoria
+            version: Versión a cargar; por defecto la indicada en CURRENT
+
+        Returns:
+            bool: True si los artefactos quedaron cargados, False en caso contrario
+        """
+        if self.is_loaded and not force:
+            return True
+
+        with self._lock:
+            if self.is_loaded and not force:
+                return True
+
+            try:
+                artefactos = self._load_artifacts(version)
+                self._artifacts = artefactos
+                self.error = None
+                # Un modelo recién cargado debe calentarse antes de declararse listo
+                self.is_ready = False
+
+                logger.info(
+                    "Artefactos de ML (versión %s) cargados con el motor %s (%s) en %.3f s (memoria aprox. %s bytes)",
+                    artefactos.version,
+                    self.backend,
+                    self.precision,
+                    artefactos.load_time_seconds,
+                    artefactos.memory_bytes,
+                )
+                return True
+
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"Error al cargar los artefactos de ML: {str(e)}")
+                return False
+
+    def warmup(self) -> bool:
+        """
+        Ejecuta predicciones de prueba para que las primeras peticiones reales
+        no paguen el trazado del grafo ni la inicialización de kernels.
+        El registro queda listo (`is_ready`) al terminar.
+
+        Returns:
+            bool: True si el calentamiento terminó correctamente
+        """
+        try:
+            model, _ = self.get()
+            self.warmup_seconds = _warmup_model(model)
+            self.is_ready = True
+            logger.info(f"Calentamiento del modelo completado en {self.warmup_seconds:.3f} s")
+            return True
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Error en el calentamiento del modelo: {str(e)}")
+            return False
+
+    def _begin_reload(self) -> bool:
+        """
+        Marca el registro como recargando si no lo estaba ya.
+
+        Returns:
+            bool: False si ya había una recarga en curso
+        """
+        with self._reload_lock:
+            if self.reloading:
+                return False
+            self.reloading = True
+            return True
+
+    def reload(self, version: Optional[str] = None) -> bool:
+        """
+        Carga y calienta otra versión y la activa con un intercambio atómico.
+
+        Mientras tanto se sigue sirviendo la versión anterior; las peticiones
+        en curso terminan con ella y las nuevas usan la nueva. Si la carga
+        falla, la versión anterior sigue activa.
+
+        Args:
+            version: Versión a cargar; por defecto la indicada en CURRENT
+
+        Returns:
+            bool: True si la nueva versión quedó activa; False si falló o si
+            ya había otra recarga en curso
+        """
+        if not self._begin_reload():
+            logger.warning("Ya hay una recarga del modelo en curso; se ignora la nueva")
+            return False
+        return self._reload(version)
+
+    def _reload(self, version: Optional[str]) -> bool:
+        """Recarga con `reloading` ya marcado por `_begin_reload`, y lo libera al terminar."""
+        anterior = self.version
+        try:
+            artefactos = self._load_artifacts(version)
+            warmup_seconds = _warmup_model(artefactos.model)
+
+            with self._lock:
+                self._artifacts = artefactos
+                self.warmup_seconds = warmup_seconds
+                self.is_ready = True
+                self.error = None
+                self.reload_error = None
+
+            logger.info(
+                f"Modelo actualizado de la versión {anterior} a {artefactos.version} "
+                f"(carga {artefactos.load_time_seconds:.3f} s, calentamiento {warmup_seconds:.3f} s)"
+            )
+            return True
+
+        except Exception as e:
+            self.reload_error = str(e)
+            logger.error(f"Error al recargar el modelo (se mantiene la versión {anterior}): {str(e)}")
+            return False
+        finally:
+            self.reloading = False
+
+    def reload_in_background(self, version: Optional[str] = None) -> Optional[threading.Thread]:
+        """
+        Lanza `reload` en un hilo en segundo plano.
+
+        `reloading` se marca antes de crear el hilo, de modo que dos llamadas
+        simultáneas no pueden iniciar dos recargas.
+
+        Returns:
+            Optional[threading.Thread]: Hilo de la recarga, o None si ya había
+            una en curso
+        """
+        if not self._begin_reload():
+            return None
+        hilo = threading.Thread(target=self._reload, args=(version,), name="model-reload", daemon=True)
+        hilo.start()
+        return hilo
+
+    def get_artifacts(self) -> LoadedArtifacts:
+        """
+        Devuelve la versión activa completa, cargándola si es necesario.
+
+        Raises:
+            RuntimeError: Si los artefactos no se pudieron cargar
+        """
+        if not self.load():
+            raise RuntimeError(
+                f"Los artefactos de Machine Learning no se han cargado correctamente: {self.error}"
+            )
+        return self._artifacts
+
+    def get(self) -> Tuple[Any, Any]:
+        """
+        Devuelve el modelo y el preprocesador, cargándolos si es necesario.
+
+        Ambos provienen de la misma versión aunque haya una recarga en curso.
+
+        Returns:
+            Tuple[Any, Any]: (modelo, preprocesador)
+
+        Raises:
+            RuntimeError: Si los artefactos no se pudieron cargar
+        """
+        artefactos = self.get_artifacts()
+        return artefactos.model, artefactos.preprocessor
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Resume el estado del registro para el endpoint /health.
+
+        Returns:
+            Dict[str, Any]: Estado de carga, tiempo de carga y memoria ocupada
+        """
+        return {
+            "backend": self.backend,
+            "precision": self.precision,
+            "preprocessor": type(self.preprocessor).__name__ if self.preprocessor is not None else None,
+            "loaded": self.is_loaded,
+            "ready": self.is_ready,
+            "warmup_seconds": round(self.warmup_seconds, 4) if self.warmup_seconds is not None else None,
+            "version": self.version,
+            "reloading": self.reloading,
+            "reload_error": self.reload_error,
+            "load_time_seconds": round(self.load_time_seconds, 4) if self.load_time_seconds is not None else None,
+            "memory_bytes": self.memory_bytes,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+async def watch_current_version(registry: "ModelRegistry", interval_seconds: float) -> None:
+    """
+    Vigila el archivo CURRENT y recarga el modelo cuando cambia la versión activa.
+
+    Así basta con publicar una versión y actualizar CURRENT (o llamar al
+    endpoint de administración en un worker) para que todos los workers la
+    adopten sin reiniciarse. Además del registro indicado se actualizan los
+    demás registros del proceso sin versión fijada (por motor o precisión,
+    variantes como "@int8").
+
+    Args:
+        registry: Registro principal a mantener actualizado
+        interval_seconds: Intervalo entre comprobaciones
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for registro in [registry] + [r for r in unpinned_registries() if r is not registry]:
+            try:
+                puntero = registro.current_pointer()
+            except OSError as e:
+                logger.warning(f"No se pudo leer la versión activa del modelo: {str(e)}")
+                continue
+
+            if puntero and registro.is_loaded and puntero != registro.version and not registro.reloading:
+                logger.info(f"Nueva versión activa detectada: {puntero} (motor {registro.backend}, {registro.precision})")
+                await loop.run_in_executor(None, registro.reload, puntero)
+
+# Instancia única compartida por todo el proceso
+model_registry = ModelRegistry()
+
+# Registros adicionales por motor y precisión, creados bajo demanda
+_registries_por_backend: Dict[Tuple[str, str], ModelRegistry] = {
+    (model_registry.backend, model_registry.precision): model_registry
+}
+_registries_lock = threading.Lock()
+
+# Registros sin versión fijada: siguen a CURRENT y se recargan junto con el principal
+_registries_sin_fijar: "weakref.WeakSet[ModelRegistry]" = weakref.WeakSet()
+
+
+def follow_current_version(registry: ModelRegistry) -> ModelRegistry:
+    """
+    Incluye un registro en las recargas de la versión activa (`watch_current_version`
+    y `reload_unpinned`). Los registros con versión fijada se ignoran.
+
+    Returns:
+        ModelRegistry: El mismo registro
+    """
+    if registry.pinned_version is None:
+        with _registries_lock:
+            _registries_sin_fijar.add(registry)
+    return registry
+
+
+def unpinned_registries() -> List[ModelRegistry]:
+    """Registros del proceso que siguen la versión activa, empezando por el principal."""
+    with _registries_lock:
+        otros = [r for r in _registries_sin_fijar if r is not model_registry]
+    return [model_registry] + otros
+
+
+def reload_unpinned(version: Optional[str] = None) -> Optional[List[threading.Thread]]:
+    """
+    Recarga en segundo plano todos los registros sin versión fijada.
+
+    El principal se recarga siempre; los demás, sólo si ya estaban cargados
+    (los que no, cargarán la versión activa cuando se usen) y no están ya
+    recargando.
+
+    Args:
+        version: Versión a cargar; por defecto la indicada en CURRENT
+
+    Returns:
+        Optional[List[threading.Thread]]: Hilos de las recargas iniciadas, o
+        None si el principal ya estaba recargando (entonces no se inicia ninguna)
+    """
+    principal = model_registry.reload_in_background(version)
+    if principal is None:
+        return None
+
+    hilos = [principal]
+    for registro in unpinned_registries():
+        if registro is not model_registry and registro.is_loaded:
+            hilo = registro.reload_in_background(version)
+            if hilo is not None:
+                hilos.append(hilo)
+    return hilos
+
+
+follow_current_version(model_registry)
+
+
+def get_model_registry() -> ModelRegistry:
+    """Dependencia de FastAPI que devuelve el registro de modelos del proceso."""
+    return model_registry
+
+
+def get_registry_for_backend(backend: str, precision: Optional[str] = None) -> ModelRegistry:
+    """
+    Devuelve el registro del proceso para un motor de inferencia concreto.
+
+    Args:
+        backend: "keras" o "numpy"
+        precision: Precisión de los pesos ("float32", "float16" o "int8"); por
+            defecto la del registro principal si usa el mismo motor, o float32
+
+    Returns:
+        ModelRegistry: Registro compartido para ese motor y precisión
+    """
+    if precision is None:
+        precision = model_registry.precision if backend == model_registry.backend else "float32"
+    with _registries_lock:
+        clave = (backend, precision)
+        if clave not in _registries_por_backend:
+            _registries_por_backend[clave] = ModelRegistry(
+                model_registry.models_dir,
+                backend=backend,
+                preprocessor_backend=model_registry.preprocessor_backend,
+                precision=precision
+            )
+            _registries_sin_fijar.add(_registries_por_backend[clave])
+        return _registries_por_backend[clave]
@@ -0,0 +1,348 @@
+import os
+import json
+import struct
+import logging
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Capas que no hacen nada en inferencia y se pueden omitir
+_CAPAS_IGNORADAS = {"InputLayer", "Dropout"}
+
+# Precisiones en las que se pueden guardar los pesos. Los sesgos y el cálculo
+# siguen en float32; sólo cambia cómo se almacenan las matrices de pesos.
+PRECISIONS = ("float32", "float16", "int8")
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # Forma numéricamente estable para valores negativos grandes
+    salida = np.empty_like(x)
+    positivos = x >= 0
+    salida[positivos] = 1.0 / (1.0 + np.exp(-x[positivos]))
+    exp_x = np.exp(x[~positivos])
+    salida[~positivos] = exp_x / (1.0 + exp_x)
+    return salida
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    exp_x = np.exp(x - x.max(axis=1, keepdims=True))
+    return exp_x / exp_x.sum(axis=1, keepdims=True)
+
+
+ACTIVACIONES = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "softmax": _softmax,
+}
+
+
+def _nombre_en_h5(class_name: str, contador: Dict[str, int]) -> str:
+    """
+    Reproduce el nombre con el que Keras 3 guarda cada capa en model.weights.h5
+    (clase en snake_case con sufijo incremental: dense, dense_1, ...).
+    """
+    base = "".join(f"_{c.lower()}" if c.isupper() else c for c in class_name).lstrip("_")
+    indice = contador.get(base, 0)
+    contador[base] = indice + 1
+    return base if indice == 0 else f"{base}_{indice}"
+
+
+def export_keras_weights(keras_path: Union[str, Path], npz_path: Union[str, Path]) -> Path:
+    """
+    Extrae los pesos de las capas densas de un artefacto .keras a un .npz.
+
+    Lee directamente config.json y model.weights.h5 del archivo .keras, por
+    lo que no necesita TensorFlow (sólo h5py).
+
+    Args:
+        keras_path: Ruta al modelo .keras (Keras 3)
+        npz_path: Ruta de salida del archivo .npz
+
+    Returns:
+        Path: Ruta del archivo generado
+
+    Raises:
+        ValueError: Si el modelo contiene capas no soportadas
+    """
+    import h5py
+
+    keras_path = Path(keras_path)
+    npz_path = Path(npz_path)
+
+    with zipfile.ZipFile(keras_path) as archivo:
+        config = json.loads(archivo.read("config.json"))
+        with archivo.open("model.weights.h5") as pesos_h5:
+            with h5py.File(pesos_h5, "r") as h5:
+                arrays: Dict[str, np.ndarray] = {}
+                activaciones: List[str] = []
+                contador: Dict[str, int] = {}
+
+                for capa in config["config"]["layers"]:
+                    clase = capa["class_name"]
+                    nombre_h5 = _nombre_en_h5(clase, contador) if clase != "InputLayer" else None
+
+                    if clase in _CAPAS_IGNORADAS:
+                        continue
+                    if clase != "Dense":
+                        raise ValueError(f"Capa no soportada por el motor NumPy: {clase}")
+
+                    activacion = capa["config"].get("activation", "linear")
+                    if activacion not in ACTIVACIONES:
+                        raise ValueError(f"Activación no soportada por el motor NumPy: {activacion}")
+
+                    variables = h5[f"layers/{nombre_h5}/vars"]
+                    indice = len(activaciones)
+                    arrays[f"W{indice}"] = np.asarray(variables["0"], dtype=np.float32)
+                    if capa["config"].get("use_bias", True):
+                        arrays[f"b{indice}"] = np.asarray(variables["1"], dtype=np.float32)
+                    else:
+                        arrays[f"b{indice}"] = np.zeros(arrays[f"W{indice}"].shape[1], dtype=np.float32)
+                    activaciones.append(activacion)
+
+    if not activaciones:
+        raise ValueError(f"No se encontraron capas densas en {keras_path}")
+
+    npz_path.parent.mkdir(parents=True, exist_ok=True)
+    # Sin compresión: el archivo es pequeño y así se puede mapear en memoria.
+    # Se escribe aparte y se renombra para no truncar un archivo que otro
+    # proceso tenga mapeado.
+    temporal = npz_path.with_name(f".{npz_path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(temporal, activations=np.array(activaciones), **arrays)
+    os.replace(temporal, npz_path)
+    logger.info(f"Pesos exportados de {keras_path} a {npz_path} ({len(activaciones)} capas)")
+    return npz_path
+
+
+def quantized_model_name(nombre: str, precision: str) -> str:
+    """
+    Nombre del archivo de pesos para una precisión.
+
+    Args:
+        nombre: Nombre del .npz en float32 (por ejemplo, model_final_pred.npz)
+        precision: "float32", "float16" o "int8"
+
+    Returns:
+        str: El mismo nombre en float32; si no, model_final_pred.<precisión>.npz
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisión no soportada: {precision} (use {', '.join(PRECISIONS)})")
+    if precision == "float32":
+        return nombre
+    return f"{Path(nombre).stem}.{precision}.npz"
+
+
+def quantize_weights(npz_path: Union[str, Path], output_path: Union[str, Path], precision: str) -> Path:
+    """
+    Genera una variante de precisión reducida de un .npz exportado con `export_keras_weights`.
+
+    - float16: las matrices de pesos se guardan en float16.
+    - int8: cuantización simétrica por neurona de salida; cada columna de
+      pesos se guarda en int8 con una escala float32 (`s<i>`) tal que
+      W ~ W_int8 * escala.
+
+    Args:
+        npz_path: Pesos originales en float32
+        output_path: Ruta del archivo a generar
+        precision: "float16" o "int8" ("float32" copia los pesos sin cambios)
+
+    Returns:
+        Path: Ruta del archivo generado
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisión no soportada: {precision} (use {', '.join(PRECISIONS)})")
+
+    output_path = Path(output_path)
+    modelo = NumpyDenseModel.load(npz_path)
+    arrays: Dict[str, np.ndarray] = {}
+    for i, (pesos, sesgo, _) in enumerate(modelo.dequantized_layers()):
+        arrays[f"b{i}"] = sesgo
+        if precision == "int8":
+            escala = np.abs(pesos).max(axis=0) / 127.0
+            escala[escala == 0] = 1.0
+            arrays[f"W{i}"] = np.clip(np.rint(pesos / escala), -127, 127).astype(np.int8)
+            arrays[f"s{i}"] = escala.astype(np.float32)
+        else:
+            arrays[f"W{i}"] = pesos.astype(precision)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Igual que en la exportación: sin compresión y con reemplazo atómico
+    temporal = output_path.with_name(f".{output_path.stem}.{os.getpid()}.tmp.npz")
+    activaciones = np.array([activacion for _, _, activacion in modelo.layers])
+    np.savez(temporal, activations=activaciones, precision=np.array(precision), **arrays)
+    os.replace(temporal, output_path)
+    logger.info(f"Pesos de {npz_path} guardados en {precision} en {output_path}")
+    return output_path
+
+
+def _mmap_npz(npz_path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """
+    Mapea en memoria (sólo lectura) los arreglos numéricos de un .npz sin compresión.
+
+    Cada miembro .npy de un zip sin compresión está almacenado tal cual
+    dentro del archivo, así que basta con ubicar su desplazamiento. Las
+    páginas mapeadas pertenecen a la caché de páginas del sistema y se
+    comparten entre todos los procesos que abren el mismo archivo.
+
+    Args:
+        npz_path: Ruta al archivo .npz
+
+    Returns:
+        Dict[str, np.ndarray]: Arreglos por nombre; los no mapeables (comprimidos
+            o de texto) se leen a memoria normalmente
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(npz_path) as archivo, open(npz_path, "rb") as crudo:
+        for info in archivo.infolist():
+            nombre = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type == zipfile.ZIP_STORED:
+                # Cabecera local del zip: 30 bytes fijos + nombre + campo extra
+                crudo.seek(info.header_offset)
+                cabecera = crudo.read(30)
+                largo_nombre, largo_extra = struct.unpack("<HH", cabecera[26:30])
+                crudo.seek(info.header_offset + 30 + largo_nombre + largo_extra)
+                if np.lib.format.read_magic(crudo) == (1, 0):
+                    forma, fortran, dtype = np.lib.format.read_array_header_1_0(crudo)
+                else:
+                    forma, fortran, dtype = np.lib.format.read_array_header_2_0(crudo)
+                if dtype.kind in "biuf" and not fortran:
+                    arrays[nombre] = np.memmap(npz_path, dtype=dtype, mode="r", offset=crudo.tell(), shape=forma)
+                    continue
+            with archivo.open(info) as miembro:
+                arrays[nombre] = np.lib.format.read_array(miembro, allow_pickle=False)
+    return arrays
+
+
+class NumpyDenseModel:
+    """
+    Red feed-forward densa evaluada sólo con NumPy.
+
+    Expone `predict` con la misma firma básica que un modelo Keras para
+    poder sustituirlo en el registro de modelos.
+
+    Los pesos pueden estar almacenados en float16 o int8 (ver
+    `quantize_weights`); se convierten a float32 capa por capa al evaluar.
+    """
+    def __init__(
+        self,
+        layers: List[Tuple[np.ndarray, np.ndarray, str]],
+        scales: Optional[List[Optional[np.ndarray]]] = None
+    ):
+        """
+        Inicializa el modelo.
+
+        Args:
+            layers: Lista de (pesos, sesgo, activación) en orden de evaluación
+            scales: Escala por columna de cada capa con pesos int8 (None en las demás)
+        """
+        self.layers = layers
+        self.scales = scales or [None] * len(layers)
+        self.input_dim = layers[0][0].shape[0]
+        self.output_dim = layers[-1][0].shape[1]
+
+    @property
+    def precision(self) -> str:
+        """Tipo con el que están almacenados los pesos ("float32", "float16" o "int8")."""
+        return str(self.layers[0][0].dtype)
+
+    def dequantized_layers(self) -> List[Tuple[np.ndarray, np.ndarray, str]]:
+        """
+        Capas con los pesos en float32 (los originales o su aproximación).
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray, str]]: (pesos, sesgo, activación) por capa
+        """
+        return [
+            (
+                np.asarray(pesos, dtype=np.float32) * escala if escala is not None
+                else np.asarray(pesos, dtype=np.float32),
+                np.asarray(sesgo, dtype=np.float32),
+                activacion,
+            )
+            for (pesos, sesgo, activacion), escala in zip(self.layers, self.scales)
+        ]
+
+    @classmethod
+    def load(cls, npz_path: Union[str, Path], mmap: bool = False) -> "NumpyDenseModel":
+        """
+        Carga un modelo exportado con `export_keras_weights`.
+
+        Args:
+            npz_path: Ruta al archivo .npz
+            mmap: Mapear los pesos en memoria en lugar de copiarlos, para que
+                todos los workers compartan las mismas páginas físicas
+
+        Returns:
+            NumpyDenseModel: Modelo listo para inferencia
+        """
+        if mmap:
+            datos = _mmap_npz(npz_path)
+            activaciones = [str(a) for a in datos["activations"]]
+            layers = [(datos[f"W{i}"], datos[f"b{i}"], activacion) for i, activacion in enumerate(activaciones)]
+            scales = [datos.get(f"s{i}") for i in range(len(activaciones))]
+            return cls(layers, scales)
+
+        with np.load(npz_path, allow_pickle=False) as datos:
+            activaciones = [str(a) for a in datos["activations"]]
+            layers = [
+                (
+                    # Los pesos conservan el tipo con el que se guardaron
+                    np.ascontiguousarray(datos[f"W{i}"]),
+                    np.ascontiguousarray(datos[f"b{i}"], dtype=np.float32),
+                    activacion,
+                )
+                for i, activacion in enumerate(activaciones)
+            ]
+            scales = [
+                np.ascontiguousarray(datos[f"s{i}"], dtype=np.float32) if f"s{i}" in datos.files else None
+                for i in range(len(activaciones))
+            ]
+        return cls(layers, scales)
+
+    def predict(self, x: np.ndarray, verbose: int = 0, **kwargs) -> np.ndarray:
+        """
+        Ejecuta la pasada hacia adelante.
+
+        Args:
+            x: Matriz (n_filas, input_dim)
+            verbose: Ignorado; se acepta por compatibilidad con Keras
+
+        Returns:
+            np.ndarray: Salidas del modelo con forma (n_filas, output_dim)
+        """
+        salida = np.asarray(x, dtype=np.float32)
+        if salida.ndim == 1:
+            salida = salida.reshape(1, -1)
+        if salida.shape[1] != self.input_dim:
+            raise ValueError(
+                f"Se esperaban {self.input_dim} características, se recibieron {salida.shape[1]}"
+            )
+
+        for (pesos, sesgo, activacion), escala in zip(self.layers, self.scales):
+            # float32 @ float16/int8 se calcula en float32
+            salida = salida @ pesos
+            if escala is not None:
+                salida *= escala
+            salida += sesgo
+            salida = ACTIVACIONES[activacion](salida)
+        return salida
+
+    __call__ = predict
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los pesos, en bytes."""
+        return sum(pesos.nbytes + sesgo.nbytes for pesos, sesgo, _ in self.layers) + sum(
+            escala.nbytes for escala in self.scales if escala is not None
+        )
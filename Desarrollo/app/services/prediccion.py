@@ -1,9 +1,7 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from types import SimpleNamespace
 import numpy as np
 from datetime import datetime
-import tensorflow as tf
-import joblib
-import os
 from ..models import (
     Student,
     StressPrediction,
@@ -11,41 +9,47 @@ from ..models import (
     PredictionResponse,
     StudentPersonalInfo,
     AcademicHistory,
-    Institution
+    StudentFeatures
 )
 from ..database import get_db
+from .model_registry import ModelRegistry, model_registry
+from .batching import MicroBatcher, prediction_batcher
+from .prediction_cache import PredictionCache, make_key, prediction_cache
+from .institution_config import InstitutionConfig
+from .institution_service import InstitutionService
+from .feature_store import StudentFeatureStore
+from .factor_rules import CompiledRuleSet
+from .prediction import predict_columns
+from .student_features import promedio_medio, records_to_columns
+from ..core.executors import db_executor, inference_executor
 from sqlalchemy.orm import Session
 
 class PrediccionService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        registry: Optional[ModelRegistry] = None,
+        batcher: Optional[MicroBatcher] = None,
+        cache: Optional[PredictionCache] = None
+    ):
         self.db = db
-        self.model = None
-        self.preprocessor = None
-        self._load_model()
+        # Los artefactos viven en el registro del proceso; construir el
+        # servicio ya no implica cargar el modelo.
+        self.registry = registry or model_registry
+        # Las predicciones individuales se agrupan con las de otros requests
+        self.batcher = batcher or prediction_batcher
+        # Predicciones recientes, para no recalcular ni duplicar filas con entradas idénticas
+        self.cache = cache or prediction_cache
+        self.instituciones = InstitutionService(db)
+        self.features = StudentFeatureStore(db)
 
-    def _load_model(self):
-        """
-        Carga el modelo Keras y el preprocesador desde los archivos guardados.
-        """
-        try:
-            model_path = os.path.join("artifacts", "model_final_pred.keras")
-            preprocessor_path = os.path.join("artifacts", "preprocessor_final.joblib")
-            
-            if os.path.exists(model_path) and os.path.exists(preprocessor_path):
-                self.model = tf.keras.models.load_model(model_path)
-                self.preprocessor = joblib.load(preprocessor_path)
-            else:
-                raise FileNotFoundError("No se encontraron los archivos del modelo o preprocesador")
-        except Exception as e:
-            print(f"Error al cargar el modelo: {str(e)}")
-            raise
+    @property
+    def model(self):
+        return self.registry.get()[0]
 
-    def _obtener_configuracion_institucion(self, institucion_id: int) -> dict:
-        """Obtiene la configuración específica de la institución."""
-        institucion = self.db.query(Institution).filter(Institution.id == institucion_id).first()
-        if not institucion or not institucion.configuracion:
-            return {}
-        return institucion.configuracion
+    @property
+    def preprocessor(self):
+        return self.registry.get()[1]
 
     async def predecir_estres(
         self,
@@ -59,14 +63,44 @@ class PrediccionService:
         Realiza la predicción de estrés académico para un estudiante usando el modelo Keras.
         """
         try:
+            # Configuración vigente de la institución: se lee una sola vez, fuera del
+            # event loop (puede consultar la base de datos), y su versión entra en la
+            # clave de la caché junto con los factores que se evalúan con ella
+            vigente = await db_executor.run(self.instituciones.obtener_configuracion_vigente, institucion_id)
+
             # Preparar los datos para el modelo
-            features = self._preparar_features(datos_academicos, datos_personales, historial_academico, institucion_id)
+            features = self._preparar_features(
+                datos_academicos, datos_personales, historial_academico, vigente.configuracion
+            )
             
+            # Tomar una única versión del registro: si hay una recarga en curso,
+            # esta petición termina con la versión con la que empezó
+            artefactos = self.registry.get_artifacts()
+
+            # Reutilizar la última predicción si las entradas no cambiaron (incluido
+            # el historial, que decide los factores de riesgo sin ser una característica)
+            materias_reprobadas = self._contar_reprobadas(historial_academico)
+            clave = make_key(
+                estudiante_id,
+                features,
+                str(vigente.version),
+                artefactos.version,
+                materias_reprobadas
+            )
+            cacheada = self.cache.get(clave)
+            if cacheada is not None:
+                prediccion_obj = await db_executor.run(self.db.get, StressPrediction, cacheada["prediccion_id"])
+                if prediccion_obj is not None:
+                    return PredictionResponse(
+                        prediccion=prediccion_obj,
+                        probabilidades=cacheada["probabilidades"]
+                    )
+
             # Preprocesar los datos
-            features_procesadas = self.preprocessor.transform(features)
+            features_procesadas = await inference_executor.run(artefactos.preprocessor.transform, features)
             
-            # Realizar la predicción
-            prediccion = self.model.predict(features_procesadas)
+            # Realizar la predicción dentro de un lote compartido con otros requests
+            prediccion = await self.batcher.submit(features_procesadas, predict_fn=artefactos.model.predict)
             
             # Calcular probabilidades
             probabilidad_estres = float(prediccion[0][0])
@@ -76,8 +110,8 @@ class PrediccionService:
             factores_riesgo = self._analizar_factores_riesgo(
                 datos_academicos,
                 datos_personales,
-                historial_academico,
-                institucion_id
+                materias_reprobadas,
+                vigente
             )
             
             # Crear objeto de predicción
@@ -86,12 +120,24 @@ class PrediccionService:
                 fecha_prediccion=datetime.now(),
                 nivel_estres=probabilidad_estres,
                 probabilidad_abandono=probabilidad_abandono,
-                factores_riesgo=factores_riesgo
+                factores_riesgo=factores_riesgo,
+                version_modelo=artefactos.version
             )
             
             # Guardar la predicción en la base de datos
-            self.db.add(prediccion_obj)
-            self.db.commit()
+            prediccion_id = await db_executor.run(
+                self._guardar_prediccion, prediccion_obj, datos_academicos, datos_personales
+            )
+
+            self.cache.set(
+                clave,
+                {
+                    "prediccion_id": prediccion_id,
+                    "probabilidades": [probabilidad_estres, probabilidad_abandono]
+                },
+                estudiante_id=estudiante_id,
+                institucion_id=institucion_id
+            )
             
             return PredictionResponse(
                 prediccion=prediccion_obj,
@@ -102,18 +148,144 @@ class PrediccionService:
             print(f"Error en la predicción: {str(e)}")
             raise
 
+    def predecir_desde_features(
+        self,
+        estudiante: Student,
+        features: StudentFeatures
+    ) -> StressPrediction:
+        """
+        Predice el estrés de un estudiante a partir de su fila de student_features.
+
+        No reconstruye características ni consulta el historial: la entrada del
+        modelo y los agregados ya están materializados. La predicción se devuelve
+        sin guardar, para confirmarla en la transacción del llamador.
+
+        Args:
+            estudiante: Estudiante
+            features: Fila de características del estudiante
+
+        Returns:
+            StressPrediction: Predicción sin confirmar
+        """
+        return self.predecir_lote_desde_features([(estudiante, features)])[0]
+
+    def predecir_lote_desde_features(
+        self,
+        pares: List[Tuple[Student, StudentFeatures]]
+    ) -> List[StressPrediction]:
+        """
+        Predice el estrés de varios estudiantes con una sola inferencia.
+
+        Args:
+            pares: (estudiante, fila de student_features) por estudiante
+
+        Returns:
+            List[StressPrediction]: Predicciones sin confirmar, en el mismo orden
+        """
+        if not pares:
+            return []
+
+        artefactos = self.registry.get_artifacts()
+        probabilidades = predict_columns(
+            artefactos.model,
+            artefactos.preprocessor,
+            records_to_columns([features.entrada for _, features in pares])
+        )
+        factores = self._analizar_factores_agregados(pares)
+        ahora = datetime.now()
+        return [
+            StressPrediction(
+                estudiante_id=estudiante.id,
+                fecha_prediccion=ahora,
+                nivel_estres=float(probabilidad),
+                # El modelo sólo estima el estrés; se conserva el riesgo de deserción vigente
+                probabilidad_abandono=estudiante.riesgo_desercion or 0.0,
+                factores_riesgo=factores_estudiante,
+                version_modelo=artefactos.version
+            )
+            for (estudiante, _), probabilidad, factores_estudiante in zip(pares, probabilidades, factores)
+        ]
+
+    def _analizar_factores_agregados(self, pares: List[Tuple[Student, StudentFeatures]]) -> List[List[str]]:
+        """
+        Factores de riesgo de un lote a partir de los agregados de cada
+        estudiante, con los umbrales y reglas de su institución.
+
+        Evalúa los mismos factores que `_analizar_factores_riesgo`: los datos
+        académicos y personales son los últimos reportados al predecir (guardados
+        en student_features), con los agregados del historial al día. Las reglas
+        de cada institución se evalúan una sola vez sobre las columnas de todos
+        sus estudiantes del lote.
+
+        Returns:
+            List[List[str]]: Factores de cada estudiante, en el orden de `pares`
+        """
+        por_institucion: Dict[int, List[int]] = {}
+        for posicion, (estudiante, _) in enumerate(pares):
+            por_institucion.setdefault(estudiante.institucion_id, []).append(posicion)
+
+        factores: List[List[str]] = [[] for _ in pares]
+        for institucion_id, posiciones in por_institucion.items():
+            vigente = self.instituciones.obtener_configuracion_vigente(institucion_id)
+            datos_academicos = []
+            datos_personales = []
+            for posicion in posiciones:
+                features = pares[posicion][1]
+                academicos = {
+                    **(features.datos_academicos or {}),
+                    "promedio_actual": promedio_medio(features),
+                    "materias_reprobadas": features.materias_reprobadas or 0,
+                    "materias_retiradas": features.materias_retiradas or 0,
+                }
+                personales = SimpleNamespace(**(features.datos_personales or {}))
+                factores[posicion] = self._factores_basicos(
+                    vigente.configuracion,
+                    academicos,
+                    academicos["materias_reprobadas"],
+                    getattr(personales, "situacion_familiar", None)
+                )
+                datos_academicos.append(academicos)
+                datos_personales.append(personales)
+
+            if len(vigente.reglas):
+                adicionales = self._evaluar_factores_adicionales(vigente.reglas, datos_academicos, datos_personales)
+                for posicion, factores_regla in zip(posiciones, adicionales):
+                    factores[posicion].extend(factores_regla)
+
+        return factores
+
+    def _guardar_prediccion(
+        self,
+        prediccion_obj: StressPrediction,
+        datos_academicos: Optional[dict] = None,
+        datos_personales: Optional[StudentPersonalInfo] = None
+    ) -> int:
+        """
+        Guarda la predicción y devuelve su ID (bloqueante; se ejecuta en el pool de base de datos).
+
+        Los datos recibidos se guardan en student_features en la misma
+        transacción, para que la re-predicción desde los agregados evalúe los
+        mismos factores de riesgo.
+        """
+        estudiante = self.db.get(Student, prediccion_obj.estudiante_id)
+        if estudiante is not None:
+            self.features.registrar_datos_reportados(estudiante, datos_academicos, datos_personales)
+        self.db.add(prediccion_obj)
+        self.db.commit()
+        self.db.refresh(prediccion_obj)
+        return prediccion_obj.id
+
     def _preparar_features(
         self,
         datos_academicos: dict,
         datos_personales: StudentPersonalInfo,
         historial_academico: List[AcademicHistory],
-        institucion_id: int
+        config: dict
     ) -> np.ndarray:
         """
         Prepara las características para el modelo a partir de los datos del estudiante.
         Las características deben coincidir exactamente con las usadas en el entrenamiento.
         """
-        config = self._obtener_configuracion_institucion(institucion_id)
         features = []
         
         # Características académicas
@@ -140,7 +312,8 @@ class PrediccionService:
                 if i < len(features):
                     features[i] *= factor
 
-        return np.array(features)
+        # El modelo calcula en float32; evita una conversión desde float64 en cada predicción
+        return np.array(features, dtype=np.float32)
 
     async def obtener_estudiantes_con_prediccion(self) -> List[Student]:
         """
@@ -160,61 +333,87 @@ class PrediccionService:
         self,
         datos_academicos: dict,
         datos_personales: StudentPersonalInfo,
-        historial_academico: List[AcademicHistory],
-        institucion_id: int
+        materias_reprobadas: Optional[int],
+        vigente: InstitutionConfig
     ) -> List[str]:
         """
         Analiza los factores de riesgo basados en los datos del estudiante
         y las configuraciones específicas de la institución.
         """
-        config = self._obtener_configuracion_institucion(institucion_id)
+        factores = self._factores_basicos(
+            vigente.configuracion,
+            datos_academicos,
+            materias_reprobadas,
+            datos_personales.situacion_familiar
+        )
+
+        # Factores específicos de la institución (reglas compiladas con la configuración)
+        if len(vigente.reglas):
+            factores.extend(self._evaluar_factores_adicionales(vigente.reglas, [datos_academicos], [datos_personales])[0])
+
+        return factores
+
+    @staticmethod
+    def _contar_reprobadas(historial_academico: List[AcademicHistory]) -> Optional[int]:
+        """Materias reprobadas en el historial (None si no hay historial)."""
+        if not historial_academico:
+            return None
+        return sum(1 for h in historial_academico if h.promedio < 6.0)
+
+    def _factores_basicos(
+        self,
+        config: dict,
+        datos_academicos: dict,
+        materias_reprobadas: Optional[int],
+        situacion_familiar: Optional[str]
+    ) -> List[str]:
+        """
+        Factores comunes a todas las instituciones, con sus umbrales personalizados.
+
+        Args:
+            config: Configuración de la institución
+            datos_academicos: Datos académicos del estudiante
+            materias_reprobadas: Materias reprobadas en el historial (None si no hay historial)
+            situacion_familiar: Situación familiar reportada
+        """
         factores = []
-        
+
         # Umbrales personalizados de la institución
         umbral_carga = config.get("umbral_carga_academica", 18)
         umbral_reprobacion = config.get("umbral_reprobacion", 2)
-        
+
         # Análisis de carga académica
         if datos_academicos.get("creditos_actuales", 0) > umbral_carga:
             factores.append("Alta carga académica")
-            
+
         # Análisis de rendimiento histórico
-        if historial_academico:
-            materias_reprobadas = sum(1 for h in historial_academico if h.promedio < 6.0)
-            if materias_reprobadas > umbral_reprobacion:
-                factores.append("Historial de reprobación")
-                
+        if materias_reprobadas is not None and materias_reprobadas > umbral_reprobacion:
+            factores.append("Historial de reprobación")
+
         # Análisis de situación personal
-        if datos_personales.situacion_familiar == "separados":
+        if situacion_familiar == "separados":
             factores.append("Situación familiar compleja")
 
-        # Factores específicos de la institución
-        if "factores_adicionales" in config:
-            for factor in config["factores_adicionales"]:
-                if self._evaluar_factor_adicional(factor, datos_academicos, datos_personales, historial_academico):
-                    factores.append(factor["nombre"])
-
         return factores
 
-    def _evaluar_factor_adicional(
+    def _evaluar_factores_adicionales(
         self,
-        factor: dict,
-        datos_academicos: dict,
-        datos_personales: StudentPersonalInfo,
-        historial_academico: List[AcademicHistory]
-    ) -> bool:
-        """Evalúa un factor adicional definido por la institución."""
-        if factor["tipo"] == "academico":
-            valor = datos_academicos.get(factor["campo"], 0)
-        elif factor["tipo"] == "personal":
-            valor = getattr(datos_personales, factor["campo"], None)
-        else:
-            return False
-
-        if factor["operador"] == ">":
-            return valor > factor["valor"]
-        elif factor["operador"] == "<":
-            return valor < factor["valor"]
-        elif factor["operador"] == "==":
-            return valor == factor["valor"]
-        return False 
\ No newline at end of file
+        reglas: CompiledRuleSet,
+        datos_academicos: List[dict],
+        datos_personales: List[StudentPersonalInfo]
+    ) -> List[List[str]]:
+        """
+        Evalúa los factores adicionales de la institución sobre un lote de estudiantes.
+
+        Returns:
+            List[List[str]]: Factores que cumple cada estudiante, en el mismo orden
+        """
+        academicos = {
+            campo: [datos.get(campo, 0) for datos in datos_academicos]
+            for campo in reglas.campos_academicos
+        }
+        personales = {
+            campo: [getattr(datos, campo, None) for datos in datos_personales]
+            for campo in reglas.campos_personales
+        }
+        return reglas.factores(academicos, personales, len(datos_academicos)) 
\ No newline at end of file
@@ -1,15 +1,15 @@
 # Contenido inicial para app/services/prediction.py
-import joblib
-import pandas as pd
+import time
+import numpy as np
 from pathlib import Path
-from typing import List
-import tensorflow as tf
+from typing import Any, Dict, List
+from app.services.model_registry import model_registry
+from app.services.columnar import FIELD_NAMES, FIELD_SPECS
+from app.services.compiled_preprocessor import CompiledPreprocessor
+from app.utils.prometheus import observe_inference
 
-# Variables globales para almacenar los artefactos cargados (RF04)
-# Idealmente, la carga se gestiona en el lifespan de FastAPI (main.py)
-# Aquí solo definimos las variables para que estén disponibles.
-preprocessor = None
-model = None
+# Los artefactos cargados (RF04) viven en el registro compartido del proceso,
+# que se carga una sola vez en el lifespan de FastAPI (main.py).
 
 # Define la ruta base relativa al archivo actual
 BASE_DIR = Path(__file__).resolve().parent.parent.parent # Sube tres niveles: services -> app -> raíz
@@ -18,38 +18,78 @@ PREPROCESSOR_PATH = ARTIFACTS_DIR / "preprocessor_final.joblib"
 MODEL_PATH = ARTIFACTS_DIR / "model_final_pred.keras"
 
 def load_artifacts():
-    """Carga el preprocesador y el modelo desde los archivos."""
-    global preprocessor, model
-    try:
-        print(f"Cargando preprocesador desde: {PREPROCESSOR_PATH}")
-        preprocessor = joblib.load(PREPROCESSOR_PATH)
-        print("Preprocesador cargado.")
+    """Carga el preprocesador y el modelo en el registro compartido."""
+    print(f"Cargando artefactos desde: {model_registry.models_dir}")
+    if not model_registry.load():
+        print(f"Error al cargar artefactos: {model_registry.error}")
+        raise RuntimeError(f"No se pudieron cargar los artefactos de ML: {model_registry.error}")
+    print("Artefactos cargados.")
 
-        print(f"Cargando modelo desde: {MODEL_PATH}")
-        model = tf.keras.models.load_model(MODEL_PATH)
-        print("Modelo cargado.")
+def _probabilidad_positiva(model, processed_data) -> np.ndarray:
+    """
+    Devuelve la probabilidad de la clase positiva ('1' - estrés).
 
-    except FileNotFoundError as e:
-        print(f"Error: Archivo de artefacto no encontrado - {e}")
-        raise
-    except Exception as e:
-        print(f"Error inesperado al cargar artefactos: {e}")
-        raise
+    Los modelos tipo scikit-learn exponen predict_proba (columna 1); el modelo
+    Keras/NumPy tiene una única salida sigmoide.
+    """
+    if hasattr(model, "predict_proba"):
+        return np.asarray(model.predict_proba(processed_data))[:, 1]
+    return np.asarray(model.predict(processed_data, verbose=0)).reshape(len(processed_data), -1)[:, 0]
+
+def predict_columns(model, preprocessor, columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Preprocesa columnas NumPy y devuelve la probabilidad de estrés de cada fila.
+
+    Con el preprocesador compilado las columnas se transforman directamente;
+    el pipeline joblib necesita un DataFrame.
+
+    Args:
+        model: Modelo del registro
+        preprocessor: Preprocesador del registro (compilado o joblib)
+        columns: Una columna por campo de StudentDataInput
 
-def make_prediction(input_data: pd.DataFrame) -> List[float]:
+    Returns:
+        np.ndarray: Probabilidades de la clase positiva
+    """
+    inicio = time.perf_counter()
+    processed_data = preprocess_columns(preprocessor, columns)
+    preprocesado = time.perf_counter()
+    probabilidades = _probabilidad_positiva(model, processed_data)
+    observe_inference("preprocess", preprocesado - inicio)
+    observe_inference("predict", time.perf_counter() - preprocesado, len(probabilidades), "columns")
+    return probabilidades
+
+def preprocess_columns(preprocessor, columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Aplica el preprocesador del registro a columnas NumPy.
+
+    Returns:
+        np.ndarray: Matriz (n_filas, n_características) de entrada al modelo
+    """
+    if isinstance(preprocessor, CompiledPreprocessor):
+        return preprocessor.transform(columns)
+    # pandas sólo se importa si se usa el pipeline joblib
+    import pandas as pd
+    return preprocessor.transform(pd.DataFrame(columns, columns=list(FIELD_NAMES)))
+
+def make_prediction(input_data: Any) -> List[float]:
     """
     Realiza el preprocesamiento y la predicción para los datos de entrada.
     (RF05, RF06)
-    """
-    global preprocessor, model
 
-    if preprocessor is None or model is None:
+    Args:
+        input_data: DataFrame o diccionario con una columna por campo de StudentDataInput
+    """
+    if not model_registry.is_loaded:
         # Esto no debería ocurrir si el lifespan funciona correctamente,
         # pero es una salvaguarda.
         print("Error: Los artefactos de ML no están cargados.")
         # Considera reintentar la carga o lanzar un error HTTP 503 Service Unavailable
         raise RuntimeError("Los artefactos de Machine Learning no se han cargado correctamente.")
 
+    # Modelo y preprocesador de la misma versión, aunque haya una recarga en curso
+    model, preprocessor = model_registry.get()
+
     # Asegúrate de que las columnas estén en el orden correcto si es necesario
     # (depende de cómo se entrenó el preprocesador)
     # expected_cols = [...] # Obtener de alguna forma
@@ -57,15 +97,9 @@ def make_prediction(input_data: pd.DataFrame) -> List[float]:
 
     try:
         # 1. Aplicar preprocesamiento (RF05)
-        print("Aplicando preprocesamiento...")
-        processed_data = preprocessor.transform(input_data)
-        print("Preprocesamiento completado.")
-
         # 2. Generar predicción de probabilidad (RF06)
-        # Asumimos que el modelo tiene un método predict_proba
-        # y que la clase positiva ('1' - estrés) es la segunda columna (índice 1)
-        print("Generando predicciones...")
-        probabilities = model.predict_proba(processed_data)[:, 1]
+        print("Aplicando preprocesamiento y generando predicciones...")
+        probabilities = predict_columns(model, preprocessor, input_data)
         print("Predicciones generadas.")
 
         # Convertir a lista de floats estándar de Python para la respuesta JSON
@@ -75,4 +109,44 @@ def make_prediction(input_data: pd.DataFrame) -> List[float]:
         # Captura errores durante la transformación o predicción (RF08)
         print(f"Error durante el preprocesamiento o predicción: {e}")
         # Relanza la excepción para que el endpoint la capture y devuelva un 500
-        raise 
\ No newline at end of file
+        raise 
+
+def make_prediction_columnar(columns: Dict[str, np.ndarray], valid_mask: np.ndarray) -> np.ndarray:
+    """
+    Predice sobre una solicitud columnar ya validada.
+
+    Sólo se procesan las filas válidas. Con el preprocesador compilado las
+    columnas NumPy se transforman directamente, sin pandas ni objetos por fila.
+
+    Args:
+        columns: Columnas normalizadas por `validate_columns`
+        valid_mask: Máscara de filas válidas
+
+    Returns:
+        np.ndarray: Probabilidades para las filas válidas, en orden
+    """
+    model, preprocessor = model_registry.get()
+
+    if not valid_mask.any():
+        return np.empty(0, dtype=np.float64)
+
+    return predict_columns(model, preprocessor, valid_columns(columns, valid_mask))
+
+def valid_columns(columns: Dict[str, np.ndarray], valid_mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Extrae las filas válidas de una solicitud columnar con el tipo que espera el preprocesador.
+
+    Args:
+        columns: Columnas normalizadas por `validate_columns`
+        valid_mask: Máscara de filas válidas
+
+    Returns:
+        Dict[str, np.ndarray]: Una columna por campo, sólo con las filas válidas
+    """
+    entrada = {}
+    for nombre in FIELD_NAMES:
+        columna = columns[nombre][valid_mask]
+        if FIELD_SPECS[nombre].kind == "int":
+            columna = columna.astype(np.int64)
+        entrada[nombre] = columna
+    return entrada
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set
+
+import numpy as np
+
+from app.core.config import PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_TTL_SECONDS
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_key(
+    estudiante_id: int,
+    features: np.ndarray,
+    config_version: str,
+    model_version: Optional[str],
+    materias_reprobadas: Optional[int] = None
+) -> str:
+    """
+    Construye la clave de caché de una predicción.
+
+    La clave depende del contenido del vector de características preparado,
+    no de su identidad, por lo que dos llamadas con las mismas entradas
+    producen la misma clave.
+
+    Args:
+        estudiante_id: ID del estudiante
+        features: Vector de características preparado
+        config_version: Versión de la configuración de la institución (`Institution.config_version`)
+        model_version: Versión de los artefactos del modelo
+        materias_reprobadas: Materias reprobadas en el historial; no forman parte
+            de las características pero deciden el factor "Historial de reprobación"
+
+    Returns:
+        str: Clave hexadecimal
+    """
+    arr = np.ascontiguousarray(features, dtype=np.float64)
+    digest = hashlib.sha256()
+    digest.update(str(estudiante_id).encode())
+    digest.update(str(arr.shape).encode())
+    digest.update(arr.tobytes())
+    digest.update(config_version.encode())
+    digest.update(str(model_version).encode())
+    digest.update(str(materias_reprobadas).encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """Predicción almacenada en caché."""
+    value: Any
+    estudiante_id: int
+    institucion_id: Optional[int]
+    expires_at: float
+
+
+@dataclass
+class CacheStats:
+    """Contadores de uso de la caché."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class PredictionCache:
+    """
+    Caché LRU con vigencia (TTL) para predicciones de estrés.
+
+    Mantiene índices por estudiante y por institución para invalidar sus
+    entradas cuando llega un evento académico o cambia la configuración.
+    """
+    def __init__(
+        self,
+        max_entries: int = PREDICTION_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entries: Máximo de entradas antes de expulsar la menos usada
+            ttl_seconds: Vigencia de cada entrada, en segundos
+            clock: Reloj monotónico (inyectable para pruebas)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser al menos 1")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._por_estudiante: Dict[int, Set[str]] = {}
+        self._por_institucion: Dict[int, Set[str]] = {}
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> None:
+        """Elimina una entrada y sus referencias en los índices (requiere el lock)."""
+        entry = self._entries.pop(key)
+        for indice, id_ in ((self._por_estudiante, entry.estudiante_id), (self._por_institucion, entry.institucion_id)):
+            claves = indice.get(id_)
+            if claves is not None:
+                claves.discard(key)
+                if not claves:
+                    del indice[id_]
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Obtiene un valor si existe y no ha expirado.
+
+        Args:
+            key: Clave generada con `make_key`
+
+        Returns:
+            Optional[Any]: Valor almacenado o None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._remove(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, estudiante_id: int, institucion_id: Optional[int] = None) -> None:
+        """
+        Almacena un valor, expulsando las entradas menos usadas si se supera el máximo.
+
+        Args:
+            key: Clave generada con `make_key`
+            value: Valor a almacenar
+            estudiante_id: Estudiante al que pertenece la predicción
+            institucion_id: Institución del estudiante
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(value, estudiante_id, institucion_id, self._clock() + self.ttl_seconds)
+            self._por_estudiante.setdefault(estudiante_id, set()).add(key)
+            if institucion_id is not None:
+                self._por_institucion.setdefault(institucion_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def _invalidate(self, indice: Dict[int, Set[str]], id_: int) -> int:
+        with self._lock:
+            claves = list(indice.get(id_, ()))
+            for key in claves:
+                self._remove(key)
+            self._stats.invalidations += len(claves)
+            return len(claves)
+
+    def invalidate_student(self, estudiante_id: int) -> int:
+        """
+        Invalida las predicciones de un estudiante.
+
+        Returns:
+            int: Entradas eliminadas
+        """
+        return self._invalidate(self._por_estudiante, estudiante_id)
+
+    def invalidate_institution(self, institucion_id: int) -> int:
+        """
+        Invalida las predicciones de todos los estudiantes de una institución.
+
+        Returns:
+            int: Entradas eliminadas
+        """
+        eliminadas = self._invalidate(self._por_institucion, institucion_id)
+        if eliminadas:
+            logger.info(f"Caché de predicciones invalidada para la institución {institucion_id} ({eliminadas} entradas)")
+        return eliminadas
+
+    def clear(self) -> None:
+        """Vacía la caché (por ejemplo, al cambiar de modelo)."""
+        with self._lock:
+            self._stats.invalidations += len(self._entries)
+            self._entries.clear()
+            self._por_estudiante.clear()
+            self._por_institucion.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Expone el tamaño, la tasa de aciertos y los contadores de expulsión.
+
+        Returns:
+            Dict[str, Any]: Métricas de la caché
+        """
+        with self._lock:
+            consultas = self._stats.hits + self._stats.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_ratio": round(self._stats.hits / consultas, 4) if consultas else None,
+                "evictions": self._stats.evictions,
+                "expirations": self._stats.expirations,
+                "invalidations": self._stats.invalidations,
+            }
+
+
+# Caché compartida por el proceso
+prediction_cache = PredictionCache()
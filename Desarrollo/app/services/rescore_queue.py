@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import RESCORE_QUEUE_MAX_BATCH, RESCORE_QUEUE_WINDOW_MS, RESCORE_QUEUE_WORKERS
+from app.utils.metrics import BATCH_SIZE_BUCKETS, LATENCY_BUCKETS_MS, Histogram
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# El retraso de la cola incluye la ventana de agrupación, así que se mide en
+# una escala más amplia que la latencia de inferencia
+QUEUE_LAG_BUCKETS_MS = LATENCY_BUCKETS_MS + (2500, 5000, 10000, 30000, 60000)
+
+
+class RescoreQueue:
+    """
+    Cola de re-predicción de estudiantes, con combinación de trabajos repetidos.
+
+    La ingesta sólo encola el ID del estudiante y responde. Un estudiante
+    encolado varias veces dentro de la ventana se evalúa una sola vez; los
+    hilos en segundo plano toman los trabajos cuya ventana ya venció y los
+    evalúan por lotes con `score_fn`.
+    """
+    def __init__(
+        self,
+        score_fn: Callable[[List[int]], Any],
+        workers: int = RESCORE_QUEUE_WORKERS,
+        window_ms: float = RESCORE_QUEUE_WINDOW_MS,
+        max_batch: int = RESCORE_QUEUE_MAX_BATCH
+    ):
+        """
+        Inicializa la cola.
+
+        Args:
+            score_fn: Función bloqueante que re-predice una lista de IDs de estudiante
+            workers: Hilos que evalúan lotes
+            window_ms: Milisegundos que un trabajo espera a que lleguen más cambios del mismo estudiante
+            max_batch: Máximo de estudiantes por lote
+        """
+        if workers < 1:
+            raise ValueError("workers debe ser al menos 1")
+        if max_batch < 1:
+            raise ValueError("max_batch debe ser al menos 1")
+
+        self.score_fn = score_fn
+        self.workers = workers
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        # estudiante_id -> instante del primer encolado pendiente (orden de llegada)
+        self._pendientes: Dict[int, float] = {}
+        self._en_proceso = 0
+        self._condicion = threading.Condition()
+        self._detener = False
+        self._hilos: List[threading.Thread] = []
+        self._encolados = 0
+        self._combinados = 0
+        self._evaluados = 0
+        self._fallidos = 0
+        self.lag_histogram = Histogram("rescore_queue_lag_ms", QUEUE_LAG_BUCKETS_MS)
+        self.batch_size_histogram = Histogram("rescore_batch_size", BATCH_SIZE_BUCKETS)
+        self.run_time_histogram = Histogram("rescore_run_time_ms", QUEUE_LAG_BUCKETS_MS)
+
+    def start(self) -> None:
+        """Arranca los hilos de evaluación si no están corriendo."""
+        with self._condicion:
+            if any(hilo.is_alive() for hilo in self._hilos):
+                return
+            self._detener = False
+            self._hilos = [
+                threading.Thread(target=self._run, name=f"rescore-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Detiene los hilos.
+
+        Args:
+            drain: Evaluar antes los trabajos pendientes, sin esperar la ventana
+            timeout: Segundos máximos de espera por hilo
+        """
+        with self._condicion:
+            self._detener = True
+            if not drain:
+                self._pendientes.clear()
+            self._condicion.notify_all()
+        for hilo in self._hilos:
+            hilo.join(timeout=timeout)
+        self._hilos = []
+
+    def enqueue(self, estudiante_id: int) -> bool:
+        """
+        Encola la re-predicción de un estudiante.
+
+        Args:
+            estudiante_id: ID del estudiante
+
+        Returns:
+            bool: False si ya había un trabajo pendiente para el estudiante (se combinó)
+        """
+        return self.enqueue_many([estudiante_id]) == 1
+
+    def enqueue_many(self, estudiante_ids: Sequence[int]) -> int:
+        """
+        Encola la re-predicción de varios estudiantes.
+
+        Returns:
+            int: Trabajos nuevos (los demás se combinaron con uno pendiente)
+        """
+        if not self._hilos:
+            self.start()
+        ahora = time.monotonic()
+        nuevos = 0
+        with self._condicion:
+            for estudiante_id in estudiante_ids:
+                self._encolados += 1
+                if estudiante_id in self._pendientes:
+                    self._combinados += 1
+                    continue
+                self._pendientes[estudiante_id] = ahora
+                nuevos += 1
+            if nuevos:
+                self._condicion.notify()
+        return nuevos
+
+    def _tomar_lote(self) -> Optional[List[Tuple[int, float]]]:
+        """
+        Espera hasta que haya trabajos con la ventana vencida (o un lote lleno)
+        y los retira de la cola. None si la cola se detuvo y no queda trabajo.
+        """
+        ventana = self.window_ms / 1000.0
+        with self._condicion:
+            while True:
+                if self._pendientes:
+                    # Los pendientes están en orden de llegada: el primero es el más antiguo
+                    primero = next(iter(self._pendientes.values()))
+                    espera = primero + ventana - time.monotonic()
+                    if espera <= 0 or self._detener or len(self._pendientes) >= self.max_batch:
+                        break
+                elif self._detener:
+                    return None
+                else:
+                    espera = None
+                self._condicion.wait(espera)
+
+            # Con la cola llena o al detenerse no se espera a que venza la ventana
+            forzar = self._detener or len(self._pendientes) >= self.max_batch
+            limite = time.monotonic() - ventana
+            lote = []
+            for estudiante_id, encolado in self._pendientes.items():
+                if len(lote) >= self.max_batch or (not forzar and encolado > limite):
+                    break
+                lote.append((estudiante_id, encolado))
+            for estudiante_id, _ in lote:
+                del self._pendientes[estudiante_id]
+            self._en_proceso += len(lote)
+            return lote
+
+    def _run(self) -> None:
+        while True:
+            lote = self._tomar_lote()
+            if lote is None:
+                return
+
+            inicio = time.monotonic()
+            self.lag_histogram.observe_many([(inicio - encolado) * 1000.0 for _, encolado in lote])
+            self.batch_size_histogram.observe(len(lote))
+
+            evaluados = self._evaluar([estudiante_id for estudiante_id, _ in lote])
+            self.run_time_histogram.observe((time.monotonic() - inicio) * 1000.0)
+
+            with self._condicion:
+                self._en_proceso -= len(lote)
+                self._evaluados += evaluados
+                self._fallidos += len(lote) - evaluados
+                self._condicion.notify_all()
+
+    def _evaluar(self, ids: List[int]) -> int:
+        """
+        Evalúa un lote; si falla, re-evalúa a cada estudiante por separado para
+        que uno con datos inválidos no haga perder la predicción del resto.
+
+        Returns:
+            int: Estudiantes evaluados correctamente
+        """
+        try:
+            self.score_fn(ids)
+            return len(ids)
+        except Exception as e:
+            logger.error(f"Error al re-predecir {len(ids)} estudiantes: {str(e)}")
+        if len(ids) == 1:
+            return 0
+
+        evaluados = 0
+        for estudiante_id in ids:
+            try:
+                self.score_fn([estudiante_id])
+                evaluados += 1
+            except Exception as e:
+                logger.error(f"Error al re-predecir al estudiante {estudiante_id}: {str(e)}")
+        logger.info(f"Lote re-evaluado estudiante por estudiante: {evaluados} de {len(ids)} evaluados")
+        return evaluados
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que no queden trabajos pendientes ni en proceso (para pruebas y scripts).
+
+        Returns:
+            bool: True si la cola quedó vacía antes del timeout
+        """
+        with self._condicion:
+            return self._condicion.wait_for(lambda: not self._pendientes and not self._en_proceso, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Expone la profundidad y el retraso de la cola.
+
+        Returns:
+            Dict[str, Any]: Pendientes, en proceso, antigüedad del más viejo y contadores
+        """
+        with self._condicion:
+            antiguedad = None
+            if self._pendientes:
+                antiguedad = (time.monotonic() - next(iter(self._pendientes.values()))) * 1000.0
+            return {
+                "workers": self.workers,
+                "window_ms": self.window_ms,
+                "max_batch": self.max_batch,
+                "pending": len(self._pendientes),
+                "in_progress": self._en_proceso,
+                "oldest_pending_ms": round(antiguedad, 3) if antiguedad is not None else None,
+                "enqueued": self._encolados,
+                "coalesced": self._combinados,
+                "scored": self._evaluados,
+                "failed": self._fallidos,
+                "lag_ms": self.lag_histogram.snapshot(),
+                "batch_size": self.batch_size_histogram.snapshot(),
+                "run_time_ms": self.run_time_histogram.snapshot(),
+            }
+
+
+def _recalcular(estudiante_ids: List[int]) -> None:
+    """Re-predice un lote de estudiantes en una sesión propia del hilo."""
+    # Importación diferida: el servicio de datos académicos encola en esta cola
+    from app.database import SessionLocal
+    from app.services.academic_data_service import AcademicDataService
+
+    with SessionLocal() as db:
+        AcademicDataService(db).recalcular_predicciones(estudiante_ids)
+
+
+# Cola compartida por el proceso
+rescore_queue = RescoreQueue(_recalcular)
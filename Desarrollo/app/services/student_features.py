@@ -0,0 +1,192 @@
+"""
+Construcción vectorizada de las características del modelo a partir de la base de datos.
+
+El esquema actual sólo guarda parte de los campos de StudentDataInput
+(programa, semestre y el historial académico). Los campos que no existen en
+la base se dejan como faltantes y los imputa el preprocesador con los valores
+aprendidos en el entrenamiento, igual que haría con un dato ausente en la API.
+"""
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import RESCORE_HISTORY_EVENTS
+from app.services.columnar import FIELD_NAMES, FIELD_SPECS
+
+# El historial académico guarda promedios en escala 0-10 (se reprueba con < 6.0);
+# el modelo se entrenó con GPA en escala 0-4.
+ESCALA_PROMEDIO = 10.0
+ESCALA_GPA = 4.0
+NOTA_APROBATORIA = 6.0
+EVENTO_RETIRO = "RETIRO_CURSO"
+
+
+def _columnas_vacias(n: int) -> Dict[str, np.ndarray]:
+    """Crea una columna faltante por campo: NaN para numéricos y None para texto."""
+    columnas = {}
+    for nombre in FIELD_NAMES:
+        if FIELD_SPECS[nombre].kind in ("choice", "str"):
+            columnas[nombre] = np.full(n, None, dtype=object)
+        else:
+            columnas[nombre] = np.full(n, np.nan, dtype=np.float64)
+    return columnas
+
+
+def build_feature_columns(
+    student_ids: Sequence[int],
+    programas: Sequence[str],
+    semestres: Sequence[int],
+    history_student_ids: Sequence[int],
+    history_rank: Sequence[int],
+    history_promedio: Sequence[float],
+    history_evento: Sequence[str]
+) -> Dict[str, np.ndarray]:
+    """
+    Construye las columnas de entrada del preprocesador para un bloque de estudiantes.
+
+    Args:
+        student_ids: IDs de los estudiantes del bloque, ordenados de forma ascendente
+        programas: Programa de cada estudiante
+        semestres: Semestre actual de cada estudiante
+        history_student_ids: Estudiante de cada evento del historial reciente
+        history_rank: Posición del evento, 1 para el más reciente
+        history_promedio: Promedio registrado en el evento (None/NaN si no aplica)
+        history_evento: Tipo de evento
+
+    Returns:
+        Dict[str, np.ndarray]: Una columna por campo de StudentDataInput
+    """
+    ids = np.asarray(student_ids, dtype=np.int64)
+    n = len(ids)
+    columnas = _columnas_vacias(n)
+    if n == 0:
+        return columnas
+
+    semestres = np.asarray(semestres, dtype=np.float64)
+    columnas["year_of_study"] = np.ceil(semestres / 2.0)
+    columnas["program_major"] = np.asarray(programas, dtype=object)
+
+    h_ids = np.asarray(history_student_ids, dtype=np.int64)
+    if len(h_ids) == 0:
+        columnas["number_of_failed_courses_current_semester"] = np.zeros(n)
+        columnas["number_of_course_withdrawals_current_semester"] = np.zeros(n)
+        return columnas
+
+    # Posición de cada evento dentro del bloque; los eventos de estudiantes
+    # ajenos al bloque se descartan
+    posicion = np.searchsorted(ids, h_ids)
+    posicion = np.minimum(posicion, n - 1)
+    propios = ids[posicion] == h_ids
+    posicion = posicion[propios]
+    rank = np.asarray(history_rank, dtype=np.int64)[propios]
+    promedio = np.array(
+        [np.nan if p is None else p for p in history_promedio], dtype=np.float64
+    )[propios]
+    evento = np.asarray(history_evento, dtype=object)[propios]
+
+    reprobado = ~np.isnan(promedio) & (promedio < NOTA_APROBATORIA)
+    columnas["number_of_failed_courses_current_semester"] = np.bincount(
+        posicion, weights=reprobado, minlength=n
+    )
+    columnas["number_of_course_withdrawals_current_semester"] = np.bincount(
+        posicion, weights=(evento == EVENTO_RETIRO), minlength=n
+    )
+
+    gpa = np.clip(promedio * (ESCALA_GPA / ESCALA_PROMEDIO), 0.0, ESCALA_GPA)
+    for campo, posicion_evento in (("gpa_current_semester", 1), ("gpa_previous_semester", 2)):
+        seleccion = rank == posicion_evento
+        columna = np.full(n, np.nan)
+        columna[posicion[seleccion]] = gpa[seleccion]
+        columnas[campo] = columna
+
+    return columnas
+
+
+# --- Actualización incremental (tabla student_features) ---
+
+def _gpa(promedio: Optional[float]) -> Optional[float]:
+    """Convierte un promedio 0-10 a GPA 0-4 (None si no hay promedio)."""
+    if promedio is None or np.isnan(promedio):
+        return None
+    return float(min(max(promedio * (ESCALA_GPA / ESCALA_PROMEDIO), 0.0), ESCALA_GPA))
+
+
+def apply_academic_event(
+    state: Any,
+    evento: str,
+    promedio: Optional[float],
+    ventana: int = RESCORE_HISTORY_EVENTS
+) -> None:
+    """
+    Incorpora un evento académico a los agregados de un estudiante.
+
+    Usa las mismas reglas que `build_feature_columns`: el evento más reciente
+    da el GPA actual y el anterior el GPA previo; se reprueba con promedio
+    menor a 6.0 y RETIRO_CURSO cuenta como retiro. Las materias reprobadas y
+    retiradas se cuentan sobre los últimos `ventana` eventos, la misma
+    ventana que usa la re-evaluación masiva.
+
+    Args:
+        state: Fila de StudentFeatures (o cualquier objeto con sus atributos)
+        evento: Tipo de evento
+        promedio: Promedio registrado en el evento (escala 0-10), si aplica
+        ventana: Eventos recientes considerados para reprobadas y retiros
+    """
+    state.eventos = (state.eventos or 0) + 1
+    state.gpa_anterior = state.gpa_actual
+    state.gpa_actual = _gpa(promedio)
+    if promedio is not None:
+        state.suma_promedios = (state.suma_promedios or 0.0) + promedio
+        state.promedios_registrados = (state.promedios_registrados or 0) + 1
+
+    # Se asigna una lista nueva para que la columna JSON se marque como modificada
+    recientes = (list(state.eventos_recientes or []) + [[evento, promedio]])[-ventana:]
+    state.eventos_recientes = recientes
+    state.materias_reprobadas = sum(1 for _, p in recientes if p is not None and p < NOTA_APROBATORIA)
+    state.materias_retiradas = sum(1 for e, _ in recientes if e == EVENTO_RETIRO)
+
+
+def promedio_medio(state: Any) -> Optional[float]:
+    """Promedio de las calificaciones registradas (escala 0-10), o None si no hay."""
+    if not state.promedios_registrados:
+        return None
+    return state.suma_promedios / state.promedios_registrados
+
+
+def feature_record(state: Any) -> Dict[str, Any]:
+    """
+    Construye la entrada del modelo (un valor por campo de StudentDataInput)
+    a partir de los agregados de un estudiante.
+
+    Los campos sin fuente en la base quedan en None y los imputa el preprocesador.
+
+    Returns:
+        Dict[str, Any]: Registro serializable a JSON
+    """
+    registro: Dict[str, Any] = dict.fromkeys(FIELD_NAMES)
+    if state.semestre is not None:
+        registro["year_of_study"] = int(np.ceil(state.semestre / 2.0))
+    registro["program_major"] = state.programa
+    registro["gpa_current_semester"] = state.gpa_actual
+    registro["gpa_previous_semester"] = state.gpa_anterior
+    registro["number_of_failed_courses_current_semester"] = state.materias_reprobadas or 0
+    registro["number_of_course_withdrawals_current_semester"] = state.materias_retiradas or 0
+    registro["lms_activity_weekly_hours_avg_last_month"] = state.lms_horas_semanales
+    registro["support_service_use_last_month"] = state.servicios_apoyo_mes
+    return registro
+
+
+def records_to_columns(records: Sequence[Mapping[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Convierte registros de `feature_record` en columnas del preprocesador.
+
+    Los None de campos numéricos pasan a NaN, como en `build_feature_columns`.
+    """
+    columnas = _columnas_vacias(len(records))
+    for nombre in FIELD_NAMES:
+        valores = [registro.get(nombre) for registro in records]
+        if FIELD_SPECS[nombre].kind in ("choice", "str"):
+            columnas[nombre][:] = valores
+        else:
+            columnas[nombre][:] = [np.nan if v is None else v for v in valores]
+    return columnas
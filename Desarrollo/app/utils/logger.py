@@ -1,58 +1,236 @@
 import os
+import time
+import queue
+import atexit
+import random
 import logging
 import logging.handlers
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+import structlog
 
 # Configuración de directorios de logs
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
-# Configuración de formato de logs
+# Configuración de formato de logs (consola en modo texto)
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Niveles de log
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
+# Formato de la consola: "text" (legible) o "json"; los archivos siempre son JSON
+LOG_CONSOLE_FORMAT = os.getenv("LOG_CONSOLE_FORMAT", "text").lower()
+
 # Configuración de rotación de logs
 MAX_BYTES = 10 * 1024 * 1024  # 10 MB
 BACKUP_COUNT = 5
 
-def setup_logger(name: str, log_file: Optional[str] = None) -> logging.Logger:
+def parse_sample_rates(valor: str) -> Dict[str, float]:
+    """
+    Interpreta LOG_SAMPLE_RATES ("api=0.1,ml=0.05").
+
+    Args:
+        valor: Pares logger=fracción separados por comas
+
+    Returns:
+        Dict[str, float]: Fracción (entre 0 y 1) de registros INFO/DEBUG que se conservan por logger
+    """
+    tasas = {}
+    for par in filter(None, (p.strip() for p in valor.split(","))):
+        nombre, separador, tasa = par.partition("=")
+        if not separador or not nombre.strip():
+            raise ValueError(f"LOG_SAMPLE_RATES inválido: '{par}' (se esperaba logger=fracción)")
+        tasas[nombre.strip()] = min(max(float(tasa), 0.0), 1.0)
+    return tasas
+
+# Muestreo por logger; WARNING y superiores nunca se descartan
+LOG_SAMPLE_RATES = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+class SamplingFilter(logging.Filter):
+    """
+    Conserva sólo una fracción de los registros por debajo de WARNING.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+def _marca_de_tiempo(logger, metodo, event_dict):
+    """Momento en que se creó el registro, no en que se escribió."""
+    registro = event_dict.get("_record")
+    creado = registro.created if registro is not None else time.time()
+    event_dict["timestamp"] = datetime.fromtimestamp(creado, timezone.utc).isoformat()
+    return event_dict
+
+def _sin_atributos_de_formato(logger, metodo, event_dict):
+    """Quita los atributos que otro formatter (la consola) dejó en el registro."""
+    event_dict.pop("message", None)
+    event_dict.pop("asctime", None)
+    return event_dict
+
+def json_formatter() -> logging.Formatter:
+    """
+    Formatter que escribe cada registro como una línea JSON, con los campos
+    pasados en `extra` como claves propias.
+    """
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[
+            _marca_de_tiempo,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.ExtraAdder(),
+            _sin_atributos_de_formato,
+        ],
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(ensure_ascii=False),
+        ],
+    )
+
+class _ColaSinFormato(logging.handlers.QueueHandler):
+    """
+    QueueHandler que encola el registro sin formatearlo: el mensaje, sus
+    argumentos y los campos de `extra` se formatean en el hilo del listener.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class _Despachador(logging.Handler):
+    """
+    Único handler del listener: escribe en consola y en el archivo del logger
+    (o del ancestro más cercano que tenga uno).
+    """
+    def __init__(self, pipeline: "_LogPipeline"):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        self.pipeline.console.handle(record)
+        archivo = self.pipeline.archivo_de(record.name)
+        if archivo is not None:
+            archivo.handle(record)
+        return True
+
+class _LogPipeline:
+    """
+    Cola compartida por todos los loggers configurados y el hilo que la vacía.
+
+    Los loggers sólo encolan el registro; el formateo y la escritura en
+    consola y archivos ocurren en el hilo del QueueListener, fuera del event loop.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue: queue.Queue = queue.Queue(-1)
+        self.handler = _ColaSinFormato(self.queue)
+        self.console = logging.StreamHandler()
+        self.console.setFormatter(
+            json_formatter() if LOG_CONSOLE_FORMAT == "json"
+            else logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+        )
+        self.archivos: Dict[str, logging.Handler] = {}
+        self.rutas: Dict[str, logging.Handler] = {}
+        self.listener: Optional[logging.handlers.QueueListener] = None
+
+    def archivo_de(self, nombre: str) -> Optional[logging.Handler]:
+        while nombre:
+            archivo = self.rutas.get(nombre)
+            if archivo is not None:
+                return archivo
+            nombre = nombre.rpartition(".")[0]
+        return None
+
+    def asignar_archivo(self, nombre: str, log_file: str) -> None:
+        archivo = self.archivos.get(log_file)
+        if archivo is None:
+            archivo = logging.handlers.RotatingFileHandler(
+                LOG_DIR / log_file,
+                maxBytes=MAX_BYTES,
+                backupCount=BACKUP_COUNT,
+                encoding="utf-8"
+            )
+            archivo.setFormatter(json_formatter())
+            self.archivos[log_file] = archivo
+        self.rutas[nombre] = archivo
+
+    def start(self) -> None:
+        if self.listener is None:
+            self.listener = logging.handlers.QueueListener(self.queue, _Despachador(self))
+            self.listener.start()
+
+    def stop(self) -> None:
+        """Escribe lo pendiente y detiene el hilo."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        for archivo in self.archivos.values():
+            archivo.close()
+
+    def after_fork(self) -> None:
+        """
+        El hilo del listener no sobrevive al fork (gunicorn con preload_app):
+        el proceso hijo usa una cola nueva y arranca su propio hilo.
+        """
+        activo = self.listener is not None
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(-1)
+        self.handler.queue = self.queue
+        self.listener = None
+        if activo:
+            self.start()
+
+_pipeline = _LogPipeline()
+atexit.register(_pipeline.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_pipeline.after_fork)
+
+def flush_logs() -> None:
     """
-    Configura un logger con manejo de archivos y consola.
-    
+    Espera a que el listener escriba todos los registros encolados.
+    """
+    if _pipeline.listener is not None:
+        _pipeline.queue.join()
+
+def setup_logger(name: str, log_file: Optional[str] = None, sample_rate: Optional[float] = None) -> logging.Logger:
+    """
+    Configura un logger que escribe a través de la cola compartida (consola y,
+    opcionalmente, un archivo JSON con rotación).
+
+    Es idempotente: llamarla de nuevo con el mismo nombre no agrega handlers.
+
     Args:
         name: Nombre del logger
         log_file: Nombre del archivo de log (opcional)
-        
+        sample_rate: Fracción de registros INFO/DEBUG que se conservan
+            (opcional; por defecto la de LOG_SAMPLE_RATES o todos)
+
     Returns:
         logging.Logger: Logger configurado
     """
-    # Crear logger
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, LOG_LEVEL))
-    
-    # Formato para los handlers
-    formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
-    
-    # Handler para consola
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # Handler para archivo si se especifica
-    if log_file:
-        file_handler = logging.handlers.RotatingFileHandler(
-            LOG_DIR / log_file,
-            maxBytes=MAX_BYTES,
-            backupCount=BACKUP_COUNT
-        )
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
+    with _pipeline.lock:
+        if log_file and name not in _pipeline.rutas:
+            _pipeline.asignar_archivo(name, log_file)
+        if _pipeline.handler in logger.handlers:
+            return logger
+
+        logger.setLevel(getattr(logging, LOG_LEVEL))
+        logger.addHandler(_pipeline.handler)
+        # La consola ya la escribe el listener; sin esto el handler raíz la duplicaría
+        logger.propagate = False
+
+        tasa = sample_rate if sample_rate is not None else LOG_SAMPLE_RATES.get(name)
+        if tasa is not None and tasa < 1.0:
+            logger.addFilter(SamplingFilter(tasa))
+
+        _pipeline.start()
     return logger
 
 # Loggers específicos
@@ -64,35 +242,45 @@ academic_logger = setup_logger("academic", "academic.log")
 
 class RequestLogger:
     """
-    Middleware para logging de requests.
+    Middleware para logging de requests: un registro por request, al enviar
+    la respuesta, con el código de estado y la duración.
     """
     def __init__(self, app):
         self.app = app
-        
+
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             return await self.app(scope, receive, send)
-            
+
         # Obtener información de la request
         method = scope.get("method", "")
         path = scope.get("path", "")
-        client = scope.get("client", ("", 0))
-        
-        # Registrar inicio de la request
-        api_logger.info(f"Request iniciada: {method} {path} desde {client[0]}:{client[1]}")
-        
+        client = scope.get("client") or ("", 0)
+        inicio = time.perf_counter()
+
         # Función para enviar la respuesta
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
                 status_code = message.get("status", 0)
-                api_logger.info(f"Response enviada: {method} {path} - Status: {status_code}")
+                duracion_ms = (time.perf_counter() - inicio) * 1000
+                api_logger.info(
+                    "Response enviada: %s %s - Status: %s - %.1f ms",
+                    method, path, status_code, duracion_ms,
+                    extra={
+                        "method": method,
+                        "path": path,
+                        "status": status_code,
+                        "duration_ms": round(duracion_ms, 3),
+                        "client": client[0],
+                    }
+                )
             await send(message)
-            
+
         # Procesar la request
         try:
             await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            api_logger.error(f"Error en request: {method} {path} - {str(e)}")
+            api_logger.error("Error en request: %s %s - %s", method, path, e, extra={"method": method, "path": path})
             raise
 
 class DatabaseLogger:
@@ -101,56 +289,69 @@ class DatabaseLogger:
     """
     def __init__(self, session):
         self.session = session
-        
+
     def __enter__(self):
         return self.session
-        
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_type is not None:
-            db_logger.error(f"Error en operación de base de datos: {str(exc_val)}")
+            db_logger.error("Error en operación de base de datos: %s", exc_val)
             self.session.rollback()
         else:
             try:
                 self.session.commit()
                 db_logger.info("Operación de base de datos completada exitosamente")
             except Exception as e:
-                db_logger.error(f"Error al commit: {str(e)}")
+                db_logger.error("Error al commit: %s", e)
                 self.session.rollback()
 
 def log_academic_event(event_type: str, details: str, student_id: Optional[int] = None):
     """
     Registra un evento académico.
-    
+
     Args:
         event_type: Tipo de evento
         details: Detalles del evento
         student_id: ID del estudiante (opcional)
     """
-    student_info = f" - Estudiante ID: {student_id}" if student_id else ""
-    academic_logger.info(f"Evento académico: {event_type}{student_info} - {details}")
+    academic_logger.info(
+        "Evento académico: %s%s - %s",
+        event_type, f" - Estudiante ID: {student_id}" if student_id else "", details,
+        extra={"event_type": event_type, "student_id": student_id}
+    )
 
 def log_ml_prediction(student_id: int, prediction: float, features: dict):
     """
     Registra una predicción de ML.
-    
+
+    Las features viajan como campo estructurado y se serializan en el hilo
+    del listener, sólo si el registro no se descartó.
+
     Args:
         student_id: ID del estudiante
         prediction: Valor de la predicción
         features: Características utilizadas
     """
+    if not ml_logger.isEnabledFor(logging.INFO):
+        return
     ml_logger.info(
-        f"Predicción ML - Estudiante ID: {student_id} - "
-        f"Predicción: {prediction:.4f} - Features: {features}"
+        "Predicción ML - Estudiante ID: %s - Predicción: %.4f",
+        student_id, prediction,
+        # Copia superficial: el llamador puede seguir modificando su diccionario
+        extra={"student_id": student_id, "prediction": float(prediction), "features": dict(features)}
     )
 
 def log_auth_event(event_type: str, user_id: Optional[int] = None, details: str = ""):
     """
     Registra un evento de autenticación.
-    
+
     Args:
         event_type: Tipo de evento
         user_id: ID del usuario (opcional)
         details: Detalles adicionales (opcional)
     """
-    user_info = f" - Usuario ID: {user_id}" if user_id else ""
-    auth_logger.info(f"Evento de autenticación: {event_type}{user_info} - {details}") 
\ No newline at end of file
+    auth_logger.info(
+        "Evento de autenticación: %s%s - %s",
+        event_type, f" - Usuario ID: {user_id}" if user_id else "", details,
+        extra={"event_type": event_type, "user_id": user_id}
+    )
@@ -0,0 +1,91 @@
+import bisect
+import threading
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+# Buckets por defecto
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+PROBABILITY_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+class Histogram:
+    """
+    Histograma acumulativo en memoria, seguro entre hilos.
+
+    Sigue la convención de Prometheus: cada bucket cuenta las observaciones
+    menores o iguales a su límite superior.
+    """
+    def __init__(self, name: str, buckets: Sequence[float]):
+        """
+        Inicializa el histograma.
+
+        Args:
+            name: Nombre del histograma
+            buckets: Límites superiores de los buckets, en orden creciente
+        """
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._limites = np.asarray(self.buckets, dtype=np.float64)
+        self._counts = [0] * (len(self.buckets) + 1)  # el último es +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Registra una observación."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def observe_many(self, values: Sequence[float]) -> None:
+        """
+        Registra varias observaciones tomando el lock una sola vez.
+
+        Equivale a llamar a `observe` con cada valor, pero ubica todo el
+        arreglo en los buckets con una sola operación vectorizada.
+
+        Args:
+            values: Observaciones (lista o arreglo NumPy)
+        """
+        valores = np.asarray(values, dtype=np.float64).ravel()
+        if not len(valores):
+            return
+        conteos = np.bincount(
+            np.searchsorted(self._limites, valores, side="left"),
+            minlength=len(self._counts)
+        ).tolist()
+        suma = float(valores.sum())
+        with self._lock:
+            self._counts = [actual + nuevo for actual, nuevo in zip(self._counts, conteos)]
+            self._sum += suma
+            self._count += len(valores)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Devuelve una copia del estado del histograma.
+
+        Returns:
+            Dict[str, Any]: Conteos acumulados por bucket, total y suma
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            suma = self._sum
+
+        acumulado = 0
+        buckets = {}
+        for limite, conteo in zip(self.buckets, counts):
+            acumulado += conteo
+            buckets[str(limite)] = acumulado
+        buckets["+Inf"] = total
+
+        return {
+            "buckets": buckets,
+            "count": total,
+            "sum": round(suma, 6),
+            "mean": round(suma / total, 6) if total else None,
+        }
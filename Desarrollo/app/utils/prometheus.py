@@ -0,0 +1,321 @@
+"""
+Métricas en formato Prometheus para /metrics.
+
+Define las métricas del proceso (HTTP, inferencia, base de datos, LLM y colas)
+y los puntos de instrumentación: un middleware ASGI, eventos de SQLAlchemy y
+un pool de conexiones que mide la espera al pedir una conexión.
+
+Las etiquetas tienen cardinalidad acotada: las rutas se etiquetan con su
+plantilla (/students/{student_id}), nunca con la ruta recibida, y las
+consultas SQL por su tipo de sentencia.
+
+Con varios workers de gunicorn, si PROMETHEUS_MULTIPROC_DIR está definido,
+/metrics agrega las métricas de todos los procesos (modo multiproceso de
+prometheus_client); las colas se informan por el worker que atiende el scrape.
+"""
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.routing import Match
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Etiqueta de las peticiones que no corresponden a ninguna ruta (404)
+RUTA_DESCONOCIDA = "<unmatched>"
+# Tipos de sentencia SQL que se distinguen; el resto cuenta como OTHER
+SENTENCIAS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY"})
+
+ROW_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 10000)
+
+# --- HTTP ---
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP", ["method", "route"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso", ["method", "route"], multiprocess_mode="livesum"
+)
+
+# --- Modelo ---
+
+MODEL_INFERENCE_SECONDS = Histogram(
+    "model_inference_seconds",
+    "Tiempo de inferencia por lote, separado en preprocesamiento y modelo",
+    ["stage"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+MODEL_BATCH_ROWS = Histogram(
+    "model_batch_rows", "Filas por lote de inferencia", ["path"], buckets=ROW_BUCKETS
+)
+
+# --- Base de datos ---
+
+DB_QUERIES = Counter("db_queries_total", "Consultas SQL ejecutadas", ["statement"])
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "Consultas SQL que fallaron", ["statement"])
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Duración de las consultas SQL",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0),
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Espera para obtener una conexión del pool (incluye abrir una nueva)",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+# --- LLM (Gemini) ---
+
+LLM_REQUESTS = Counter("llm_requests_total", "Llamadas al LLM", ["operation", "outcome"])
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds",
+    "Latencia de las llamadas al LLM",
+    ["operation"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+
+
+def observe_inference(stage: str, segundos: float, filas: Optional[int] = None, path: Optional[str] = None) -> None:
+    """
+    Registra un lote de inferencia.
+
+    Args:
+        stage: "preprocess" o "predict"
+        segundos: Duración de la etapa
+        filas: Filas del lote (se registran una vez por lote, con `path`)
+        path: Camino que originó el lote ("columns" o "micro_batch")
+    """
+    MODEL_INFERENCE_SECONDS.labels(stage).observe(segundos)
+    if filas is not None and path is not None:
+        MODEL_BATCH_ROWS.labels(path).observe(filas)
+
+
+class LLMTimer:
+    """
+    Mide una llamada al LLM y registra su resultado (ok o error).
+
+        with LLMTimer("chat"):
+            respuesta = await modelo.generate_content_async(prompt)
+    """
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._inicio = 0.0
+
+    def __enter__(self) -> "LLMTimer":
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        LLM_LATENCY.labels(self.operation).observe(time.perf_counter() - self._inicio)
+        LLM_REQUESTS.labels(self.operation, "error" if exc_type is not None else "ok").inc()
+        return False
+
+
+# --- HTTP: middleware ---
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Plantilla de la ruta que atenderá la petición, o RUTA_DESCONOCIDA.
+
+    Se resuelve contra las rutas de la aplicación antes de procesar la
+    petición, para poder contar las peticiones en curso por ruta.
+    """
+    app = scope.get("app")
+    rutas = getattr(getattr(app, "router", None), "routes", None) or []
+    parcial = None
+    for ruta in rutas:
+        coincidencia, _ = ruta.matches(scope)
+        if coincidencia == Match.FULL:
+            return getattr(ruta, "path", RUTA_DESCONOCIDA)
+        if coincidencia == Match.PARTIAL and parcial is None:
+            # Misma ruta con otro método (405)
+            parcial = getattr(ruta, "path", None)
+    return parcial or RUTA_DESCONOCIDA
+
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI que mide latencia, peticiones en curso y códigos de estado por ruta.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope.get("method", "")
+        ruta = route_template(scope)
+        estado = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                estado["status"] = message.get("status", 500)
+            await send(message)
+
+        en_curso = HTTP_IN_FLIGHT.labels(method, ruta)
+        en_curso.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_LATENCY.labels(method, ruta).observe(time.perf_counter() - inicio)
+            HTTP_REQUESTS.labels(method, ruta, str(estado["status"])).inc()
+            en_curso.dec()
+
+
+# --- Base de datos ---
+
+def statement_type(statement: str) -> str:
+    """Tipo de sentencia SQL (SELECT, INSERT, ...) para etiquetar sin cardinalidad ilimitada."""
+    partes = statement.lstrip().split(None, 1)
+    verbo = partes[0].upper() if partes else ""
+    return verbo if verbo in SENTENCIAS else "OTHER"
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada petición de conexión."""
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - inicio)
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """
+    Cuenta y mide las consultas de un engine por tipo de sentencia.
+
+    Returns:
+        Engine: El mismo engine, para encadenar
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("prometheus_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info["prometheus_query_start"].pop()
+        tipo = statement_type(statement)
+        DB_QUERIES.labels(tipo).inc()
+        DB_QUERY_SECONDS.labels(tipo).observe(time.perf_counter() - inicio)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(contexto):
+        pila = contexto.connection.info.get("prometheus_query_start") if contexto.connection is not None else None
+        if pila:
+            pila.pop()
+        DB_QUERY_ERRORS.labels(statement_type(contexto.statement or "")).inc()
+
+    return engine
+
+
+# --- Colas y pools (se leen en cada scrape) ---
+
+class RuntimeCollector:
+    """
+    Expone el estado de las colas del proceso en el momento del scrape:
+    la cola de re-predicción, los pools de hilos y el pool de conexiones.
+    """
+    def __init__(
+        self,
+        rescore_stats: Callable[[], Dict[str, Any]],
+        executor_stats: Callable[[], Dict[str, Dict[str, Any]]],
+        engine: Optional[Engine] = None
+    ):
+        """
+        Args:
+            rescore_stats: Estadísticas de la cola de re-predicción
+            executor_stats: Estadísticas por pool de hilos
+            engine: Engine cuyo pool de conexiones se informa (opcional)
+        """
+        self.rescore_stats = rescore_stats
+        self.executor_stats = executor_stats
+        self.engine = engine
+
+    def collect(self) -> Iterable[Any]:
+        cola = self.rescore_stats()
+        yield GaugeMetricFamily("rescore_queue_pending", "Estudiantes esperando re-predicción", value=cola["pending"])
+        yield GaugeMetricFamily(
+            "rescore_queue_in_progress", "Estudiantes en re-predicción", value=cola["in_progress"]
+        )
+        yield GaugeMetricFamily(
+            "rescore_queue_oldest_pending_seconds",
+            "Antigüedad del estudiante pendiente más antiguo",
+            value=(cola["oldest_pending_ms"] or 0.0) / 1000.0,
+        )
+        yield CounterMetricFamily(
+            "rescore_queue_scored", "Estudiantes re-predichos", value=cola["scored"]
+        )
+        yield CounterMetricFamily(
+            "rescore_queue_failed", "Estudiantes cuya re-predicción falló", value=cola["failed"]
+        )
+
+        activos = GaugeMetricFamily("executor_active", "Tareas en ejecución por pool", labels=["pool"])
+        en_cola = GaugeMetricFamily("executor_queued", "Tareas en espera por pool", labels=["pool"])
+        rechazadas = CounterMetricFamily("executor_rejected", "Tareas rechazadas por pool saturado", labels=["pool"])
+        for nombre, stats in self.executor_stats().items():
+            activos.add_metric([nombre], stats["active"])
+            en_cola.add_metric([nombre], stats["queued"])
+            rechazadas.add_metric([nombre], stats["rejected"])
+        yield activos
+        yield en_cola
+        yield rechazadas
+
+        pool = getattr(self.engine, "pool", None)
+        if isinstance(pool, QueuePool):
+            yield GaugeMetricFamily("db_pool_size", "Conexiones permanentes del pool", value=pool.size())
+            yield GaugeMetricFamily("db_pool_checked_out", "Conexiones en uso", value=pool.checkedout())
+            yield GaugeMetricFamily("db_pool_overflow", "Conexiones de desborde abiertas", value=max(pool.overflow(), 0))
+
+
+def render_metrics(*collectors: Any) -> Tuple[bytes, str]:
+    """
+    Genera el cuerpo de /metrics.
+
+    Args:
+        collectors: Colectores del proceso (por ejemplo, RuntimeCollector) que
+            se agregan al registro en cada scrape
+
+    Returns:
+        Tuple[bytes, str]: Cuerpo en formato de texto de Prometheus y su Content-Type
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = CollectorRegistry()
+        registro.register(_RegistroGlobal())
+
+    for colector in collectors:
+        registro.register(colector)
+    return generate_latest(registro), CONTENT_TYPE_LATEST
+
+
+class _RegistroGlobal:
+    """Expone las métricas del registro global de prometheus_client dentro de otro registro."""
+    def collect(self) -> Iterable[Any]:
+        return REGISTRY.collect()
@@ -0,0 +1,186 @@
+"""
+Conteo de consultas SQL por request y detección de N+1.
+
+Los eventos del engine registran cada consulta en el QueryStats activo del
+contexto (contextvars), que el middleware crea al recibir un request. El
+contexto se propaga a los hilos de db_executor y del threadpool de Starlette,
+así que se cuentan también las consultas de los endpoints síncronos.
+
+Una misma sentencia (el SQL con parámetros sin sustituir) ejecutada muchas
+veces en un request suele ser un N+1: una relación cargada fila a fila.
+"""
+import time
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import DB_QUERY_HEADERS, N_PLUS_ONE_THRESHOLD
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+REPEATED_QUERIES_HEADER = "X-DB-Repeated-Queries"
+
+class QueryStats:
+    """
+    Consultas ejecutadas dentro de un contexto: total, tiempo y repeticiones por sentencia.
+    """
+    def __init__(self, padre: Optional["QueryStats"] = None):
+        # Los contextos anidados también cuentan en el de afuera
+        self.padre = padre
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, segundos: float) -> None:
+        stats = self
+        while stats is not None:
+            with stats._lock:
+                stats.count += 1
+                stats.seconds += segundos
+                stats.statements[statement] += 1
+            stats = stats.padre
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """
+        Sentencias ejecutadas al menos `threshold` veces.
+
+        Returns:
+            Dict[str, int]: Sentencia -> ejecuciones, de más a menos repetida
+        """
+        with self._lock:
+            return {sql: veces for sql, veces in self.statements.most_common() if veces >= threshold}
+
+_actual: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Estadísticas del contexto activo, o None fuera de count_queries."""
+    return _actual.get()
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    Cuenta las consultas ejecutadas dentro del bloque (incluidas las que
+    corren en otros hilos con el contexto copiado).
+
+        with count_queries() as stats:
+            servicio.listar_admins()
+        print(stats.count, stats.repeated())
+    """
+    stats = QueryStats(_actual.get())
+    token = _actual.set(stats)
+    try:
+        yield stats
+    finally:
+        _actual.reset(token)
+
+def track_queries(engine: Engine) -> Engine:
+    """
+    Registra en el QueryStats activo cada consulta del engine.
+
+    Fuera de un contexto de conteo el costo es una lectura de ContextVar.
+
+    Returns:
+        Engine: El mismo engine, para encadenar
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        if _actual.get() is not None and context is not None:
+            context._query_counter_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        stats = _actual.get()
+        inicio = getattr(context, "_query_counter_start", None)
+        if stats is not None and inicio is not None:
+            stats.record(statement, time.perf_counter() - inicio)
+
+    return engine
+
+def _resumir(statement: str, largo: int = 120) -> str:
+    """Sentencia en una línea y recortada, para logs y cabeceras."""
+    linea = " ".join(statement.split())
+    return linea if len(linea) <= largo else linea[:largo - 3] + "..."
+
+class QueryCounterMiddleware:
+    """
+    Middleware ASGI que cuenta las consultas SQL de cada request.
+
+    Registra un aviso cuando una sentencia se repite N_PLUS_ONE_THRESHOLD veces
+    y, si `expose_headers` (DEBUG), agrega a la respuesta las cabeceras
+    X-DB-Query-Count, X-DB-Query-Time-Ms y X-DB-Repeated-Queries.
+    """
+    def __init__(self, app, expose_headers: bool = DB_QUERY_HEADERS, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with count_queries() as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    repetidas = stats.repeated(self.threshold)
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()))
+                    headers.append((QUERY_TIME_HEADER.lower().encode(), f"{stats.seconds * 1000:.2f}".encode()))
+                    headers.append((REPEATED_QUERIES_HEADER.lower().encode(), str(len(repetidas)).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                for statement, veces in stats.repeated(self.threshold).items():
+                    logger.warning(
+                        f"Posible N+1 en {scope.get('method', '')} {scope.get('path', '')}: "
+                        f"{veces} ejecuciones de '{_resumir(statement)}'"
+                    )
+
+@contextmanager
+def assert_max_queries(limite: int) -> Iterator[QueryStats]:
+    """
+    Helper de pruebas: falla si el bloque ejecuta más de `limite` consultas.
+
+        with assert_max_queries(3):
+            respuesta = await cliente.get("/admin")
+
+    Cuenta en el contexto actual, así que funciona al llamar servicios
+    directamente o a la app con httpx.ASGITransport; con TestClient (otro
+    hilo, sin el contexto) usar assert_response_queries.
+
+    Raises:
+        AssertionError: Con las sentencias ejecutadas, de más a menos repetida
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limite:
+        raise AssertionError(_detalle(stats.count, limite, stats.repeated(1)))
+
+def assert_response_queries(response, limite: int) -> None:
+    """
+    Helper de pruebas: falla si la respuesta informa más de `limite` consultas
+    en X-DB-Query-Count (requiere DB_QUERY_HEADERS).
+    """
+    valor = response.headers.get(QUERY_COUNT_HEADER)
+    if valor is None:
+        raise AssertionError(f"La respuesta no tiene la cabecera {QUERY_COUNT_HEADER} (¿DB_QUERY_HEADERS desactivado?)")
+    if int(valor) > limite:
+        raise AssertionError(f"Se ejecutaron {valor} consultas; el máximo es {limite}")
+
+def _detalle(total: int, limite: int, sentencias: Dict[str, int]) -> str:
+    lineas: List[str] = [f"Se ejecutaron {total} consultas; el máximo es {limite}:"]
+    lineas.extend(f"  {veces}x {_resumir(sql)}" for sql, veces in sentencias.items())
+    return "\n".join(lineas)
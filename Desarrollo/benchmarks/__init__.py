@@ -0,0 +1,2 @@
+# Benchmarks de rendimiento. Ejecutar desde la raíz del proyecto, p. ej.:
+#   python -m benchmarks.numpy_backend
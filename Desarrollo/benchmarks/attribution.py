@@ -0,0 +1,76 @@
+"""
+Mide el costo de explicar las predicciones (integrated gradients) frente a
+sólo predecir, con el motor NumPy y el preprocesador compilado.
+
+Para cada tamaño de lote y número de pasos informa la latencia mediana y p95
+de `predict_columns` y de `AttributionEngine.explain`, y el sobrecosto.
+
+Uso:
+    python -m benchmarks.attribution [--batch-sizes 1 32 256 1024] [--steps 16 32 64] [--repeats 30]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _medir(funcion, repeats: int) -> dict:
+    funcion()  # calentamiento
+    tiempos = []
+    for _ in range(repeats):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "p50_ms": round(float(np.percentile(tiempos, 50)), 4),
+        "p95_ms": round(float(np.percentile(tiempos, 95)), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la atribución de predicciones")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256, 1024])
+    parser.add_argument("--steps", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT_DIR))
+    from app.services.attribution import AttributionEngine
+    from app.services.model_registry import ModelRegistry
+    from app.services.prediction import predict_columns
+    from benchmarks.synthetic import generate_students
+
+    registry = ModelRegistry(backend="numpy", preprocessor_backend="compiled")
+    if not registry.load():
+        print(f"No se pudo cargar el modelo: {registry.error}")
+        return
+    artefactos = registry.get_artifacts()
+
+    informe = {}
+    for batch_size in args.batch_sizes:
+        columnas = generate_students(batch_size, support_as_category=True)
+        prediccion = _medir(lambda: predict_columns(artefactos.model, artefactos.preprocessor, columnas), args.repeats)
+        informe[batch_size] = {"predict": prediccion}
+        for steps in args.steps:
+            motor = AttributionEngine(steps=steps)
+            explicacion = _medir(lambda: motor.explain(artefactos, columnas), args.repeats)
+            probabilidades, explicaciones = motor.explain(artefactos, columnas)
+            # Error de completitud: sum(contribuciones) frente a probabilidad - base
+            sumas = np.array([sum(e["contributions"].values()) for e in explicaciones])
+            error = np.abs(sumas - (probabilidades - explicaciones[0]["base"])).max()
+            informe[batch_size][f"explain_steps_{steps}"] = {
+                **explicacion,
+                "overhead_x": round(explicacion["p50_ms"] / max(prediccion["p50_ms"], 1e-9), 2),
+                "max_completeness_error": round(float(error), 6),
+            }
+
+    print(json.dumps(informe, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Suite de rendimiento de todos los caminos de predicción.
+
+Escenarios en proceso:
+- make_prediction: `app.services.prediction.make_prediction` (el camino original de /predict).
+- ml_model_service.predict_batch: `MLModelService.predict_batch`, que usa /predict hoy.
+- ml_model_service.predict: `MLModelService.predict`, una llamada por estudiante.
+- prediccion_service.predecir_lote: `PrediccionService.predecir_lote_desde_features`,
+  el camino del servicio de predicción por estudiante (re-predicciones y cola).
+
+Escenarios HTTP, a través de la aplicación ASGI sin abrir sockets:
+- http.predict: POST /api/v1/predict con una lista de estudiantes.
+- http.predict_columnar: POST /api/v1/predict/columnar con un arreglo por campo.
+
+Para cada escenario y tamaño de lote se mide la latencia p50/p95/p99 y las
+filas por segundo. El resultado se guarda en JSON; con --baseline se compara
+con un resultado anterior y se marca como regresión todo escenario cuya
+mediana o p95 empeore más que la tolerancia (el proceso termina con código 1).
+
+Uso:
+    python -m benchmarks.inference_suite [--batch-sizes 1 10 100 1000 10000] [--output resultados.json]
+    python -m benchmarks.inference_suite --baseline benchmarks/baseline.json [--tolerance 0.15]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+ESCENARIOS = (
+    "make_prediction",
+    "ml_model_service.predict_batch",
+    "ml_model_service.predict",
+    "prediccion_service.predecir_lote",
+    "http.predict",
+    "http.predict_columnar",
+)
+# Métricas que se comparan con la línea base (más alto es peor)
+METRICAS_COMPARADAS = ("p50_ms", "p95_ms")
+
+
+def medir(funcion: Callable[[], Any], filas: int, repeats: int, max_seconds: float) -> Dict[str, Any]:
+    """
+    Mide la latencia de `funcion` hasta `repeats` veces o `max_seconds` segundos.
+
+    Args:
+        funcion: Llamada a medir (procesa un lote de `filas` filas)
+        filas: Filas por llamada, para calcular el throughput
+        repeats: Máximo de mediciones
+        max_seconds: Presupuesto de tiempo; siempre se toma al menos una medición
+
+    Returns:
+        Dict[str, Any]: Percentiles en ms, filas por segundo y número de mediciones
+    """
+    funcion()  # calentamiento
+    tiempos = []
+    limite = time.perf_counter() + max_seconds
+    while len(tiempos) < repeats and (not tiempos or time.perf_counter() < limite):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    p50 = float(np.percentile(tiempos, 50))
+    return {
+        "p50_ms": round(p50, 4),
+        "p95_ms": round(float(np.percentile(tiempos, 95)), 4),
+        "p99_ms": round(float(np.percentile(tiempos, 99)), 4),
+        "rows_per_second": round(filas / (p50 / 1000), 1) if p50 > 0 else None,
+        "samples": len(tiempos),
+    }
+
+
+def compare(actual: Dict[str, Any], base: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Compara dos resultados de la suite.
+
+    Sólo se comparan los escenarios y tamaños de lote presentes en ambos y
+    medidos sin error.
+
+    Args:
+        actual: Resultado actual
+        base: Resultado de referencia
+        tolerance: Empeoramiento relativo admitido (0.1 = 10 %)
+
+    Returns:
+        List[Dict[str, Any]]: Una entrada por métrica que empeoró más que la tolerancia
+    """
+    regresiones = []
+    for escenario, lotes in actual.get("results", {}).items():
+        for batch_size, medicion in lotes.items():
+            referencia = base.get("results", {}).get(escenario, {}).get(batch_size)
+            if not referencia or "error" in medicion or "error" in referencia:
+                continue
+            for metrica in METRICAS_COMPARADAS:
+                if not referencia.get(metrica):
+                    continue
+                cociente = medicion[metrica] / referencia[metrica]
+                if cociente > 1.0 + tolerance:
+                    regresiones.append({
+                        "scenario": escenario,
+                        "batch_size": batch_size,
+                        "metric": metrica,
+                        "baseline": referencia[metrica],
+                        "current": medicion[metrica],
+                        "ratio": round(cociente, 3),
+                    })
+    return regresiones
+
+
+def _cargar_app(nombre: str):
+    """
+    Importa la aplicación ASGI ("modulo:atributo").
+
+    Si la aplicación completa no se puede importar (por ejemplo, sin la
+    configuración de base de datos), se monta sólo el router de /predict,
+    que no depende de ella, y se indica en el resultado.
+    """
+    import importlib
+
+    modulo, _, atributo = nombre.partition(":")
+    try:
+        return getattr(importlib.import_module(modulo), atributo or "app"), nombre
+    except Exception as e:
+        from fastapi import FastAPI
+        from app.api.endpoints import predict
+
+        print(f"No se pudo importar {nombre} ({e}); se usa sólo el router de predicción", file=sys.stderr)
+        app = FastAPI()
+        app.include_router(predict.router, prefix="/api/v1")
+        return app, "app.api.endpoints.predict:router"
+
+
+def _escenarios_en_proceso(columnas: Dict[str, np.ndarray], registros: List[Dict[str, Any]]) -> Dict[str, Callable]:
+    """Construye las llamadas de los escenarios en proceso para un lote."""
+    from app.services.ml_model_service import ml_model_service
+    from app.services.prediction import make_prediction
+
+    def make_prediction_silencioso():
+        # make_prediction escribe en stdout en cada llamada
+        with contextlib.redirect_stdout(io.StringIO()):
+            return make_prediction(columnas)
+
+    def predict_por_fila():
+        for registro in registros:
+            if ml_model_service.predict(registro) is None:
+                raise RuntimeError("MLModelService.predict devolvió None")
+
+    escenarios = {
+        "make_prediction": make_prediction_silencioso,
+        "ml_model_service.predict_batch": lambda: ml_model_service.predict_batch(columnas),
+        "ml_model_service.predict": predict_por_fila,
+    }
+
+    def predecir_lote():
+        from app.services.institution_config import institution_config_cache
+        from app.services.prediccion import PrediccionService
+
+        # Configuración de la institución ya en caché: no se consulta la base de datos
+        institution_config_cache.set(1, {}, 1)
+        servicio = PrediccionService(db=None)
+        pares = [
+            (
+                SimpleNamespace(id=i, institucion_id=1, riesgo_desercion=0.0),
+                SimpleNamespace(entrada=registro, materias_reprobadas=0, materias_retiradas=0,
+                                suma_promedios=0.0, promedios_registrados=0,
+                                datos_academicos=None, datos_personales=None),
+            )
+            for i, registro in enumerate(registros)
+        ]
+        return lambda: servicio.predecir_lote_desde_features(pares)
+
+    try:
+        escenarios["prediccion_service.predecir_lote"] = predecir_lote()
+    except Exception as e:
+        escenarios["prediccion_service.predecir_lote"] = e
+    return escenarios
+
+
+def _escenarios_http(app, columnas: Dict[str, np.ndarray], registros: List[Dict[str, Any]], loop) -> Dict[str, Callable]:
+    """Construye las llamadas HTTP; los cuerpos se serializan una sola vez, fuera de la medición."""
+    import httpx
+
+    cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    cabeceras = {"content-type": "application/json"}
+    cuerpos = {
+        "http.predict": ("/api/v1/predict", json.dumps({"students": registros}).encode()),
+        "http.predict_columnar": (
+            "/api/v1/predict/columnar",
+            json.dumps({campo: valores.tolist() for campo, valores in columnas.items()}).encode(),
+        ),
+    }
+
+    def llamada(ruta: str, cuerpo: bytes) -> Callable[[], None]:
+        def ejecutar():
+            respuesta = loop.run_until_complete(cliente.post(ruta, content=cuerpo, headers=cabeceras))
+            if respuesta.status_code != 200:
+                raise RuntimeError(f"{ruta} respondió {respuesta.status_code}: {respuesta.text[:200]}")
+        return ejecutar
+
+    return {nombre: llamada(ruta, cuerpo) for nombre, (ruta, cuerpo) in cuerpos.items()}
+
+
+def ejecutar_suite(
+    batch_sizes: List[int],
+    escenarios: List[str],
+    repeats: int,
+    max_seconds: float,
+    app_name: str,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Ejecuta los escenarios elegidos para cada tamaño de lote.
+
+    Un escenario que falla se registra con su error y la suite continúa;
+    `main` termina con error al final (ver `errores`).
+
+    Returns:
+        Dict[str, Any]: Metadatos del entorno y resultados por escenario y tamaño de lote
+    """
+    from app.services.model_registry import model_registry
+    from benchmarks.synthetic import generate_students, to_records
+
+    if not model_registry.load():
+        raise RuntimeError(f"No se pudo cargar el modelo: {model_registry.error}")
+    model_registry.warmup()
+
+    app, app_usada = _cargar_app(app_name) if any(e.startswith("http.") for e in escenarios) else (None, None)
+    loop = asyncio.new_event_loop()
+    resultados: Dict[str, Dict[str, Any]] = {escenario: {} for escenario in escenarios}
+    try:
+        for batch_size in batch_sizes:
+            # El esquema de la API: support_service_use_last_month es un entero
+            columnas = generate_students(batch_size, seed=seed)
+            registros = to_records(columnas)
+            llamadas = _escenarios_en_proceso(columnas, registros)
+            if app is not None:
+                llamadas.update(_escenarios_http(app, columnas, registros, loop))
+
+            for escenario in escenarios:
+                llamada = llamadas[escenario]
+                try:
+                    if isinstance(llamada, Exception):
+                        raise llamada
+                    medicion = medir(llamada, batch_size, repeats, max_seconds)
+                except Exception as e:
+                    medicion = {"error": f"{type(e).__name__}: {e}"}
+                resultados[escenario][str(batch_size)] = medicion
+                print(f"{escenario} [{batch_size}]: {medicion}", file=sys.stderr)
+    finally:
+        loop.close()
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": model_registry.backend,
+            "precision": model_registry.precision,
+            "preprocessor": type(model_registry.preprocessor).__name__,
+            "model_version": model_registry.version,
+            "asgi_app": app_usada,
+        },
+        "results": resultados,
+    }
+
+
+def errores(resultado: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Mediciones que fallaron en un resultado de `ejecutar_suite`.
+
+    Returns:
+        List[Dict[str, str]]: Escenario, tamaño de lote y error de cada fallo
+    """
+    return [
+        {"scenario": escenario, "batch_size": batch_size, "error": medicion["error"]}
+        for escenario, mediciones in resultado["results"].items()
+        for batch_size, medicion in mediciones.items()
+        if "error" in medicion
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de rendimiento de los caminos de predicción")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--scenarios", nargs="+", choices=ESCENARIOS, default=list(ESCENARIOS))
+    parser.add_argument("--repeats", type=int, default=50, help="Máximo de mediciones por escenario y lote")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Presupuesto de tiempo por escenario y lote")
+    parser.add_argument("--backend", default="numpy", help="Motor de inferencia (ML_BACKEND)")
+    parser.add_argument("--app", default="app.main:app", help="Aplicación ASGI para los escenarios HTTP")
+    parser.add_argument("--output", help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--baseline", help="Resultado anterior con el que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Empeoramiento relativo admitido")
+    args = parser.parse_args()
+
+    # La configuración se lee al importar app.core.config
+    os.environ["ML_BACKEND"] = args.backend
+    sys.path.insert(0, str(ROOT_DIR))
+
+    resultado = ejecutar_suite(args.batch_sizes, args.scenarios, args.repeats, args.max_seconds, args.app)
+    if args.output:
+        Path(args.output).write_text(json.dumps(resultado, indent=2) + "\n")
+        print(f"Resultado guardado en {args.output}", file=sys.stderr)
+
+    regresiones: Optional[List[Dict[str, Any]]] = None
+    if args.baseline:
+        base = json.loads(Path(args.baseline).read_text())
+        regresiones = compare(resultado, base, args.tolerance)
+        resultado["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance, "regressions": regresiones}
+
+    print(json.dumps(resultado, indent=2))
+    fallidos = errores(resultado)
+    for fallo in fallidos:
+        print(f"Escenario fallido: {fallo['scenario']} [{fallo['batch_size']}]: {fallo['error']}", file=sys.stderr)
+    if regresiones:
+        print(f"{len(regresiones)} regresiones frente a {args.baseline}", file=sys.stderr)
+    # Un escenario que no se pudo medir no debe pasar por un resultado válido
+    if fallidos or regresiones:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Compara el motor de inferencia Keras (TensorFlow) con el motor NumPy.
+
+Mide, para cada motor:
+- Arranque en frío: tiempo de importar y cargar el modelo en un proceso nuevo.
+- RSS máximo del proceso tras la carga.
+- Latencia por lote para distintos tamaños de lote.
+
+Uso:
+    python -m benchmarks.numpy_backend [--batch-sizes 1 32 256 1024] [--repeats 50]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+_COLD_START = """
+import json, time
+inicio = time.perf_counter()
+from app.services.model_registry import ModelRegistry
+registry = ModelRegistry(backend={backend!r})
+assert registry.load(), registry.error
+model, _ = registry.get()
+model.predict(__import__("numpy").zeros((1, {input_dim}), dtype="float32"), verbose=0)
+segundos = time.perf_counter() - inicio
+# VmHWM/VmRSS de /proc: ru_maxrss se hereda a través de fork+exec y mentiría
+estado = dict(l.split(":", 1) for l in open("/proc/self/status"))
+print(json.dumps({{
+    "cold_start_seconds": segundos,
+    "rss_mb": int(estado["VmRSS"].split()[0]) / 1024,
+    "peak_rss_mb": int(estado["VmHWM"].split()[0]) / 1024,
+}}))
+"""
+
+
+def medir_arranque_en_frio(backend: str, input_dim: int) -> dict:
+    """Carga el motor en un proceso nuevo y devuelve tiempo y memoria."""
+    resultado = subprocess.run(
+        [sys.executable, "-c", _COLD_START.format(backend=backend, input_dim=input_dim)],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def medir_latencia(model, batch_sizes, repeats: int, input_dim: int) -> dict:
+    """Mide la latencia mediana y p95 de `predict` para cada tamaño de lote."""
+    rng = np.random.default_rng(0)
+    resultados = {}
+    for batch_size in batch_sizes:
+        x = rng.normal(size=(batch_size, input_dim)).astype(np.float32)
+        model.predict(x, verbose=0)  # calentamiento
+        tiempos = []
+        for _ in range(repeats):
+            inicio = time.perf_counter()
+            model.predict(x, verbose=0)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        resultados[batch_size] = {
+            "p50_ms": round(float(np.percentile(tiempos, 50)), 4),
+            "p95_ms": round(float(np.percentile(tiempos, 95)), 4),
+            "rows_per_second": round(batch_size / (np.median(tiempos) / 1000), 1),
+        }
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Keras vs NumPy")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256, 1024])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--backends", nargs="+", default=["keras", "numpy"])
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT_DIR))
+    from app.services.model_registry import ModelRegistry
+
+    informe = {}
+    for backend in args.backends:
+        registry = ModelRegistry(backend=backend)
+        if not registry.load():
+            print(f"[{backend}] no se pudo cargar: {registry.error}")
+            continue
+        model, _ = registry.get()
+        input_dim = getattr(model, "input_dim", None) or model.input_shape[-1]
+
+        informe[backend] = medir_arranque_en_frio(backend, input_dim)
+        informe[backend]["latency"] = medir_latencia(model, args.batch_sizes, args.repeats, input_dim)
+
+    print(json.dumps(informe, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compara el preprocesador joblib (scikit-learn + pandas) con el compilado en NumPy.
+
+Mide la latencia por llamada y por fila de `transform` para distintos tamaños
+de lote, con la entrada en el formato que usa cada camino de la API: un
+DataFrame para el pipeline original y columnas NumPy para el compilado.
+
+Uso:
+    python -m benchmarks.preprocessor [--batch-sizes 1 10 100 1000] [--repeats 50]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def medir(transform, entrada, batch_size: int, repeats: int) -> dict:
+    """Mide la latencia mediana y p95 de una función de transformación."""
+    transform(entrada)  # calentamiento
+    tiempos = []
+    for _ in range(repeats):
+        inicio = time.perf_counter()
+        transform(entrada)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    p50 = float(np.percentile(tiempos, 50))
+    return {
+        "p50_ms": round(p50, 4),
+        "p95_ms": round(float(np.percentile(tiempos, 95)), 4),
+        "per_row_us": round(p50 * 1000 / batch_size, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del preprocesador sklearn vs compilado")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT_DIR))
+    import pandas as pd
+
+    from app.core.config import ARTIFACTS_PATH, PREPROCESSOR_NAME
+    from app.services.compiled_preprocessor import compile_preprocessor
+    from app.services.model_registry import load_sklearn_preprocessor
+    from benchmarks.synthetic import generate_students
+
+    pipeline = load_sklearn_preprocessor(Path(ARTIFACTS_PATH) / PREPROCESSOR_NAME)
+    compilado = compile_preprocessor(pipeline)
+
+    informe = {}
+    for batch_size in args.batch_sizes:
+        columnas = generate_students(batch_size, support_as_category=True)
+        sklearn = medir(lambda c: pipeline.transform(pd.DataFrame(c)), columnas, batch_size, args.repeats)
+        numpy = medir(compilado.transform, columnas, batch_size, args.repeats)
+        informe[batch_size] = {
+            "sklearn": sklearn,
+            "compiled": numpy,
+            "speedup": round(sklearn["p50_ms"] / numpy["p50_ms"], 1),
+        }
+
+    print(json.dumps(informe, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compara los pesos del modelo en float32, float16 e int8 con el motor NumPy.
+
+Para cada precisión informa:
+- Desviación de las probabilidades frente al modelo original (float32 y, si
+  TensorFlow está instalado, el .keras) sobre una muestra sintética que no se
+  usó para cuantizar, y cuántas decisiones cambian con el umbral 0.5.
+- Memoria de los pesos y tamaño del archivo.
+- Latencia mediana y filas por segundo por tamaño de lote.
+
+Uso:
+    python -m benchmarks.quantization [--rows 20000] [--batch-sizes 1 32 256 1024] [--repeats 50] [--keras]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def medir_desviacion(probabilidades: np.ndarray, referencia: np.ndarray) -> dict:
+    """Resume la diferencia absoluta y los cambios de decisión frente a la referencia."""
+    diferencia = np.abs(probabilidades - referencia)
+    return {
+        "mean_abs_diff": float(f"{diferencia.mean():.3e}"),
+        "p99_abs_diff": float(f"{np.percentile(diferencia, 99):.3e}"),
+        "max_abs_diff": float(f"{diferencia.max():.3e}"),
+        "decision_flips": int(((probabilidades >= 0.5) != (referencia >= 0.5)).sum()),
+    }
+
+
+def medir_latencia(model, x: np.ndarray, batch_sizes, repeats: int) -> dict:
+    """Latencia mediana y p95 de `predict` por tamaño de lote."""
+    resultados = {}
+    for batch_size in batch_sizes:
+        lote = x[:batch_size]
+        model.predict(lote)  # calentamiento
+        tiempos = []
+        for _ in range(repeats):
+            inicio = time.perf_counter()
+            model.predict(lote)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        resultados[batch_size] = {
+            "p50_ms": round(float(np.percentile(tiempos, 50)), 4),
+            "p95_ms": round(float(np.percentile(tiempos, 95)), 4),
+            "rows_per_second": round(len(lote) / (np.median(tiempos) / 1000), 1),
+        }
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de precisión de los pesos: desviación vs latencia")
+    parser.add_argument("--rows", type=int, default=20000, help="Filas de la muestra de evaluación")
+    parser.add_argument("--seed", type=int, default=12345, help="Semilla de la muestra (distinta de la de calibración)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256, 1024])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--keras", action="store_true", help="Comparar también con el .keras (requiere TensorFlow)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT_DIR))
+    from app.core.config import ARTIFACTS_PATH, MODEL_NAME
+    from app.services.model_registry import ModelRegistry
+    from app.services.numpy_inference import PRECISIONS, NumpyDenseModel, quantize_weights
+    from app.services.prediction import preprocess_columns
+    from benchmarks.synthetic import generate_students
+
+    registry = ModelRegistry(backend="numpy", preprocessor_backend="compiled", precision="float32")
+    if not registry.load():
+        print(f"No se pudo cargar el modelo: {registry.error}")
+        return
+    artefactos = registry.get_artifacts()
+    original_path = registry.numpy_model_path
+    x = preprocess_columns(
+        artefactos.preprocessor, generate_students(args.rows, seed=args.seed, support_as_category=True)
+    ).astype(np.float32)
+    referencia = NumpyDenseModel.load(original_path).predict(x)[:, -1]
+
+    referencia_keras = None
+    if args.keras:
+        import tensorflow as tf
+        keras_model = tf.keras.models.load_model(str(Path(ARTIFACTS_PATH) / MODEL_NAME))
+        referencia_keras = keras_model.predict(x, batch_size=1024, verbose=0)[:, -1]
+
+    informe = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for precision in PRECISIONS:
+            ruta = (
+                original_path if precision == "float32"
+                else quantize_weights(original_path, Path(directorio) / f"{precision}.npz", precision)
+            )
+            modelo = NumpyDenseModel.load(ruta)
+            probabilidades = modelo.predict(x)[:, -1]
+            informe[precision] = {
+                "weights_kb": round(modelo.nbytes / 1024, 1),
+                "file_kb": round(ruta.stat().st_size / 1024, 1),
+                "drift_vs_float32": medir_desviacion(probabilidades, referencia),
+                "latency": medir_latencia(modelo, x, args.batch_sizes, args.repeats),
+            }
+            if referencia_keras is not None:
+                informe[precision]["drift_vs_keras"] = medir_desviacion(probabilidades, referencia_keras)
+
+    print(json.dumps({"rows": args.rows, "variants": informe}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
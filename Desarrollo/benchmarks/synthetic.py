@@ -0,0 +1,58 @@
+"""
+Generador de estudiantes sintéticos con el esquema de StudentDataInput.
+
+Produce columnas NumPy (formato columnar) que pueden convertirse a DataFrame,
+a lista de diccionarios o al cuerpo JSON de /api/v1/predict.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+GENDERS = ("Male", "Female")
+PROGRAMS = (
+    "Arts", "Business", "Education", "Engineering", "Health Sciences",
+    "Humanities", "Law", "Sciences", "Computer Science",
+)
+SUPPORT_SERVICES = ("None", "Academic Support", "Psychological Counseling", "Both", "Other")
+
+
+def generate_students(n: int, seed: int = 0, support_as_category: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Genera `n` estudiantes con valores dentro de los rangos válidos.
+
+    Args:
+        n: Número de estudiantes
+        seed: Semilla para reproducibilidad
+        support_as_category: Si es True, `support_service_use_last_month` usa las
+            categorías de texto con las que se entrenó el preprocesador; si es
+            False, usa el entero que declara StudentDataInput
+
+    Returns:
+        Dict[str, np.ndarray]: Una columna por campo
+    """
+    rng = np.random.default_rng(seed)
+    gpa_prev = np.round(rng.uniform(0.0, 4.0, n), 2)
+    columnas = {
+        "gender": rng.choice(GENDERS, n).astype(object),
+        "year_of_study": rng.integers(1, 6, n),
+        "program_major": rng.choice(PROGRAMS, n).astype(object),
+        "credit_load": rng.integers(6, 25, n),
+        "gpa_previous_semester": gpa_prev,
+        "gpa_current_semester": np.clip(np.round(gpa_prev + rng.normal(0, 0.5, n), 2), 0.0, 4.0),
+        "number_of_failed_courses_current_semester": rng.poisson(0.4, n),
+        "number_of_course_withdrawals_current_semester": rng.poisson(0.2, n),
+        "entrance_exam_score_percentile": np.round(rng.uniform(0, 100, n), 1),
+        "lms_activity_weekly_hours_avg_last_month": np.round(np.abs(rng.normal(45, 15, n)), 1),
+        "support_service_use_last_month": (
+            rng.choice(SUPPORT_SERVICES, n).astype(object) if support_as_category else rng.integers(0, 5, n)
+        ),
+        "edad": rng.integers(17, 40, n),
+    }
+    return columnas
+
+
+def to_records(columnas: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Convierte columnas a una lista de diccionarios (un estudiante por elemento)."""
+    listas = {k: v.tolist() for k, v in columnas.items()}
+    n = len(next(iter(listas.values())))
+    return [{k: v[i] for k, v in listas.items()} for i in range(n)]
@@ -0,0 +1,73 @@
+"""
+Configuración de gunicorn para servir la API con varios workers uvicorn.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+Con `preload_app` la aplicación y los artefactos de ML se cargan una sola
+vez en el proceso maestro antes del fork; los workers heredan esas páginas
+y las comparten (copy-on-write) en lugar de tener cada uno su copia. Con el
+motor NumPy los pesos además se mapean desde el archivo (MODEL_MMAP), así
+que también las versiones recargadas en caliente se comparten.
+
+TensorFlow no es seguro tras un fork: con ML_BACKEND=keras el modelo no se
+precarga y cada worker lo carga en su lifespan.
+
+Para que /metrics agregue las métricas de todos los workers, definir
+PROMETHEUS_MULTIPROC_DIR con un directorio vacío antes de arrancar.
+"""
+import gc
+import logging
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() in ("1", "true", "yes")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def when_ready(server):
+    """Se ejecuta en el maestro, después de importar la aplicación y antes de crear los workers."""
+    if not preload_app:
+        return
+
+    from app.services.model_registry import model_registry
+
+    if model_registry.backend == "keras":
+        server.log.warning("ML_BACKEND=keras: el modelo no se precarga (TensorFlow no es seguro tras un fork)")
+    elif model_registry.load():
+        stats = model_registry.stats()
+        server.log.info(
+            f"Artefactos de ML precargados en el maestro (versión {stats['version']}, "
+            f"{stats['load_time_seconds']} s); los workers los comparten"
+        )
+    else:
+        server.log.error(f"No se pudieron precargar los artefactos de ML: {model_registry.error}")
+
+    # Sacar del recolector los objetos ya creados: si el GC de cada worker los
+    # recorriera, escribiría en sus cabeceras y copiaría las páginas compartidas
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Cada worker abre sus propias conexiones a la base de datos."""
+    if not preload_app:
+        return
+
+    from app.database import engine
+
+    # No cerrar las conexiones heredadas (pertenecen al maestro), sólo descartarlas
+    engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Descarta las métricas en vivo (gauges) del worker que terminó."""
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,44 @@
+"""add institutions.config_version
+
+Revision ID: ed62f57b8359
+Revises: d5c2dcd2d98b
+Create Date: 2026-10-17 03:25:12.418530+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ed62f57b8359'
+down_revision: Union[str, None] = 'd5c2dcd2d98b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columnas(tabla: str):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(tabla):
+        return None
+    return {columna['name'] for columna in inspector.get_columns(tabla)}
+
+
+def upgrade() -> None:
+    # La tabla puede haberla creado `Base.metadata.create_all` al iniciar la app,
+    # con o sin la columna
+    columnas = _columnas('institutions')
+    if columnas is None or 'config_version' in columnas:
+        return
+    # Las filas existentes empiezan en la versión 1
+    op.add_column(
+        'institutions',
+        sa.Column('config_version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    columnas = _columnas('institutions')
+    if columnas is not None and 'config_version' in columnas:
+        op.drop_column('institutions', 'config_version')
@@ -0,0 +1,63 @@
+"""add student_features
+
+Revision ID: 61affdb6031c
+Revises: ed62f57b8359
+Create Date: 2026-10-17 03:30:41.902113+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '61affdb6031c'
+down_revision: Union[str, None] = 'ed62f57b8359'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columnas():
+    return [
+        sa.Column('estudiante_id', sa.Integer(), nullable=False),
+        sa.Column('programa', sa.String(length=100), nullable=True),
+        sa.Column('semestre', sa.Integer(), nullable=True),
+        sa.Column('eventos', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('eventos_recientes', sa.JSON(), nullable=True),
+        sa.Column('materias_reprobadas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('materias_retiradas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('suma_promedios', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('promedios_registrados', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('gpa_actual', sa.Float(), nullable=True),
+        sa.Column('gpa_anterior', sa.Float(), nullable=True),
+        sa.Column('lms_horas_semanales', sa.Float(), nullable=True),
+        sa.Column('servicios_apoyo_mes', sa.Integer(), nullable=True),
+        sa.Column('datos_academicos', sa.JSON(), nullable=True),
+        sa.Column('datos_personales', sa.JSON(), nullable=True),
+        sa.Column('entrada', sa.JSON(), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('student_features'):
+        op.create_table('student_features',
+        *_columnas(),
+        sa.ForeignKeyConstraint(['estudiante_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('estudiante_id')
+        )
+        return
+
+    # Creada por `Base.metadata.create_all` antes de existir algunas columnas
+    existentes = {columna['name'] for columna in inspector.get_columns('student_features')}
+    for columna in _columnas():
+        if columna.name not in existentes:
+            op.add_column('student_features', columna)
+
+
+def downgrade() -> None:
+    # La tabla es derivada: se reconstruye desde academic_history al volver a usarse
+    if sa.inspect(op.get_bind()).has_table('student_features'):
+        op.drop_table('student_features')
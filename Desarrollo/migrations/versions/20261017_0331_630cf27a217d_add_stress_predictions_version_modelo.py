@@ -0,0 +1,40 @@
+"""add stress_predictions.version_modelo
+
+Revision ID: 630cf27a217d
+Revises: 61affdb6031c
+Create Date: 2026-10-17 03:31:08.277406+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '630cf27a217d'
+down_revision: Union[str, None] = '61affdb6031c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columnas():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('stress_predictions'):
+        return None
+    return {columna['name'] for columna in inspector.get_columns('stress_predictions')}
+
+
+def upgrade() -> None:
+    # La columna puede haberla creado `Base.metadata.create_all` al iniciar la app
+    columnas = _columnas()
+    if columnas is None or 'version_modelo' in columnas:
+        return
+    # Las predicciones anteriores quedan sin versión conocida
+    op.add_column('stress_predictions', sa.Column('version_modelo', sa.String(length=50), nullable=True))
+
+
+def downgrade() -> None:
+    columnas = _columnas()
+    if columnas is not None and 'version_modelo' in columnas:
+        op.drop_column('stress_predictions', 'version_modelo')
@@ -0,0 +1,47 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from app.core.config import ARTIFACTS_PATH, COMPILED_PREPROCESSOR_NAME, PREPROCESSOR_NAME
+from app.services.compiled_preprocessor import compile_preprocessor
+from app.services.model_registry import load_sklearn_preprocessor
+from benchmarks.synthetic import generate_students
+
+def main():
+    """
+    Compila el preprocesador joblib a un .npz evaluable sólo con NumPy.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--preprocessor", default=str(Path(ARTIFACTS_PATH) / PREPROCESSOR_NAME), help="Preprocesador .joblib de entrada")
+    parser.add_argument("--output", default=str(Path(ARTIFACTS_PATH) / COMPILED_PREPROCESSOR_NAME), help="Archivo .npz de salida")
+    parser.add_argument("--check-rows", type=int, default=1000, help="Filas sintéticas para verificar la equivalencia")
+    args = parser.parse_args()
+
+    print(f"Compilando {args.preprocessor}...")
+    pipeline = load_sklearn_preprocessor(args.preprocessor)
+    compilado = compile_preprocessor(pipeline)
+
+    # Verificar contra el pipeline original antes de escribir el artefacto
+    if args.check_rows > 0:
+        import pandas as pd
+
+        columnas = generate_students(args.check_rows, support_as_category=True)
+        esperado = pipeline.transform(pd.DataFrame(columnas))
+        obtenido = compilado.transform(columnas)
+        diferencia = float(np.max(np.abs(esperado - obtenido)))
+        print(f"Diferencia máxima frente al pipeline original ({args.check_rows} filas): {diferencia:.3e}")
+        if not np.allclose(esperado, obtenido, atol=1e-9):
+            print("El preprocesador compilado no coincide con el original; no se escribe el artefacto")
+            sys.exit(1)
+
+    ruta = compilado.save(args.output)
+    print(f"Preprocesador compilado en {ruta}: {compilado.n_features_out} características de salida")
+
+if __name__ == "__main__":
+    main()
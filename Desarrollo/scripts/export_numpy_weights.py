@@ -0,0 +1,30 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from app.core.config import ARTIFACTS_PATH, MODEL_NAME, NUMPY_MODEL_NAME
+from app.services.numpy_inference import NumpyDenseModel, export_keras_weights
+
+def main():
+    """
+    Exporta los pesos del modelo .keras a un .npz para el motor de inferencia NumPy.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--keras", default=str(Path(ARTIFACTS_PATH) / MODEL_NAME), help="Modelo .keras de entrada")
+    parser.add_argument("--output", default=str(Path(ARTIFACTS_PATH) / NUMPY_MODEL_NAME), help="Archivo .npz de salida")
+    args = parser.parse_args()
+
+    print(f"Exportando pesos desde {args.keras}...")
+    ruta = export_keras_weights(args.keras, args.output)
+
+    modelo = NumpyDenseModel.load(ruta)
+    capas = " -> ".join(f"{w.shape[1]} ({act})" for w, _, act in modelo.layers)
+    print(f"Modelo exportado en {ruta}: entrada {modelo.input_dim} -> {capas}")
+    print(f"Tamaño de los pesos: {modelo.nbytes / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    main()
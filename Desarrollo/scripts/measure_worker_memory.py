@@ -0,0 +1,98 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+PROC = Path("/proc")
+CAMPOS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+def leer_smaps_rollup(pid: int) -> Dict[str, int]:
+    """
+    Lee /proc/<pid>/smaps_rollup (Linux >= 4.14).
+
+    Returns:
+        Dict[str, int]: Valores en bytes por campo
+    """
+    valores = {}
+    for linea in (PROC / str(pid) / "smaps_rollup").read_text().splitlines()[1:]:
+        nombre, _, resto = linea.partition(":")
+        if nombre in CAMPOS:
+            valores[nombre] = int(resto.split()[0]) * 1024
+    return valores
+
+def hijos(pid: int) -> List[int]:
+    """PIDs cuyo padre es `pid` (los workers de gunicorn)."""
+    encontrados = []
+    for stat in PROC.glob("[0-9]*/stat"):
+        try:
+            # El nombre del proceso va entre paréntesis y puede contener espacios
+            campos = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(campos[1]) == pid:
+            encontrados.append(int(stat.parent.name))
+    return sorted(encontrados)
+
+def resumir(pid: int, rol: str) -> Dict[str, object]:
+    valores = leer_smaps_rollup(pid)
+    return {
+        "pid": pid,
+        "role": rol,
+        "rss": valores.get("Rss", 0),
+        # Memoria proporcional: las páginas compartidas se reparten entre quienes las usan
+        "pss": valores.get("Pss", 0),
+        "shared": valores.get("Shared_Clean", 0) + valores.get("Shared_Dirty", 0),
+        "unique": valores.get("Private_Clean", 0) + valores.get("Private_Dirty", 0),
+        "swap": valores.get("Swap", 0),
+    }
+
+def main():
+    """
+    Informa la memoria única y compartida de cada worker de gunicorn.
+
+    Sumar el RSS de los workers cuenta varias veces las páginas compartidas;
+    la suma de PSS es el consumo real del servicio en el nodo. Ejemplo:
+        python scripts/measure_worker_memory.py --pidfile /tmp/gunicorn.pid
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--pid", type=int, help="PID del proceso maestro de gunicorn")
+    grupo.add_argument("--pidfile", help="Archivo con el PID del maestro (opción --pid de gunicorn)")
+    parser.add_argument("--json", action="store_true", help="Imprimir el resultado en JSON")
+    args = parser.parse_args()
+
+    maestro = args.pid or int(Path(args.pidfile).read_text().strip())
+    try:
+        procesos = [resumir(maestro, "master")] + [resumir(pid, "worker") for pid in hijos(maestro)]
+    except OSError as e:
+        # Proceso inexistente, sin permisos (ejecutar como el mismo usuario) o sistema no Linux
+        print(f"No se pudo leer la memoria de los procesos: {e}")
+        sys.exit(1)
+    workers = [p for p in procesos if p["role"] == "worker"]
+    totales = {
+        "workers": len(workers),
+        "rss_sum": sum(p["rss"] for p in procesos),
+        "pss_sum": sum(p["pss"] for p in procesos),
+        "unique_per_worker_avg": sum(p["unique"] for p in workers) // len(workers) if workers else 0,
+    }
+
+    if args.json:
+        print(json.dumps({"processes": procesos, "totals": totales}, indent=2))
+        return
+
+    mib = 1024 * 1024
+    print(f"{'PID':>8} {'rol':<7} {'RSS MiB':>9} {'PSS MiB':>9} {'compartida':>11} {'única':>9}")
+    for p in procesos:
+        print(
+            f"{p['pid']:>8} {p['role']:<7} {p['rss'] / mib:>9.1f} {p['pss'] / mib:>9.1f} "
+            f"{p['shared'] / mib:>11.1f} {p['unique'] / mib:>9.1f}"
+        )
+    print(
+        f"\n{totales['workers']} workers; suma RSS {totales['rss_sum'] / mib:.1f} MiB, "
+        f"suma PSS (consumo real) {totales['pss_sum'] / mib:.1f} MiB, "
+        f"memoria única media por worker {totales['unique_per_worker_avg'] / mib:.1f} MiB"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from app.core.config import (
+    ARTIFACTS_PATH,
+    COMPILED_PREPROCESSOR_NAME,
+    MODEL_NAME,
+    NUMPY_MODEL_NAME,
+    PREPROCESSOR_NAME,
+)
+from app.services.model_registry import ModelRegistry
+
+ARTEFACTOS = (MODEL_NAME, PREPROCESSOR_NAME, NUMPY_MODEL_NAME, COMPILED_PREPROCESSOR_NAME)
+
+def main():
+    """
+    Publica una versión del modelo en ARTIFACTS_PATH/versions/<versión>/ y opcionalmente la activa.
+
+    Los workers en ejecución adoptan la versión activada sin reiniciarse.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("version", help="Nombre de la versión (por ejemplo, 2025-06-01)")
+    parser.add_argument("--source", required=True, help="Directorio con los artefactos entrenados")
+    parser.add_argument("--artifacts", default=ARTIFACTS_PATH, help="Directorio de artefactos del servicio")
+    parser.add_argument("--activate", action="store_true", help="Marcar la versión como activa en CURRENT")
+    args = parser.parse_args()
+
+    origen = Path(args.source)
+    if not (origen / MODEL_NAME).exists() or not (origen / PREPROCESSOR_NAME).exists():
+        print(f"{origen} debe contener {MODEL_NAME} y {PREPROCESSOR_NAME}")
+        sys.exit(1)
+
+    registry = ModelRegistry(args.artifacts)
+    destino = registry.versions_dir / args.version
+    if destino.exists():
+        print(f"La versión {args.version} ya existe; las versiones publicadas no se modifican")
+        sys.exit(1)
+
+    # Copiar a un directorio temporal y renombrar: los workers nunca ven una versión a medias
+    temporal = registry.versions_dir / f".{args.version}.tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    temporal.mkdir(parents=True)
+    for nombre in ARTEFACTOS:
+        if (origen / nombre).exists():
+            shutil.copy2(origen / nombre, temporal / nombre)
+    temporal.rename(destino)
+    print(f"Versión {args.version} publicada en {destino}")
+
+    if args.activate:
+        registry.activate(args.version)
+        print(f"Versión {args.version} activada")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from app.core.config import ARTIFACTS_PATH, MODEL_NAME, NUMPY_MODEL_NAME
+from app.services.numpy_inference import NumpyDenseModel, export_keras_weights, quantize_weights, quantized_model_name
+
+def main():
+    """
+    Genera variantes float16/int8 de los pesos del modelo para el motor NumPy.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--artifacts", default=ARTIFACTS_PATH, help="Directorio de artefactos (o de una versión)")
+    parser.add_argument("--precision", nargs="+", choices=["float16", "int8"], default=["float16", "int8"])
+    parser.add_argument("--check-rows", type=int, default=1000, help="Filas aleatorias para medir la desviación")
+    args = parser.parse_args()
+
+    directorio = Path(args.artifacts)
+    original_path = directorio / NUMPY_MODEL_NAME
+    if not original_path.exists():
+        print(f"Exportando pesos desde {directorio / MODEL_NAME}...")
+        export_keras_weights(directorio / MODEL_NAME, original_path)
+    original = NumpyDenseModel.load(original_path)
+    x = np.random.default_rng(0).normal(size=(args.check_rows, original.input_dim)).astype(np.float32)
+    referencia = original.predict(x)[:, -1]
+    print(f"float32: {original.nbytes / 1024:.1f} KB en memoria, {original_path.stat().st_size / 1024:.1f} KB en disco")
+
+    for precision in args.precision:
+        ruta = quantize_weights(original_path, directorio / quantized_model_name(NUMPY_MODEL_NAME, precision), precision)
+        modelo = NumpyDenseModel.load(ruta)
+        diferencia = np.abs(modelo.predict(x)[:, -1] - referencia)
+        print(
+            f"{precision}: {modelo.nbytes / 1024:.1f} KB en memoria, {ruta.stat().st_size / 1024:.1f} KB en disco; "
+            f"desviación media {diferencia.mean():.2e}, máxima {diferencia.max():.2e} ({args.check_rows} filas)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from app.core.config import RESCORE_CHUNK_SIZE, RESCORE_HISTORY_EVENTS, RESCORE_WORKERS
+from app.services.batch_scoring import BatchScoringService
+
+def main():
+    """
+    Re-evalúa el riesgo de estrés de todos los estudiantes.
+
+    Pensado para ejecutarse de forma nocturna (cron) o tras desplegar un
+    modelo nuevo, por ejemplo:
+        0 2 * * * cd /app && python scripts/rescore_students.py
+    """
+    parser = argparse.ArgumentParser(description="Re-evalúa el riesgo de estrés de todos los estudiantes")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE, help="Estudiantes por bloque")
+    parser.add_argument("--workers", type=int, default=RESCORE_WORKERS, help="Procesos de inferencia (0 = proceso actual)")
+    parser.add_argument("--history-events", type=int, default=RESCORE_HISTORY_EVENTS, help="Eventos académicos recientes por estudiante")
+    parser.add_argument("--dry-run", action="store_true", help="Calcular sin escribir en la base de datos")
+    args = parser.parse_args()
+
+    servicio = BatchScoringService(
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        history_events=args.history_events,
+    )
+    resumen = servicio.run(dry_run=args.dry_run)
+    print(json.dumps(resumen, indent=2))
+
+if __name__ == "__main__":
+    main()
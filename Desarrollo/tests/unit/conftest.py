@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base, Institution, Student, User, UserRole
+from app.utils.query_counter import track_queries
+
+
+@pytest.fixture
+def engine():
+    """Base SQLite en memoria con el esquema de app.models, compartida entre hilos."""
+    motor = track_queries(
+        create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    )
+    Base.metadata.create_all(motor)
+    yield motor
+    motor.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as sesion:
+        yield sesion
+
+
+def crear_estudiantes(db: Session, cantidad: int, institucion_id: int = 1, programa: str = "Ingeniería") -> List[Student]:
+    """Crea una institución (si no existe) y `cantidad` estudiantes con su usuario."""
+    if db.get(Institution, institucion_id) is None:
+        db.add(Institution(id=institucion_id, nombre=f"Institución {institucion_id}", codigo=f"I{institucion_id}"))
+    inicio = db.query(Student).count() + 1
+    estudiantes = []
+    for estudiante_id in range(inicio, inicio + cantidad):
+        usuario = User(
+            email=f"estudiante{estudiante_id}@x.co",
+            hashed_password="x",
+            nombre=f"Estudiante {estudiante_id}",
+            rol=UserRole.STUDENT
+        )
+        estudiantes.append(Student(
+            id=estudiante_id,
+            usuario=usuario,
+            institucion_id=institucion_id,
+            programa=programa,
+            semestre=3
+        ))
+    db.add_all(estudiantes)
+    db.commit()
+    return estudiantes
+
+
+class ColaRegistrada:
+    """Sustituye a la cola de re-predicción y guarda los IDs encolados."""
+    def __init__(self):
+        self.encolados: List[int] = []
+
+    def enqueue(self, estudiante_id: int) -> bool:
+        self.encolados.append(estudiante_id)
+        return True
+
+    def enqueue_many(self, estudiante_ids) -> int:
+        self.encolados.extend(estudiante_ids)
+        return len(estudiante_ids)
+
+
+class ModeloFijo:
+    """Modelo tipo scikit-learn que predice siempre la misma probabilidad."""
+    def __init__(self, probabilidad: float):
+        self.probabilidad = probabilidad
+
+    def predict_proba(self, datos):
+        return np.tile([1.0 - self.probabilidad, self.probabilidad], (len(datos), 1))
+
+
+class PreprocesadorFijo:
+    def transform(self, datos):
+        return np.zeros((len(datos), 1))
+
+
+class RegistroFijo:
+    """Sustituye al registro de modelos, sin cargar artefactos."""
+    def __init__(self, probabilidad: float = 0.7, version: str = "v-test"):
+        self.artefactos = SimpleNamespace(model=ModeloFijo(probabilidad), preprocessor=PreprocesadorFijo(), version=version)
+
+    def get_artifacts(self):
+        return self.artefactos
+
+    def get(self):
+        return self.artefactos.model, self.artefactos.preprocessor
@@ -0,0 +1,140 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import ContactInfo, Institution, Student, StudentFeatures, StudentPersonalInfo
+from app.services.academic_data_service import AcademicDataService
+from app.services.feature_store import StudentFeatureStore
+from app.services.institution_config import institution_config_cache
+from tests.unit.conftest import ColaRegistrada, RegistroFijo, crear_estudiantes
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    institution_config_cache.clear()
+    yield
+    institution_config_cache.clear()
+
+
+def datos_personales(**cambios) -> StudentPersonalInfo:
+    datos = dict(
+        nombre="Ana", edad=20, fecha_nacimiento=datetime(2005, 1, 1), año_inscripcion=2023,
+        carrera="Ingeniería", semestre=3, medio_transporte="publico", situacion_familiar="separados",
+        contacto=ContactInfo(email="ana@x.co", telefono="300"),
+    )
+    datos.update(cambios)
+    return StudentPersonalInfo(**datos)
+
+
+def servicio(db, cola=None) -> AcademicDataService:
+    servicio = AcademicDataService(db, rescore=cola or ColaRegistrada())
+    servicio.prediccion_service.registry = RegistroFijo(0.7)
+    return servicio
+
+
+def test_registrar_evento_actualiza_agregados_y_encola(db):
+    crear_estudiantes(db, 1)
+    cola = ColaRegistrada()
+
+    assert servicio(db, cola).registrar_evento_academico(1, "CALIFICACION_FINAL", "Cálculo", 5.0)
+    assert servicio(db, cola).registrar_evento_academico(1, "RETIRO_CURSO", "Física")
+
+    fila = db.get(StudentFeatures, 1)
+    assert fila.eventos == 2
+    assert fila.eventos_recientes == [["CALIFICACION_FINAL", 5.0], ["RETIRO_CURSO", None]]
+    assert fila.materias_reprobadas == 1 and fila.materias_retiradas == 1
+    assert cola.encolados == [1, 1]
+    assert servicio(db, cola).registrar_evento_academico(99, "CALIFICACION_FINAL", "") is False
+
+
+def test_reconstruccion_concurrente_no_pierde_el_evento(engine, db, monkeypatch):
+    estudiante, = crear_estudiantes(db, 1)
+    otra = Session(engine)
+    tardia = StudentFeatureStore(otra)
+    bloquear = tardia._bloquear
+    lecturas = []
+
+    def bloquear_antes_del_commit_ajeno(ids):
+        # La primera lectura ocurre antes de que la otra transacción confirme su fila
+        lecturas.append(list(ids))
+        return {} if len(lecturas) == 1 else bloquear(ids)
+
+    monkeypatch.setattr(tardia, "_bloquear", bloquear_antes_del_commit_ajeno)
+
+    StudentFeatureStore(db).registrar_evento(estudiante, "CALIFICACION_FINAL", 8.0)
+    db.commit()
+    fila = tardia.registrar_evento(otra.get(Student, 1), "CALIFICACION_FINAL", 4.0)
+    otra.commit()
+
+    # El INSERT chocó con la fila existente: se usó ésa y se le aplicó el evento
+    assert len(lecturas) == 2
+    assert fila.eventos == 2 and fila.materias_reprobadas == 1
+    assert fila.gpa_actual == pytest.approx(1.6) and fila.gpa_anterior == pytest.approx(3.2)
+    otra.close()
+
+
+def test_recalcular_predicciones_evalua_todos_los_factores(db):
+    estudiantes = crear_estudiantes(db, 2)
+    institucion = db.get(Institution, 1)
+    institucion.configuracion = {
+        "umbral_carga_academica": 15,
+        "factores_adicionales": [
+            {"nombre": "Transporte público", "tipo": "personal", "campo": "medio_transporte",
+             "operador": "==", "valor": "publico"},
+            {"nombre": "Baja asistencia", "tipo": "academico", "campo": "asistencia_promedio",
+             "operador": "<", "valor": 70},
+        ],
+    }
+    db.commit()
+    store = StudentFeatureStore(db)
+    store.registrar_datos_reportados(estudiantes[0], {"creditos_actuales": 20, "asistencia_promedio": 60}, datos_personales())
+    store.registrar_datos_reportados(
+        estudiantes[1], {"creditos_actuales": 12, "asistencia_promedio": 90}, datos_personales(medio_transporte="propio", situacion_familiar="juntos")
+    )
+    db.commit()
+    assert "contacto" not in db.get(StudentFeatures, 1).datos_personales
+
+    assert servicio(db).recalcular_predicciones([1, 2]) == 2
+
+    primero, segundo = db.get(Student, 1), db.get(Student, 2)
+    assert primero.riesgo_estres == pytest.approx(0.7)
+    assert primero.factores_estres == [
+        "Alta carga académica", "Situación familiar compleja", "Transporte público", "Baja asistencia"
+    ]
+    assert segundo.factores_estres == []
+
+
+def test_las_reglas_se_evaluan_una_vez_por_institucion(db, monkeypatch):
+    from app.services.factor_rules import CompiledRuleSet
+
+    regla = {"nombre": "Transporte público", "tipo": "personal", "campo": "medio_transporte",
+             "operador": "==", "valor": "publico"}
+    crear_estudiantes(db, 3, institucion_id=1)
+    crear_estudiantes(db, 2, institucion_id=2)
+    for institucion_id in (1, 2):
+        db.get(Institution, institucion_id).configuracion = {"factores_adicionales": [regla]}
+    db.commit()
+    store = StudentFeatureStore(db)
+    for estudiante in db.query(Student).order_by(Student.id):
+        transporte = "publico" if estudiante.id % 2 else "propio"
+        store.registrar_datos_reportados(estudiante, {}, datos_personales(medio_transporte=transporte, situacion_familiar="juntos"))
+    db.commit()
+
+    lotes = []
+    factores = CompiledRuleSet.factores
+
+    def factores_registrando(self, academicos, personales, n):
+        lotes.append(n)
+        return factores(self, academicos, personales, n)
+
+    monkeypatch.setattr(CompiledRuleSet, "factores", factores_registrando)
+
+    assert servicio(db).recalcular_predicciones([5, 4, 3, 2, 1]) == 5
+
+    assert sorted(lotes) == [2, 3]
+    assert {e.id: e.factores_estres for e in db.query(Student)} == {
+        1: ["Transporte público"], 2: [], 3: ["Transporte público"], 4: [], 5: ["Transporte público"],
+    }
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.academic_event_stream import (
+    AcademicEventStreamParser,
+    DatosLMSFila,
+    ServiciosApoyoFila,
+    formato_desde_content_type,
+    resumen_errores,
+    validar_arreglo,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def leer(formato, contenido: bytes, tam_parte: int, **kwargs):
+    """Alimenta el lector en partes de `tam_parte` bytes, cortando líneas a la mitad."""
+    lector = AcademicEventStreamParser(formato, **kwargs)
+    filas = []
+    for inicio in range(0, len(contenido), tam_parte):
+        filas.extend(lector.feed(contenido[inicio:inicio + tam_parte]))
+    filas.extend(lector.close())
+    return lector, filas
+
+
+@pytest.mark.parametrize("tam_parte", [1, 7, 4096])
+def test_ndjson_por_partes_con_errores_por_linea(tam_parte):
+    contenido = (
+        b'{"estudiante_id": 1, "evento": "CALIFICACION_FINAL", "detalles": "Calculo", "promedio": 8.5}\n'
+        b'\n'
+        b'{"estudiante_id": "x", "evento": "CALIFICACION_FINAL"}\n'
+        b'{no es json}\n'
+        b'[1, 2]\n'
+        b'{"estudiante_id": 2, "evento": "RETIRO_CURSO", "fecha": "2025-06-30T10:00:00"}'
+    )
+
+    lector, filas = leer("ndjson", contenido, tam_parte)
+
+    assert [f.linea for f in filas] == [1, 3, 4, 5, 6]
+    assert lector.filas == 5
+    validas = [f for f in filas if f.fila is not None]
+    assert [f.fila.estudiante_id for f in validas] == [1, 2]
+    assert validas[0].fila.promedio == 8.5
+    assert validas[1].fila.detalles == "" and validas[1].fila.fecha == datetime(2025, 6, 30, 10)
+    errores = {f.linea: f.error for f in filas if f.error}
+    assert "estudiante_id" in errores[3]
+    assert errores[4].startswith("JSON inválido")
+    assert errores[5] == "Se esperaba un objeto JSON por línea"
+
+
+def test_csv_con_encabezado_y_celdas_vacias():
+    contenido = (
+        "\ufeffestudiante_id,Evento,detalles,promedio\r\n"
+        "1,CALIFICACION_FINAL,\"Álgebra, grupo 2\",4.5\r\n"
+        "2,RETIRO_CURSO,,\r\n"
+        "3,CALIFICACION_FINAL\r\n"
+        "4,,sin evento,7\r\n"
+    ).encode("utf-8")
+
+    _, filas = leer("csv", contenido, 5)
+
+    assert [f.linea for f in filas] == [2, 3, 4, 5]
+    assert filas[0].fila.detalles == "Álgebra, grupo 2" and filas[0].fila.promedio == 4.5
+    assert filas[1].fila.promedio is None and filas[1].fila.detalles == ""
+    assert filas[2].error == "Se esperaban 4 columnas, se recibieron 2"
+    assert filas[3].error.startswith("evento:")
+
+
+def test_formato_y_resumen_de_errores():
+    assert formato_desde_content_type("application/x-ndjson; charset=utf-8") == "ndjson"
+    assert formato_desde_content_type("text/csv") == "csv"
+    assert formato_desde_content_type("application/json") is None
+    with pytest.raises(ValueError):
+        AcademicEventStreamParser("xml")
+
+    _, filas = leer("ndjson", b"1\n2\n3\n", 100)
+    detalle, omitidos = resumen_errores(filas, limite=2)
+    assert [e["linea"] for e in detalle] == [1, 2] and omitidos == 1
+
+
+def test_csv_de_servicios_separa_la_lista_por_punto_y_coma():
+    contenido = (
+        b"estudiante_id,servicios_utilizados\n"
+        b"1,tutoria; psicologia\n"
+        b"2,\n"
+    )
+
+    _, filas = leer("csv", contenido, 3, modelo=ServiciosApoyoFila)
+
+    assert filas[0].fila.servicios_utilizados == ["tutoria", "psicologia"]
+    assert filas[1].fila.servicios_utilizados == []
+
+
+def test_arreglo_json_de_datos_lms():
+    filas = validar_arreglo(
+        [{"estudiante_id": 1, "horas_actividad_semanal": 6.5}, {"estudiante_id": 2, "horas_actividad_semanal": -1}, 3],
+        DatosLMSFila
+    )
+
+    assert [f.linea for f in filas] == [1, 2, 3]
+    assert filas[0].fila.horas_actividad_semanal == 6.5
+    assert filas[1].error.startswith("horas_actividad_semanal:")
+    assert filas[2].error == "Se esperaba un objeto JSON por línea"
+    with pytest.raises(ValueError):
+        validar_arreglo({"estudiante_id": 1}, DatosLMSFila)
@@ -0,0 +1,81 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.config import ARTIFACTS_PATH, COMPILED_PREPROCESSOR_NAME
+from app.services.attribution import AttributionEngine, AttributionUnavailableError, IntegratedGradients
+from app.services.compiled_preprocessor import CompiledPreprocessor
+from app.services.numpy_inference import NumpyDenseModel
+from app.services.prediction import predict_columns
+from benchmarks.synthetic import generate_students
+
+COMPILED_PATH = Path(ARTIFACTS_PATH) / COMPILED_PREPROCESSOR_NAME
+
+pytestmark = pytest.mark.unit
+
+
+def modelo_aleatorio(input_dim: int, seed: int = 0) -> NumpyDenseModel:
+    rng = np.random.default_rng(seed)
+    dims = [input_dim, 16, 8, 1]
+    activaciones = ["relu", "tanh", "sigmoid"]
+    return NumpyDenseModel([
+        (
+            rng.normal(scale=0.5, size=(entrada, salida)).astype(np.float32),
+            rng.normal(scale=0.1, size=salida).astype(np.float32),
+            activacion,
+        )
+        for entrada, salida, activacion in zip(dims[:-1], dims[1:], activaciones)
+    ])
+
+
+def test_completitud_y_probabilidad_del_modelo():
+    modelo = modelo_aleatorio(6)
+    x = np.random.default_rng(1).normal(size=(40, 6)).astype(np.float32)
+    ig = IntegratedGradients(modelo.layers, steps=256)
+
+    probabilidades, atribuciones = ig.attribute(x)
+
+    np.testing.assert_allclose(probabilidades, modelo.predict(x)[:, 0], rtol=1e-6)
+    # Las contribuciones suman probabilidad - base (salvo error de integración)
+    np.testing.assert_allclose(atribuciones.sum(axis=1), probabilidades - ig.base_probability, atol=5e-3)
+
+
+def test_lotes_partidos_dan_el_mismo_resultado():
+    modelo = modelo_aleatorio(6)
+    x = np.random.default_rng(2).normal(size=(25, 6)).astype(np.float32)
+
+    completo = IntegratedGradients(modelo.layers, steps=8).attribute(x)
+    partido = IntegratedGradients(modelo.layers, steps=8, max_rows=20).attribute(x)
+
+    for a, b in zip(completo, partido):
+        np.testing.assert_allclose(a, b, rtol=1e-5, atol=1e-7)
+
+
+def test_modelo_no_soportado():
+    artefactos = SimpleNamespace(version="v1", model=object(), preprocessor=None)
+    with pytest.raises(AttributionUnavailableError):
+        AttributionEngine().global_importance(artefactos)
+
+
+@pytest.mark.skipif(not COMPILED_PATH.exists(), reason="El preprocesador compilado no está disponible")
+def test_explicacion_agrupa_categoricas_e_importancia_en_cache():
+    preprocesador = CompiledPreprocessor.load(COMPILED_PATH)
+    n_features = len(preprocesador.num_columns) + sum(len(c) for c in preprocesador.categories)
+    artefactos = SimpleNamespace(version="v1", model=modelo_aleatorio(n_features), preprocessor=preprocesador)
+    columnas = generate_students(12, support_as_category=True)
+    motor = AttributionEngine(steps=16)
+
+    probabilidades, explicaciones = motor.explain(artefactos, columnas)
+
+    np.testing.assert_allclose(probabilidades, predict_columns(artefactos.model, preprocesador, columnas), rtol=1e-6)
+    nombres = list(preprocesador.num_columns) + list(preprocesador.cat_columns)
+    for explicacion in explicaciones:
+        contribuciones = list(explicacion["contributions"].values())
+        assert sorted(explicacion["contributions"]) == sorted(nombres)
+        assert contribuciones == sorted(contribuciones, key=abs, reverse=True)
+
+    importancia = motor.global_importance(artefactos)
+    assert sum(importancia.values()) == pytest.approx(1.0, abs=1e-4)
+    assert motor.global_importance(artefactos) is importancia
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+import pytest
+
+from app.models import User, UserRole
+from app.services.auth_service import AuthService
+from tests.unit.conftest import crear_estudiantes
+
+pytestmark = [pytest.mark.unit, pytest.mark.auth]
+
+
+def test_token_de_acceso_y_usuario_actual(db):
+    estudiante, = crear_estudiantes(db, 1)
+    servicio = AuthService(db)
+
+    token = servicio.create_access_token({"sub": str(estudiante.usuario.id), "rol": "student"})
+
+    assert servicio.verify_token(token)["rol"] == "student"
+    assert servicio.get_current_user(token).email == "estudiante1@x.co"
+
+
+def test_tokens_invalidos(db):
+    servicio = AuthService(db)
+    caducado = servicio.create_access_token({"sub": "1"}, expires_delta=timedelta(minutes=-1))
+    sin_usuario = servicio.create_access_token({"rol": "admin"})
+
+    assert servicio.verify_token(caducado) is None
+    assert servicio.verify_token("no-es-un-token") is None
+    assert servicio.get_current_user(caducado) is None
+    assert servicio.get_current_user(sin_usuario) is None
+
+
+def test_autenticar_usuario_inexistente(db):
+    assert AuthService(db).authenticate_user("nadie@x.co", "clave") is None
+
+
+def test_check_permissions():
+    admin = User(email="a@x.co", hashed_password="x", nombre="A", rol=UserRole.ADMIN)
+
+    assert AuthService(None).check_permissions(admin, UserRole.ADMIN)
+    assert not AuthService(None).check_permissions(admin, UserRole.STUDENT)
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import AcademicHistory, Student, StressPrediction
+from app.services import batch_scoring
+from app.services.batch_scoring import BatchScoringService
+from tests.unit.conftest import RegistroFijo, crear_estudiantes
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def columnas_evaluadas(monkeypatch):
+    bloques = []
+    score_columns = batch_scoring.score_columns
+
+    def registrar(columnas, registry=None):
+        bloques.append(columnas)
+        return score_columns(columnas, registry=registry)
+
+    monkeypatch.setattr(batch_scoring, "score_columns", registrar)
+    return bloques
+
+
+def servicio(engine, **kwargs) -> BatchScoringService:
+    return BatchScoringService(
+        session_factory=lambda: Session(engine),
+        workers=0,
+        registry=RegistroFijo(0.7, version="v-lote"),
+        **kwargs
+    )
+
+
+def test_reevalua_a_todos_los_estudiantes_por_bloques(engine, db, columnas_evaluadas):
+    crear_estudiantes(db, 5)
+    db.get(Student, 2).riesgo_desercion = 0.4
+    db.get(Student, 2).factores_estres = ["Alta carga académica"]
+    inicio = datetime(2025, 3, 1)
+    # Estudiante 1: dos reprobadas antiguas fuera de la ventana y dos eventos recientes
+    for dias, evento, promedio in [(0, "CALIFICACION_FINAL", 4.0), (1, "CALIFICACION_FINAL", 5.0),
+                                   (2, "RETIRO_CURSO", None), (3, "CALIFICACION_FINAL", 9.0)]:
+        db.add(AcademicHistory(estudiante_id=1, fecha=inicio + timedelta(days=dias), evento=evento, promedio=promedio))
+    db.commit()
+
+    resumen = servicio(engine, chunk_size=2, history_events=2).run()
+
+    assert resumen["students"] == 5 and resumen["chunks"] == 3
+    primero = columnas_evaluadas[0]
+    np.testing.assert_array_equal(primero["number_of_failed_courses_current_semester"], [0, 0])
+    np.testing.assert_array_equal(primero["number_of_course_withdrawals_current_semester"], [1, 0])
+    np.testing.assert_allclose(primero["gpa_current_semester"], [3.6, np.nan])
+
+    db.expire_all()
+    assert [e.riesgo_estres for e in db.query(Student).order_by(Student.id)] == pytest.approx([0.7] * 5)
+    predicciones = {p.estudiante_id: p for p in db.query(StressPrediction)}
+    assert len(predicciones) == 5
+    assert predicciones[2].probabilidad_abandono == 0.4
+    assert predicciones[2].factores_riesgo == ["Alta carga académica"]
+    assert {p.version_modelo for p in predicciones.values()} == {"v-lote"}
+
+
+def test_dry_run_no_escribe(engine, db):
+    crear_estudiantes(db, 3)
+
+    resumen = servicio(engine, chunk_size=10).run(dry_run=True)
+
+    assert resumen["students"] == 3 and resumen["dry_run"]
+    assert db.query(StressPrediction).count() == 0
+    assert all(e.riesgo_estres == 0.0 for e in db.query(Student))
+
+
+def test_chunk_size_invalido():
+    with pytest.raises(ValueError):
+        BatchScoringService(chunk_size=0)
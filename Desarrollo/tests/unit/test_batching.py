@@ -0,0 +1,106 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.batching import MicroBatcher
+
+
+class ModeloFalso:
+    """Modelo que suma las columnas de cada fila y registra los lotes recibidos."""
+    def __init__(self):
+        self.lotes = []
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        self.lotes.append(len(batch))
+        return batch.sum(axis=1, keepdims=True)
+
+
+@pytest.mark.unit
+async def test_agrupa_peticiones_concurrentes_en_un_lote():
+    modelo = ModeloFalso()
+    batcher = MicroBatcher(modelo, max_batch_size=8, max_wait_ms=50)
+
+    filas = [np.full((1, 3), i, dtype=float) for i in range(5)]
+    resultados = await asyncio.gather(*(batcher.submit(f) for f in filas))
+    await batcher.stop()
+
+    assert modelo.lotes == [5]
+    for i, resultado in enumerate(resultados):
+        assert resultado.shape == (1, 1)
+        assert resultado[0, 0] == 3 * i
+
+
+@pytest.mark.unit
+async def test_respeta_el_tamano_maximo_de_lote():
+    modelo = ModeloFalso()
+    batcher = MicroBatcher(modelo, max_batch_size=2, max_wait_ms=50)
+
+    await asyncio.gather(*(batcher.submit(np.ones(3)) for _ in range(5)))
+    stats = batcher.stats()
+    await batcher.stop()
+
+    assert all(tamano <= 2 for tamano in modelo.lotes)
+    assert sum(modelo.lotes) == 5
+    assert stats["batch_size"]["count"] == len(modelo.lotes)
+    assert stats["queue_wait_ms"]["count"] == 5
+
+
+@pytest.mark.unit
+async def test_propaga_errores_a_todos_los_llamadores():
+    def modelo_roto(batch):
+        raise ValueError("fallo de inferencia")
+
+    batcher = MicroBatcher(modelo_roto, max_batch_size=4, max_wait_ms=10)
+    resultados = await asyncio.gather(
+        batcher.submit(np.ones(2)), batcher.submit(np.ones(2)), return_exceptions=True
+    )
+    await batcher.stop()
+
+    assert all(isinstance(r, ValueError) for r in resultados)
+
+
+@pytest.mark.unit
+async def test_filas_de_otro_ancho_no_afectan_al_resto_del_lote():
+    modelo = ModeloFalso()
+
+    def predecir(batch):
+        if batch.shape[1] != 3:
+            raise ValueError(f"se esperaban 3 columnas, no {batch.shape[1]}")
+        return modelo(batch)
+
+    batcher = MicroBatcher(predecir, max_batch_size=8, max_wait_ms=50)
+    resultados = await asyncio.gather(
+        batcher.submit(np.ones(3)),
+        batcher.submit(np.ones(4)),
+        batcher.submit(np.ones(3)),
+        return_exceptions=True,
+    )
+    siguiente = await asyncio.wait_for(batcher.submit(np.ones(3)), timeout=1)
+    await batcher.stop()
+
+    assert resultados[0][0, 0] == resultados[2][0, 0] == 3
+    assert isinstance(resultados[1], ValueError)
+    assert siguiente[0, 0] == 3 and modelo.lotes == [2, 1]
+
+
+@pytest.mark.unit
+async def test_un_lote_defectuoso_no_detiene_el_despacho(monkeypatch):
+    batcher = MicroBatcher(ModeloFalso(), max_batch_size=8, max_wait_ms=10)
+    observar = batcher.queue_wait_histogram.observe_many
+    llamadas = []
+
+    def falla_una_vez(valores):
+        llamadas.append(valores)
+        if len(llamadas) == 1:
+            raise RuntimeError("histograma roto")
+        observar(valores)
+
+    monkeypatch.setattr(batcher.queue_wait_histogram, "observe_many", falla_una_vez)
+
+    with pytest.raises(RuntimeError, match="histograma roto"):
+        await asyncio.wait_for(batcher.submit(np.ones(3)), timeout=1)
+    resultado = await asyncio.wait_for(batcher.submit(np.ones(3)), timeout=1)
+    await batcher.stop()
+
+    assert resultado[0, 0] == 3
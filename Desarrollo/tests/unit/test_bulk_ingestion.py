@@ -0,0 +1,218 @@
+import asyncio
+import csv
+import io
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.executors import ExecutorSaturatedError
+from app.models import AcademicHistory, StudentFeatures
+from app.services import bulk_ingestion
+from app.services.bulk_ingestion import BulkAcademicEventLoader, BulkLoader
+from app.services.feature_store import StudentFeatureStore
+from app.utils.query_counter import count_queries
+from tests.unit.conftest import ColaRegistrada, crear_estudiantes
+
+pytestmark = pytest.mark.unit
+
+
+async def partes(contenido: bytes, tam: int):
+    for inicio in range(0, len(contenido), tam):
+        yield contenido[inicio:inicio + tam]
+
+
+def cargar(loader, contenido: bytes, formato: str = "ndjson", tam: int = 64):
+    return asyncio.run(loader.cargar_stream(partes(contenido, tam), formato))
+
+
+def test_bulk_loader_es_abstracto(db):
+    with pytest.raises(TypeError):
+        BulkLoader(db)
+
+
+def test_carga_ndjson_inserta_actualiza_features_y_encola(db):
+    crear_estudiantes(db, 3)
+    cola = ColaRegistrada()
+    loader = BulkAcademicEventLoader(db, chunk_size=2, rescore=cola)
+    contenido = (
+        b'{"estudiante_id": 1, "evento": "CALIFICACION_FINAL", "promedio": 8.0, "fecha": "2025-03-01T10:00:00"}\n'
+        b'{"estudiante_id": 1, "evento": "CALIFICACION_FINAL", "promedio": 5.0, "fecha": "2025-03-02T10:00:00"}\n'
+        b'{"estudiante_id": 2, "evento": "RETIRO_CURSO"}\n'
+        b'{"estudiante_id": 99, "evento": "CALIFICACION_FINAL", "promedio": 7.0}\n'
+        b'{"estudiante_id": "x"}\n'
+    )
+
+    reporte = cargar(loader, contenido)
+
+    assert reporte["filas"] == 5
+    assert reporte["insertadas"] == 3
+    assert reporte["rechazadas"] == 2
+    assert reporte["estudiantes_afectados"] == 2
+    errores = {e["linea"]: e["error"] for e in reporte["errores"]}
+    assert "99" in errores[4] and "estudiante_id" in errores[5]
+    assert sorted(cola.encolados) == [1, 2]
+
+    assert db.query(AcademicHistory).count() == 3
+    # El evento sin fecha se registra con la hora de la carga
+    retiro = db.query(AcademicHistory).filter(AcademicHistory.estudiante_id == 2).one()
+    assert retiro.fecha == loader.fecha_carga and retiro.detalles == ""
+
+    features = db.get(StudentFeatures, 1)
+    assert features.eventos == 2
+    assert features.gpa_actual == pytest.approx(2.0) and features.gpa_anterior == pytest.approx(3.2)
+    assert features.entrada["program_major"] == "Ingeniería"
+    assert db.get(StudentFeatures, 2).materias_retiradas == 1
+
+
+def test_carga_csv_valida_ids_con_una_consulta_por_bloque(db):
+    crear_estudiantes(db, 4)
+    loader = BulkAcademicEventLoader(db, chunk_size=100, rescore=ColaRegistrada())
+    contenido = "estudiante_id,evento,detalles,promedio\n" + "".join(
+        f"{i % 4 + 1},CALIFICACION_FINAL,Materia {i},7.5\n" for i in range(40)
+    )
+
+    with count_queries() as stats:
+        reporte = cargar(loader, contenido.encode(), formato="csv", tam=128)
+
+    assert reporte["insertadas"] == 40
+    # Sin N+1: ninguna consulta se repite por fila o por estudiante (los
+    # agregados de los estudiantes nuevos se reconstruyen con una sola lectura)
+    assert not any(sql.lstrip().startswith("SELECT") for sql in stats.repeated(2))
+    assert db.query(AcademicHistory).count() == 40
+    assert db.get(StudentFeatures, 3).eventos == 10
+
+
+def test_un_bloque_que_falla_se_revierte_y_se_reporta(db, monkeypatch):
+    crear_estudiantes(db, 2)
+    loader = BulkAcademicEventLoader(db, chunk_size=1, rescore=ColaRegistrada())
+    llamadas = []
+
+    def insertar(registros):
+        llamadas.append(registros)
+        if len(llamadas) == 1:
+            raise RuntimeError("disco lleno")
+        BulkAcademicEventLoader._insertar(loader, registros)
+
+    monkeypatch.setattr(loader, "_insertar", insertar)
+    reporte = cargar(
+        loader,
+        b'{"estudiante_id": 1, "evento": "A", "promedio": 9}\n{"estudiante_id": 2, "evento": "B", "promedio": 9}\n'
+    )
+
+    assert reporte["insertadas"] == 1 and reporte["rechazadas"] == 1
+    assert "disco lleno" in reporte["errores"][0]["error"]
+    # El bloque fallido no deja eventos ni agregados a medias
+    assert [h.estudiante_id for h in db.query(AcademicHistory)] == [2]
+    assert db.get(StudentFeatures, 1) is None
+
+
+def test_carga_interrumpida_encola_los_bloques_ya_guardados(db, monkeypatch):
+    crear_estudiantes(db, 3)
+    cola = ColaRegistrada()
+    loader = BulkAcademicEventLoader(db, chunk_size=1, rescore=cola)
+    ejecutar = bulk_ingestion.db_executor.run
+    llamadas = []
+
+    async def run(func, *args):
+        llamadas.append(args)
+        if len(llamadas) == 3:
+            raise ExecutorSaturatedError("db")
+        return await ejecutar(func, *args)
+
+    monkeypatch.setattr(bulk_ingestion.db_executor, "run", run)
+    contenido = b"".join(
+        f'{{"estudiante_id": {i}, "evento": "CALIFICACION_FINAL", "promedio": 8.0}}\n'.encode() for i in (1, 2, 3)
+    )
+
+    with pytest.raises(ExecutorSaturatedError):
+        cargar(loader, contenido)
+
+    # Los dos bloques confirmados se re-predicen, una vez por estudiante
+    assert cola.encolados == [1, 2]
+    assert db.query(AcademicHistory).count() == 2
+    assert loader.finalizar()["estudiantes_afectados"] == 2
+    assert cola.encolados == [1, 2]
+
+
+def test_los_errores_guardados_no_superan_max_errors(db):
+    crear_estudiantes(db, 1)
+    loader = BulkAcademicEventLoader(db, chunk_size=3, max_errors=2, rescore=ColaRegistrada())
+    contenido = b'{"estudiante_id": 1, "evento": "A", "promedio": 9}\n' + b"".join(
+        f'{{"estudiante_id": {100 + i}, "evento": "A"}}\n'.encode() for i in range(9)
+    )
+    maximo = []
+    cargar_bloque = loader.cargar_bloque
+
+    def medir(filas):
+        aplicadas = cargar_bloque(filas)
+        maximo.append(len(loader.errores))
+        return aplicadas
+
+    loader.cargar_bloque = medir
+    reporte = cargar(loader, contenido)
+
+    assert reporte["insertadas"] == 1 and reporte["rechazadas"] == 9
+    assert [e["linea"] for e in reporte["errores"]] == [2, 3]
+    assert reporte["errores_omitidos"] == 7
+    # Como mucho un bloque de errores además de los `max_errors` ya guardados
+    assert max(maximo) <= 2 + loader.chunk_size
+    assert len(loader.errores) == 2
+
+
+def test_copy_en_postgresql_escribe_csv_en_la_misma_conexion():
+    copiado = {}
+
+    class Cursor:
+        def copy_expert(self, sql, buffer):
+            copiado["sql"] = sql
+            copiado["filas"] = list(csv.reader(io.StringIO(buffer.read())))
+
+        def close(self):
+            copiado["cerrado"] = True
+
+    conexion = SimpleNamespace(connection=SimpleNamespace(cursor=Cursor))
+    sesion = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        flush=lambda: copiado.setdefault("flush", True),
+        connection=lambda: conexion,
+    )
+    loader = BulkAcademicEventLoader.__new__(BulkAcademicEventLoader)
+    loader.db = sesion
+
+    loader._insertar([
+        {"estudiante_id": 1, "fecha": datetime(2025, 3, 1, 10), "evento": "CALIFICACION_FINAL",
+         "detalles": 'Álgebra, "grupo" 2', "promedio": 8.25},
+        {"estudiante_id": 2, "fecha": datetime(2025, 3, 2), "evento": "RETIRO_CURSO", "detalles": "", "promedio": None},
+    ])
+
+    assert copiado["flush"] and copiado["cerrado"]
+    assert copiado["sql"].startswith("COPY academic_history (estudiante_id, fecha, evento, detalles, promedio)")
+    assert copiado["filas"] == [
+        ["1", "2025-03-01T10:00:00", "CALIFICACION_FINAL", 'Álgebra, "grupo" 2', "8.25"],
+        ["2", "2025-03-02T00:00:00", "RETIRO_CURSO", "", ""],
+    ]
+
+
+def test_feature_store_reconstruye_desde_el_historial(db):
+    estudiante, = crear_estudiantes(db, 1)
+    db.add_all([
+        AcademicHistory(estudiante_id=1, fecha=datetime(2025, 1, 1), evento="CALIFICACION_FINAL", promedio=4.0),
+        AcademicHistory(estudiante_id=1, fecha=datetime(2025, 2, 1), evento="RETIRO_CURSO"),
+    ])
+    db.commit()
+    store = StudentFeatureStore(db)
+
+    fila = store.registrar_evento(estudiante, "CALIFICACION_FINAL", 9.0)
+    db.commit()
+
+    assert fila.eventos == 3
+    assert fila.materias_reprobadas == 1 and fila.materias_retiradas == 1
+    assert fila.gpa_actual == pytest.approx(3.6) and fila.gpa_anterior is None
+
+    store.actualizar_lms(estudiante, 12.5)
+    store.actualizar_servicios_apoyo(estudiante, ["tutoria", "psicologia"])
+    db.commit()
+    entrada = db.get(StudentFeatures, 1).entrada
+    assert entrada["lms_activity_weekly_hours_avg_last_month"] == 12.5
+    assert entrada["support_service_use_last_month"] == 2
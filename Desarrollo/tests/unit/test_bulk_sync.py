@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.orm import Session
+
+from app.api.routes import academic_data
+from app.database import get_db
+from app.models import Student, StudentFeatures
+from app.services import bulk_ingestion
+from app.services.feature_store import StudentFeatureStore
+from app.utils.query_counter import count_queries
+from tests.unit.conftest import ColaRegistrada, crear_estudiantes
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def cola(monkeypatch):
+    cola = ColaRegistrada()
+    monkeypatch.setattr(bulk_ingestion, "rescore_queue", cola)
+    return cola
+
+
+@pytest.fixture
+def cliente(engine):
+    app = FastAPI()
+    app.include_router(academic_data.router)
+
+    def sesion():
+        with Session(engine) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = sesion
+
+    def post(url, **kwargs):
+        async def pedir():
+            transporte = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://test") as c:
+                return await c.post(url, **kwargs)
+        return asyncio.run(pedir())
+
+    return post
+
+
+def test_actualizar_en_bloque_con_executemany(db):
+    crear_estudiantes(db, 3)
+    store = StudentFeatureStore(db)
+    store.actualizar_lms(db.get(Student, 1), 1.0)
+    db.commit()
+
+    with count_queries() as stats:
+        actualizados = store.actualizar_en_bloque("lms_horas_semanales", {1: 7.5, 2: 3.0, 42: 9.0})
+        db.commit()
+
+    # El 42 no existe; el 2 no tenía fila y se reconstruye
+    assert actualizados == {1, 2}
+    assert db.get(StudentFeatures, 1).lms_horas_semanales == 7.5
+    assert db.get(StudentFeatures, 1).entrada["lms_activity_weekly_hours_avg_last_month"] == 7.5
+    assert db.get(StudentFeatures, 2).lms_horas_semanales == 3.0
+    assert db.get(StudentFeatures, 3) is None
+    assert stats.repeated(2) == {}
+
+
+def test_actualizar_en_bloque_recalcula_la_entrada_con_las_filas_bloqueadas(engine, db, monkeypatch):
+    crear_estudiantes(db, 2)
+    store = StudentFeatureStore(db)
+    for estudiante_id in (1, 2):
+        store.registrar_evento(db.get(Student, estudiante_id), "CALIFICACION_FINAL", 8.0)
+    db.commit()
+    bloquear = store._bloquear
+    bloqueadas = []
+
+    def evento_concurrente(ids):
+        # Otro worker confirma un evento justo antes de que se concedan los bloqueos
+        with Session(engine) as otra:
+            StudentFeatureStore(otra).registrar_evento(otra.get(Student, 1), "CALIFICACION_FINAL", 4.0)
+            otra.commit()
+        bloqueadas.append(sorted(ids))
+        return bloquear(ids)
+
+    monkeypatch.setattr(store, "_bloquear", evento_concurrente)
+    store.actualizar_en_bloque("lms_horas_semanales", {1: 5.0, 2: 6.0})
+    db.commit()
+
+    assert bloqueadas == [[1, 2]]
+    fila = db.get(StudentFeatures, 1)
+    assert fila.eventos == 2 and fila.lms_horas_semanales == 5.0
+    # La entrada reescrita conserva el evento concurrente
+    assert fila.entrada["gpa_current_semester"] == pytest.approx(1.6)
+    assert fila.entrada["lms_activity_weekly_hours_avg_last_month"] == 5.0
+
+
+def test_actualizar_en_bloque_rechaza_campos_no_sincronizables(db):
+    with pytest.raises(ValueError):
+        StudentFeatureStore(db).actualizar_en_bloque("gpa_actual", {1: 4.0})
+    assert StudentFeatureStore(db).actualizar_en_bloque("lms_horas_semanales", {}) == set()
+
+
+def test_lote_lms_json_con_ids_desconocidos_y_repetidos(engine, db, cliente, cola):
+    crear_estudiantes(db, 2)
+
+    respuesta = cliente("/academic-data/datos-lms/lote", json=[
+        {"estudiante_id": 1, "horas_actividad_semanal": 4},
+        {"estudiante_id": 1, "horas_actividad_semanal": 6},
+        {"estudiante_id": 2, "horas_actividad_semanal": -1},
+        {"estudiante_id": 77, "horas_actividad_semanal": 2},
+    ])
+
+    assert respuesta.status_code == 200
+    reporte = respuesta.json()
+    assert reporte["actualizadas"] == 2
+    assert reporte["rechazadas"] == 2
+    errores = {e["linea"]: e["error"] for e in reporte["errores"]}
+    assert "horas_actividad_semanal" in errores[3]
+    assert "77" in errores[4]
+    assert cola.encolados == [1]
+    # Con IDs repetidos vale la última fila
+    db.expire_all()
+    assert db.get(StudentFeatures, 1).lms_horas_semanales == 6
+
+
+def test_lote_servicios_apoyo_csv(db, cliente, cola):
+    crear_estudiantes(db, 3)
+
+    respuesta = cliente(
+        "/academic-data/servicios-apoyo/lote",
+        content=b"estudiante_id,servicios_utilizados\n1,tutoria;psicologia\n3,\nx,tutoria\n",
+        headers={"content-type": "text/csv"},
+    )
+
+    reporte = respuesta.json()
+    assert reporte["actualizadas"] == 2 and reporte["rechazadas"] == 1
+    assert sorted(cola.encolados) == [1, 3]
+    db.expire_all()
+    assert db.get(StudentFeatures, 1).servicios_apoyo_mes == 2
+    assert db.get(StudentFeatures, 3).servicios_apoyo_mes == 0
+
+
+def test_lote_con_formato_no_soportado(cliente, cola):
+    respuesta = cliente("/academic-data/datos-lms/lote", content=b"<xml/>", headers={"content-type": "text/xml"})
+
+    assert respuesta.status_code == 415
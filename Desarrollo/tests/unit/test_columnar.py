@@ -0,0 +1,57 @@
+import pytest
+
+from app.services.columnar import FIELD_NAMES, validate_columns
+
+FILA_VALIDA = {
+    "gender": "Female",
+    "year_of_study": 2,
+    "program_major": "Computer Science",
+    "credit_load": 15,
+    "gpa_previous_semester": 3.5,
+    "gpa_current_semester": 3.2,
+    "number_of_failed_courses_current_semester": 0,
+    "number_of_course_withdrawals_current_semester": 1,
+    "entrance_exam_score_percentile": 85.5,
+    "lms_activity_weekly_hours_avg_last_month": 10.2,
+    "support_service_use_last_month": 1,
+    "edad": 20,
+}
+
+
+def columnas(n=3, **reemplazos):
+    datos = {campo: [valor] * n for campo, valor in FILA_VALIDA.items()}
+    for campo, valores in reemplazos.items():
+        datos[campo] = valores
+    return datos
+
+
+@pytest.mark.unit
+def test_lote_valido_no_reporta_errores():
+    salida, validas, errores = validate_columns(columnas())
+
+    assert validas.all()
+    assert errores == []
+    assert set(salida) == set(FIELD_NAMES)
+
+
+@pytest.mark.unit
+def test_errores_por_fila_sin_invalidar_el_lote():
+    _, validas, errores = validate_columns(columnas(
+        gender=["Female", "Other", "Male"],
+        gpa_current_semester=[3.0, 2.0, 4.5],
+        credit_load=[15, 15.5, None],
+    ))
+
+    assert validas.tolist() == [True, False, False]
+    assert {(e["row"], e["field"]) for e in errores} == {
+        (1, "gender"),
+        (1, "credit_load"),
+        (2, "gpa_current_semester"),
+        (2, "credit_load"),
+    }
+
+
+@pytest.mark.unit
+def test_longitudes_distintas_es_error_estructural():
+    with pytest.raises(ValueError):
+        validate_columns(columnas(edad=[20]))
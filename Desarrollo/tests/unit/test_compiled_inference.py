@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.config import ARTIFACTS_PATH, MODEL_NAME
+from app.services.compiled_inference import BucketedPredictor, compile_keras_model
+
+KERAS_PATH = Path(ARTIFACTS_PATH) / MODEL_NAME
+
+
+class FuncionRegistrada:
+    """Suma las características de cada fila y registra las formas recibidas."""
+    def __init__(self):
+        self.formas = []
+
+    def __call__(self, x):
+        self.formas.append(x.shape)
+        return x.sum(axis=1, keepdims=True)
+
+
+@pytest.mark.unit
+def test_rellena_hasta_el_bucket_y_divide_lotes_grandes():
+    funcion = FuncionRegistrada()
+    predictor = BucketedPredictor(funcion, input_dim=3, output_dim=1, buckets=(1, 4, 8))
+    x = np.arange(30, dtype=np.float32).reshape(10, 3)
+
+    np.testing.assert_allclose(predictor.predict(x[:3]), x[:3].sum(axis=1, keepdims=True))
+    np.testing.assert_allclose(predictor.predict(x), x.sum(axis=1, keepdims=True))
+
+    assert funcion.formas == [(4, 3), (8, 3), (4, 3)]
+    assert predictor.predict(np.empty((0, 3))).shape == (0, 1)
+
+
+@pytest.mark.unit
+def test_warmup_evalua_cada_bucket():
+    funcion = FuncionRegistrada()
+    predictor = BucketedPredictor(funcion, input_dim=2, output_dim=1, buckets=(8, 1, 4))
+
+    assert list(predictor.warmup()) == [1, 4, 8]
+    assert funcion.formas == [(1, 2), (4, 2), (8, 2)]
+
+
+@pytest.mark.ml
+@pytest.mark.skipif(not KERAS_PATH.exists(), reason="El artefacto .keras no está disponible")
+def test_keras_compilado_no_vuelve_a_trazar():
+    tf = pytest.importorskip("tensorflow")
+    modelo = tf.keras.models.load_model(str(KERAS_PATH))
+    predictor = compile_keras_model(modelo, buckets=(1, 8, 32))
+    predictor.warmup()
+
+    rng = np.random.default_rng(0)
+    for n in (1, 3, 8, 20, 50):
+        x = rng.normal(size=(n, predictor.input_dim)).astype(np.float32)
+        np.testing.assert_allclose(predictor.predict(x), modelo.predict(x, verbose=0), atol=1e-5)
+
+    # La firma fija produce una única traza para todos los tamaños de lote
+    assert predictor.predict_fn.experimental_get_tracing_count() == 1
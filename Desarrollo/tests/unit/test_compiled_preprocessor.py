@@ -0,0 +1,110 @@
+"""
+Arnés de equivalencia: el preprocesador compilado debe reproducir exactamente
+`preprocessor_final.joblib.transform`, incluidos valores faltantes, categorías
+desconocidas y lotes de un solo estudiante.
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.config import ARTIFACTS_PATH, PREPROCESSOR_NAME
+from app.services.compiled_preprocessor import CompiledPreprocessor, compile_preprocessor
+from benchmarks.synthetic import generate_students, to_records
+
+PREPROCESSOR_PATH = Path(ARTIFACTS_PATH) / PREPROCESSOR_NAME
+
+pytestmark = [
+    pytest.mark.ml,
+    pytest.mark.skipif(not PREPROCESSOR_PATH.exists(), reason="El preprocesador joblib no está disponible"),
+]
+
+
+@pytest.fixture(scope="module")
+def original():
+    pytest.importorskip("sklearn")
+    from app.services.model_registry import load_sklearn_preprocessor
+    return load_sklearn_preprocessor(PREPROCESSOR_PATH)
+
+
+@pytest.fixture(scope="module")
+def compilado(original):
+    return compile_preprocessor(original)
+
+
+def dataframe(columnas):
+    pd = pytest.importorskip("pandas")
+    return pd.DataFrame({k: list(v) for k, v in columnas.items()})
+
+
+def assert_equivalente(original, compilado, df):
+    np.testing.assert_array_equal(compilado.transform(df), original.transform(df))
+
+
+@pytest.mark.parametrize("n", [1, 2, 17, 1000])
+@pytest.mark.parametrize("support_as_category", [True, False])
+def test_equivalencia_lotes_sinteticos(original, compilado, n, support_as_category):
+    df = dataframe(generate_students(n, seed=n, support_as_category=support_as_category))
+    assert_equivalente(original, compilado, df)
+
+
+def test_equivalencia_con_faltantes_y_desconocidos(original, compilado):
+    columnas = generate_students(50, seed=7, support_as_category=True)
+    df = dataframe(columnas)
+    df.loc[::3, "gender"] = None
+    df.loc[1::4, "program_major"] = "Astronomy"
+    df.loc[2::5, "support_service_use_last_month"] = None
+    df.loc[::6, "edad"] = None
+    df.loc[::7, "gpa_previous_semester"] = np.nan
+    df.loc[::8, "lms_activity_weekly_hours_avg_last_month"] = np.nan
+    assert_equivalente(original, compilado, df)
+
+
+def test_edad_no_numerica_falla_igual_que_el_original(original, compilado):
+    df = dataframe(generate_students(5, seed=3, support_as_category=True))
+    df["edad"] = df["edad"].astype(object)
+    df.loc[0, "edad"] = "veinte"
+
+    with pytest.raises((TypeError, ValueError)):
+        original.transform(df)
+    with pytest.raises((TypeError, ValueError)):
+        compilado.transform(df)
+
+
+def test_equivalencia_edad_toda_faltante(original, compilado):
+    df = dataframe(generate_students(4, seed=5, support_as_category=True))
+    df["edad"] = None
+    assert_equivalente(original, compilado, df)
+
+
+def test_acepta_columnas_y_registros(original, compilado):
+    columnas = generate_students(20, seed=11, support_as_category=True)
+    esperado = original.transform(dataframe(columnas))
+
+    np.testing.assert_array_equal(compilado.transform(columnas), esperado)
+    np.testing.assert_array_equal(compilado.transform(to_records(columnas)), esperado)
+
+
+def test_guardar_y_cargar(compilado, tmp_path):
+    ruta = compilado.save(tmp_path / "preprocesador.npz")
+    cargado = CompiledPreprocessor.load(ruta)
+
+    columnas = generate_students(30, seed=13, support_as_category=True)
+    np.testing.assert_array_equal(cargado.transform(columnas), compilado.transform(columnas))
+
+
+def test_registro_usa_preprocesador_compilado(compilado, tmp_path):
+    import shutil
+    from app.services.model_registry import ModelRegistry
+
+    shutil.copy(PREPROCESSOR_PATH, tmp_path / PREPROCESSOR_NAME)
+    registry = ModelRegistry(models_dir=str(tmp_path), preprocessor_backend="compiled")
+
+    assert isinstance(registry._load_preprocessor(), CompiledPreprocessor)
+
+    # Un .npz más reciente que el joblib se carga sin recompilar
+    compilado.save(registry.compiled_preprocessor_path)
+    assert isinstance(registry._load_preprocessor(), CompiledPreprocessor)
+
+    sklearn = ModelRegistry(models_dir=str(tmp_path), preprocessor_backend="sklearn")
+    assert not isinstance(sklearn._load_preprocessor(), CompiledPreprocessor)
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.executors import BoundedExecutor, ExecutorSaturatedError
+
+pytestmark = pytest.mark.unit
+
+
+async def test_no_bloquea_el_event_loop():
+    executor = BoundedExecutor("prueba", max_workers=1, max_queue=1)
+    liberar = threading.Event()
+
+    tarea = asyncio.ensure_future(executor.run(liberar.wait, 5))
+    await asyncio.sleep(0.05)
+
+    # El event loop sigue atendiendo otras corrutinas mientras el hilo espera
+    assert executor.stats()["active"] == 1
+    assert executor.stats()["saturation"] == 1.0
+    liberar.set()
+    assert await tarea is True
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+async def test_rechaza_cuando_la_cola_esta_llena():
+    executor = BoundedExecutor("prueba", max_workers=1, max_queue=1)
+    liberar = threading.Event()
+
+    en_curso = asyncio.ensure_future(executor.run(liberar.wait, 5))
+    en_cola = asyncio.ensure_future(executor.run(liberar.wait, 5))
+    await asyncio.sleep(0.05)
+    assert executor.stats()["queued"] == 1
+
+    with pytest.raises(ExecutorSaturatedError) as error:
+        await executor.run(liberar.wait, 5)
+    assert error.value.status_code == 503
+
+    liberar.set()
+    await asyncio.gather(en_curso, en_cola)
+    stats = executor.stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 2 and stats["queued"] == 0
+    executor.shutdown()
+
+
+async def test_propaga_excepciones_y_argumentos():
+    executor = BoundedExecutor("prueba", max_workers=2, max_queue=0)
+
+    assert await executor.run(int, "ff", base=16) == 255
+    with pytest.raises(ZeroDivisionError):
+        await executor.run(divmod, 1, 0)
+    assert executor.stats()["failed"] == 1
+    executor.shutdown()
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app.services.factor_rules import RuleCompileError, compile_rules
+
+FACTORES = [
+    {"nombre": "Sobrecarga", "tipo": "academico", "campo": "creditos_actuales", "operador": ">", "valor": 20},
+    {"nombre": "Bajo promedio", "tipo": "academico", "campo": "promedio_actual", "operador": "<", "valor": 3.0},
+    {"nombre": "Transporte público", "tipo": "personal", "campo": "medio_transporte", "operador": "==", "valor": "publico"},
+    {"nombre": "Menor de edad", "tipo": "personal", "campo": "edad", "operador": "<", "valor": 18},
+]
+
+
+def evaluar_regla_por_regla(factores, academicos, personales):
+    """Semántica original: un estudiante y una regla a la vez."""
+    operaciones = {">": lambda a, b: a > b, "<": lambda a, b: a < b, "==": lambda a, b: a == b}
+    resultado = []
+    for factor in factores:
+        if factor["tipo"] == "academico":
+            valor = academicos.get(factor["campo"], 0)
+        else:
+            valor = personales.get(factor["campo"])
+        if operaciones[factor["operador"]](valor, factor["valor"]):
+            resultado.append(factor["nombre"])
+    return resultado
+
+
+@pytest.mark.unit
+def test_coincide_con_la_evaluacion_por_estudiante():
+    rng = np.random.default_rng(0)
+    n = 200
+    academicos = [
+        {"creditos_actuales": int(rng.integers(10, 26)), "promedio_actual": float(rng.uniform(0, 5))}
+        for _ in range(n)
+    ]
+    personales = [
+        {"medio_transporte": str(rng.choice(["publico", "privado"])), "edad": int(rng.integers(16, 30))}
+        for _ in range(n)
+    ]
+    reglas = compile_rules(FACTORES)
+
+    obtenido = reglas.factores(
+        {c: [a[c] for a in academicos] for c in reglas.campos_academicos},
+        {c: [p[c] for p in personales] for c in reglas.campos_personales},
+        n,
+    )
+
+    assert obtenido == [evaluar_regla_por_regla(FACTORES, a, p) for a, p in zip(academicos, personales)]
+
+
+@pytest.mark.unit
+def test_campos_ausentes_y_no_numericos_no_cumplen():
+    reglas = compile_rules(FACTORES)
+
+    mascaras = reglas.evaluate({}, {"edad": [None, "desconocida", 15]}, 3)
+
+    # Los campos académicos ausentes valen 0; edad None o no numérica nunca cumple
+    assert mascaras.shape == (3, 4)
+    assert not mascaras[:, 0].any()
+    assert mascaras[:, 1].all()
+    assert not mascaras[:, 2].any()
+    assert mascaras[:, 3].tolist() == [False, False, True]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("factor", [
+    {"nombre": "x", "tipo": "academico", "campo": "creditos", "operador": ">="},
+    {"nombre": "x", "tipo": "otro", "campo": "creditos", "operador": ">", "valor": 1},
+    {"nombre": "x", "tipo": "academico", "campo": "creditos", "operador": "~", "valor": 1},
+    {"nombre": "x", "tipo": "academico", "campo": "creditos", "operador": ">", "valor": "alto"},
+    {"nombre": "x", "tipo": "personal", "campo": "color_favorito", "operador": "==", "valor": "azul"},
+    "no es un objeto",
+])
+def test_errores_de_compilacion(factor):
+    with pytest.raises(RuleCompileError):
+        compile_rules([factor], campos_personales=["edad", "medio_transporte"])
+
+
+@pytest.mark.unit
+def test_modo_tolerante_omite_reglas_invalidas():
+    reglas = compile_rules([FACTORES[0], {"nombre": "roto"}], strict=False)
+
+    assert [r.nombre for r in reglas.reglas] == ["Sobrecarga"]
+    assert len(compile_rules("no es una lista", strict=False)) == 0
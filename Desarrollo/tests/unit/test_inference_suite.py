@@ -0,0 +1,63 @@
+import pytest
+
+from benchmarks.inference_suite import _escenarios_en_proceso, compare, errores, medir
+from benchmarks.synthetic import generate_students, to_records
+
+pytestmark = pytest.mark.unit
+
+
+def resultado(**escenarios):
+    return {"results": escenarios}
+
+
+def test_compare_marca_solo_lo_que_empeora_mas_que_la_tolerancia():
+    base = resultado(
+        make_prediction={"1": {"p50_ms": 1.0, "p95_ms": 2.0}, "100": {"p50_ms": 10.0, "p95_ms": 20.0}},
+        **{"http.predict": {"1": {"error": "RuntimeError: 500"}}},
+    )
+    actual = resultado(
+        make_prediction={"1": {"p50_ms": 1.05, "p95_ms": 2.6}, "100": {"p50_ms": 9.0, "p95_ms": 20.0}},
+        **{"http.predict": {"1": {"p50_ms": 5.0, "p95_ms": 6.0}}, "ml_model_service.predict": {"1": {"p50_ms": 1.0}}},
+    )
+
+    regresiones = compare(actual, base, tolerance=0.1)
+
+    # El p50 de 5 % y las mejoras no cuentan; sin referencia válida no se compara
+    assert regresiones == [{
+        "scenario": "make_prediction",
+        "batch_size": "1",
+        "metric": "p95_ms",
+        "baseline": 2.0,
+        "current": 2.6,
+        "ratio": 1.3,
+    }]
+
+
+def test_medir_respeta_repeticiones_y_calcula_el_throughput():
+    llamadas = []
+
+    medicion = medir(lambda: llamadas.append(1), filas=10, repeats=7, max_seconds=60)
+
+    # Una llamada de calentamiento más las mediciones
+    assert len(llamadas) == 8
+    assert medicion["samples"] == 7
+    assert medicion["p50_ms"] <= medicion["p95_ms"] <= medicion["p99_ms"]
+    assert medicion["rows_per_second"] > 0
+
+
+def test_errores_lista_los_escenarios_que_no_se_pudieron_medir():
+    base = resultado(
+        make_prediction={"1": {"p50_ms": 1.0}, "10": {"error": "RuntimeError: sin modelo"}},
+        **{"http.predict": {"1": {"p50_ms": 2.0}}},
+    )
+
+    assert errores(base) == [{"scenario": "make_prediction", "batch_size": "10", "error": "RuntimeError: sin modelo"}]
+    assert errores(resultado(make_prediction={"1": {"p50_ms": 1.0}})) == []
+
+
+def test_el_escenario_del_servicio_de_prediccion_se_puede_construir():
+    columnas = generate_students(3, seed=1)
+
+    llamadas = _escenarios_en_proceso(columnas, to_records(columnas))
+
+    assert callable(llamadas["prediccion_service.predecir_lote"])
@@ -0,0 +1,83 @@
+import pytest
+
+from app.services.institution_config import InstitutionConfig, InstitutionConfigCache
+from app.services.prediction_cache import prediction_cache
+
+
+@pytest.mark.unit
+def test_guarda_y_reutiliza_la_configuracion():
+    cache = InstitutionConfigCache()
+
+    assert cache.get(1) is None
+    cache.set(1, {"factores_escala": [1.5]}, version=3)
+    entrada = cache.get(1)
+
+    assert entrada == InstitutionConfig({"factores_escala": [1.5]}, 3)
+    assert cache.set(2, None, version=1).configuracion == {}
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 2
+
+
+@pytest.mark.unit
+def test_una_lectura_vieja_no_pisa_a_una_nueva():
+    cache = InstitutionConfigCache()
+    cache.set(1, {"v": 5}, version=5)
+
+    assert cache.set(1, {"v": 4}, version=4).version == 5
+    assert cache.get(1).configuracion == {"v": 5}
+
+
+@pytest.mark.unit
+def test_notificacion_de_otro_worker_invalida_configuracion_y_predicciones():
+    cache = InstitutionConfigCache()
+    cache.set(1, {"v": 1}, version=1)
+    cache.set(2, {"v": 1}, version=1)
+    prediction_cache.set("clave-inst-1", {"prediccion_id": 1}, estudiante_id=10, institucion_id=1)
+
+    cache.handle_notification("1:2")
+
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+    assert prediction_cache.get("clave-inst-1") is None
+
+
+@pytest.mark.unit
+def test_notificacion_ya_aplicada_se_ignora():
+    cache = InstitutionConfigCache()
+    cache.set(1, {"v": 2}, version=2)
+
+    # El worker que escribió ya recargó la versión 2 antes de recibir su propio aviso
+    assert cache.invalidate(1, version=2) is False
+    assert cache.get(1).version == 2
+    cache.handle_notification("no-es-un-id")
+    assert cache.get(1).version == 2
+
+
+@pytest.mark.unit
+def test_notify_sin_postgresql_no_hace_nada():
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from sqlalchemy.orm import Session
+    from app.services.institution_config import notify_config_change
+
+    engine = sqlalchemy.create_engine("sqlite://")
+    with Session(engine) as db:
+        notify_config_change(db, 1, 2)
+
+
+@pytest.mark.unit
+def test_una_lectura_anterior_a_la_invalidacion_no_se_guarda():
+    cache = InstitutionConfigCache()
+
+    # Un worker leyó la versión 1 justo antes de que otro escribiera la 2
+    cache.invalidate(1, version=2)
+    entrada = cache.set(1, {"v": 1}, version=1)
+
+    assert entrada.configuracion == {"v": 1}
+    assert cache.get(1) is None
+    assert cache.set(1, {"v": 2}, version=2).version == 2
+    assert cache.get(1).configuracion == {"v": 2}
+
+    cache.invalidate(1, version=3)
+    cache.replace_all({1: InstitutionConfig({"v": 2}, 2), 2: InstitutionConfig({}, 1)})
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
@@ -0,0 +1,100 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.models import Institution, InstitutionCreate
+from app.services import institution_service
+from app.services.institution_config import InstitutionConfig, InstitutionConfigCache
+from app.services.institution_service import InstitutionService
+
+pytestmark = pytest.mark.unit
+
+REGLA = {"nombre": "Sobrecarga", "tipo": "academico", "campo": "creditos_actuales", "operador": ">", "valor": 20}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = InstitutionConfigCache()
+    monkeypatch.setattr(institution_service, "institution_config_cache", cache)
+    return cache
+
+
+def datos(codigo: str = "U1", **configuracion) -> InstitutionCreate:
+    return InstitutionCreate(nombre=f"Universidad {codigo}", codigo=codigo, configuracion=configuracion or None)
+
+
+def test_crear_y_consultar_instituciones(db, cache):
+    servicio = InstitutionService(db)
+
+    creada = servicio.crear_institucion(datos("U1", factores_adicionales=[REGLA]))
+    servicio.crear_institucion(datos("U2"))
+
+    assert creada.config_version == 1
+    assert servicio.obtener_institucion(creada.id).codigo == "U1"
+    assert servicio.obtener_institucion_por_codigo("U2").nombre == "Universidad U2"
+    assert [i.codigo for i in servicio.listar_instituciones()] == ["U1", "U2"]
+    assert servicio.obtener_configuracion(creada.id) == {"factores_adicionales": [REGLA]}
+    assert servicio.obtener_configuracion(99) is None
+
+
+def test_crear_rechaza_codigo_repetido_y_reglas_invalidas(db, cache):
+    servicio = InstitutionService(db)
+    servicio.crear_institucion(datos("U1"))
+
+    with pytest.raises(HTTPException) as repetido:
+        servicio.crear_institucion(datos("U1"))
+    with pytest.raises(HTTPException) as invalida:
+        servicio.crear_institucion(datos("U3", factores_adicionales=[{"nombre": "roto"}]))
+
+    assert repetido.value.status_code == invalida.value.status_code == 400
+    assert "Configuración inválida" in invalida.value.detail
+    assert db.query(Institution).count() == 1
+
+
+def test_actualizar_sube_la_version_e_invalida_la_cache(db, cache):
+    servicio = InstitutionService(db)
+    institucion = servicio.crear_institucion(datos("U1"))
+    servicio.crear_institucion(datos("U2"))
+    assert servicio.obtener_configuracion_vigente(institucion.id) == InstitutionConfig({}, 1)
+
+    actualizada = servicio.actualizar_institucion(institucion.id, datos("U1B", umbral=0.5))
+
+    assert actualizada.codigo == "U1B" and actualizada.config_version == 2
+    assert cache.get(institucion.id) is None
+    assert servicio.obtener_configuracion_vigente(institucion.id) == InstitutionConfig({"umbral": 0.5}, 2)
+
+    servicio.actualizar_configuracion(institucion.id, {"umbral": 0.7})
+    assert servicio.obtener_configuracion_vigente(institucion.id) == InstitutionConfig({"umbral": 0.7}, 3)
+
+    with pytest.raises(HTTPException):
+        servicio.actualizar_institucion(institucion.id, datos("U2"))
+    assert servicio.actualizar_institucion(99, datos("U9")) is None
+    assert servicio.actualizar_configuracion(99, {}) is None
+
+
+def test_cargar_configuraciones_al_iniciar(db, cache):
+    servicio = InstitutionService(db)
+    servicio.crear_institucion(datos("U1", umbral=0.5))
+    servicio.crear_institucion(datos("U2"))
+
+    assert servicio.cargar_configuraciones() == 2
+    assert cache.get(1) == InstitutionConfig({"umbral": 0.5}, 1)
+    assert cache.get(2) == InstitutionConfig({}, 1)
+    # Una institución inexistente no se guarda en la caché
+    assert servicio.obtener_configuracion_vigente(99) == InstitutionConfig({}, 0)
+    assert cache.get(99) is None
+
+
+def test_cambios_simultaneos_obtienen_versiones_distintas(engine, db, cache):
+    servicio = InstitutionService(db)
+    institucion = servicio.crear_institucion(datos("U1"))
+    assert institucion.config_version == 1
+
+    # Otro worker guarda un cambio mientras esta sesión tiene la versión 1 en memoria
+    with Session(engine) as otra:
+        assert InstitutionService(otra).actualizar_configuracion(institucion.id, {"umbral": 0.5}).config_version == 2
+
+    actualizada = servicio.actualizar_configuracion(institucion.id, {"umbral": 0.7})
+
+    assert actualizada.config_version == 3
+    assert servicio.obtener_configuracion_vigente(institucion.id) == InstitutionConfig({"umbral": 0.7}, 3)
@@ -0,0 +1,84 @@
+import json
+import logging
+import threading
+
+import pytest
+
+from app.utils import logger as logger_module
+from app.utils.logger import SamplingFilter, flush_logs, parse_sample_rates, setup_logger
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger_module, "LOG_DIR", tmp_path)
+    return tmp_path
+
+
+def test_setup_logger_es_idempotente(log_dir):
+    primero = setup_logger("test.idempotente", "idempotente.log")
+    segundo = setup_logger("test.idempotente", "idempotente.log")
+
+    assert primero is segundo
+    assert len(primero.handlers) == 1
+    assert primero.propagate is False
+
+
+def test_escribe_json_con_campos_estructurados(log_dir):
+    log = setup_logger("test.json", "json.log")
+
+    log.info("Predicción para %s", 42, extra={"student_id": 42, "features": {"promedio": 3.5}})
+    flush_logs()
+
+    registro = json.loads((log_dir / "json.log").read_text(encoding="utf-8").splitlines()[-1])
+    assert registro["event"] == "Predicción para 42"
+    assert registro["logger"] == "test.json"
+    assert registro["level"] == "info"
+    assert registro["student_id"] == 42
+    assert registro["features"] == {"promedio": 3.5}
+    assert "message" not in registro and "timestamp" in registro
+
+
+def test_el_mensaje_se_formatea_en_el_hilo_del_listener(log_dir):
+    log = setup_logger("test.lazy", "lazy.log")
+    hilos = []
+
+    class Costoso:
+        def __str__(self):
+            hilos.append(threading.current_thread())
+            return "costoso"
+
+    log.info("valor: %s", Costoso())
+    flush_logs()
+
+    assert hilos and threading.main_thread() not in hilos
+
+
+def test_sampling_filter_conserva_warnings():
+    filtro = SamplingFilter(0.0)
+
+    def registro(nivel):
+        return logging.LogRecord("x", nivel, __file__, 1, "m", None, None)
+
+    assert not filtro.filter(registro(logging.INFO))
+    assert filtro.filter(registro(logging.WARNING))
+    assert SamplingFilter(1.0).filter(registro(logging.DEBUG))
+
+
+def test_setup_logger_aplica_el_muestreo(log_dir):
+    log = setup_logger("test.muestreo", "muestreo.log", sample_rate=0.0)
+
+    log.info("descartado")
+    log.warning("conservado")
+    flush_logs()
+
+    eventos = [json.loads(linea)["event"] for linea in (log_dir / "muestreo.log").read_text().splitlines()]
+    assert eventos == ["conservado"]
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("") == {}
+    assert parse_sample_rates("api=0.1, ml = 2") == {"api": 0.1, "ml": 1.0}
+    with pytest.raises(ValueError):
+        parse_sample_rates("api")
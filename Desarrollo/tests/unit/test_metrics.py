@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from app.utils.metrics import PROBABILITY_BUCKETS, Histogram
+
+pytestmark = pytest.mark.unit
+
+
+def test_observe_many_equivale_a_observar_uno_por_uno():
+    # Incluye valores justo en los límites (cuentan en su bucket) y fuera de rango
+    valores = np.concatenate([
+        np.random.default_rng(3).random(1000),
+        np.array(PROBABILITY_BUCKETS),
+        [-0.5, 1.5],
+    ])
+    uno_por_uno = Histogram("uno", PROBABILITY_BUCKETS)
+    for valor in valores.tolist():
+        uno_por_uno.observe(valor)
+    en_bloque = Histogram("bloque", PROBABILITY_BUCKETS)
+    en_bloque.observe_many(valores[:500])
+    en_bloque.observe_many(valores[500:].tolist())
+    en_bloque.observe_many([])
+
+    esperado, obtenido = uno_por_uno.snapshot(), en_bloque.snapshot()
+    assert obtenido["buckets"] == esperado["buckets"]
+    assert obtenido["count"] == esperado["count"] == len(valores)
+    assert obtenido["sum"] == pytest.approx(esperado["sum"])
@@ -0,0 +1,131 @@
+"""
+Variantes A/B y sombra del modelo en MLModelService.
+"""
+import random
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.config import ARTIFACTS_PATH, COMPILED_PREPROCESSOR_NAME, NUMPY_MODEL_NAME
+from app.core.executors import BoundedExecutor
+from app.services.ml_model_service import MLModelService, ModelVariant, parse_variants
+from app.services.model_registry import ModelRegistry
+from benchmarks.synthetic import generate_students
+
+ORIGEN = Path(ARTIFACTS_PATH)
+
+
+class RegistroFalso:
+    def __init__(self, version):
+        self.version = version
+        self.is_loaded = True
+
+
+@pytest.mark.unit
+def test_parse_variants():
+    assert parse_variants("") == []
+    assert parse_variants("candidata=v2:0.25, sombra=v3") == [("candidata", "v2", 0.25), ("sombra", "v3", 0.0)]
+    with pytest.raises(ValueError):
+        parse_variants("candidata")
+    with pytest.raises(ValueError):
+        parse_variants("candidata=v2:1.5")
+
+
+@pytest.mark.unit
+def test_reparte_el_trafico_segun_las_fracciones():
+    servicio = MLModelService(
+        RegistroFalso("v1"),
+        variants=[
+            ModelVariant("candidata", RegistroFalso("v2"), weight=0.2),
+            ModelVariant("sombra", RegistroFalso("v3"), weight=0.5, shadow=True),
+        ],
+        rng=random.Random(0),
+    )
+
+    elegidas = [servicio.choose_variant().name for _ in range(5000)]
+
+    assert servicio.shadow.weight == 0.0
+    assert "sombra" not in elegidas
+    assert elegidas.count("candidata") / len(elegidas) == pytest.approx(0.2, abs=0.03)
+    # Con clave, la misma entidad recibe siempre la misma variante
+    assert len({servicio.choose_variant(routing_key=42).name for _ in range(20)}) == 1
+
+
+@pytest.mark.unit
+def test_variante_no_cargada_cede_su_trafico():
+    candidata = RegistroFalso("v2")
+    candidata.is_loaded = False
+    servicio = MLModelService(RegistroFalso("v1"), variants=[ModelVariant("candidata", candidata, weight=1.0)])
+
+    assert servicio.choose_variant().name == "principal"
+
+
+@pytest.mark.unit
+def test_fracciones_invalidas():
+    with pytest.raises(ValueError):
+        MLModelService(RegistroFalso("v1"), variants=[
+            ModelVariant("a", RegistroFalso("v2"), weight=0.7),
+            ModelVariant("b", RegistroFalso("v3"), weight=0.7),
+        ])
+
+
+@pytest.mark.ml
+@pytest.mark.skipif(
+    not (ORIGEN / NUMPY_MODEL_NAME).exists() or not (ORIGEN / COMPILED_PREPROCESSOR_NAME).exists(),
+    reason="Los artefactos NumPy no están disponibles",
+)
+def test_sombra_evalua_el_mismo_lote_fuera_del_camino_critico(tmp_path):
+    for version in ("v1", "v2"):
+        destino = tmp_path / "versions" / version
+        destino.mkdir(parents=True)
+        for nombre in (NUMPY_MODEL_NAME, COMPILED_PREPROCESSOR_NAME):
+            shutil.copy2(ORIGEN / nombre, destino / nombre)
+
+    def registro(version):
+        return ModelRegistry(str(tmp_path), backend="numpy", preprocessor_backend="compiled", version=version)
+
+    pool = BoundedExecutor("sombra-test", 1, 8)
+    servicio = MLModelService(
+        registro("v1"),
+        variants=[ModelVariant("sombra", registro("v2"), shadow=True)],
+        shadow_pool=pool,
+    )
+    servicio.load_models()
+
+    probabilidades, variante = servicio.predict_batch(generate_students(10, seed=3))
+    pool.shutdown(wait=True)
+    stats = servicio.variant_stats()
+
+    assert variante == "principal"
+    assert probabilidades.shape == (10,)
+    assert stats["principal"]["rows"] == 10
+    assert stats["principal"]["score"]["count"] == 10
+    assert stats["sombra"]["version"] == "v2"
+    assert stats["sombra"]["rows"] == 10
+    # Mismos artefactos: la sombra reproduce las probabilidades servidas
+    assert stats["sombra"]["mean_abs_diff_vs_served"] == pytest.approx(0.0, abs=1e-6)
+
+
+@pytest.mark.ml
+@pytest.mark.skipif(
+    not (ORIGEN / NUMPY_MODEL_NAME).exists() or not (ORIGEN / COMPILED_PREPROCESSOR_NAME).exists(),
+    reason="Los artefactos NumPy no están disponibles",
+)
+def test_variante_cuantizada_desde_la_configuracion(tmp_path):
+    for nombre in (NUMPY_MODEL_NAME, COMPILED_PREPROCESSOR_NAME):
+        shutil.copy2(ORIGEN / nombre, tmp_path / nombre)
+    principal = ModelRegistry(str(tmp_path), backend="numpy", preprocessor_backend="compiled", precision="float32")
+
+    servicio = MLModelService.from_config(principal, spec="int8=@int8:1.0", shadow="")
+    servicio.load_models()
+    columnas = generate_students(50, seed=4)
+    probabilidades, variante = servicio.predict_batch(columnas)
+
+    assert variante == "int8"
+    assert servicio.variant_stats()["int8"]["precision"] == "int8"
+    # La variante se cuantiza al vuelo junto a los pesos originales
+    assert (tmp_path / "model_final_pred.int8.npz").exists()
+    esperado, _ = MLModelService(principal).predict_batch(columnas)
+    np.testing.assert_allclose(probabilidades, esperado, atol=2e-2)
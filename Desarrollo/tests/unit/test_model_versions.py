@@ -0,0 +1,198 @@
+"""
+Recarga en caliente de versiones del modelo: la nueva versión se carga y
+calienta aparte y se activa con un intercambio atómico; quien ya tomó la
+versión anterior termina con ella.
+"""
+import asyncio
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.config import ARTIFACTS_PATH, COMPILED_PREPROCESSOR_NAME, NUMPY_MODEL_NAME
+from app.services.batching import MicroBatcher
+from app.services.model_registry import ModelRegistry
+
+ORIGEN = Path(ARTIFACTS_PATH)
+requiere_artefactos = pytest.mark.skipif(
+    not (ORIGEN / NUMPY_MODEL_NAME).exists() or not (ORIGEN / COMPILED_PREPROCESSOR_NAME).exists(),
+    reason="Los artefactos NumPy no están disponibles",
+)
+
+
+def publicar(directorio: Path, version: str) -> Path:
+    destino = directorio / "versions" / version
+    destino.mkdir(parents=True)
+    for nombre in (NUMPY_MODEL_NAME, COMPILED_PREPROCESSOR_NAME):
+        shutil.copy2(ORIGEN / nombre, destino / nombre)
+    return destino
+
+
+@pytest.fixture
+def artefactos(tmp_path):
+    publicar(tmp_path, "v1")
+    publicar(tmp_path, "v2")
+    (tmp_path / "CURRENT").write_text("v1\n")
+    return tmp_path
+
+
+@pytest.mark.ml
+@requiere_artefactos
+def test_carga_la_version_indicada_en_current(artefactos):
+    registry = ModelRegistry(str(artefactos), backend="numpy", preprocessor_backend="compiled")
+
+    assert registry.load()
+    assert registry.version == "v1"
+    assert registry.available_versions() == ["v1", "v2"]
+    assert registry.model_path.parent == artefactos / "versions" / "v1"
+
+
+@pytest.mark.ml
+@requiere_artefactos
+def test_recarga_intercambia_sin_afectar_a_quien_tomo_la_version_anterior(artefactos):
+    registry = ModelRegistry(str(artefactos), backend="numpy", preprocessor_backend="compiled")
+    anterior = registry.get_artifacts()
+
+    registry.activate("v2")
+    assert registry.current_pointer() == "v2"
+    assert registry.reload()
+
+    actual = registry.get_artifacts()
+    assert actual.version == "v2"
+    assert registry.is_ready and registry.reload_error is None
+    # La referencia tomada antes de la recarga sigue completa y utilizable
+    assert anterior.version == "v1"
+    assert anterior.model is not actual.model
+    x = np.zeros((2, anterior.model.input_dim), dtype=np.float32)
+    np.testing.assert_array_equal(anterior.model.predict(x), actual.model.predict(x))
+
+
+@pytest.mark.ml
+@requiere_artefactos
+def test_recarga_fallida_conserva_la_version_activa(artefactos):
+    registry = ModelRegistry(str(artefactos), backend="numpy", preprocessor_backend="compiled")
+    registry.load()
+    (artefactos / "versions" / "v2" / NUMPY_MODEL_NAME).write_bytes(b"corrupto")
+
+    assert not registry.reload("v2")
+    assert registry.version == "v1"
+    assert registry.reload_error
+
+
+@pytest.mark.unit
+def test_version_inexistente(tmp_path):
+    registry = ModelRegistry(str(tmp_path), backend="numpy")
+    (tmp_path / "versions" / "v1").mkdir(parents=True)
+
+    with pytest.raises(FileNotFoundError):
+        registry.resolve_directory("v9")
+    with pytest.raises(FileNotFoundError):
+        registry.activate("../v1")
+    assert registry.current_pointer() is None
+
+
+@pytest.mark.unit
+async def test_batcher_evalua_cada_peticion_con_su_version():
+    llamadas = []
+
+    def version(valor):
+        def predecir(batch):
+            llamadas.append((valor, len(batch)))
+            return np.full((len(batch), 1), valor, dtype=float)
+        return predecir
+
+    vieja, nueva = version(1.0), version(2.0)
+    batcher = MicroBatcher(vieja, max_batch_size=8, max_wait_ms=50)
+    resultados = await asyncio.gather(
+        batcher.submit(np.zeros(3)),
+        batcher.submit(np.zeros(3), predict_fn=nueva),
+        batcher.submit(np.zeros(3)),
+    )
+    await batcher.stop()
+
+    assert [r[0, 0] for r in resultados] == [1.0, 2.0, 1.0]
+    assert sorted(llamadas) == [(1.0, 2), (2.0, 1)]
+
+
+@pytest.mark.ml
+@requiere_artefactos
+async def test_la_vigilancia_recarga_los_registros_sin_version_fijada(artefactos):
+    from app.services.model_registry import follow_current_version, watch_current_version
+
+    def registro(**kwargs):
+        return ModelRegistry(str(artefactos), backend="numpy", preprocessor_backend="compiled", **kwargs)
+
+    principal = registro()
+    cuantizado = follow_current_version(registro(precision="int8"))
+    fijado = follow_current_version(registro(version="v1"))
+    for r in (principal, cuantizado, fijado):
+        assert r.load() and r.version == "v1"
+
+    principal.activate("v2")
+    vigilancia = asyncio.create_task(watch_current_version(principal, 0.01))
+    try:
+        for _ in range(500):
+            if principal.version == cuantizado.version == "v2":
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        vigilancia.cancel()
+
+    assert principal.version == "v2"
+    assert cuantizado.version == "v2" and cuantizado.precision == "int8"
+    assert fijado.version == "v1"
+
+
+@pytest.mark.ml
+@requiere_artefactos
+def test_recargar_actualiza_todos_los_registros_sin_version_fijada(artefactos, monkeypatch):
+    from app.services import model_registry as modulo
+
+    principal = ModelRegistry(str(artefactos), backend="numpy", preprocessor_backend="compiled")
+    monkeypatch.setattr(modulo, "model_registry", principal)
+    cuantizado = modulo.follow_current_version(
+        ModelRegistry(str(artefactos), backend="numpy", preprocessor_backend="compiled", precision="int8")
+    )
+    sin_cargar = modulo.follow_current_version(
+        ModelRegistry(str(artefactos), backend="numpy", preprocessor_backend="compiled", precision="float16")
+    )
+    principal.load()
+    cuantizado.load()
+
+    for hilo in modulo.reload_unpinned("v2"):
+        hilo.join(timeout=30)
+
+    assert principal.version == cuantizado.version == "v2"
+    # Los registros aún no cargados cargarán la versión activa al usarse
+    assert not sin_cargar.is_loaded
+
+
+@pytest.mark.unit
+def test_solo_se_inicia_una_recarga_a_la_vez(tmp_path, monkeypatch):
+    from app.services import model_registry as modulo
+
+    registry = ModelRegistry(str(tmp_path), backend="numpy")
+    monkeypatch.setattr(modulo, "model_registry", registry)
+    liberar = threading.Event()
+    cargas = []
+
+    def cargar(version):
+        cargas.append(version)
+        liberar.wait(timeout=5)
+        raise RuntimeError("sin artefactos")
+
+    monkeypatch.setattr(registry, "_load_artifacts", cargar)
+
+    hilo = registry.reload_in_background("v2")
+    # `reloading` ya está marcado al volver, antes de que el hilo cargue nada
+    assert hilo is not None and registry.reloading
+    assert registry.reload_in_background("v2") is None
+    assert modulo.reload_unpinned("v2") is None
+    assert not registry.reload("v2")
+
+    liberar.set()
+    hilo.join(timeout=5)
+    assert cargas == ["v2"]
+    assert not registry.reloading and registry.reload_error == "sin artefactos"
@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.config import ARTIFACTS_PATH, MODEL_NAME
+from app.services.numpy_inference import (
+    NumpyDenseModel,
+    export_keras_weights,
+    quantize_weights,
+    quantized_model_name,
+)
+
+KERAS_PATH = Path(ARTIFACTS_PATH) / MODEL_NAME
+
+# Tolerancia frente a TensorFlow (ambos calculan en float32)
+TOLERANCIA = 1e-5
+
+requiere_artefacto = pytest.mark.skipif(
+    not KERAS_PATH.exists(), reason="El artefacto .keras no está disponible"
+)
+
+
+@pytest.fixture(scope="module")
+def modelo_numpy(tmp_path_factory):
+    pytest.importorskip("h5py")
+    npz_path = tmp_path_factory.mktemp("npz") / "modelo.npz"
+    export_keras_weights(KERAS_PATH, npz_path)
+    return NumpyDenseModel.load(npz_path)
+
+
+@pytest.mark.unit
+def test_forward_pass_manual():
+    pesos = np.array([[1.0, -1.0], [2.0, 0.5]], dtype=np.float32)
+    sesgo = np.array([0.0, 0.25], dtype=np.float32)
+    modelo = NumpyDenseModel([(pesos, sesgo, "relu"), (np.ones((2, 1), np.float32), np.zeros(1, np.float32), "sigmoid")])
+
+    salida = modelo.predict(np.array([[1.0, 1.0]]))
+
+    # relu([3.0, -0.25]) = [3.0, 0.0] -> sigmoid(3.0)
+    assert salida.shape == (1, 1)
+    assert salida[0, 0] == pytest.approx(1 / (1 + np.exp(-3.0)), rel=1e-6)
+
+
+@pytest.mark.ml
+@requiere_artefacto
+def test_coincide_con_tensorflow(modelo_numpy):
+    tf = pytest.importorskip("tensorflow")
+    modelo_keras = tf.keras.models.load_model(str(KERAS_PATH))
+
+    x = np.random.default_rng(42).normal(scale=3.0, size=(512, modelo_numpy.input_dim)).astype(np.float32)
+
+    esperado = modelo_keras.predict(x, verbose=0)
+    obtenido = modelo_numpy.predict(x)
+
+    assert obtenido.shape == esperado.shape
+    np.testing.assert_allclose(obtenido, esperado, atol=TOLERANCIA)
+
+
+@pytest.mark.ml
+@requiere_artefacto
+def test_rechaza_dimension_incorrecta(modelo_numpy):
+    with pytest.raises(ValueError):
+        modelo_numpy.predict(np.zeros((1, modelo_numpy.input_dim + 1)))
+
+
+@pytest.mark.unit
+def test_carga_mapeada_en_memoria_coincide(tmp_path):
+    rng = np.random.default_rng(0)
+    npz_path = tmp_path / "modelo.npz"
+    np.savez(
+        npz_path,
+        activations=np.array(["relu", "sigmoid"]),
+        W0=rng.normal(size=(4, 3)).astype(np.float32),
+        b0=rng.normal(size=3).astype(np.float32),
+        W1=rng.normal(size=(3, 1)).astype(np.float32),
+        b1=np.zeros(1, dtype=np.float32),
+    )
+
+    copiado = NumpyDenseModel.load(npz_path)
+    mapeado = NumpyDenseModel.load(npz_path, mmap=True)
+
+    assert all(isinstance(pesos, np.memmap) for pesos, _, _ in mapeado.layers)
+    assert not mapeado.layers[0][0].flags.writeable
+    x = rng.normal(size=(8, 4)).astype(np.float32)
+    np.testing.assert_array_equal(mapeado.predict(x), copiado.predict(x))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("precision,tolerancia", [("float16", 1e-3), ("int8", 2e-2)])
+def test_pesos_cuantizados(tmp_path, precision, tolerancia):
+    rng = np.random.default_rng(1)
+    npz_path = tmp_path / "modelo.npz"
+    np.savez(
+        npz_path,
+        activations=np.array(["relu", "sigmoid"]),
+        W0=rng.normal(size=(6, 16)).astype(np.float32),
+        b0=rng.normal(size=16).astype(np.float32),
+        W1=rng.normal(scale=0.3, size=(16, 1)).astype(np.float32),
+        b1=np.zeros(1, dtype=np.float32),
+    )
+    original = NumpyDenseModel.load(npz_path)
+
+    ruta = quantize_weights(npz_path, tmp_path / quantized_model_name(npz_path.name, precision), precision)
+    copiado = NumpyDenseModel.load(ruta)
+    mapeado = NumpyDenseModel.load(ruta, mmap=True)
+
+    assert ruta.name == f"modelo.{precision}.npz"
+    assert copiado.precision == mapeado.precision == precision
+    assert copiado.nbytes < original.nbytes
+    x = rng.normal(size=(64, 6)).astype(np.float32)
+    salida = copiado.predict(x)
+    assert salida.dtype == np.float32
+    np.testing.assert_array_equal(mapeado.predict(x), salida)
+    np.testing.assert_allclose(salida, original.predict(x), atol=tolerancia)
+    # Las capas en float32 reproducen lo que evalúa predict
+    np.testing.assert_allclose(NumpyDenseModel(copiado.dequantized_layers()).predict(x), salida, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.unit
+def test_nombre_de_variante_cuantizada():
+    assert quantized_model_name("model_final_pred.npz", "float32") == "model_final_pred.npz"
+    assert quantized_model_name("model_final_pred.npz", "int8") == "model_final_pred.int8.npz"
+    with pytest.raises(ValueError):
+        quantized_model_name("model_final_pred.npz", "int4")
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.models import AcademicHistoryCreate, Institution, StressPrediction, StudentFeatures
+from app.services.institution_config import institution_config_cache
+from app.services.institution_service import InstitutionService
+from app.services.prediccion import PrediccionService
+from app.services.prediction_cache import PredictionCache
+from tests.unit.conftest import crear_estudiantes
+from tests.unit.test_academic_data_service import datos_personales
+
+pytestmark = pytest.mark.unit
+
+
+class BatcherDirecto:
+    """Predice cada solicitud sin esperar a formar un lote."""
+    async def submit(self, features, predict_fn):
+        return predict_fn(features)
+
+
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    institution_config_cache.clear()
+    yield
+    institution_config_cache.clear()
+
+
+@pytest.fixture
+def servicio(db):
+    crear_estudiantes(db, 1)
+    db.get(Institution, 1).configuracion = {"umbral_carga_academica": 15}
+    db.commit()
+
+    modelo = SimpleNamespace(predict=lambda x: np.array([[0.6, 0.2]]))
+    preprocesador = SimpleNamespace(transform=lambda features: features.reshape(1, -1))
+    registro = SimpleNamespace(
+        get_artifacts=lambda: SimpleNamespace(model=modelo, preprocessor=preprocesador, version="v1")
+    )
+    return PrediccionService(db, registry=registro, batcher=BatcherDirecto(), cache=PredictionCache())
+
+
+def predecir(servicio, creditos=20, promedios=(5.0,)):
+    return asyncio.run(servicio.predecir_estres(
+        estudiante_id=1,
+        datos_academicos={"creditos_actuales": creditos, "promedio_actual": 7.5},
+        datos_personales=datos_personales(),
+        historial_academico=[
+            AcademicHistoryCreate(fecha="2025-03-01", evento="CALIFICACION_FINAL", detalles="", promedio=promedio)
+            for promedio in promedios
+        ],
+        institucion_id=1,
+    ))
+
+
+def test_predecir_estres_lee_la_configuracion_una_vez_fuera_del_event_loop(db, servicio, monkeypatch):
+    hilos = []
+    obtener = servicio.instituciones.obtener_configuracion_vigente
+
+    def obtener_registrando(institucion_id):
+        hilos.append(threading.current_thread())
+        return obtener(institucion_id)
+
+    monkeypatch.setattr(servicio.instituciones, "obtener_configuracion_vigente", obtener_registrando)
+
+    respuesta = predecir(servicio)
+
+    assert len(hilos) == 1 and hilos[0] is not threading.main_thread()
+    assert respuesta.probabilidades == pytest.approx([0.6, 0.2])
+    assert respuesta.prediccion.factores_riesgo == ["Alta carga académica", "Situación familiar compleja"]
+    assert respuesta.prediccion.version_modelo == "v1"
+    # Los datos recibidos quedan para re-predecir desde los agregados
+    features = db.get(StudentFeatures, 1)
+    assert features.datos_academicos["creditos_actuales"] == 20
+    assert features.datos_personales["medio_transporte"] == "publico"
+
+
+def test_un_cambio_de_configuracion_cambia_la_clave_de_la_cache(db, servicio):
+    primera = predecir(servicio)
+    assert predecir(servicio).prediccion.id == primera.prediccion.id
+    assert db.query(StressPrediction).count() == 1
+
+    InstitutionService(db).actualizar_configuracion(1, {"umbral_carga_academica": 25})
+    tercera = predecir(servicio)
+
+    assert tercera.prediccion.id != primera.prediccion.id
+    assert tercera.prediccion.factores_riesgo == ["Situación familiar compleja"]
+    assert institution_config_cache.get(1).version == 2
+
+
+def test_el_historial_de_reprobacion_cambia_la_clave_de_la_cache(db, servicio):
+    primera = predecir(servicio)
+    # Mismas características, pero el historial supera el umbral de reprobación (2)
+    segunda = predecir(servicio, promedios=(5.0, 4.0, 3.0))
+
+    assert segunda.prediccion.id != primera.prediccion.id
+    assert "Historial de reprobación" not in primera.prediccion.factores_riesgo
+    assert "Historial de reprobación" in segunda.prediccion.factores_riesgo
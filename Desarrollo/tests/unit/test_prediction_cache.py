@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app.services.prediction_cache import PredictionCache, make_key
+
+pytestmark = pytest.mark.unit
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_clave_depende_del_contenido():
+    features = np.array([1.0, 2.0, 3.0])
+    clave = make_key(1, features, "1", "v1", 0)
+
+    assert clave == make_key(1, features.copy(), "1", "v1", 0)
+    assert clave != make_key(2, features, "1", "v1", 0)
+    assert clave != make_key(1, features + 1e-9, "1", "v1", 0)
+    assert clave != make_key(1, features, "2", "v1", 0)
+    assert clave != make_key(1, features, "1", "v2", 0)
+    assert clave != make_key(1, features, "1", "v1", 3)
+    assert clave != make_key(1, features, "1", "v1", None)
+
+
+def test_lru_y_ttl():
+    reloj = Reloj()
+    cache = PredictionCache(max_entries=2, ttl_seconds=10, clock=reloj)
+    cache.set("a", 1, estudiante_id=1)
+    cache.set("b", 2, estudiante_id=2)
+    assert cache.get("a") == 1  # "b" pasa a ser la menos usada
+    cache.set("c", 3, estudiante_id=3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    reloj.ahora = 11
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_invalidacion_por_estudiante_e_institucion():
+    cache = PredictionCache()
+    cache.set("a", 1, estudiante_id=1, institucion_id=10)
+    cache.set("b", 2, estudiante_id=2, institucion_id=10)
+    cache.set("c", 3, estudiante_id=3, institucion_id=20)
+
+    assert cache.invalidate_student(1) == 1
+    assert cache.get("a") is None
+    assert cache.invalidate_institution(10) == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["invalidations"] == 2
@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.utils.prometheus import (
+    LLMTimer,
+    PrometheusMiddleware,
+    RuntimeCollector,
+    instrument_engine,
+    render_metrics,
+    statement_type,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def muestra(nombre, **labels):
+    return REGISTRY.get_sample_value(nombre, labels) or 0.0
+
+
+def test_el_middleware_etiqueta_por_plantilla_de_ruta():
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    antes = muestra("http_requests_total", method="GET", route="/items/{item_id}", status="200")
+    antes_404 = muestra("http_requests_total", method="GET", route="<unmatched>", status="404")
+
+    async def pedir():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://test") as cliente:
+            for item_id in (1, 2, 3):
+                assert (await cliente.get(f"/items/{item_id}")).status_code == 200
+            assert (await cliente.get("/no-existe")).status_code == 404
+
+    asyncio.run(pedir())
+
+    # Una sola serie para las tres peticiones, no una por id
+    assert muestra("http_requests_total", method="GET", route="/items/{item_id}", status="200") == antes + 3
+    assert muestra("http_requests_total", method="GET", route="<unmatched>", status="404") == antes_404 + 1
+    assert muestra("http_requests_in_flight", method="GET", route="/items/{item_id}") == 0
+
+
+def test_statement_type():
+    assert statement_type("  select * from students") == "SELECT"
+    assert statement_type("INSERT INTO x VALUES (1)") == "INSERT"
+    assert statement_type("PRAGMA foreign_keys") == "OTHER"
+    assert statement_type("") == "OTHER"
+
+
+def test_instrument_engine_cuenta_consultas_y_errores():
+    engine = instrument_engine(create_engine("sqlite://", poolclass=StaticPool))
+    antes = muestra("db_queries_total", statement="SELECT")
+    errores = muestra("db_query_errors_total", statement="SELECT")
+
+    with engine.connect() as conexion:
+        conexion.execute(text("SELECT 1"))
+        conexion.execute(text("SELECT 2"))
+        with pytest.raises(Exception):
+            conexion.execute(text("SELECT * FROM tabla_inexistente"))
+        # La pila de inicios queda limpia tras el error
+        assert conexion.connection.info.get("prometheus_query_start") == []
+
+    assert muestra("db_queries_total", statement="SELECT") == antes + 2
+    assert muestra("db_query_errors_total", statement="SELECT") == errores + 1
+
+
+def test_llm_timer_registra_errores():
+    antes = muestra("llm_requests_total", operation="test", outcome="error")
+
+    with pytest.raises(RuntimeError):
+        with LLMTimer("test"):
+            raise RuntimeError("cuota agotada")
+
+    assert muestra("llm_requests_total", operation="test", outcome="error") == antes + 1
+    assert muestra("llm_request_duration_seconds_count", operation="test") >= 1
+
+
+def test_render_metrics_incluye_colas():
+    colector = RuntimeCollector(
+        lambda: {"pending": 7, "in_progress": 1, "oldest_pending_ms": 2500.0, "scored": 10, "failed": 2},
+        lambda: {"db": {"active": 3, "queued": 4, "rejected": 5}},
+    )
+
+    cuerpo, content_type = render_metrics(colector)
+    texto = cuerpo.decode()
+
+    assert content_type.startswith("text/plain")
+    assert "rescore_queue_pending 7.0" in texto
+    assert "rescore_queue_oldest_pending_seconds 2.5" in texto
+    assert "rescore_queue_failed_total 2.0" in texto
+    assert 'executor_queued{pool="db"} 4.0' in texto
+    # También las métricas del registro global
+    assert "http_request_duration_seconds" in texto
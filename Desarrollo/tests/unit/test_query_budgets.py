@@ -0,0 +1,58 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models import Admin, Institution, User, UserRole
+from app.services.admin_service import AdminService
+from app.services.institution_service import InstitutionService
+from app.utils.query_counter import assert_max_queries
+from tests.unit.conftest import crear_estudiantes
+
+pytestmark = pytest.mark.unit
+
+
+def crear_admins(db, cantidad: int, institucion_id: int = 1):
+    if db.get(Institution, institucion_id) is None:
+        db.add(Institution(id=institucion_id, nombre="Institución", codigo=f"I{institucion_id}"))
+    for i in range(cantidad):
+        usuario = User(email=f"admin{i}@x.co", hashed_password="x", nombre=f"Admin {i}", rol=UserRole.ADMIN)
+        db.add(Admin(usuario=usuario, institucion_id=institucion_id, departamento="Bienestar", permisos={}))
+    db.commit()
+    db.expunge_all()
+
+
+def test_listar_admins_carga_los_usuarios_en_la_misma_consulta(db):
+    crear_admins(db, 5)
+
+    with assert_max_queries(1):
+        admins = AdminService(db).listar_admins()
+
+    assert sorted(a.usuario.email for a in admins) == [f"admin{i}@x.co" for i in range(5)]
+
+
+def test_eliminar_institucion_con_estudiantes_no_carga_las_colecciones(db):
+    crear_estudiantes(db, 50)
+    db.expunge_all()
+
+    # La institución y un único EXISTS, sin importar cuántos estudiantes tenga
+    with assert_max_queries(2):
+        with pytest.raises(HTTPException) as error:
+            InstitutionService(db).eliminar_institucion(1)
+
+    assert error.value.status_code == 400
+    assert db.get(Institution, 1) is not None
+
+
+def test_eliminar_institucion_con_admins_falla(db):
+    crear_admins(db, 1)
+
+    with pytest.raises(HTTPException):
+        InstitutionService(db).eliminar_institucion(1)
+
+
+def test_eliminar_institucion_vacia(db):
+    db.add(Institution(id=7, nombre="Vacía", codigo="V"))
+    db.commit()
+
+    assert InstitutionService(db).eliminar_institucion(7) is True
+    assert InstitutionService(db).eliminar_institucion(7) is False
+    assert db.get(Institution, 7) is None
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, joinedload, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.utils.query_counter import (
+    QueryCounterMiddleware,
+    assert_max_queries,
+    assert_response_queries,
+    count_queries,
+    track_queries,
+)
+
+pytestmark = pytest.mark.unit
+
+Base = declarative_base()
+
+
+class Usuario(Base):
+    __tablename__ = "usuarios"
+
+    id = Column(Integer, primary_key=True)
+    email = Column(String(50))
+
+
+class Administrador(Base):
+    __tablename__ = "administradores"
+
+    id = Column(Integer, primary_key=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"))
+    usuario = relationship(Usuario)
+
+
+@pytest.fixture
+def Session():
+    engine = track_queries(
+        create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    )
+    Base.metadata.create_all(engine)
+    Sesion = sessionmaker(bind=engine)
+    with Sesion() as db:
+        for i in range(6):
+            db.add(Administrador(id=i, usuario=Usuario(id=i, email=f"admin{i}@x.co")))
+        db.commit()
+    return Sesion
+
+
+def emails_fila_a_fila(db):
+    return [admin.usuario.email for admin in db.query(Administrador).all()]
+
+
+def test_detecta_la_carga_fila_a_fila(Session):
+    with Session() as db, count_queries() as stats:
+        emails_fila_a_fila(db)
+
+    # Una consulta de administradores y una por usuario
+    assert stats.count == 7
+    assert stats.seconds > 0
+    assert list(stats.repeated(5).values()) == [6]
+
+
+def test_assert_max_queries(Session):
+    with Session() as db, assert_max_queries(1):
+        admins = db.query(Administrador).options(joinedload(Administrador.usuario)).all()
+        assert len({admin.usuario.email for admin in admins}) == 6
+
+    with Session() as db:
+        with pytest.raises(AssertionError, match=r"7 consultas; el máximo es 2(.|\n)*6x SELECT"):
+            with assert_max_queries(2):
+                emails_fila_a_fila(db)
+
+
+def test_los_contextos_anidados_cuentan_en_el_de_afuera(Session):
+    with Session() as db, count_queries() as afuera:
+        db.query(Usuario).all()
+        with count_queries() as adentro:
+            db.query(Administrador).all()
+
+    assert adentro.count == 1
+    assert afuera.count == 2
+
+
+def test_fuera_de_contexto_no_se_cuenta(Session):
+    with Session() as db:
+        db.query(Usuario).all()
+        with count_queries() as stats:
+            pass
+
+    assert stats.count == 0
+
+
+def test_middleware_expone_cabeceras_y_avisa_de_n_mas_uno(Session, caplog):
+    app = FastAPI()
+    app.add_middleware(QueryCounterMiddleware, expose_headers=True, threshold=5)
+
+    # Endpoint síncrono: corre en el threadpool con el contexto copiado
+    @app.get("/admins")
+    def listar():
+        with Session() as db:
+            return emails_fila_a_fila(db)
+
+    async def pedir():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://test") as cliente:
+            return await cliente.get("/admins")
+
+    with caplog.at_level(logging.WARNING, logger="app.utils.query_counter"):
+        respuesta = asyncio.run(pedir())
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers["x-db-query-count"] == "7"
+    assert respuesta.headers["x-db-repeated-queries"] == "1"
+    assert float(respuesta.headers["x-db-query-time-ms"]) > 0
+    assert any("Posible N+1 en GET /admins: 6 ejecuciones" in r.getMessage() for r in caplog.records)
+
+    assert_response_queries(respuesta, 7)
+    with pytest.raises(AssertionError):
+        assert_response_queries(respuesta, 3)
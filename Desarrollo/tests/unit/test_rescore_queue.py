@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from app.services.rescore_queue import RescoreQueue
+
+
+class Registro:
+    def __init__(self, falla: bool = False, invalidos=()):
+        self.lotes = []
+        self.falla = falla
+        self.invalidos = set(invalidos)
+        self._lock = threading.Lock()
+
+    def __call__(self, ids):
+        with self._lock:
+            self.lotes.append(list(ids))
+        if self.falla or self.invalidos & set(ids):
+            raise RuntimeError("fallo de prueba")
+
+
+@pytest.mark.unit
+def test_combina_trabajos_repetidos_y_evalua_por_lotes():
+    registro = Registro()
+    cola = RescoreQueue(registro, workers=1, window_ms=200, max_batch=64)
+
+    for estudiante_id in (1, 2, 1, 3, 1, 2):
+        cola.enqueue(estudiante_id)
+
+    assert cola.wait_idle(timeout=5)
+    cola.stop()
+
+    assert registro.lotes == [[1, 2, 3]]
+    stats = cola.stats()
+    assert stats["enqueued"] == 6 and stats["coalesced"] == 3 and stats["scored"] == 3
+    assert stats["pending"] == 0 and stats["in_progress"] == 0
+    assert stats["lag_ms"]["count"] == 3
+    # Cada trabajo esperó al menos la ventana de agrupación
+    assert stats["lag_ms"]["sum"] >= 3 * 200 * 0.9
+
+
+@pytest.mark.unit
+def test_lote_lleno_no_espera_la_ventana():
+    registro = Registro()
+    cola = RescoreQueue(registro, workers=1, window_ms=60000, max_batch=2)
+
+    cola.enqueue_many([1, 2])
+
+    assert cola.wait_idle(timeout=5)
+    cola.stop(drain=False)
+    assert registro.lotes == [[1, 2]]
+
+
+@pytest.mark.unit
+def test_detener_evalua_los_pendientes():
+    registro = Registro()
+    cola = RescoreQueue(registro, workers=2, window_ms=60000, max_batch=10)
+
+    assert cola.enqueue_many([5, 6, 5]) == 2
+    cola.stop(drain=True, timeout=5)
+
+    assert sorted(sum(registro.lotes, [])) == [5, 6]
+
+
+@pytest.mark.unit
+def test_un_lote_fallido_no_detiene_la_cola():
+    registro = Registro(falla=True)
+    cola = RescoreQueue(registro, workers=1, window_ms=0, max_batch=10)
+
+    cola.enqueue(1)
+    assert cola.wait_idle(timeout=5)
+    registro.falla = False
+    cola.enqueue(2)
+    assert cola.wait_idle(timeout=5)
+    cola.stop()
+
+    stats = cola.stats()
+    assert stats["failed"] == 1 and stats["scored"] == 1
+
+
+@pytest.mark.unit
+def test_un_estudiante_invalido_no_descarta_al_resto_del_lote():
+    registro = Registro(invalidos={2})
+    cola = RescoreQueue(registro, workers=1, window_ms=0, max_batch=10)
+
+    cola.enqueue_many([1, 2, 3])
+    assert cola.wait_idle(timeout=5)
+    cola.stop()
+
+    # El lote falla y se re-evalúa uno por uno
+    assert registro.lotes == [[1, 2, 3], [1], [2], [3]]
+    stats = cola.stats()
+    assert stats["scored"] == 2 and stats["failed"] == 1
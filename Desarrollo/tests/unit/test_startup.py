@@ -0,0 +1,74 @@
+"""
+Presupuesto de arranque: importar la aplicación en un proceso nuevo debe ser
+rápido y no debe cargar TensorFlow, scikit-learn ni pandas.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core.startup import StartupReport
+
+pytestmark = pytest.mark.unit
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+IMPORT_BUDGET_SECONDS = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "3.0"))
+DEPENDENCIAS_PESADAS = ("tensorflow", "keras", "sklearn", "pandas", "joblib")
+
+_IMPORTAR = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+print(json.dumps({{
+    "seconds": time.perf_counter() - inicio,
+    "heavy": [m for m in {pesadas!r} if m in sys.modules],
+}}))
+"""
+
+
+def importar_en_frio(modulo: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", _IMPORTAR.format(modulo=modulo, pesadas=DEPENDENCIAS_PESADAS)],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+
+
+def assert_dentro_del_presupuesto(resultado: subprocess.CompletedProcess) -> None:
+    assert resultado.returncode == 0, resultado.stderr
+    medicion = json.loads(resultado.stdout.strip().splitlines()[-1])
+    assert medicion["heavy"] == []
+    assert medicion["seconds"] < IMPORT_BUDGET_SECONDS
+
+
+def test_importar_app_main_dentro_del_presupuesto():
+    resultado = importar_en_frio("app.main")
+    if resultado.returncode != 0 and "ModuleNotFoundError" in resultado.stderr:
+        pytest.skip(f"app.main no se puede importar en este entorno: {resultado.stderr.strip().splitlines()[-1]}")
+    assert_dentro_del_presupuesto(resultado)
+
+
+@pytest.mark.parametrize("modulo", [
+    "app.api.endpoints.predict",
+    "app.services.ml_model_service",
+    "app.services.batching",
+])
+def test_servicios_de_prediccion_sin_dependencias_pesadas(modulo):
+    assert_dentro_del_presupuesto(importar_en_frio(modulo))
+
+
+def test_informe_de_arranque():
+    informe = StartupReport()
+    informe.record("imports", 0.5)
+    with pytest.raises(RuntimeError):
+        with informe.phase("model_load"):
+            raise RuntimeError("sin modelo")
+
+    resumen = informe.as_dict()
+    assert set(resumen["phases_seconds"]) == {"imports", "model_load"}
+    assert resumen["errors"] == {"model_load": "sin modelo"}
+    assert resumen["total_seconds"] >= 0.5
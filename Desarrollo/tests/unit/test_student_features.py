@@ -0,0 +1,136 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.config import ARTIFACTS_PATH, PREPROCESSOR_NAME
+from app.services.columnar import FIELD_NAMES
+from app.services.student_features import (
+    apply_academic_event,
+    build_feature_columns,
+    feature_record,
+    promedio_medio,
+    records_to_columns,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def construir():
+    return build_feature_columns(
+        student_ids=[3, 7, 9],
+        programas=["Engineering", "Law", "Arts"],
+        semestres=[1, 4, 7],
+        history_student_ids=[3, 3, 3, 7, 42],
+        history_rank=[1, 2, 3, 1, 1],
+        history_promedio=[5.0, 8.0, None, 9.0, 1.0],
+        history_evento=["CALIFICACION_FINAL", "CALIFICACION_FINAL", "RETIRO_CURSO", "CALIFICACION_FINAL", "RETIRO_CURSO"],
+    )
+
+
+def test_agregados_del_historial():
+    columnas = construir()
+
+    assert set(columnas) == set(FIELD_NAMES)
+    np.testing.assert_array_equal(columnas["year_of_study"], [1, 2, 4])
+    np.testing.assert_array_equal(columnas["number_of_failed_courses_current_semester"], [1, 0, 0])
+    # El evento del estudiante 42 no pertenece al bloque y se descarta
+    np.testing.assert_array_equal(columnas["number_of_course_withdrawals_current_semester"], [1, 0, 0])
+    np.testing.assert_allclose(columnas["gpa_current_semester"], [2.0, 3.6, np.nan])
+    np.testing.assert_allclose(columnas["gpa_previous_semester"], [3.2, np.nan, np.nan])
+
+
+def test_campos_sin_origen_quedan_faltantes():
+    columnas = construir()
+
+    assert all(v is None for v in columnas["gender"])
+    assert np.isnan(columnas["edad"]).all()
+    assert np.isnan(columnas["credit_load"]).all()
+
+
+@pytest.mark.ml
+@pytest.mark.skipif(
+    not (Path(ARTIFACTS_PATH) / PREPROCESSOR_NAME).exists(),
+    reason="El preprocesador joblib no está disponible",
+)
+def test_el_preprocesador_imputa_los_faltantes():
+    from app.services.model_registry import ModelRegistry
+
+    _, preprocessor = ModelRegistry(backend="numpy").get()
+    salida = preprocessor.transform(construir())
+
+    assert salida.shape == (3, 36)
+    assert np.isfinite(salida).all()
+
+
+def estado_vacio(programa, semestre):
+    return SimpleNamespace(
+        programa=programa, semestre=semestre, eventos=None, eventos_recientes=None, materias_reprobadas=None,
+        materias_retiradas=None, suma_promedios=None, promedios_registrados=None,
+        gpa_actual=None, gpa_anterior=None, lms_horas_semanales=None, servicios_apoyo_mes=None,
+    )
+
+
+def test_actualizacion_incremental_coincide_con_la_reconstruccion():
+    # Eventos en orden cronológico; el rank 1 es el último
+    historial = {
+        3: [("RETIRO_CURSO", None), ("CALIFICACION_FINAL", 8.0), ("CALIFICACION_FINAL", 5.0)],
+        7: [("CALIFICACION_FINAL", 9.0)],
+        9: [],
+    }
+    estados = {3: estado_vacio("Engineering", 1), 7: estado_vacio("Law", 4), 9: estado_vacio("Arts", 7)}
+    for estudiante, eventos in historial.items():
+        for evento, promedio in eventos:
+            apply_academic_event(estados[estudiante], evento, promedio)
+
+    incremental = records_to_columns([feature_record(estados[i]) for i in (3, 7, 9)])
+    reconstruido = construir()
+
+    for nombre in FIELD_NAMES:
+        if incremental[nombre].dtype == object:
+            assert incremental[nombre].tolist() == reconstruido[nombre].tolist(), nombre
+        else:
+            np.testing.assert_array_equal(incremental[nombre], reconstruido[nombre], err_msg=nombre)
+    assert estados[3].eventos == 3
+    assert promedio_medio(estados[3]) == pytest.approx(6.5)
+    assert promedio_medio(estados[9]) is None
+
+
+def test_registro_serializable_sin_nan():
+    estado = estado_vacio("Law", 3)
+    apply_academic_event(estado, "CALIFICACION_FINAL", None)
+    estado.servicios_apoyo_mes = 2
+
+    registro = feature_record(estado)
+
+    assert set(registro) == set(FIELD_NAMES)
+    assert registro["gpa_current_semester"] is None
+    assert registro["support_service_use_last_month"] == 2
+    assert all(not (isinstance(v, float) and np.isnan(v)) for v in registro.values())
+
+
+def test_reprobadas_y_retiros_en_la_misma_ventana_que_la_reevaluacion():
+    # Cronológico: dos reprobadas y un retiro antiguos, luego tres aprobadas
+    eventos = [("CALIFICACION_FINAL", 4.0), ("RETIRO_CURSO", None), ("CALIFICACION_FINAL", 5.0)]
+    eventos += [("CALIFICACION_FINAL", 8.0)] * 3
+    estado = estado_vacio("Law", 3)
+    for evento, promedio in eventos:
+        apply_academic_event(estado, evento, promedio, ventana=3)
+
+    recientes = list(reversed(eventos))[:3]
+    reconstruido = build_feature_columns(
+        student_ids=[1],
+        programas=["Law"],
+        semestres=[3],
+        history_student_ids=[1] * 3,
+        history_rank=[1, 2, 3],
+        history_promedio=[p for _, p in recientes],
+        history_evento=[e for e, _ in recientes],
+    )
+
+    assert estado.materias_reprobadas == 0 and estado.materias_retiradas == 0
+    assert estado.eventos == 6 and len(estado.eventos_recientes) == 3
+    registro = feature_record(estado)
+    for nombre in ("number_of_failed_courses_current_semester", "number_of_course_withdrawals_current_semester"):
+        assert registro[nombre] == reconstruido[nombre][0]
@@ -0,0 +1,58 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.student_service import StudentService
+from tests.unit.conftest import crear_estudiantes
+
+pytestmark = pytest.mark.unit
+
+
+def test_crear_consultar_y_filtrar_estudiantes(db):
+    crear_estudiantes(db, 2)
+    servicio = StudentService(db)
+
+    nuevo = servicio.create_student({"institucion_id": 1, "programa": "Medicina", "semestre": 5})
+
+    assert servicio.get_student(nuevo.id).programa == "Medicina"
+    assert [e.id for e in servicio.get_students()] == [1, 2, nuevo.id]
+    assert [e.id for e in servicio.get_students(programa="Medicina")] == [nuevo.id]
+    assert [e.id for e in servicio.get_students(semestre=3, limit=1)] == [1]
+    assert [e.id for e in servicio.get_students(skip=2)] == [nuevo.id]
+
+
+def test_estudiante_inexistente(db):
+    servicio = StudentService(db)
+
+    with pytest.raises(HTTPException) as error:
+        servicio.get_student(99)
+
+    assert error.value.status_code == 404
+    with pytest.raises(HTTPException):
+        servicio.delete_student(99)
+
+
+def test_crear_con_datos_invalidos_revierte(db):
+    crear_estudiantes(db, 1)
+    servicio = StudentService(db)
+
+    with pytest.raises(HTTPException) as error:
+        servicio.create_student({"institucion_id": 1, "programa": None, "semestre": 1})
+
+    assert error.value.status_code == 400
+    assert len(servicio.get_students()) == 1
+
+
+def test_actualizar_y_eliminar(db):
+    crear_estudiantes(db, 2)
+    servicio = StudentService(db)
+
+    actualizado = servicio.update_student(1, {"semestre": 4, "departamento": "Antioquia"})
+    assert (actualizado.semestre, actualizado.departamento) == (4, "Antioquia")
+
+    with pytest.raises(HTTPException) as error:
+        servicio.update_student(2, {"programa": None})
+    assert error.value.status_code == 400
+    assert servicio.get_student(2).programa == "Ingeniería"
+
+    assert servicio.delete_student(1) is True
+    assert [e.id for e in servicio.get_students()] == [2]